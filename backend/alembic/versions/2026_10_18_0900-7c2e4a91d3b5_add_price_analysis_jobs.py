@@ -0,0 +1,77 @@
+"""add_price_analysis_jobs
+
+Background price analysis jobs with incrementally written per-item results.
+
+Revision ID: 7c2e4a91d3b5
+Revises: fead9a7f54bc
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2e4a91d3b5'
+down_revision = 'fead9a7f54bc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'price_analysis_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('apply_updates', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('force_update', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('store_item_ids', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('total_items', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('items_analyzed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('items_updated', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('items_skipped', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('items_failed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['requested_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_price_analysis_jobs_id', 'price_analysis_jobs', ['id'])
+    op.create_index('ix_price_analysis_jobs_status', 'price_analysis_jobs', ['status'])
+
+    op.create_table(
+        'price_analysis_results',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('store_item_id', sa.Integer(), nullable=False),
+        sa.Column('succeeded', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('current_price', sa.Numeric(10, 2), nullable=True),
+        sa.Column('recommended_price', sa.Numeric(10, 2), nullable=True),
+        sa.Column('price_change', sa.Numeric(10, 2), nullable=True),
+        sa.Column('market_prices', sa.JSON(), nullable=True),
+        sa.Column('reason', sa.Text(), nullable=True),
+        sa.Column('cost_breakdown', sa.JSON(), nullable=True),
+        sa.Column('should_update', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('applied', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['price_analysis_jobs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['store_item_id'], ['store_items.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_id', 'store_item_id', name='uq_price_analysis_result_item')
+    )
+    op.create_index('ix_price_analysis_results_id', 'price_analysis_results', ['id'])
+    op.create_index('idx_price_analysis_results_job', 'price_analysis_results', ['job_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_price_analysis_results_job', table_name='price_analysis_results')
+    op.drop_index('ix_price_analysis_results_id', table_name='price_analysis_results')
+    op.drop_table('price_analysis_results')
+    op.drop_index('ix_price_analysis_jobs_status', table_name='price_analysis_jobs')
+    op.drop_index('ix_price_analysis_jobs_id', table_name='price_analysis_jobs')
+    op.drop_table('price_analysis_jobs')
@@ -0,0 +1,70 @@
+"""add_keyset_pagination_indexes
+
+Composite indexes matching the (sort key, id) order of keyset-paginated
+lists, so each page is an index range scan instead of a sort.
+
+Revision ID: 3f8d61b2c9a4
+Revises: 7c2e4a91d3b5
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8d61b2c9a4'
+down_revision = '7c2e4a91d3b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # My documents: newest edits first, soft-deleted rows excluded
+    op.create_index(
+        'idx_documents_owner_updated_id',
+        'documents',
+        ['owner_id', 'updated_at', 'id'],
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+    # Public documents: newest publications first, unpublished (NULL) last
+    op.create_index(
+        'idx_documents_published_id',
+        'documents',
+        [sa.text('published_at DESC NULLS LAST'), sa.text('id DESC')],
+    )
+    op.create_index(
+        'idx_activity_events_user_created_id',
+        'activity_events',
+        ['user_id', 'created_at', 'id'],
+    )
+    op.create_index(
+        'idx_reading_progress_user_last_read_id',
+        'reading_progress',
+        ['user_id', 'last_read', 'id'],
+    )
+    op.create_index(
+        'idx_group_posts_group_pinned_created_id',
+        'group_posts',
+        ['group_id', 'is_pinned', 'created_at', 'id'],
+    )
+    op.create_index(
+        'idx_moderation_group_created_id',
+        'moderation_actions',
+        ['group_id', 'created_at', 'id'],
+    )
+    op.create_index(
+        'idx_messages_thread_created_id',
+        'messages',
+        ['thread_id', 'created_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_messages_thread_created_id', table_name='messages')
+    op.drop_index('idx_moderation_group_created_id', table_name='moderation_actions')
+    op.drop_index('idx_group_posts_group_pinned_created_id', table_name='group_posts')
+    op.drop_index('idx_reading_progress_user_last_read_id', table_name='reading_progress')
+    op.drop_index('idx_activity_events_user_created_id', table_name='activity_events')
+    op.drop_index('idx_documents_published_id', table_name='documents')
+    op.drop_index('idx_documents_owner_updated_id', table_name='documents')
@@ -0,0 +1,232 @@
+"""add_folder_closure_table
+
+Closure table for the folder hierarchy, plus document and word counts per
+folder and per subtree, all kept current by triggers
+(app.models.folder.FOLDER_HIERARCHY_DDL, copied here as of this revision).
+
+Revision ID: a94c27e5d0f1
+Revises: 3f8d61b2c9a4
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a94c27e5d0f1'
+down_revision = '3f8d61b2c9a4'
+branch_labels = None
+depends_on = None
+
+# Frozen copies of app.models.folder.FOLDER_HIERARCHY_DDL and
+# FOLDER_HIERARCHY_BACKFILL: this revision must keep building the same schema
+# whatever the models say later
+FOLDER_HIERARCHY_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION folder_counts_apply(p_folder_id integer, p_documents integer, p_words bigint)
+    RETURNS void AS $$
+        UPDATE folders f SET
+            subtree_document_count = f.subtree_document_count + p_documents,
+            subtree_word_count = f.subtree_word_count + p_words,
+            document_count = f.document_count + CASE WHEN c.depth = 0 THEN p_documents ELSE 0 END,
+            word_count = f.word_count + CASE WHEN c.depth = 0 THEN p_words ELSE 0 END
+        FROM folder_closure c
+        WHERE c.descendant_id = p_folder_id AND f.id = c.ancestor_id
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION folder_counts_document_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND OLD.folder_id IS NOT DISTINCT FROM NEW.folder_id
+                AND OLD.is_deleted = NEW.is_deleted THEN
+            -- Same folder, same state: only the word count changed
+            IF NEW.folder_id IS NOT NULL AND NOT NEW.is_deleted THEN
+                PERFORM folder_counts_apply(
+                    NEW.folder_id, 0, COALESCE(NEW.word_count, 0) - COALESCE(OLD.word_count, 0)
+                );
+            END IF;
+            RETURN NULL;
+        END IF;
+        IF TG_OP <> 'INSERT' AND OLD.folder_id IS NOT NULL AND NOT OLD.is_deleted THEN
+            PERFORM folder_counts_apply(OLD.folder_id, -1, -COALESCE(OLD.word_count, 0));
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.folder_id IS NOT NULL AND NOT NEW.is_deleted THEN
+            PERFORM folder_counts_apply(NEW.folder_id, 1, COALESCE(NEW.word_count, 0));
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION folder_closure_insert() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO folder_closure (ancestor_id, descendant_id, depth)
+        SELECT NEW.id, NEW.id, 0
+        UNION ALL
+        SELECT ancestor_id, NEW.id, depth + 1 FROM folder_closure WHERE descendant_id = NEW.parent_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION folder_closure_move() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.parent_id IS NOT NULL AND EXISTS (
+            SELECT 1 FROM folder_closure WHERE ancestor_id = NEW.id AND descendant_id = NEW.parent_id
+        ) THEN
+            RAISE EXCEPTION 'folder % cannot be moved into its own subtree', NEW.id
+                USING ERRCODE = 'check_violation';
+        END IF;
+
+        UPDATE folders f SET
+            subtree_document_count = f.subtree_document_count - NEW.subtree_document_count,
+            subtree_word_count = f.subtree_word_count - NEW.subtree_word_count
+        FROM folder_closure c
+        WHERE c.descendant_id = NEW.id AND c.depth > 0 AND f.id = c.ancestor_id;
+
+        DELETE FROM folder_closure c
+        USING folder_closure sub, folder_closure anc
+        WHERE sub.ancestor_id = NEW.id
+          AND anc.descendant_id = NEW.id AND anc.depth > 0
+          AND c.ancestor_id = anc.ancestor_id AND c.descendant_id = sub.descendant_id;
+
+        INSERT INTO folder_closure (ancestor_id, descendant_id, depth)
+        SELECT p.ancestor_id, s.descendant_id, p.depth + s.depth + 1
+        FROM folder_closure p, folder_closure s
+        WHERE p.descendant_id = NEW.parent_id AND s.ancestor_id = NEW.id;
+
+        UPDATE folders f SET
+            subtree_document_count = f.subtree_document_count + NEW.subtree_document_count,
+            subtree_word_count = f.subtree_word_count + NEW.subtree_word_count
+        FROM folder_closure c
+        WHERE c.descendant_id = NEW.id AND c.depth > 0 AND f.id = c.ancestor_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION folder_detach_documents() RETURNS trigger AS $$
+    BEGIN
+        UPDATE documents SET folder_id = NULL WHERE folder_id = OLD.id;
+        RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS folders_closure_insert ON folders",
+    """
+    CREATE TRIGGER folders_closure_insert AFTER INSERT ON folders
+    FOR EACH ROW EXECUTE FUNCTION folder_closure_insert()
+    """,
+    "DROP TRIGGER IF EXISTS folders_closure_move ON folders",
+    """
+    CREATE TRIGGER folders_closure_move AFTER UPDATE OF parent_id ON folders
+    FOR EACH ROW WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id)
+    EXECUTE FUNCTION folder_closure_move()
+    """,
+    "DROP TRIGGER IF EXISTS folders_detach_documents ON folders",
+    """
+    CREATE TRIGGER folders_detach_documents BEFORE DELETE ON folders
+    FOR EACH ROW EXECUTE FUNCTION folder_detach_documents()
+    """,
+    "DROP TRIGGER IF EXISTS documents_folder_counts_insert ON documents",
+    """
+    CREATE TRIGGER documents_folder_counts_insert AFTER INSERT ON documents
+    FOR EACH ROW WHEN (NEW.folder_id IS NOT NULL)
+    EXECUTE FUNCTION folder_counts_document_change()
+    """,
+    "DROP TRIGGER IF EXISTS documents_folder_counts_update ON documents",
+    """
+    CREATE TRIGGER documents_folder_counts_update AFTER UPDATE OF folder_id, word_count, is_deleted ON documents
+    FOR EACH ROW WHEN (
+        OLD.folder_id IS DISTINCT FROM NEW.folder_id
+        OR OLD.word_count IS DISTINCT FROM NEW.word_count
+        OR OLD.is_deleted IS DISTINCT FROM NEW.is_deleted
+    )
+    EXECUTE FUNCTION folder_counts_document_change()
+    """,
+    "DROP TRIGGER IF EXISTS documents_folder_counts_delete ON documents",
+    """
+    CREATE TRIGGER documents_folder_counts_delete AFTER DELETE ON documents
+    FOR EACH ROW WHEN (OLD.folder_id IS NOT NULL)
+    EXECUTE FUNCTION folder_counts_document_change()
+    """,
+]
+
+FOLDER_HIERARCHY_BACKFILL = [
+    "DELETE FROM folder_closure",
+    """
+    INSERT INTO folder_closure (ancestor_id, descendant_id, depth)
+    WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+        SELECT id, id, 0 FROM folders
+        UNION ALL
+        SELECT t.ancestor_id, f.id, t.depth + 1
+        FROM tree t JOIN folders f ON f.parent_id = t.descendant_id
+        WHERE t.depth < 100  -- stop on parent_id cycles
+    )
+    SELECT ancestor_id, descendant_id, min(depth) FROM tree GROUP BY ancestor_id, descendant_id
+    """,
+    """
+    UPDATE folders f SET
+        document_count = COALESCE(own.documents, 0),
+        word_count = COALESCE(own.words, 0),
+        subtree_document_count = COALESCE(sub.documents, 0),
+        subtree_word_count = COALESCE(sub.words, 0)
+    FROM folders f2
+    LEFT JOIN (
+        SELECT folder_id, count(*) AS documents, sum(COALESCE(word_count, 0)) AS words
+        FROM documents WHERE folder_id IS NOT NULL AND NOT is_deleted
+        GROUP BY folder_id
+    ) own ON own.folder_id = f2.id
+    LEFT JOIN (
+        SELECT c.ancestor_id, count(*) AS documents, sum(COALESCE(d.word_count, 0)) AS words
+        FROM folder_closure c JOIN documents d ON d.folder_id = c.descendant_id AND NOT d.is_deleted
+        GROUP BY c.ancestor_id
+    ) sub ON sub.ancestor_id = f2.id
+    WHERE f.id = f2.id
+    """,
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'folder_closure',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['folders.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['descendant_id'], ['folders.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_folder_closure_descendant_id', 'folder_closure', ['descendant_id'])
+
+    op.add_column('folders', sa.Column('document_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('folders', sa.Column('word_count', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('folders', sa.Column('subtree_document_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('folders', sa.Column('subtree_word_count', sa.BigInteger(), nullable=False, server_default='0'))
+
+    # Lock both tables so nothing changes between the backfill and the triggers
+    op.execute("LOCK TABLE folders, documents IN SHARE ROW EXCLUSIVE MODE")
+    for statement in FOLDER_HIERARCHY_BACKFILL + FOLDER_HIERARCHY_DDL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS documents_folder_counts_delete ON documents")
+    op.execute("DROP TRIGGER IF EXISTS documents_folder_counts_update ON documents")
+    op.execute("DROP TRIGGER IF EXISTS documents_folder_counts_insert ON documents")
+    op.execute("DROP TRIGGER IF EXISTS folders_detach_documents ON folders")
+    op.execute("DROP TRIGGER IF EXISTS folders_closure_move ON folders")
+    op.execute("DROP TRIGGER IF EXISTS folders_closure_insert ON folders")
+    op.execute("DROP FUNCTION IF EXISTS folder_detach_documents()")
+    op.execute("DROP FUNCTION IF EXISTS folder_closure_move()")
+    op.execute("DROP FUNCTION IF EXISTS folder_closure_insert()")
+    op.execute("DROP FUNCTION IF EXISTS folder_counts_document_change()")
+    op.execute("DROP FUNCTION IF EXISTS folder_counts_apply(integer, integer, bigint)")
+
+    op.drop_column('folders', 'subtree_word_count')
+    op.drop_column('folders', 'subtree_document_count')
+    op.drop_column('folders', 'word_count')
+    op.drop_column('folders', 'document_count')
+    op.drop_index('ix_folder_closure_descendant_id', table_name='folder_closure')
+    op.drop_table('folder_closure')
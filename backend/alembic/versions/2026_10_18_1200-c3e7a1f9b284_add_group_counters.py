@@ -0,0 +1,184 @@
+"""add_group_counters
+
+Member, follower and post counts and the last post time on groups, and the
+member count on workspaces, all kept current by triggers
+(app.models.collaboration.GROUP_COUNTERS_DDL,
+app.models.workspace.WORKSPACE_COUNTERS_DDL, copied here as of this revision).
+
+Revision ID: c3e7a1f9b284
+Revises: a94c27e5d0f1
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e7a1f9b284'
+down_revision = 'a94c27e5d0f1'
+branch_labels = None
+depends_on = None
+
+LISTED = sa.text("is_public AND is_active AND NOT is_deleted")
+
+# Frozen copies of the counter triggers and backfills in app.models.collaboration
+# and app.models.workspace: this revision must keep building the same schema
+# whatever the models say later
+GROUP_COUNTERS_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION group_counts_member_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE groups SET member_count = member_count + 1 WHERE id = NEW.group_id;
+        ELSE
+            UPDATE groups SET member_count = GREATEST(member_count - 1, 0) WHERE id = OLD.group_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION group_counts_follower_change() RETURNS trigger AS $$
+    DECLARE
+        delta integer := 0;
+    BEGIN
+        IF TG_OP <> 'INSERT' AND OLD.is_active THEN
+            delta := delta - 1;
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.is_active THEN
+            delta := delta + 1;
+        END IF;
+        IF delta <> 0 THEN
+            UPDATE groups SET follower_count = GREATEST(follower_count + delta, 0)
+            WHERE id = COALESCE(NEW.group_id, OLD.group_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION group_counts_post_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE groups SET
+                post_count = post_count + 1,
+                last_activity_at = GREATEST(last_activity_at, COALESCE(NEW.created_at, now()))
+            WHERE id = NEW.group_id;
+        ELSE
+            UPDATE groups SET post_count = GREATEST(post_count - 1, 0) WHERE id = OLD.group_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS group_members_counts ON group_members",
+    """
+    CREATE TRIGGER group_members_counts AFTER INSERT OR DELETE ON group_members
+    FOR EACH ROW EXECUTE FUNCTION group_counts_member_change()
+    """,
+    "DROP TRIGGER IF EXISTS group_followers_counts ON group_followers",
+    """
+    CREATE TRIGGER group_followers_counts AFTER INSERT OR DELETE ON group_followers
+    FOR EACH ROW EXECUTE FUNCTION group_counts_follower_change()
+    """,
+    "DROP TRIGGER IF EXISTS group_followers_counts_update ON group_followers",
+    """
+    CREATE TRIGGER group_followers_counts_update AFTER UPDATE OF is_active ON group_followers
+    FOR EACH ROW WHEN (OLD.is_active IS DISTINCT FROM NEW.is_active)
+    EXECUTE FUNCTION group_counts_follower_change()
+    """,
+    "DROP TRIGGER IF EXISTS group_posts_counts ON group_posts",
+    """
+    CREATE TRIGGER group_posts_counts AFTER INSERT OR DELETE ON group_posts
+    FOR EACH ROW EXECUTE FUNCTION group_counts_post_change()
+    """,
+]
+
+GROUP_COUNTERS_BACKFILL = [
+    """
+    UPDATE groups g SET
+        member_count = (SELECT count(*) FROM group_members m WHERE m.group_id = g.id),
+        follower_count = (SELECT count(*) FROM group_followers f WHERE f.group_id = g.id AND f.is_active),
+        post_count = (SELECT count(*) FROM group_posts p WHERE p.group_id = g.id),
+        last_activity_at = (SELECT max(p.created_at) FROM group_posts p WHERE p.group_id = g.id)
+    """,
+]
+
+WORKSPACE_COUNTERS_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION workspace_counts_member_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE workspaces SET member_count = member_count + 1 WHERE id = NEW.workspace_id;
+        ELSE
+            UPDATE workspaces SET member_count = GREATEST(member_count - 1, 0) WHERE id = OLD.workspace_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS workspace_members_counts ON workspace_members",
+    """
+    CREATE TRIGGER workspace_members_counts AFTER INSERT OR DELETE ON workspace_members
+    FOR EACH ROW EXECUTE FUNCTION workspace_counts_member_change()
+    """,
+]
+
+WORKSPACE_COUNTERS_BACKFILL = [
+    """
+    UPDATE workspaces w SET
+        member_count = (SELECT count(*) FROM workspace_members m WHERE m.workspace_id = w.id)
+    """,
+]
+
+
+def upgrade() -> None:
+    op.add_column('groups', sa.Column('member_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('groups', sa.Column('follower_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('groups', sa.Column('post_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('groups', sa.Column('last_activity_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('workspaces', sa.Column('member_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Lock the source tables so nothing changes between the backfill and the triggers
+    op.execute(
+        "LOCK TABLE groups, group_members, group_followers, group_posts, "
+        "workspaces, workspace_members IN SHARE ROW EXCLUSIVE MODE"
+    )
+    for statement in (
+        GROUP_COUNTERS_BACKFILL + GROUP_COUNTERS_DDL
+        + WORKSPACE_COUNTERS_BACKFILL + WORKSPACE_COUNTERS_DDL
+    ):
+        op.execute(statement)
+
+    op.create_index(
+        'idx_groups_listed_popular', 'groups',
+        [sa.text('member_count DESC'), 'id'],
+        postgresql_where=LISTED,
+    )
+    op.create_index(
+        'idx_groups_listed_active', 'groups',
+        [sa.text('last_activity_at DESC NULLS LAST'), 'id'],
+        postgresql_where=LISTED,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_groups_listed_active', table_name='groups')
+    op.drop_index('idx_groups_listed_popular', table_name='groups')
+
+    op.execute("DROP TRIGGER IF EXISTS workspace_members_counts ON workspace_members")
+    op.execute("DROP TRIGGER IF EXISTS group_posts_counts ON group_posts")
+    op.execute("DROP TRIGGER IF EXISTS group_followers_counts_update ON group_followers")
+    op.execute("DROP TRIGGER IF EXISTS group_followers_counts ON group_followers")
+    op.execute("DROP TRIGGER IF EXISTS group_members_counts ON group_members")
+    op.execute("DROP FUNCTION IF EXISTS workspace_counts_member_change()")
+    op.execute("DROP FUNCTION IF EXISTS group_counts_post_change()")
+    op.execute("DROP FUNCTION IF EXISTS group_counts_follower_change()")
+    op.execute("DROP FUNCTION IF EXISTS group_counts_member_change()")
+
+    op.drop_column('workspaces', 'member_count')
+    op.drop_column('groups', 'last_activity_at')
+    op.drop_column('groups', 'post_count')
+    op.drop_column('groups', 'follower_count')
+    op.drop_column('groups', 'member_count')
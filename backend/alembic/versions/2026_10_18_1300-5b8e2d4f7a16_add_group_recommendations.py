@@ -0,0 +1,39 @@
+"""add_group_recommendations
+
+Precomputed top groups per user (app.services.group_recommendation_service),
+plus a GIN index on users.interests so a group's tag change can find the
+users it affects.
+
+Revision ID: 5b8e2d4f7a16
+Revises: c3e7a1f9b284
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2d4f7a16'
+down_revision = 'c3e7a1f9b284'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'group_recommendations',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('group_ids', postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column('scores', postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('idx_users_interests', 'users', ['interests'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_users_interests', table_name='users')
+    op.drop_table('group_recommendations')
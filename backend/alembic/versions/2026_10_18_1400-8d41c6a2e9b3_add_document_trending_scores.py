@@ -0,0 +1,38 @@
+"""add_document_trending_scores
+
+Durable copy of the time-decayed trending boards kept in Redis
+(app.services.trending_service), one row per document.
+
+Revision ID: 8d41c6a2e9b3
+Revises: 5b8e2d4f7a16
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41c6a2e9b3'
+down_revision = '5b8e2d4f7a16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'document_trending_scores',
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('score_day', sa.Float(), nullable=False),
+        sa.Column('score_week', sa.Float(), nullable=False),
+        sa.Column('score_month', sa.Float(), nullable=False),
+        sa.Column('score_year', sa.Float(), nullable=False),
+        sa.Column('score_all', sa.Float(), nullable=False),
+        sa.Column('scored_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('document_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('document_trending_scores')
@@ -0,0 +1,41 @@
+"""add_storage_path_indexes
+
+Byte-ordered (COLLATE "C") indexes on the blob storage paths, matching the
+order S3 lists keys in, so the storage garbage collector
+(app.services.storage_gc_service) pages through referenced paths with
+index range scans.
+
+Revision ID: e4c9b7a2d8f1
+Revises: 8d41c6a2e9b3
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4c9b7a2d8f1'
+down_revision = '8d41c6a2e9b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_documents_file_path_c',
+        'documents',
+        [sa.text('file_path COLLATE "C"')],
+        postgresql_where=sa.text('file_path IS NOT NULL'),
+    )
+    op.create_index(
+        'idx_document_versions_file_path_c',
+        'document_versions',
+        [sa.text('file_path COLLATE "C"')],
+        postgresql_where=sa.text('file_path IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_document_versions_file_path_c', table_name='document_versions')
+    op.drop_index('idx_documents_file_path_c', table_name='documents')
@@ -0,0 +1,39 @@
+"""add_content_fingerprints
+
+MinHash signatures of published documents, store items and EPUB
+submissions, the source of the local near-duplicate index
+(app.services.near_duplicate_service).
+
+Revision ID: a7d3f58c1e62
+Revises: e4c9b7a2d8f1
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3f58c1e62'
+down_revision = 'e4c9b7a2d8f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'content_fingerprints',
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=True),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+        sa.Column('word_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('kind', 'source_id')
+    )
+    op.create_index('idx_content_fingerprints_updated_at', 'content_fingerprints', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_content_fingerprints_updated_at', table_name='content_fingerprints')
+    op.drop_table('content_fingerprints')
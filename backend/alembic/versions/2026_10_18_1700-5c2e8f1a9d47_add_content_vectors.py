@@ -0,0 +1,39 @@
+"""add_content_vectors
+
+Hashed term features of published documents and store items, the source
+of the local "more like this" similarity index
+(app.services.similarity_service).
+
+Revision ID: 5c2e8f1a9d47
+Revises: a7d3f58c1e62
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2e8f1a9d47'
+down_revision = 'a7d3f58c1e62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'content_vectors',
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=True),
+        sa.Column('feature_ids', sa.LargeBinary(), nullable=False),
+        sa.Column('weights', sa.LargeBinary(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('kind', 'source_id')
+    )
+    op.create_index('idx_content_vectors_updated_at', 'content_vectors', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_content_vectors_updated_at', table_name='content_vectors')
+    op.drop_table('content_vectors')
@@ -0,0 +1,28 @@
+"""add_activity_events_user_id_index
+
+(user_id, id) index on activity_events, so the newest events of the users
+a feed follows are read in id order straight from the index - by inbox
+builds, celebrity pulls and the database fallback of the activity feed
+(app.services.activity_inbox).
+
+Revision ID: b91f4d6e2c38
+Revises: 5c2e8f1a9d47
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b91f4d6e2c38'
+down_revision = '5c2e8f1a9d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_activity_events_user_id_id', 'activity_events', ['user_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_activity_events_user_id_id', table_name='activity_events')
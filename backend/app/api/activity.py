@@ -1,11 +1,12 @@
 """Activity Feed API"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.pagination import COUNT_MODE_PATTERN
 from app.services import user_service
 from app.schemas.social import ActivityFeedResponse
 from app.services.activity_service import ActivityService
@@ -15,10 +16,18 @@ router = APIRouter(prefix="/activity", tags=["activity"])
 
 
 @router.get("/feed", response_model=ActivityFeedResponse)
-async def get_activity_feed(skip: int = 0, limit: int = 50, current_user: Dict[str, Any] = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_activity_feed(
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    count: Optional[str] = Query(None, pattern=COUNT_MODE_PATTERN),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Activity from followed users and your own; pass next_cursor back as cursor for the next page."""
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
-    events, total = await ActivityService.get_activity_feed(db, user.id, skip, limit)
-    return ActivityFeedResponse(total=total, events=events)
+    page = await ActivityService.get_activity_feed(db, user.id, skip, limit, cursor=cursor, count=count)
+    return ActivityFeedResponse(events=page.pop("items"), **page)
 
 
 @router.get("/user/{user_id}", response_model=ActivityFeedResponse)
@@ -2,7 +2,7 @@
 Admin API - Platform Administration Endpoints
 Secured via Keycloak authentication with is_staff check
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func
 from sqlalchemy.orm import joinedload
@@ -10,11 +10,12 @@ from typing import List, Optional
 from datetime import datetime, timezone
 from pydantic import BaseModel, ConfigDict
 
-from app.core.database import get_db
+from app.core.database import get_analytics_db, get_db
 from app.core.auth import require_staff
 from app.models.collaboration import Group, GroupMember, GroupMemberRole
 from app.models.studio_customization import StudioCustomDomain
 from app.models.user import User
+from app.services.tenant_resolution_service import GROUP, STUDIO, tenant_resolution
 from app.models.store import StoreItem, StoreItemStatus
 from app.schemas.collaboration import ScholarshipDecision, ScholarshipRequestResponse
 from decimal import Decimal
@@ -323,7 +324,7 @@ async def make_user_staff(
 @router.get("/stats", response_model=AdminStatsResponse)
 async def get_admin_stats(
     staff_user: User = Depends(require_staff),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_analytics_db)
 ):
     """
     Get admin dashboard statistics
@@ -387,7 +388,7 @@ async def get_admin_stats(
 async def get_top_interests(
     limit: int = Query(10, le=50),
     staff_user: User = Depends(require_staff),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_analytics_db)
 ):
     """
     Get the most popular interests across all groups
@@ -446,17 +447,9 @@ async def get_pending_group_subdomains(
     )
     groups = result.scalars().all()
     
-    # Get member counts and owner info for all groups efficiently
+    # Get owner info for all groups efficiently (member counts are on the group row)
     group_ids = [group.id for group in groups]
     
-    # Count members for each group
-    member_counts_result = await db.execute(
-        select(GroupMember.group_id, func.count(GroupMember.id))
-        .where(GroupMember.group_id.in_(group_ids))
-        .group_by(GroupMember.group_id)
-    )
-    member_counts = dict(member_counts_result.all())
-    
     # Get owners (users with OWNER role) for each group
     owners_result = await db.execute(
         select(GroupMember)
@@ -480,7 +473,7 @@ async def get_pending_group_subdomains(
             slug=group.slug,
             subdomain_requested=group.subdomain_requested,
             created_at=group.created_at,
-            member_count=member_counts.get(group.id, 0),
+            member_count=group.member_count,
             owner_username=owners_by_group.get(group.id)
         ))
     
@@ -545,6 +538,7 @@ async def approve_group_subdomain(
     
     await db.commit()
     await db.refresh(group)
+    await tenant_resolution.publish_invalidation(GROUP, group.id)
     
     return {
         "success": True,
@@ -631,6 +625,7 @@ async def approve_custom_domain(
     
     await db.commit()
     await db.refresh(domain)
+    await tenant_resolution.publish_invalidation(STUDIO, domain.studio_id)
     
     return {
         "success": True,
@@ -795,6 +790,7 @@ class PriceUpdateRequest(BaseModel):
 
 class PriceAnalysisResponse(BaseModel):
     """Response with price analysis"""
+    result_id: Optional[int] = None
     store_item_id: int
     title: str
     current_price: float
@@ -804,219 +800,174 @@ class PriceAnalysisResponse(BaseModel):
     reason: str
     cost_breakdown: dict
     should_update: bool
+    applied: bool = False
 
 
-class BulkPriceUpdateResponse(BaseModel):
-    """Response from bulk price update"""
+class PriceAnalysisJobResponse(BaseModel):
+    """Status of a background price analysis job"""
+    id: int
+    status: str
+    apply_updates: bool
+    force_update: bool
     total_items: int
     items_analyzed: int
     items_updated: int
     items_skipped: int
     items_failed: int
-    updates: List[PriceAnalysisResponse]
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
 
+async def _start_price_job(
+    request: PriceUpdateRequest,
+    apply_updates: bool,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession,
+    staff_user: Optional[dict]
+) -> PriceAnalysisJobResponse:
+    """Create a price analysis job and schedule it in the background"""
+    from app.services.price_analysis_service import PriceAnalysisService
+    
+    # require_staff returns the staff User row
+    job = await PriceAnalysisService.create_job(
+        db,
+        requested_by=getattr(staff_user, "id", None),
+        store_item_ids=request.store_item_ids,
+        force_update=request.force_update,
+        apply_updates=apply_updates
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="No store items found")
+    
+    background_tasks.add_task(PriceAnalysisService.run_job, job.id)
+    return PriceAnalysisJobResponse.model_validate(job)
 
-@router.post("/prices/analyze", response_model=List[PriceAnalysisResponse])
+
+@router.post("/prices/analyze", response_model=PriceAnalysisJobResponse)
 async def analyze_prices(
     request: PriceUpdateRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     staff_user: Optional[dict] = Depends(require_staff)
 ):
     """
     Analyze market prices for store items without updating
     
-    This endpoint scrapes competitor prices and calculates optimal pricing
-    but doesn't make any changes. Use this to preview what would happen.
+    Starts a background job that scrapes competitor prices and calculates
+    optimal pricing but doesn't change any prices. Poll
+    /prices/jobs/{job_id} for progress and /prices/jobs/{job_id}/results
+    for the analysis.
     """
-    # Lazy import to avoid startup errors if packages not installed yet
-    from app.services.price_scraper import PriceScraper
-    from app.services.pricing_engine import PricingEngine
-    
-    try:
-        # Get store items to analyze
-        if request.store_item_ids:
-            result = await db.execute(
-                select(StoreItem).where(
-                    StoreItem.id.in_(request.store_item_ids),
-                    StoreItem.status == StoreItemStatus.ACTIVE
-                )
-            )
-        else:
-            # Analyze all active items
-            result = await db.execute(
-                select(StoreItem).where(StoreItem.status == StoreItemStatus.ACTIVE)
-            )
-        
-        items = result.scalars().all()
-        
-        if not items:
-            raise HTTPException(status_code=404, detail="No store items found")
-        
-        analyses = []
-        
-        for item in items:
-            try:
-                # Scrape market prices
-                market_prices = await PriceScraper.get_market_prices(
-                    isbn=item.isbn,
-                    title=item.title,
-                    author=item.author_name
-                )
-                
-                # Calculate optimal price
-                pricing_result = PricingEngine.calculate_optimal_price(
-                    market_prices=market_prices,
-                    current_price=item.price_usd
-                )
-                
-                analyses.append(PriceAnalysisResponse(
-                    store_item_id=item.id,
-                    title=item.title,
-                    current_price=float(item.price_usd),
-                    recommended_price=float(pricing_result['recommended_price']),
-                    price_change=float(pricing_result['price_change']) if pricing_result['price_change'] else None,
-                    market_prices={k: float(v) if v else None for k, v in pricing_result['market_prices'].items()},
-                    reason=pricing_result['reason'],
-                    cost_breakdown={k: float(v) if isinstance(v, (int, float)) else v 
-                                   for k, v in pricing_result['cost_breakdown'].items()},
-                    should_update=pricing_result['should_update']
-                ))
-                
-            except Exception as e:
-                print(f"Error analyzing price for item {item.id}: {e}")
-                continue
-        
-        return analyses
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error in price analysis: {e}")
-        raise HTTPException(status_code=500, detail=f"Price analysis failed: {str(e)}")
+    return await _start_price_job(request, False, background_tasks, db, staff_user)
 
 
-@router.post("/prices/update", response_model=BulkPriceUpdateResponse)
+@router.post("/prices/update", response_model=PriceAnalysisJobResponse)
 async def update_prices(
     request: PriceUpdateRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     staff_user: Optional[dict] = Depends(require_staff)
 ):
     """
     Update prices for store items based on market analysis
     
-    This endpoint:
-    1. Scrapes competitor prices
+    Starts a background job that:
+    1. Scrapes competitor prices (bounded concurrency, cached per ISBN)
     2. Calculates optimal pricing with minimum margin protection
-    3. Updates prices in database
-    4. Returns detailed report
+    3. Records each analysis as it completes
+    4. Applies all price changes with bulk updates
+    
+    Returns the job; poll /prices/jobs/{job_id} for progress.
     """
-    # Lazy import to avoid startup errors if packages not installed yet
-    from app.services.price_scraper import PriceScraper
-    from app.services.pricing_engine import PricingEngine
+    return await _start_price_job(request, True, background_tasks, db, staff_user)
+
+
+@router.get("/prices/jobs/{job_id}", response_model=PriceAnalysisJobResponse)
+async def get_price_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    staff_user: Optional[dict] = Depends(require_staff)
+):
+    """Get progress of a price analysis job"""
+    from app.services.price_analysis_service import PriceAnalysisService
     
-    try:
-        # Get store items to update
-        if request.store_item_ids:
-            result = await db.execute(
-                select(StoreItem).where(
-                    StoreItem.id.in_(request.store_item_ids),
-                    StoreItem.status == StoreItemStatus.ACTIVE
-                )
-            )
-        else:
-            # Update all active items
-            result = await db.execute(
-                select(StoreItem).where(StoreItem.status == StoreItemStatus.ACTIVE)
-            )
-        
-        items = result.scalars().all()
-        
-        if not items:
-            raise HTTPException(status_code=404, detail="No store items found")
-        
-        total_items = len(items)
-        items_analyzed = 0
-        items_updated = 0
-        items_skipped = 0
-        items_failed = 0
-        updates = []
-        
-        for item in items:
-            try:
-                items_analyzed += 1
-                
-                # Scrape market prices
-                market_prices = await PriceScraper.get_market_prices(
-                    isbn=item.isbn,
-                    title=item.title,
-                    author=item.author_name
-                )
-                
-                # Calculate optimal price
-                pricing_result = PricingEngine.calculate_optimal_price(
-                    market_prices=market_prices,
-                    current_price=item.price_usd
-                )
-                
-                # Decide whether to update
-                should_update = request.force_update or pricing_result['should_update']
-                
-                if should_update:
-                    # Update price in database
-                    new_price = pricing_result['recommended_price']
-                    
-                    # Calculate discount if applicable
-                    if new_price < item.price_usd:
-                        discount_pct = ((item.price_usd - new_price) / item.price_usd * 100)
-                        item.discount_percentage = int(discount_pct)
-                    else:
-                        item.discount_percentage = 0
-                    
-                    item.price_usd = new_price
-                    item.final_price = new_price
-                    
-                    items_updated += 1
-                    print(f"Updated price for '{item.title}' from ${item.price_usd} to ${new_price}")
-                else:
-                    items_skipped += 1
-                    print(f"Skipped price update for '{item.title}' - change too small")
-                
-                updates.append(PriceAnalysisResponse(
-                    store_item_id=item.id,
-                    title=item.title,
-                    current_price=float(item.price_usd),
-                    recommended_price=float(pricing_result['recommended_price']),
-                    price_change=float(pricing_result['price_change']) if pricing_result['price_change'] else None,
-                    market_prices={k: float(v) if v else None for k, v in pricing_result['market_prices'].items()},
-                    reason=pricing_result['reason'],
-                    cost_breakdown={k: float(v) if isinstance(v, (int, float)) else v 
-                                   for k, v in pricing_result['cost_breakdown'].items()},
-                    should_update=should_update
-                ))
-                
-            except Exception as e:
-                items_failed += 1
-                print(f"Error updating price for item {item.id}: {e}")
-                continue
-        
-        # Commit all changes
-        await db.commit()
-        
-        return BulkPriceUpdateResponse(
-            total_items=total_items,
-            items_analyzed=items_analyzed,
-            items_updated=items_updated,
-            items_skipped=items_skipped,
-            items_failed=items_failed,
-            updates=updates
+    job = await PriceAnalysisService.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Price analysis job not found")
+    return job
+
+
+@router.get("/prices/jobs/{job_id}/results", response_model=List[PriceAnalysisResponse])
+async def get_price_job_results(
+    job_id: int,
+    after_id: int = Query(0, ge=0, description="Return results after this result ID"),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    staff_user: Optional[dict] = Depends(require_staff)
+):
+    """
+    Get analysis results recorded so far for a price analysis job
+    
+    Results are ordered by result ID; pass the last seen ID as after_id to
+    fetch only new results while the job is running.
+    """
+    from app.services.price_analysis_service import PriceAnalysisService
+    
+    job = await PriceAnalysisService.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Price analysis job not found")
+    
+    rows = await PriceAnalysisService.get_results(db, job_id, after_id=after_id, limit=limit)
+    return [
+        PriceAnalysisResponse(
+            result_id=result.id,
+            store_item_id=result.store_item_id,
+            title=title,
+            current_price=float(result.current_price),
+            recommended_price=float(result.recommended_price),
+            price_change=float(result.price_change) if result.price_change else None,
+            market_prices=result.market_prices or {},
+            reason=result.reason or "",
+            cost_breakdown=result.cost_breakdown or {},
+            should_update=result.should_update,
+            applied=result.applied
         )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error in bulk price update: {e}")
-        await db.rollback()
-        raise HTTPException(status_code=500, detail=f"Bulk price update failed: {str(e)}")
+        for result, title in rows
+    ]
+
+
+@router.post("/prices/jobs/{job_id}/resume", response_model=PriceAnalysisJobResponse)
+async def resume_price_job(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    staff_user: Optional[dict] = Depends(require_staff)
+):
+    """
+    Resume a failed, not yet started or abandoned price analysis job
+    
+    Items that already have results are not scraped again. A running or
+    applying job is only taken over once its worker has stopped renewing
+    its lease; until then, and for completed jobs, this returns 409.
+    """
+    from app.services.price_analysis_service import PriceAnalysisService
+    from app.models.store import PriceAnalysisJobStatus
+    
+    job = await PriceAnalysisService.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Price analysis job not found")
+    if not PriceAnalysisService.is_resumable(job):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Price analysis job is {PriceAnalysisJobStatus(job.status).value} and cannot be resumed"
+        )
+    
+    background_tasks.add_task(PriceAnalysisService.run_job, job.id)
+    return job
 
 
 @router.get("/prices/minimum")
@@ -1098,7 +1049,7 @@ class StoreItemAnalyticsResponse(BaseModel):
 
 @router.get("/store/stats", response_model=StoreStatsResponse)
 async def get_store_stats(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_analytics_db),
     staff_user: Optional[dict] = Depends(require_staff)
 ):
     """
@@ -1139,7 +1090,7 @@ async def get_store_items(
     search: Optional[str] = Query(None, description="Search by title or author"),
     limit: int = Query(100, le=1000),
     offset: int = Query(0, ge=0),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_analytics_db),
     staff_user: Optional[dict] = Depends(require_staff)
 ):
     """
@@ -10,7 +10,7 @@ from datetime import datetime
 from pydantic import BaseModel, ConfigDict
 from decimal import Decimal
 
-from app.core.database import get_db
+from app.core.database import get_analytics_db, get_db
 from app.core.auth import require_staff
 from app.models.user import User
 from app.models.store import StoreItem, StoreItemStatus
@@ -54,7 +54,7 @@ class StoreItemAnalyticsResponse(BaseModel):
 
 @router.get("/store/stats", response_model=StoreStatsResponse)
 async def get_store_stats(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_analytics_db),
     staff_user: Optional[dict] = Depends(require_staff)
 ):
     """
@@ -91,7 +91,7 @@ async def get_store_stats(
 
 @router.get("/store/items", response_model=List[StoreItemAnalyticsResponse])
 async def get_store_items(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_analytics_db),
     staff_user: Optional[dict] = Depends(require_staff)
 ):
     """
@@ -72,7 +72,8 @@ async def generate_writing_prompts(
     prompts = await AIAssistanceService.generate_writing_prompts(
         genre=request.genre,
         theme=request.theme,
-        count=request.count
+        count=request.count,
+        user_id=current_user.get("sub")
     )
     
     return prompts
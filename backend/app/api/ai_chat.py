@@ -7,10 +7,10 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Dict, Any
-import os
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.services.ai_gateway import ai_gateway
 
 
 router = APIRouter(prefix="/ai", tags=["AI Chat"])
@@ -37,16 +37,10 @@ async def chat_with_ai(
     Takes conversation history and streams the response back.
     Helps writers with their creative process.
     """
-    ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-    
-    if not ANTHROPIC_API_KEY:
+    if not ai_gateway.is_configured:
         raise HTTPException(status_code=503, detail="AI service not configured")
     
     try:
-        from anthropic import AsyncAnthropic
-        
-        client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
-        
         # System prompt that guides Claude's behavior
         system_prompt = """You are a helpful writing assistant for creative writers. Your role is to:
 
@@ -74,14 +68,14 @@ You're here to help writers CREATE, not to write FOR them."""
         
         # Stream the response
         async def generate():
-            async with client.messages.stream(
-                model=os.getenv("CLAUDE_MODEL", "claude-sonnet-4-20250514"),
-                max_tokens=2048,
+            async for text in ai_gateway.stream(
+                claude_messages,
                 system=system_prompt,
-                messages=claude_messages
-            ) as stream:
-                async for text in stream.text_stream:
-                    yield text
+                max_tokens=2048,
+                feature="chat",
+                user_id=current_user.get("sub")
+            ):
+                yield text
         
         return StreamingResponse(generate(), media_type="text/plain")
     
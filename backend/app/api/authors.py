@@ -5,17 +5,46 @@ Users view central author profiles and can follow them for notifications.
 from typing import List, Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field, ConfigDict
 
 from app.core.database import get_db
-from app.core.auth import get_current_user, get_optional_user
+from app.core.auth import get_current_user, get_optional_user, get_optional_user_from_db
+from app.core.http_cache import CachePolicy, combine, table_version
 from app.models.user import User
 from app.models.author import Author, AuthorEdit, UserFollowsAuthor
 from app.models.store import StoreItem
 
 router = APIRouter(prefix="/authors", tags=["authors"])
 
+# Profile plus its followers (follower counts, is_following)
+AUTHOR_CACHE = CachePolicy(
+    max_age=60,
+    stale_while_revalidate=600,
+    version=combine(
+        table_version(Author, lambda params: [Author.id == int(params["author_id"])]),
+        table_version(
+            UserFollowsAuthor,
+            lambda params: [UserFollowsAuthor.author_id == int(params["author_id"])],
+            column="id",
+        ),
+    ),
+    personalized=True,
+    shared=True,
+)
+
+AUTHOR_BOOKS_CACHE = CachePolicy(
+    max_age=300,
+    stale_while_revalidate=3600,
+    version=table_version(StoreItem, lambda params: [
+        StoreItem.author_id == int(params["author_id"]),
+        StoreItem.status == "active",
+    ]),
+    shared=True,
+)
+
 
 # Schemas
 class AuthorResponse(BaseModel):
@@ -79,6 +108,22 @@ class EditResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+def _book_summary(book: StoreItem) -> BookSummary:
+    """BookSummary for a store item, with its discounted price"""
+    final_price = float(book.price_usd)
+    if book.discount_percentage:
+        final_price = final_price * (1 - book.discount_percentage / 100)
+    return BookSummary(
+        id=book.id,
+        title=book.title,
+        cover_url=book.cover_blob_url,
+        final_price=round(final_price, 2),
+        rating_average=float(book.rating_average) if book.rating_average else None,
+        rating_count=book.rating_count or 0,
+        published_at=book.published_at
+    )
+
+
 # Endpoints
 # Note: More specific routes must come before generic /{author_id} patterns
 @router.get("/by-name/{author_name}/books", response_model=List[BookSummary])
@@ -108,54 +153,51 @@ async def get_books_by_author_name(
     result = await db.execute(stmt)
     books = result.scalars().all()
     
-    return [
-        BookSummary(
-            id=book.id,
-            title=book.title,
-            cover_url=book.cover_url,
-            final_price=book.final_price
-        )
-        for book in books
-    ]
+    return [_book_summary(book) for book in books]
 
 
-@router.get("/{author_id}", response_model=AuthorResponse)
+@router.get("/{author_id}", response_model=AuthorResponse, dependencies=[Depends(AUTHOR_CACHE)])
 async def get_author(
     author_id: int,
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user_from_db)
 ):
     """Get wiki-style author profile by ID."""
-    author = db.query(Author).filter(Author.id == author_id).first()
+    result = await db.execute(select(Author).where(Author.id == author_id))
+    author = result.scalar_one_or_none()
     if not author:
         raise HTTPException(status_code=404, detail="Author not found")
     
     # Check if current user follows this author
     is_following = False
     if current_user:
-        follow = db.query(UserFollowsAuthor).filter(
-            UserFollowsAuthor.user_id == current_user.id,
-            UserFollowsAuthor.author_id == author_id
-        ).first()
-        is_following = follow is not None
+        result = await db.execute(
+            select(UserFollowsAuthor.id).where(
+                UserFollowsAuthor.user_id == current_user.id,
+                UserFollowsAuthor.author_id == author_id
+            )
+        )
+        is_following = result.first() is not None
     
     response = AuthorResponse.model_validate(author)
     response.is_following = is_following
     return response
 
 
-@router.get("/{author_id}/books", response_model=List[BookSummary])
+@router.get("/{author_id}/books", response_model=List[BookSummary], dependencies=[Depends(AUTHOR_BOOKS_CACHE)])
 async def get_author_books(
     author_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all books by this author (auto-generated from store)."""
-    books = db.query(StoreItem).filter(
-        StoreItem.author_id == author_id,
-        StoreItem.status == "active"
-    ).order_by(StoreItem.published_at.desc()).all()
+    result = await db.execute(
+        select(StoreItem).where(
+            StoreItem.author_id == author_id,
+            StoreItem.status == "active"
+        ).order_by(StoreItem.published_at.desc())
+    )
     
-    return [BookSummary.model_validate(book) for book in books]
+    return [_book_summary(book) for book in result.scalars().all()]
 
 
 @router.post("/{author_id}/edit", response_model=EditResponse)
@@ -2,13 +2,17 @@
 Beta Reader Profile API
 Endpoints for beta reader marketplace profiles
 """
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select
 from typing import List, Optional
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.models.user import User, BetaReaderProfile, UserBadge
+from app.services.loaders import Loaders, get_loaders, user_label
 from app.schemas.beta_profile import (
     BetaReaderProfileCreate,
     BetaReaderProfileUpdate,
@@ -132,7 +136,7 @@ def create_or_update_my_profile(
 
 
 @router.get("/marketplace", response_model=dict)
-def browse_marketplace(
+async def browse_marketplace(
     genres: Optional[str] = Query(None, description="Comma-separated genres"),
     specialties: Optional[str] = Query(None, description="Comma-separated specialties"),
     availability: Optional[str] = Query(None, pattern="^(available|busy|not_accepting)$"),
@@ -147,13 +151,14 @@ def browse_marketplace(
     sort: Optional[str] = Query(None, pattern="^(rating|turnaround|price)$"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders)
 ):
     """
     Browse beta reader marketplace with filters
     Returns profiles with user data, scores, and badges
     """
-    query = db.query(BetaReaderProfile).join(User).filter(
+    query = select(BetaReaderProfile).join(User, BetaReaderProfile.user_id == User.id).filter(
         BetaReaderProfile.is_active == True
     )
     
@@ -251,21 +256,31 @@ def browse_marketplace(
         )
     
     # Pagination
-    total = query.count()
+    total = (await db.execute(
+        select(func.count()).select_from(query.order_by(None).subquery())
+    )).scalar_one()
     offset = (page - 1) * page_size
-    profiles = query.offset(offset).limit(page_size).all()
+    profiles = (await db.execute(query.offset(offset).limit(page_size))).scalars().all()
+    
+    # Users and badges for the whole page, one query each (or none if cached)
+    user_ids = [profile.user_id for profile in profiles]
+    users, badge_lists = await asyncio.gather(
+        loaders.users.load_many(user_ids),
+        loaders.badges.load_many(user_ids),
+    )
     
     # Enrich profiles with user data and badges
     enriched_profiles = []
-    for profile in profiles:
-        user = db.query(User).filter(User.id == profile.user_id).first()
-        badges = db.query(UserBadge).filter(UserBadge.user_id == profile.user_id).all()
+    for profile, user, badges in zip(profiles, users, badge_lists):
+        if user is None:
+            continue
+        badges = badges or []
         
         profile_dict = {
             "id": profile.id,
             "user_id": profile.user_id,
-            "username": user.username or user.email,
-            "display_name": user.display_name or user.username or user.email,
+            "username": user["username"] or f"User {user['id']}",
+            "display_name": user_label(user),
             "availability": profile.availability,
             "bio": profile.bio,
             "genres": profile.genres,
@@ -281,11 +296,11 @@ def browse_marketplace(
             "is_featured": profile.is_featured,
             "total_projects_completed": profile.total_projects_completed,
             "average_rating": profile.average_rating,
-            "beta_score": user.beta_score,
-            "reading_score": user.reading_score,
-            "writer_score": user.writer_score,
-            "has_beta_master_badge": any(b.badge_type == "BETA_MASTER" for b in badges),
-            "has_author_badge": any(b.badge_type == "AUTHOR" for b in badges),
+            "beta_score": user["beta_score"],
+            "reading_score": user["reading_score"],
+            "writer_score": user["writer_score"],
+            "has_beta_master_badge": any(b["badge_type"] == "BETA_MASTER" for b in badges),
+            "has_author_badge": any(b["badge_type"] == "AUTHOR" for b in badges),
             "created_at": profile.created_at,
             "updated_at": profile.updated_at
         }
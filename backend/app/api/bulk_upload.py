@@ -17,37 +17,14 @@ import zipfile
 import io
 import os
 import json
-import re
 from datetime import datetime, timezone
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.services import user_service
-
-# Document format libraries
-try:
-    from docx import Document as DocxDocument
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
-
-try:
-    from odf import text as odf_text, teletype
-    from odf.opendocument import load as odf_load
-    ODF_AVAILABLE = True
-except ImportError:
-    ODF_AVAILABLE = False
-
-try:
-    from PyPDF2 import PdfReader
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
-
-try:
-    from bs4 import BeautifulSoup
-    HTML_AVAILABLE = True
-except ImportError:
-    HTML_AVAILABLE = False
+from app.services.document_conversion_service import (
+    document_conversion,
+    DocumentConversionError,
+)
 
 router = APIRouter(prefix="/storage", tags=["bulk-upload", "storage"])
 
@@ -353,15 +330,13 @@ async def bulk_upload_documents(
                                 errors.append(f"Skipped {safe_filename}: File too large after decompression")
                                 continue
                             
-                            # Convert document to markdown (handles all formats)
+                            # Convert to markdown and TipTap JSON (handles all formats)
                             try:
-                                file_content = convert_document_to_markdown(raw_content, safe_filename)
-                            except HTTPException as he:
-                                errors.append(f"Skipped {safe_filename}: {he.detail}")
-                                continue
-                            except Exception as e:
+                                converted = await document_conversion.convert_upload(raw_content, safe_filename)
+                            except DocumentConversionError as e:
                                 errors.append(f"Skipped {safe_filename}: {str(e)}")
                                 continue
+                            file_content = converted["markdown"]
                             
                             # Security: Validate content
                             if not validate_markdown_content(file_content):
@@ -370,11 +345,9 @@ async def bulk_upload_documents(
                             
                             file_size_bytes = len(file_content.encode('utf-8'))
                             
-                            # Extract metadata from Obsidian-style frontmatter (if it's markdown)
-                            title, clean_content = parse_frontmatter(file_content, safe_filename)
-                            
-                            # Convert to TipTap JSON format
-                            tiptap_content = markdown_to_tiptap(clean_content)
+                            # Title from Obsidian-style frontmatter, first heading or filename
+                            title = converted["title"]
+                            tiptap_content = converted["tiptap"]
                             
                             # Handle folder structure - create project from top-level folder
                             folder_path = os.path.dirname(file_path)
@@ -421,7 +394,7 @@ async def bulk_upload_documents(
                                     target_project_id = folder_to_project[top_folder]
                             
                             # Create document
-                            word_count = len(clean_content.split())
+                            word_count = converted["word_count"]
                             
                             result = await db.execute(
                                 text("""
@@ -493,13 +466,12 @@ async def bulk_upload_documents(
             # Security: Sanitize filename
             safe_filename = sanitize_filename(file.filename)
             
-            # Convert document to markdown
+            # Convert document to markdown and TipTap JSON
             try:
-                file_content = convert_document_to_markdown(content, safe_filename)
-            except HTTPException as he:
-                raise he
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
+                converted = await document_conversion.convert_upload(content, safe_filename)
+            except DocumentConversionError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            file_content = converted["markdown"]
             
             # Security: Validate content
             if not validate_markdown_content(file_content):
@@ -507,12 +479,9 @@ async def bulk_upload_documents(
             
             file_size_bytes = len(content)
             
-            title, clean_content = parse_frontmatter(file_content, safe_filename)
-            
-            # Convert to TipTap JSON format
-            tiptap_content = markdown_to_tiptap(clean_content)
-            
-            word_count = len(clean_content.split())
+            title = converted["title"]
+            tiptap_content = converted["tiptap"]
+            word_count = converted["word_count"]
             
             result = await db.execute(
                 text("""
@@ -634,22 +603,18 @@ async def bulk_upload_documents(
                     file_content_bytes = await file_obj.read()
                     file_size_bytes = len(file_content_bytes)
                     
-                    # Convert document to markdown
+                    # Convert document to markdown and TipTap JSON
                     try:
-                        file_content = convert_document_to_markdown(file_content_bytes, relative_path)
-                    except HTTPException as he:
-                        errors.append({"file": relative_path, "error": he.detail})
-                        continue
-                    except Exception as e:
+                        converted = await document_conversion.convert_upload(
+                            file_content_bytes, os.path.basename(relative_path)
+                        )
+                    except DocumentConversionError as e:
                         errors.append({"file": relative_path, "error": str(e)})
                         continue
                     
-                    # Parse frontmatter and get title
-                    title, clean_content = parse_frontmatter(file_content, os.path.basename(relative_path))
-                    
-                    # Convert to TipTap format
-                    tiptap_content = markdown_to_tiptap(clean_content)
-                    word_count = len(clean_content.split())
+                    title = converted["title"]
+                    tiptap_content = converted["tiptap"]
+                    word_count = converted["word_count"]
                     
                     # Determine folder_id from path
                     folder_path = os.path.dirname(relative_path)
@@ -727,336 +692,6 @@ async def bulk_upload_documents(
         raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
 
 
-def convert_document_to_markdown(content: bytes, filename: str) -> str:
-    """
-    Convert various document formats to markdown.
-    Supports: .txt, .html, .docx, .odt, .pdf
-    """
-    ext = os.path.splitext(filename.lower())[1]
-    
-    try:
-        # Plain text
-        if ext == '.txt':
-            return content.decode('utf-8')
-        
-        # HTML
-        elif ext in ['.html', '.htm']:
-            if not HTML_AVAILABLE:
-                raise HTTPException(status_code=400, detail="HTML parsing not available")
-            soup = BeautifulSoup(content, 'html.parser')
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            return soup.get_text()
-        
-        # Microsoft Word (.docx)
-        elif ext == '.docx':
-            if not DOCX_AVAILABLE:
-                raise HTTPException(status_code=400, detail="DOCX parsing not available")
-            doc = DocxDocument(io.BytesIO(content))
-            paragraphs = []
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    paragraphs.append(para.text)
-            return '\n\n'.join(paragraphs)
-        
-        # OpenDocument Text (.odt)
-        elif ext == '.odt':
-            if not ODF_AVAILABLE:
-                raise HTTPException(status_code=400, detail="ODT parsing not available")
-            doc = odf_load(io.BytesIO(content))
-            paragraphs = []
-            for para in doc.getElementsByType(odf_text.P):
-                text = teletype.extractText(para)
-                if text.strip():
-                    paragraphs.append(text)
-            return '\n\n'.join(paragraphs)
-        
-        # PDF
-        elif ext == '.pdf':
-            if not PDF_AVAILABLE:
-                raise HTTPException(status_code=400, detail="PDF parsing not available")
-            reader = PdfReader(io.BytesIO(content))
-            text_parts = []
-            for page in reader.pages:
-                text = page.extract_text()
-                if text.strip():
-                    text_parts.append(text)
-            return '\n\n'.join(text_parts)
-        
-        # Markdown (no conversion needed)
-        elif ext in ['.md', '.markdown']:
-            return content.decode('utf-8')
-        
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported file format: {ext}")
-            
-    except UnicodeDecodeError:
-        raise HTTPException(status_code=400, detail="File encoding not supported. Please use UTF-8.")
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error parsing {ext} file: {str(e)}")
-
-
-def markdown_to_tiptap(markdown: str) -> dict:
-    """
-    Convert markdown text to TipTap JSON format.
-    Supports common markdown features: headings, bold, italic, lists, links, code, etc.
-    """
-    content = []
-    lines = markdown.split('\n')
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i]
-        stripped = line.strip()
-        
-        # Empty line - add empty paragraph to preserve spacing
-        if not stripped:
-            content.append({
-                "type": "paragraph",
-                "content": []
-            })
-            i += 1
-            continue
-        
-        # Headings
-        if stripped.startswith('#'):
-            level = len(stripped) - len(stripped.lstrip('#'))
-            level = min(level, 3)  # Max level 3
-            text = stripped.lstrip('#').strip()
-            content.append({
-                "type": "heading",
-                "attrs": {"level": level},
-                "content": parse_inline_markdown(text)
-            })
-            i += 1
-            continue
-        
-        # Bullet list
-        if stripped.startswith(('- ', '* ', '+ ')):
-            list_items = []
-            while i < len(lines) and lines[i].strip().startswith(('- ', '* ', '+ ')):
-                item_text = lines[i].strip()[2:]
-                list_items.append({
-                    "type": "listItem",
-                    "content": [{
-                        "type": "paragraph",
-                        "content": parse_inline_markdown(item_text)
-                    }]
-                })
-                i += 1
-            content.append({
-                "type": "bulletList",
-                "content": list_items
-            })
-            continue
-        
-        # Numbered list
-        if re.match(r'^\d+\.\s', stripped):
-            list_items = []
-            while i < len(lines) and re.match(r'^\d+\.\s', lines[i].strip()):
-                item_text = re.sub(r'^\d+\.\s', '', lines[i].strip())
-                list_items.append({
-                    "type": "listItem",
-                    "content": [{
-                        "type": "paragraph",
-                        "content": parse_inline_markdown(item_text)
-                    }]
-                })
-                i += 1
-            content.append({
-                "type": "orderedList",
-                "content": list_items
-            })
-            continue
-        
-        # Blockquote
-        if stripped.startswith('>'):
-            quote_lines = []
-            while i < len(lines) and lines[i].strip().startswith('>'):
-                quote_lines.append(lines[i].strip()[1:].strip())
-                i += 1
-            content.append({
-                "type": "blockquote",
-                "content": [{
-                    "type": "paragraph",
-                    "content": parse_inline_markdown(' '.join(quote_lines))
-                }]
-            })
-            continue
-        
-        # Code block
-        if stripped.startswith('```'):
-            code_lines = []
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                code_lines.append(lines[i])
-                i += 1
-            i += 1  # Skip closing ```
-            content.append({
-                "type": "codeBlock",
-                "content": [{
-                    "type": "text",
-                    "text": '\n'.join(code_lines)
-                }]
-            })
-            continue
-        
-        # Regular paragraph - preserve line breaks within paragraph
-        para_lines = [line]
-        i += 1
-        while i < len(lines) and lines[i].strip() and not lines[i].strip().startswith(('#', '-', '*', '+', '>', '```')) and not re.match(r'^\d+\.\s', lines[i].strip()):
-            para_lines.append(lines[i])
-            i += 1
-        
-        # Parse paragraph with line breaks preserved
-        para_content = []
-        for idx, pline in enumerate(para_lines):
-            para_content.extend(parse_inline_markdown(pline))
-            # Add hard break between lines (except last line)
-            if idx < len(para_lines) - 1:
-                para_content.append({"type": "hardBreak"})
-        
-        content.append({
-            "type": "paragraph",
-            "content": para_content
-        })
-    
-    return {
-        "type": "doc",
-        "content": content
-    }
-
-
-def parse_inline_markdown(text: str) -> list:
-    """Parse inline markdown formatting (bold, italic, code, links)"""
-    if not text:
-        return [{"type": "text", "text": ""}]
-    
-    parts = []
-    current_text = ""
-    i = 0
-    
-    while i < len(text):
-        # Bold **text**
-        if text[i:i+2] == '**':
-            if current_text:
-                parts.append({"type": "text", "text": current_text})
-                current_text = ""
-            end = text.find('**', i + 2)
-            if end != -1:
-                parts.append({
-                    "type": "text",
-                    "text": text[i+2:end],
-                    "marks": [{"type": "bold"}]
-                })
-                i = end + 2
-                continue
-        
-        # Italic *text*
-        if text[i] == '*' and (i == 0 or text[i-1] != '*') and (i+1 >= len(text) or text[i+1] != '*'):
-            if current_text:
-                parts.append({"type": "text", "text": current_text})
-                current_text = ""
-            end = text.find('*', i + 1)
-            if end != -1 and (end+1 >= len(text) or text[end+1] != '*'):
-                parts.append({
-                    "type": "text",
-                    "text": text[i+1:end],
-                    "marks": [{"type": "italic"}]
-                })
-                i = end + 1
-                continue
-        
-        # Code `text`
-        if text[i] == '`':
-            if current_text:
-                parts.append({"type": "text", "text": current_text})
-                current_text = ""
-            end = text.find('`', i + 1)
-            if end != -1:
-                parts.append({
-                    "type": "text",
-                    "text": text[i+1:end],
-                    "marks": [{"type": "code"}]
-                })
-                i = end + 1
-                continue
-        
-        # Links [text](url)
-        if text[i] == '[':
-            link_match = re.match(r'\[([^\]]+)\]\(([^)]+)\)', text[i:])
-            if link_match:
-                if current_text:
-                    parts.append({"type": "text", "text": current_text})
-                    current_text = ""
-                parts.append({
-                    "type": "text",
-                    "text": link_match.group(1),
-                    "marks": [{"type": "link", "attrs": {"href": link_match.group(2)}}]
-                })
-                i += len(link_match.group(0))
-                continue
-        
-        current_text += text[i]
-        i += 1
-    
-    if current_text:
-        parts.append({"type": "text", "text": current_text})
-    
-    return parts if parts else [{"type": "text", "text": ""}]
-
-
-def parse_frontmatter(content: str, filename: str) -> tuple[str, str]:
-    """
-    Parse Obsidian-style YAML frontmatter and extract title.
-    Returns (title, clean_content)
-    """
-    lines = content.split('\n')
-    
-    # Check for frontmatter
-    if lines and lines[0].strip() == '---':
-        # Find end of frontmatter
-        end_idx = None
-        title = None
-        
-        for i, line in enumerate(lines[1:], 1):
-            if line.strip() == '---':
-                end_idx = i
-                break
-            # Extract title from frontmatter
-            if line.startswith('title:'):
-                title = line.split(':', 1)[1].strip().strip('"\'')
-        
-        if end_idx:
-            # Remove frontmatter from content
-            clean_content = '\n'.join(lines[end_idx + 1:]).strip()
-            
-            # Use frontmatter title if found, otherwise derive from filename or first heading
-            if not title:
-                title = derive_title_from_content(clean_content, filename)
-            
-            return title, clean_content
-    
-    # No frontmatter - derive title and return full content
-    title = derive_title_from_content(content, filename)
-    return title, content
-
-
-def derive_title_from_content(content: str, filename: str) -> str:
-    """Extract title from first heading or use filename"""
-    lines = content.split('\n')
-    
-    # Look for first markdown heading
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith('#'):
-            return stripped.lstrip('#').strip()
-    
-    # Use filename without extension
-    return os.path.splitext(os.path.basename(filename))[0].replace('_', ' ').replace('-', ' ').title()
-
-
 @router.get("/info")
 async def get_storage_info(
     current_user: dict = Depends(get_current_user),
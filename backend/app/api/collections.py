@@ -11,7 +11,14 @@ from pydantic import BaseModel, Field, ConfigDict
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
-from app.models import Collection, CollectionItem, CollectionItemType
+# Bookmark folders; app.models re-exports CollectionItem/CollectionItemType
+# from workspaces, which are a different table
+from app.models.collection import (
+    BookmarkFolder as Collection,
+    BookmarkFolderItem as CollectionItem,
+    BookmarkItemType as CollectionItemType,
+)
+from app.services.saved_items_service import SavedItemsService, item_kind
 from app.services.user_service import get_or_create_user_from_keycloak
 
 router = APIRouter(prefix="/collections", tags=["collections"])
@@ -36,6 +43,15 @@ class CollectionItemCreate(BaseModel):
     note: Optional[str] = None
 
 
+class SavedItemRef(BaseModel):
+    item_type: CollectionItemType
+    item_id: int
+
+
+class SavedCheckRequest(BaseModel):
+    items: List[SavedItemRef] = Field(..., max_length=200)
+
+
 class CollectionItemUpdate(BaseModel):
     note: Optional[str] = None
 
@@ -110,7 +126,7 @@ async def list_collections(
     # Query collections with item counts
     query = (
         select(Collection, func.count(CollectionItem.id).label('item_count'))
-        .outerjoin(CollectionItem, Collection.id == CollectionItem.collection_id)
+        .outerjoin(CollectionItem, Collection.id == CollectionItem.folder_id)
         .where(Collection.user_id == user.id)
         .group_by(Collection.id)
         .order_by(Collection.created_at.desc())
@@ -204,7 +220,7 @@ async def update_collection(
     await db.refresh(collection)
     
     # Get item count
-    count_query = select(func.count()).where(CollectionItem.collection_id == collection.id)
+    count_query = select(func.count()).where(CollectionItem.folder_id == collection.id)
     count_result = await db.execute(count_query)
     item_count = count_result.scalar()
     
@@ -237,6 +253,7 @@ async def delete_collection(
     
     await db.delete(collection)
     await db.commit()
+    await SavedItemsService.invalidate(user.id)
 
 
 # Collection Items Endpoints
@@ -261,7 +278,7 @@ async def add_item_to_collection(
     
     # Check if item already exists in collection
     check_query = select(CollectionItem).where(
-        CollectionItem.collection_id == collection_id,
+        CollectionItem.folder_id == collection_id,
         CollectionItem.item_type == item_data.item_type,
         CollectionItem.item_id == item_data.item_id
     )
@@ -273,7 +290,7 @@ async def add_item_to_collection(
     
     # Add item
     item = CollectionItem(
-        collection_id=collection_id,
+        folder_id=collection_id,
         item_type=item_data.item_type,
         item_id=item_data.item_id,
         note=item_data.note
@@ -282,6 +299,7 @@ async def add_item_to_collection(
     db.add(item)
     await db.commit()
     await db.refresh(item)
+    await SavedItemsService.mark_saved(user.id, item_kind(item.item_type), item.item_id)
     
     return CollectionItemResponse(
         id=item.id,
@@ -306,10 +324,10 @@ async def update_collection_item(
     # Verify collection belongs to user
     query = (
         select(CollectionItem)
-        .join(Collection, CollectionItem.collection_id == Collection.id)
+        .join(Collection, CollectionItem.folder_id == Collection.id)
         .where(
             CollectionItem.id == item_id,
-            CollectionItem.collection_id == collection_id,
+            CollectionItem.folder_id == collection_id,
             Collection.user_id == user.id
         )
     )
@@ -347,10 +365,10 @@ async def remove_item_from_collection(
     # Verify collection belongs to user
     query = (
         select(CollectionItem)
-        .join(Collection, CollectionItem.collection_id == Collection.id)
+        .join(Collection, CollectionItem.folder_id == Collection.id)
         .where(
             CollectionItem.id == item_id,
-            CollectionItem.collection_id == collection_id,
+            CollectionItem.folder_id == collection_id,
             Collection.user_id == user.id
         )
     )
@@ -362,6 +380,7 @@ async def remove_item_from_collection(
     
     await db.delete(item)
     await db.commit()
+    await SavedItemsService.mark_unsaved(db, user.id, item_kind(item.item_type), item.item_id)
 
 
 # Utility endpoints
@@ -378,7 +397,7 @@ async def check_item_saved(
     
     query = (
         select(Collection)
-        .join(CollectionItem, Collection.id == CollectionItem.collection_id)
+        .join(CollectionItem, Collection.id == CollectionItem.folder_id)
         .where(
             Collection.user_id == user.id,
             CollectionItem.item_type == item_type,
@@ -399,3 +418,23 @@ async def check_item_saved(
             for col in collections
         ]
     }
+
+
+@router.post("/check")
+async def check_items_saved(
+    request: SavedCheckRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Saved state of a page of items in one call (instead of /check/{item_type}/{item_id} per card)"""
+    user = await get_or_create_user_from_keycloak(db, current_user)
+    
+    saved = await SavedItemsService.lookup(
+        db, user.id, [(item_kind(ref.item_type), ref.item_id) for ref in request.items]
+    )
+    return {
+        "items": [
+            {"item_type": ref.item_type, "item_id": ref.item_id, "is_saved": is_saved}
+            for ref, is_saved in zip(request.items, saved)
+        ]
+    }
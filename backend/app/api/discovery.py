@@ -1,10 +1,14 @@
 """Discovery API - Content discovery and trending"""
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_read_db
+from app.core.http_cache import CachePolicy, combine, table_version, time_bucket
+from app.models.document import Document
+from app.models.reading import Category
 from app.services.discovery_service import DiscoveryService
+from app.services.similarity_service import DOCUMENT, SimilarityService
 from app.schemas.discovery import (
     DiscoverRequest, DiscoverResponse, TrendingDocument,
     CategoryResponse, SortBy, TimeRange
@@ -12,9 +16,34 @@ from app.schemas.discovery import (
 
 router = APIRouter(prefix="/discovery", tags=["discovery"])
 
+# Time ranges slide, so trending also turns over once a minute
+TRENDING_CACHE = CachePolicy(
+    max_age=60,
+    stale_while_revalidate=300,
+    version=combine(
+        table_version(Document, lambda params: [Document.status == 'published']),
+        time_bucket(60),
+    ),
+    shared=True,
+)
+
+# Neighbours change as works are published and when the index is rebuilt
+SIMILAR_CACHE = CachePolicy(
+    max_age=300,
+    stale_while_revalidate=3600,
+    shared=True,
+)
+
+CATEGORIES_CACHE = CachePolicy(
+    max_age=3600,
+    stale_while_revalidate=86400,
+    version=table_version(Category),
+    shared=True,
+)
 
-@router.get("/trending")
-async def get_trending(time_range: Optional[TimeRange] = None, skip: int = 0, limit: int = 20, db: AsyncSession = Depends(get_db)):
+
+@router.get("/trending", dependencies=[Depends(TRENDING_CACHE)])
+async def get_trending(time_range: Optional[TimeRange] = None, skip: int = 0, limit: int = 20, db: AsyncSession = Depends(get_read_db)):
     """Get trending documents."""
     documents, total = await DiscoveryService.get_trending_documents(db, time_range, skip, limit)
     return {"documents": documents, "total": total, "skip": skip, "limit": limit}
@@ -28,7 +57,7 @@ async def discover_content(
     time_range: Optional[TimeRange] = None,
     skip: int = 0,
     limit: int = 20,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Discover content based on filters."""
     documents, total = await DiscoveryService.discover_documents(
@@ -47,7 +76,20 @@ async def discover_content(
     }
 
 
-@router.get("/categories", response_model=List[CategoryResponse])
-async def get_categories(db: AsyncSession = Depends(get_db)):
+@router.get("/categories", response_model=List[CategoryResponse], dependencies=[Depends(CATEGORIES_CACHE)])
+async def get_categories(db: AsyncSession = Depends(get_read_db)):
     """Get all categories."""
     return await DiscoveryService.get_categories(db)
+
+
+@router.get("/similar/{document_id}", dependencies=[Depends(SIMILAR_CACHE)])
+async def get_similar(
+    document_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Published documents and store items most like a published document."""
+    if not await DiscoveryService.is_discoverable(db, document_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    results = await SimilarityService.similar(db, DOCUMENT, document_id, limit)
+    return {"document_id": document_id, "results": results}
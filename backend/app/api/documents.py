@@ -3,14 +3,19 @@ Document Management API - CRUD operations for documents
 """
 
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.auth import get_current_user, get_optional_user
+from app.core.http_cache import CachePolicy, table_version
+from app.core.pagination import COUNT_MODE_PATTERN
+from app.core.responses import stream_json_array
 from app.services import document_service, user_service
 from app.services.content_integrity_service import ContentIntegrityService
-from app.models.document import DocumentStatus, DocumentMode
+from app.services.near_duplicate_service import NearDuplicateService
+from app.services.similarity_service import SimilarityService
+from app.models.document import Document, DocumentStatus, DocumentMode, DocumentVisibility
 from app.schemas.document import (
     DocumentCreate,
     DocumentUpdate,
@@ -20,6 +25,16 @@ from app.schemas.document import (
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
+PUBLIC_DOCUMENTS_CACHE = CachePolicy(
+    max_age=30,
+    stale_while_revalidate=300,
+    version=table_version(Document, lambda params: [
+        Document.visibility == DocumentVisibility.PUBLIC,
+        Document.status == DocumentStatus.PUBLISHED,
+    ]),
+    shared=True,
+)
+
 
 @router.post("", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
 async def create_document(
@@ -49,6 +64,8 @@ async def list_documents(
     status_filter: Optional[DocumentStatus] = Query(None, description="Filter by status"),
     project_id: Optional[int] = Query(None, description="Filter by project ID"),
     folder_id: Optional[int] = Query(None, description="Filter by folder ID"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count: Optional[str] = Query(None, pattern=COUNT_MODE_PATTERN, description="Total count mode"),
     db: AsyncSession = Depends(get_db),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -57,31 +74,30 @@ async def list_documents(
     
     Requires authentication.
     Returns paginated list of documents owned by the authenticated user.
+    Pass next_cursor back as `cursor` for keyset paging; `page` still works.
     """
     # Get user from database
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
     
-    # Get documents (function expects page number, not skip)
-    documents, total = await document_service.list_user_documents(
-        db, user.id, page, page_size, status_filter, project_id, folder_id
+    result = await document_service.list_user_documents(
+        db, user.id, page, page_size, status_filter, project_id, folder_id,
+        cursor=cursor, count=count
     )
     
-    # Calculate skip for response metadata
-    skip = (page - 1) * page_size
-    
     return {
-        "documents": documents,
-        "total": total,
+        "documents": result.pop("items"),
         "page": page,
         "page_size": page_size,
-        "has_more": (skip + len(documents)) < total
+        **result
     }
 
 
-@router.get("/public", response_model=DocumentListResponse)
+@router.get("/public", response_model=DocumentListResponse, dependencies=[Depends(PUBLIC_DOCUMENTS_CACHE)])
 async def list_public_documents(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count: Optional[str] = Query(None, pattern=COUNT_MODE_PATTERN, description="Total count mode"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -90,15 +106,15 @@ async def list_public_documents(
     No authentication required.
     Returns published documents with public visibility.
     """
-    skip = (page - 1) * page_size
-    documents, total = await document_service.list_public_documents(db, page, page_size)
+    result = await document_service.list_public_documents(
+        db, page, page_size, cursor=cursor, count=count
+    )
     
     return {
-        "documents": documents,
-        "total": total,
+        "documents": result.pop("items"),
         "page": page,
         "page_size": page_size,
-        "has_more": (skip + len(documents)) < total
+        **result
     }
 
 
@@ -131,6 +147,7 @@ async def get_document(
 async def update_document(
     document_id: int,
     document_data: DocumentUpdate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -178,6 +195,13 @@ async def update_document(
     # Update document
     document = await document_service.update_document(db, document_id, document_data, user.id)
     
+    # Published text goes into the near-duplicate and similarity indexes
+    if document.status == DocumentStatus.PUBLISHED and (
+        document_data.status == DocumentStatus.PUBLISHED or document_data.content is not None
+    ):
+        background_tasks.add_task(NearDuplicateService.index_document_in_background, document.id)
+        background_tasks.add_task(SimilarityService.index_document_in_background, document.id)
+    
     return document
 
 
@@ -225,7 +249,7 @@ async def list_document_versions(
     """
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
     versions = await document_service.list_document_versions(db, document_id, user.id)
-    return versions
+    return stream_json_array(Dict[str, Any], versions)
 
 
 @router.get("/{document_id}/versions/{version_number}", response_model=Dict[str, Any])
@@ -314,6 +338,7 @@ async def change_document_mode(
 @router.post("/{document_id}/publish", response_model=Dict[str, Any])
 async def publish_document_to_store(
     document_id: int,
+    background_tasks: BackgroundTasks,
     price_usd: float = Query(..., ge=0, description="Price in USD (0 for free)"),
     description: Optional[str] = Query(None, description="Store listing description"),
     genres: Optional[List[str]] = Query(None, description="List of genres"),
@@ -357,4 +382,11 @@ async def publish_document_to_store(
         genres=genres
     )
     
+    background_tasks.add_task(
+        NearDuplicateService.index_document_in_background, document_id, result["store_item_id"]
+    )
+    background_tasks.add_task(
+        SimilarityService.index_document_in_background, document_id, result["store_item_id"]
+    )
+    
     return result
@@ -20,7 +20,6 @@ from app.models import User
 from app.services import user_service
 from app.services.content_verification import verification_service
 from app.core.config import settings
-import boto3
 from botocore.exceptions import ClientError
 
 router = APIRouter(prefix="/epub-uploads", tags=["epub-uploads"])
@@ -109,6 +108,7 @@ class VerificationResultResponse(BaseModel):
     warnings: List[str]
     errors: List[str]
     timestamp: str
+    timings_ms: dict = {}  # Per-stage pipeline durations
 
 
 class ModeratorAction(BaseModel):
@@ -358,12 +358,17 @@ async def get_verification_results(
     if not submission.verification_results:
         raise HTTPException(status_code=404, detail="Verification not complete yet")
     
+    # Status fields come from the submission (moderators may have overridden them)
+    stored_results = {
+        k: v for k, v in submission.verification_results.items()
+        if k not in ("overall_score", "verified", "requires_review")
+    }
     return VerificationResultResponse(
         submission_id=submission.id,
         overall_score=submission.verification_score or 0.0,
         verified=submission.status == SubmissionStatus.VERIFIED,
         requires_review=submission.requires_manual_review,
-        **submission.verification_results
+        **stored_results
     )
 
 
@@ -484,6 +489,8 @@ async def _upload_to_s3_storage(
         raise Exception("S3 storage not configured")
     
     # Initialize S3 client
+    import boto3
+
     s3_client = boto3.client(
         's3',
         endpoint_url=settings.S3_ENDPOINT_URL if settings.S3_ENDPOINT_URL else None,
@@ -532,8 +539,9 @@ async def _run_verification(
     Run content verification checks
     This runs in the background after upload
     """
-    from app.core.database import SessionLocal
+    from app.core.database import get_jobs_session_local
     
+    SessionLocal = get_jobs_session_local()
     async with SessionLocal() as db:
         try:
             # Get submission
@@ -563,7 +571,10 @@ async def _run_verification(
                 verification_results = await verification_service.verify_epub_content(
                     tmp_path,
                     author,
-                    title
+                    title,
+                    file_hash=submission.file_hash,
+                    submission_id=submission.id,
+                    uploader_id=submission.user_id
                 )
                 
                 # Update submission
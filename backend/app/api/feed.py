@@ -1,18 +1,19 @@
 """
 Feed API - Personalized user feed
 """
+import asyncio
 from typing import List, Optional, Dict
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, desc, func, cast, String
 from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.orm import joinedload
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.responses import json_response
 from app.models.collaboration import GroupPost, GroupMember, Group, GroupPostReaction
-from app.models.user import User, UserProfile
 from app.services import user_service
+from app.services.loaders import Loaders, get_loaders, user_label
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 
@@ -78,10 +79,58 @@ async def get_votes_for_posts(db: AsyncSession, post_ids: List[int]) -> Dict[int
     return votes_by_post
 
 
+async def build_feed_posts(
+    loaders: Loaders,
+    posts_data: List[tuple],
+    votes_by_post: Optional[Dict[int, Dict[str, int]]] = None,
+) -> List[FeedPost]:
+    """
+    FeedPost models for (post, group) rows, with authors and their avatars
+    batch-loaded instead of joined into the post query
+    """
+    author_ids = [post.author_id for post, _ in posts_data]
+    authors, profiles = await asyncio.gather(
+        loaders.users.load_many(author_ids),
+        loaders.profiles.load_many(author_ids),
+    )
+    
+    feed_posts = []
+    for (post, group), author, profile in zip(posts_data, authors, profiles):
+        if author is None:
+            continue
+        votes = (votes_by_post or {}).get(post.id, {"upvotes": 0, "downvotes": 0})
+        feed_posts.append(FeedPost(
+            id=post.id,
+            title=post.title,
+            content=post.content,
+            created_at=post.created_at,
+            is_pinned=post.is_pinned,
+            is_locked=post.is_locked,
+            pinned_feeds=post.pinned_feeds or [],
+            upvotes=votes["upvotes"],
+            downvotes=votes["downvotes"],
+            score=votes["upvotes"] - votes["downvotes"],
+            author=PostAuthor(
+                id=author["id"],
+                username=author["username"],
+                display_name=user_label(author),
+                avatar_url=profile["avatar_url"] if profile else None
+            ),
+            group=GroupInfo(
+                id=group.id,
+                name=group.name,
+                slug=group.slug,
+                avatar_url=group.avatar_url
+            )
+        ))
+    return feed_posts
+
+
 @router.get("", response_model=List[FeedPost])
 async def get_feed(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     limit: int = 50,
     sort: str = "newest"
 ):
@@ -107,10 +156,8 @@ async def get_feed(
     
     # Build base query
     posts_query = (
-        select(GroupPost, User, Group)
-        .join(User, GroupPost.author_id == User.id)
+        select(GroupPost, Group)
         .join(Group, GroupPost.group_id == Group.id)
-        .options(joinedload(User.profile))
         .where(GroupPost.group_id.in_(group_ids))
     )
     
@@ -133,37 +180,11 @@ async def get_feed(
     posts_data = result.all()
     
     # Get vote counts
-    post_ids = [post.id for post, _, _ in posts_data]
+    post_ids = [post.id for post, _ in posts_data]
     votes_by_post = await get_votes_for_posts(db, post_ids)
     
     # Transform to response format
-    feed_posts = []
-    for post, author, group in posts_data:
-        votes = votes_by_post.get(post.id, {"upvotes": 0, "downvotes": 0})
-        feed_posts.append(FeedPost(
-            id=post.id,
-            title=post.title,
-            content=post.content,
-            created_at=post.created_at,
-            is_pinned=post.is_pinned,
-            is_locked=post.is_locked,
-            pinned_feeds=post.pinned_feeds or [],
-            upvotes=votes["upvotes"],
-            downvotes=votes["downvotes"],
-            score=votes["upvotes"] - votes["downvotes"],
-            author=PostAuthor(
-                id=author.id,
-                username=author.username,
-                display_name=author.display_name,
-                avatar_url=author.profile.avatar_url if author.profile else None
-            ),
-            group=GroupInfo(
-                id=group.id,
-                name=group.name,
-                slug=group.slug,
-                avatar_url=group.avatar_url
-            )
-        ))
+    feed_posts = await build_feed_posts(loaders, posts_data, votes_by_post)
     
     # Apply vote-based sorting if requested
     if sort == "top":
@@ -175,22 +196,24 @@ async def get_feed(
             -(min(p.upvotes, p.downvotes) * 2)  # Rewards posts with similar up/down votes
         ))
     
-    return feed_posts[:limit]
+    return json_response(List[FeedPost], feed_posts[:limit])
 
 @router.get("/personal", response_model=List[FeedPost])
 async def get_personal_feed(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     limit: int = 50
 ):
     """Alias for personalized feed to match frontend expectation /feed/personal."""
-    return await get_feed(current_user=current_user, db=db, limit=limit)
+    return await get_feed(current_user=current_user, db=db, loaders=loaders, limit=limit)
 
 
 @router.get("/updates", response_model=List[FeedPost])
 async def get_updates_feed(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     limit: int = 50
 ):
     """
@@ -209,10 +232,8 @@ async def get_updates_feed(
     
     # Get pinned posts and recent updates
     posts_query = (
-        select(GroupPost, User, Group)
-        .join(User, GroupPost.author_id == User.id)
+        select(GroupPost, Group)
         .join(Group, GroupPost.group_id == Group.id)
-        .options(joinedload(User.profile))
         .where(GroupPost.group_id.in_(group_ids))
         .order_by(desc(GroupPost.is_pinned), desc(GroupPost.updated_at))
         .limit(limit)
@@ -221,61 +242,43 @@ async def get_updates_feed(
     result = await db.execute(posts_query)
     posts_data = result.all()
     
-    feed_posts = []
-    for post, author, group in posts_data:
-        feed_posts.append(FeedPost(
-            id=post.id,
-            title=post.title,
-            content=post.content,
-            created_at=post.created_at,
-            is_pinned=post.is_pinned,
-            is_locked=post.is_locked,
-            author=PostAuthor(
-                id=author.id,
-                username=author.username,
-                display_name=author.display_name,
-                avatar_url=author.profile.avatar_url if author.profile else None
-            ),
-            group=GroupInfo(
-                id=group.id,
-                name=group.name,
-                slug=group.slug,
-                avatar_url=group.avatar_url
-            )
-        ))
+    feed_posts = await build_feed_posts(loaders, posts_data)
     
-    return feed_posts
+    return json_response(List[FeedPost], feed_posts)
 
 
 @router.get("/beta", response_model=List[FeedPost])
 async def get_beta_feed(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     limit: int = 50
 ):
     """
     Beta feed - posts from groups where user is a beta reader
     Currently returns posts from all user's groups (can be filtered later)
     """
-    return await get_feed(current_user=current_user, db=db, limit=limit)
+    return await get_feed(current_user=current_user, db=db, loaders=loaders, limit=limit)
 
 
 @router.get("/groups", response_model=List[FeedPost])
 async def get_groups_feed(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     limit: int = 50
 ):
     """
     Groups feed - all posts from user's groups
     """
-    return await get_feed(current_user=current_user, db=db, limit=limit)
+    return await get_feed(current_user=current_user, db=db, loaders=loaders, limit=limit)
 
 
 @router.get("/global", response_model=List[FeedPost])
 async def get_global_feed(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     limit: int = 50
 ):
     """
@@ -283,10 +286,8 @@ async def get_global_feed(
     """
     # Get recent posts from all PUBLIC groups
     posts_query = (
-        select(GroupPost, User, Group)
-        .join(User, GroupPost.author_id == User.id)
+        select(GroupPost, Group)
         .join(Group, GroupPost.group_id == Group.id)
-        .options(joinedload(User.profile))
         .where(
             and_(
                 Group.is_public == True,
@@ -304,37 +305,16 @@ async def get_global_feed(
     result = await db.execute(posts_query)
     posts_data = result.all()
     
-    feed_posts = []
-    for post, author, group in posts_data:
-        feed_posts.append(FeedPost(
-            id=post.id,
-            title=post.title,
-            content=post.content,
-            created_at=post.created_at,
-            is_pinned=post.is_pinned,
-            is_locked=post.is_locked,
-            pinned_feeds=post.pinned_feeds or [],
-            author=PostAuthor(
-                id=author.id,
-                username=author.username,
-                display_name=author.profile.display_name if author.profile else (author.username or author.email),
-                avatar_url=author.profile.avatar_url if author.profile else None
-            ),
-            group=GroupInfo(
-                id=group.id,
-                name=group.name,
-                slug=group.slug,
-                avatar_url=group.avatar_url
-            )
-        ))
+    feed_posts = await build_feed_posts(loaders, posts_data)
     
-    return feed_posts
+    return json_response(List[FeedPost], feed_posts)
 
 
 @router.get("/discover", response_model=List[FeedPost])
 async def get_discover_feed(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     limit: int = 20
 ):
     """
@@ -350,10 +330,8 @@ async def get_discover_feed(
     
     # Get recent posts from PUBLIC groups user is not in
     posts_query = (
-        select(GroupPost, User, Group)
-        .join(User, GroupPost.author_id == User.id)
+        select(GroupPost, Group)
         .join(Group, GroupPost.group_id == Group.id)
-        .options(joinedload(User.profile))
         .where(
             and_(
                 Group.is_public == True,
@@ -373,28 +351,6 @@ async def get_discover_feed(
     posts_data = result.all()
     
     # Transform to response format
-    feed_posts = []
-    for post, author, group in posts_data:
-        feed_posts.append(FeedPost(
-            id=post.id,
-            title=post.title,
-            content=post.content,
-            created_at=post.created_at,
-            is_pinned=post.is_pinned,
-            is_locked=post.is_locked,
-            pinned_feeds=post.pinned_feeds or [],
-            author=PostAuthor(
-                id=author.id,
-                username=author.username,
-                display_name=author.display_name,
-                avatar_url=author.profile.avatar_url if author.profile else None
-            ),
-            group=GroupInfo(
-                id=group.id,
-                name=group.name,
-                slug=group.slug,
-                avatar_url=group.avatar_url
-            )
-        ))
+    feed_posts = await build_feed_posts(loaders, posts_data)
     
-    return feed_posts
+    return json_response(List[FeedPost], feed_posts)
@@ -9,6 +9,7 @@ from app.core.auth import get_current_user
 from app.services.folder_service import FolderService
 from app.services import user_service
 from app.schemas.project import FolderCreate, FolderUpdate, FolderResponse
+from app.core.exceptions import ValidationError
 
 router = APIRouter(prefix="/folders", tags=["folders"])
 
@@ -30,15 +31,16 @@ async def create_folder(
 @router.get("/tree", response_model=List[Dict[str, Any]])
 async def get_folder_tree(
     project_id: Optional[int] = Query(None),
+    root_id: Optional[int] = Query(None, description="Only return the subtree under this folder"),
     db: AsyncSession = Depends(get_db),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
-    """Get complete folder tree for a project."""
+    """Get complete folder tree for a project, with per-folder and subtree counts."""
     try:
         user = await user_service.get_or_create_user_from_keycloak(db, current_user)
         print(f"[FOLDER TREE] user_id={user.id}, tenant_id={user.tenant_id}, project_id={project_id}")
         result = await FolderService.get_folder_tree(
-            db, user.id, user.tenant_id, project_id
+            db, user.id, user.tenant_id, project_id, root_id
         )
         print(f"[FOLDER TREE] Returning {len(result)} root folders")
         return result
@@ -84,11 +86,14 @@ async def update_folder(
     db: AsyncSession = Depends(get_db),
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
-    """Update folder."""
+    """Update folder. Setting parent_id moves the folder with everything under it."""
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
-    return await FolderService.update_folder(
-        db, folder_id, data, user.id, user.tenant_id
-    )
+    try:
+        return await FolderService.update_folder(
+            db, folder_id, data, user.id, user.tenant_id
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.delete("/{folder_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -6,12 +6,14 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
-import httpx
 from app.core.database import get_db
+from app.core.lazy import LazyModule
 from app.core.auth import get_current_user_id
 from app.models.user import User
 from app.models.vault import Article
 
+httpx = LazyModule("httpx")
+
 router = APIRouter(prefix="/free-books", tags=["free-books"])
 
 # API Endpoints
@@ -13,6 +13,7 @@ import secrets
 
 from app.core.database import get_db
 from app.core.auth import get_current_user, get_current_user_from_db
+from app.core.pagination import COUNT_MODE_PATTERN, COUNT_NONE, paginate
 from app.models.collaboration import (
     Group, GroupMember, GroupPost, GroupMemberRole, 
     ModerationAction, ModerationActionType,
@@ -20,6 +21,9 @@ from app.models.collaboration import (
 )
 from app.models.user import User
 from app.services.email_service import email_service
+from app.services.group_leaderboard_service import GroupLeaderboardService
+from app.services.loaders import Loaders, get_loaders
+from app.services.tenant_resolution_service import GROUP, tenant_resolution
 
 router = APIRouter(prefix="/group-admin", tags=["group-admin"])
 
@@ -307,6 +311,8 @@ async def request_subdomain(
     
     await db.commit()
     await db.refresh(group)
+    # A new request withdraws any approved subdomain
+    await tenant_resolution.publish_invalidation(GROUP, group.id)
     
     return {
         "success": True,
@@ -516,6 +522,7 @@ async def remove_member(
     # Remove the member
     await db.delete(member)
     await db.commit()
+    await GroupLeaderboardService.refresh(db, group_id)
     
     return {
         "success": True,
@@ -610,6 +617,7 @@ async def create_group_post(
     db.add(new_post)
     await db.commit()
     await db.refresh(new_post)
+    await GroupLeaderboardService.refresh(db, group_id)
     
     return {
         "success": True,
@@ -932,6 +940,7 @@ async def ban_member(
     # In a full implementation, you'd create a BannedMember table to track bans
     await db.delete(member)
     await db.commit()
+    await GroupLeaderboardService.refresh(db, group_id)
     
     return {
         "success": True,
@@ -945,13 +954,18 @@ async def get_audit_log(
     limit: int = Query(50, le=100),
     offset: int = Query(0, ge=0),
     action_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count: Optional[str] = Query(None, pattern=COUNT_MODE_PATTERN),
     db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders),
     current_user: User = Depends(get_current_user_from_db)
 ):
     """
     Get moderation audit log for a group (moderator/admin/owner only)
     
     **Requires**: Keycloak authentication + group moderator/admin/owner role
+    
+    Pass next_cursor back as `cursor` for the next page.
     """
     group, _ = await get_group_moderator_or_above(group_id, db, current_user)
     
@@ -966,44 +980,36 @@ async def get_audit_log(
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid action_type: {action_type}")
     
-    # Order by most recent first
-    query = query.order_by(ModerationAction.created_at.desc())
-    
-    # Apply pagination
-    query = query.limit(limit).offset(offset)
+    # Most recent first
+    page = await paginate(
+        db, query,
+        keys=(ModerationAction.created_at, ModerationAction.id),
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
+        # The log never returned a total; only count on request
+        count=count or COUNT_NONE,
+        scope=f"group-admin:{group_id}:audit-log:{action_type}",
+    )
+    actions = page["items"]
     
-    # Execute query
-    result = await db.execute(query)
-    actions = result.scalars().all()
+    # Moderator and target user names, loaded together
+    users = await loaders.users.load_many(
+        {user_id for action in actions for user_id in (action.moderator_id, action.target_user_id) if user_id}
+    )
+    names = {user["id"]: user["username"] or f"User {user['id']}" for user in users if user}
     
-    # Get moderator and target user info
     action_list = []
     for action in actions:
-        # Fetch moderator info
-        moderator_name = None
-        if action.moderator_id:
-            mod_result = await db.execute(select(User).filter(User.id == action.moderator_id))
-            moderator = mod_result.scalar_one_or_none()
-            if moderator:
-                moderator_name = moderator.username or moderator.email
-        
-        # Fetch target user info
-        target_user_name = None
-        if action.target_user_id:
-            user_result = await db.execute(select(User).filter(User.id == action.target_user_id))
-            target_user = user_result.scalar_one_or_none()
-            if target_user:
-                target_user_name = target_user.username or target_user.email
-        
         action_list.append({
             "id": action.id,
             "action_type": action.action_type.value,
             "moderator_id": action.moderator_id,
-            "moderator_name": moderator_name,
+            "moderator_name": names.get(action.moderator_id),
             "target_type": action.target_type,
             "target_id": action.target_id,
             "target_user_id": action.target_user_id,
-            "target_user_name": target_user_name,
+            "target_user_name": names.get(action.target_user_id),
             "reason": action.reason,
             "metadata": action.action_metadata,
             "created_at": action.created_at.isoformat() if action.created_at else None
@@ -1014,7 +1020,11 @@ async def get_audit_log(
         "logs": action_list,
         "count": len(action_list),
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "total": page["total"],
+        "total_is_estimate": page["total_is_estimate"],
+        "has_more": page["has_more"],
+        "next_cursor": page["next_cursor"]
     }
 
 
@@ -1,16 +1,23 @@
 """Groups API - Writing group management"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
 
-from app.core.database import get_db
+from app.core.database import get_analytics_db, get_db
 from app.core.auth import get_current_user, get_optional_user
+from app.core.http_cache import CachePolicy, combine, table_version
+from app.core.pagination import COUNT_MODE_PATTERN, COUNT_NONE, paginate, set_page_headers
 from app.services import user_service
 from app.services.group_service import GroupService
 from app.services.group_customization_service import GroupCustomizationService
-from app.models.collaboration import GroupInvitation, GroupInvitationStatus, GroupMember
+from app.services.group_leaderboard_service import GroupLeaderboardService, POPULAR
+from app.services.group_recommendation_service import RECOMMENDER_AVAILABLE, GroupRecommendationService, group_terms
+from app.services.loaders import Loaders, get_loaders
+from app.models.collaboration import (
+    Group, GroupFollower, GroupInvitation, GroupInvitationStatus, GroupMember, GroupPost
+)
 from app.schemas.collaboration import (
     GroupCreate, GroupUpdate, GroupResponse,
     GroupMemberAdd, GroupMemberRoleUpdate,
@@ -28,6 +35,25 @@ from app.schemas.group_customization import (
 
 router = APIRouter(prefix="/groups", tags=["groups"])
 
+def _slug_group_id(params):
+    return select(Group.id).where(Group.slug == params["slug"]).scalar_subquery()
+
+
+# The group row plus its membership (is_member, member_role) and its counters,
+# which triggers change without touching groups.updated_at
+GROUP_BY_SLUG_CACHE = CachePolicy(
+    max_age=30,
+    stale_while_revalidate=120,
+    version=combine(
+        table_version(Group, lambda params: [Group.slug == params["slug"]]),
+        table_version(GroupMember, lambda params: [GroupMember.group_id == _slug_group_id(params)]),
+        table_version(GroupFollower, lambda params: [GroupFollower.group_id == _slug_group_id(params)]),
+        table_version(GroupPost, lambda params: [GroupPost.group_id == _slug_group_id(params)]),
+    ),
+    personalized=True,
+    shared=True,
+)
+
 
 @router.post("", response_model=GroupResponse, status_code=status.HTTP_201_CREATED)
 async def create_group(
@@ -60,6 +86,7 @@ async def create_group(
 async def get_groups(
     limit: int = 50,
     offset: int = 0,
+    sort: str = Query("newest", pattern="^(newest|popular|active)$"),
     current_user: Optional[Dict[str, Any]] = Depends(get_optional_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -73,18 +100,10 @@ async def get_groups(
         user_id = user.id
     
     # Get discoverable groups (respects privacy levels)
-    groups = await GroupService.get_discoverable_groups(db, user_id=user_id, limit=limit, offset=offset)
+    groups = await GroupService.get_discoverable_groups(db, user_id=user_id, limit=limit, offset=offset, sort=sort)
     
-    # Get member counts for each group
     responses = []
     for group in groups:
-        # Count members
-        member_count_result = await db.execute(
-            select(func.count(GroupMember.id))
-            .where(GroupMember.group_id == group.id)
-        )
-        member_count = member_count_result.scalar() or 0
-        
         # Check if current user is a member
         is_member = False
         member_role = None
@@ -98,7 +117,6 @@ async def get_groups(
                 member_role = member_result.scalar()
         
         # Add attributes for Pydantic
-        group.member_count = int(member_count)
         group.document_count = 0  # TODO: calculate actual document count
         group.is_member = is_member
         group.member_role = member_role
@@ -117,27 +135,17 @@ async def get_my_groups(
 ):
     """Get groups current user is a member of."""
     from app.models.collaboration import Group, GroupMember
-    from sqlalchemy.orm import aliased
     
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
     
-    # Use aliased GroupMember for counting all members
-    AllMembers = aliased(GroupMember)
-    
-    # Get user's groups with member counts and their role
+    # Get user's groups with their role
     query = (
-        select(
-            Group, 
-            func.count(AllMembers.id).label('member_count'),
-            GroupMember.role
-        )
+        select(Group, GroupMember.role)
         .join(GroupMember, and_(
             Group.id == GroupMember.group_id,
             GroupMember.user_id == user.id
         ))
-        .outerjoin(AllMembers, Group.id == AllMembers.group_id)
         .where(Group.is_active == True)
-        .group_by(Group.id, GroupMember.role)
         .order_by(Group.created_at.desc())
         .limit(limit)
         .offset(offset)
@@ -147,9 +155,8 @@ async def get_my_groups(
     
     # Transform to response format
     responses = []
-    for group, member_count, role in rows:
+    for group, role in rows:
         # Add calculated fields as attributes for Pydantic
-        group.member_count = member_count
         group.document_count = 0  # TODO: calculate actual document count
         group.is_member = True
         group.member_role = role
@@ -167,21 +174,12 @@ async def get_group(
     """Get a specific group."""
     from app.models.collaboration import Group, GroupMember
     
-    # Get group with member count
-    query = (
-        select(Group, func.count(GroupMember.id).label('member_count'))
-        .outerjoin(GroupMember, Group.id == GroupMember.group_id)
-        .where(Group.id == group_id)
-        .group_by(Group.id)
-    )
-    result = await db.execute(query)
-    row = result.first()
+    result = await db.execute(select(Group).where(Group.id == group_id))
+    group = result.scalar_one_or_none()
     
-    if not row:
+    if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     
-    group, member_count = row
-    
     # Check if user is a member and get their role
     is_member = False
     member_role = None
@@ -197,7 +195,6 @@ async def get_group(
             member_role = role_row[0]
     
     # Add calculated fields as attributes for Pydantic
-    group.member_count = member_count
     group.document_count = 0  # TODO: calculate actual document count
     group.is_member = is_member
     group.member_role = member_role
@@ -205,7 +202,7 @@ async def get_group(
     return GroupResponse.model_validate(group)
 
 
-@router.get("/slug/{slug}", response_model=GroupResponse)
+@router.get("/slug/{slug}", response_model=GroupResponse, dependencies=[Depends(GROUP_BY_SLUG_CACHE)])
 async def get_group_by_slug(
     slug: str,
     current_user: Optional[Dict[str, Any]] = Depends(get_optional_user),
@@ -248,10 +245,20 @@ async def update_group(
     # Create dict of updates, excluding None values
     updates = {k: v for k, v in group_data.dict(exclude_unset=True).items() if v is not None}
     
+    old_terms = None
+    if "tags" in updates or "interests" in updates:
+        existing = await GroupService.get_group_by_id(db, group_id)
+        if existing:
+            old_terms = group_terms(existing.tags, existing.interests)
+    
     try:
         group = await GroupService.update_group(db, group_id, user.id, **updates)
         if not group:
             raise HTTPException(status_code=404, detail="Group not found or not authorized")
+        if old_terms is not None:
+            new_terms = group_terms(group.tags, group.interests)
+            if set(new_terms) != set(old_terms):
+                await GroupRecommendationService.mark_terms_dirty([*old_terms, *new_terms])
         return group
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -414,17 +421,19 @@ async def get_group_scholarship_requests(
 
 @router.get("/suggestions", response_model=List[GroupResponse])
 async def get_suggested_groups(
+    background_tasks: BackgroundTasks,
     current_user: Dict[str, Any] = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     limit: int = 10
 ):
     """
     Get group suggestions based on user interests
-    Matches user interests with group tags and interests
+    Served from the precomputed recommendations (interest similarity,
+    co-membership and popularity); users without them yet get interest
+    matching and popular groups while theirs are computed.
     """
     from app.models.collaboration import Group, GroupMember
-    from app.models.user import User
-    from sqlalchemy import select, and_, or_, func
+    from sqlalchemy import select, and_, or_
     
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
     
@@ -433,24 +442,36 @@ async def get_suggested_groups(
     member_result = await db.execute(member_query)
     member_group_ids = [row[0] for row in member_result.all()]
     
+    recommended_ids = await GroupRecommendationService.get_recommended_group_ids(db, user.id)
+    if recommended_ids is None and RECOMMENDER_AVAILABLE:
+        background_tasks.add_task(GroupRecommendationService.mark_users_dirty, [user.id])
+    if recommended_ids:
+        # Joined or unlisted since they were computed
+        joined = set(member_group_ids)
+        candidate_ids = [group_id for group_id in recommended_ids if group_id not in joined]
+        result = await db.execute(
+            select(Group).where(
+                Group.id.in_(candidate_ids),
+                Group.is_public == True,
+                Group.is_active == True,
+                Group.is_deleted == False
+            )
+        )
+        by_id = {group.id: group for group in result.scalars().all()}
+        recommended = [by_id[group_id] for group_id in candidate_ids if group_id in by_id][:limit]
+        if len(recommended) == limit:
+            return recommended
+        recommended.extend(await GroupLeaderboardService.top_groups(
+            db, POPULAR, limit=limit - len(recommended),
+            exclude_ids=member_group_ids + [group.id for group in recommended]
+        ))
+        return recommended
+    
     # If user has no interests, return popular public groups
     if not user.interests or len(user.interests) == 0:
-        query = (
-            select(Group, func.count(GroupMember.id).label('member_count'))
-            .outerjoin(GroupMember, Group.id == GroupMember.group_id)
-            .where(
-                and_(
-                    Group.is_public == True,
-                    Group.is_active == True,
-                    Group.id.notin_(member_group_ids) if member_group_ids else True
-                )
-            )
-            .group_by(Group.id)
-            .order_by(func.count(GroupMember.id).desc())
-            .limit(limit)
+        return await GroupLeaderboardService.top_groups(
+            db, POPULAR, limit=limit, exclude_ids=member_group_ids
         )
-        result = await db.execute(query)
-        return [row[0] for row in result.all()]
     
     # Find groups matching user interests (tags or interests field)
     # This is a simple keyword match - could be enhanced with better matching logic
@@ -471,6 +492,7 @@ async def get_suggested_groups(
                 or_(*interest_conditions) if interest_conditions else True
             )
         )
+        .order_by(Group.member_count.desc(), Group.id)
         .limit(limit)
     )
     
@@ -483,22 +505,9 @@ async def get_suggested_groups(
         suggested_ids = [g.id for g in suggested_groups]
         exclude_ids = member_group_ids + suggested_ids
         
-        popular_query = (
-            select(Group, func.count(GroupMember.id).label('member_count'))
-            .outerjoin(GroupMember, Group.id == GroupMember.group_id)
-            .where(
-                and_(
-                    Group.is_public == True,
-                    Group.is_active == True,
-                    Group.id.notin_(exclude_ids) if exclude_ids else True
-                )
-            )
-            .group_by(Group.id)
-            .order_by(func.count(GroupMember.id).desc())
-            .limit(remaining)
-        )
-        popular_result = await db.execute(popular_query)
-        suggested_groups.extend([row[0] for row in popular_result.all()])
+        suggested_groups.extend(await GroupLeaderboardService.top_groups(
+            db, POPULAR, limit=remaining, exclude_ids=exclude_ids
+        ))
     
     return suggested_groups
 
@@ -844,14 +853,21 @@ async def remove_role_from_member(
 @router.get("/{group_id}/posts", response_model=List[Dict[str, Any]])
 async def get_group_posts(
     group_id: int,
+    response: Response,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    count: Optional[str] = Query(None, pattern=COUNT_MODE_PATTERN),
     current_user: Optional[Dict[str, Any]] = Depends(get_optional_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all posts in a group based on privacy level."""
+    """
+    Get all posts in a group based on privacy level, pinned first.
+    
+    The next page's cursor is returned in the X-Next-Cursor header.
+    """
     from app.models.collaboration import GroupPost, Group, GroupMember
-    from sqlalchemy import select, desc
+    from sqlalchemy import select
     
     # Get group to check privacy level
     group_result = await db.execute(
@@ -881,18 +897,22 @@ async def get_group_posts(
         else:
             raise HTTPException(status_code=403, detail="Access denied")
     
-    result = await db.execute(
-        select(GroupPost)
-        .where(GroupPost.group_id == group_id)
-        .order_by(desc(GroupPost.is_pinned), desc(GroupPost.created_at))
-        .limit(limit)
-        .offset(offset)
+    page = await paginate(
+        db,
+        select(GroupPost).where(GroupPost.group_id == group_id),
+        keys=(GroupPost.is_pinned, GroupPost.created_at, GroupPost.id),
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
+        # Post lists never returned a total; only count on request
+        count=count or COUNT_NONE,
+        scope=f"groups:{group_id}:posts",
     )
-    posts = result.scalars().all()
+    set_page_headers(response, page)
     
     # Convert to dict and include author info
     post_dicts = []
-    for post in posts:
+    for post in page["items"]:
         post_dict = {
             "id": post.id,
             "group_id": post.group_id,
@@ -914,7 +934,8 @@ async def get_group_post(
     group_id: int,
     post_id: int,
     current_user: Optional[Dict[str, Any]] = Depends(get_optional_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders)
 ):
     """Get a single post from a group based on privacy level."""
     from app.models.collaboration import GroupPost, Group
@@ -961,12 +982,7 @@ async def get_group_post(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    # Get author info
-    from app.models.user import User
-    author_result = await db.execute(
-        select(User).where(User.id == post.author_id)
-    )
-    author = author_result.scalar_one_or_none()
+    author = await loaders.users.load(post.author_id)
     
     # Return post with author info
     return {
@@ -980,9 +996,10 @@ async def get_group_post(
         "created_at": post.created_at.isoformat(),
         "updated_at": post.updated_at.isoformat(),
         "author": {
-            "id": author.id,
-            "username": author.username,
-            "email": author.email
+            "id": author["id"],
+            "username": author["username"],
+            # Only shown to the author themselves
+            "email": user.email if post.author_id == user_id else None
         } if author else None
     }
 
@@ -1023,6 +1040,7 @@ async def create_group_post(
     db.add(post)
     await db.commit()
     await db.refresh(post)
+    await GroupLeaderboardService.refresh(db, group_id)
     
     return {
         "id": post.id,
@@ -1204,6 +1222,7 @@ async def join_group(
     db.add(member)
     await db.commit()
     await db.refresh(member)
+    await GroupLeaderboardService.refresh(db, group_id)
     
     return {
         "id": member.id,
@@ -1520,7 +1539,8 @@ async def get_group_analytics(
     start_date: str = None,
     end_date: str = None,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    analytics_db: AsyncSession = Depends(get_analytics_db)
 ):
     """Get group analytics and metrics (owner/admin only)."""
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
@@ -1536,7 +1556,7 @@ async def get_group_analytics(
     start = datetime.fromisoformat(start_date) if start_date else None
     end = datetime.fromisoformat(end_date) if end_date else None
     
-    metrics = await GroupAnalyticsService.get_group_metrics(db, group_id, start, end)
+    metrics = await GroupAnalyticsService.get_group_metrics(analytics_db, group_id, start, end)
     return metrics
 
 
@@ -1546,7 +1566,8 @@ async def get_group_time_series(
     metric: str = "followers",
     days: int = 30,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    analytics_db: AsyncSession = Depends(get_analytics_db)
 ):
     """Get time series data for group analytics (owner/admin only)."""
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
@@ -1558,7 +1579,7 @@ async def get_group_time_series(
     
     from app.services.group_analytics_service import GroupAnalyticsService
     
-    data = await GroupAnalyticsService.get_time_series_data(db, group_id, metric, days)
+    data = await GroupAnalyticsService.get_time_series_data(analytics_db, group_id, metric, days)
     return {"metric": metric, "data": data}
 
 
@@ -7,13 +7,22 @@ from sqlalchemy import select, func
 from typing import List
 
 from app.core.database import get_db
+from app.core.http_cache import CachePolicy, table_version
 from app.models.collaboration import Group
 
 
 router = APIRouter(prefix="/interests", tags=["interests"])
 
+# Tags only change when a public group is created, edited or removed
+INTERESTS_CACHE = CachePolicy(
+    max_age=300,
+    stale_while_revalidate=3600,
+    version=table_version(Group, lambda params: [Group.is_public == True]),
+    shared=True,
+)
 
-@router.get("", response_model=List[str])
+
+@router.get("", response_model=List[str], dependencies=[Depends(INTERESTS_CACHE)])
 async def get_available_interests(
     db: AsyncSession = Depends(get_db)
 ):
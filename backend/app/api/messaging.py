@@ -1,10 +1,11 @@
 """Messaging API - Direct messaging and conversations"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.pagination import COUNT_MODE_PATTERN, set_page_headers
 from app.services import user_service
 from app.services.messaging_service import MessagingService
 from app.schemas.collaboration import (
@@ -81,12 +82,19 @@ async def get_conversation(
 @router.get("/conversations/{conversation_id}/messages", response_model=List[MessageResponse])
 async def get_messages(
     conversation_id: int,
+    response: Response,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    count: Optional[str] = Query(None, pattern=COUNT_MODE_PATTERN),
     current_user: Dict[str, Any] = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get messages in a conversation."""
+    """
+    Get messages in a conversation, newest first.
+    
+    The next page's cursor is returned in the X-Next-Cursor header.
+    """
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
     
     # Verify user is a participant
@@ -94,8 +102,9 @@ async def get_messages(
     if not conversation or user.id not in conversation.participant_ids:
         raise HTTPException(status_code=403, detail="Not authorized to access this conversation")
     
-    messages = await MessagingService.get_messages(db, conversation_id, limit, offset)
-    return messages
+    page = await MessagingService.get_messages(db, conversation_id, limit, offset, cursor=cursor, count=count)
+    set_page_headers(response, page)
+    return page["items"]
 
 
 @router.post("/conversations/{conversation_id}/messages", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
@@ -1,10 +1,11 @@
 """Reading API - Reading progress tracking"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.pagination import COUNT_MODE_PATTERN
 from app.services import user_service
 from app.services.reading_service import ReadingService
 from app.schemas.reading import ReadingProgress, ReadingProgressResponse
@@ -17,6 +18,8 @@ async def update_reading_progress(progress_data: ReadingProgress, current_user:
     """Update reading progress for a document."""
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
     progress = await ReadingService.update_progress(db, user.id, progress_data.document_id, progress_data.progress_percentage, progress_data.last_position)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Document not found")
     return progress
 
 
@@ -24,18 +27,25 @@ async def update_reading_progress(progress_data: ReadingProgress, current_user:
 async def get_reading_progress(document_id: int, current_user: Dict[str, Any] = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Get reading progress for a specific document."""
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
-    progress = await ReadingService.get_progress(db, user.id, document_id)
+    progress = await ReadingService.get_latest_progress(db, user.id, document_id)
     if not progress:
         raise HTTPException(status_code=404, detail="No reading progress found")
     return progress
 
 
 @router.get("/history")
-async def get_reading_history(skip: int = 0, limit: int = 50, current_user: Dict[str, Any] = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    """Get user's reading history."""
+async def get_reading_history(
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    count: Optional[str] = Query(None, pattern=COUNT_MODE_PATTERN),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get user's reading history. Pass next_cursor back as cursor for the next page."""
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
-    items, total = await ReadingService.get_user_reading_history(db, user.id, skip, limit)
-    return {"items": items, "total": total, "skip": skip, "limit": limit}
+    page = await ReadingService.get_user_reading_history(db, user.id, skip, limit, cursor=cursor, count=count)
+    return {**page, "skip": skip, "limit": limit}
 
 
 @router.get("/currently-reading")
@@ -3,12 +3,13 @@ Registration validation endpoints
 Helps prevent duplicate registrations and provides better UX
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
 from app.models import User
 from app.api.auth import get_current_user
+from app.services.group_recommendation_service import GroupRecommendationService
 from pydantic import BaseModel, EmailStr, validator
 
 router = APIRouter(prefix="/auth", tags=["registration"])
@@ -189,6 +190,7 @@ async def get_registration_info():
 @router.post("/complete-onboarding")
 async def complete_onboarding(
     request: CompleteOnboardingRequest,
+    background_tasks: BackgroundTasks,
     current_user_token: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -259,6 +261,9 @@ async def complete_onboarding(
     await db.commit()
     await db.refresh(user)
     
+    if user.interests:
+        background_tasks.add_task(GroupRecommendationService.mark_users_dirty, [user.id])
+    
     return {
         "success": True,
         "message": "Onboarding completed successfully!",
@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_, func, and_
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.auth import get_current_user
 from app.schemas.search import SearchQuery, SearchResponse
 from app.services import search_service, user_service
@@ -21,6 +21,7 @@ async def search_users(
     q: str = Query(..., description="Search query for username or display name"),
     limit: int = Query(10, ge=1, le=50, description="Number of results to return"),
     db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Search for users by username or display name"""
@@ -41,7 +42,7 @@ async def search_users(
         )
     ).limit(limit)
     
-    result = await db.execute(stmt)
+    result = await read_db.execute(stmt)
     users = result.scalars().all()
     
     # Format results
@@ -64,13 +65,14 @@ async def search_users(
 async def search(
     search_query: SearchQuery,
     db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Search across the platform"""
     
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
     
-    results, total = await search_service.search_all(db, search_query, user.id)
+    results, total = await search_service.search_all(read_db, search_query, user.id)
     
     skip = (search_query.page - 1) * search_query.page_size
     
@@ -13,6 +13,8 @@ from pydantic import BaseModel, Field, ConfigDict
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.http_cache import CachePolicy, table_version
+from app.core.responses import json_response
 from app.models.user import User
 from app.models.store import StoreItem, Purchase, StoreItemStatus, PurchaseStatus
 from app.services.stripe_service import StripeService
@@ -20,6 +22,13 @@ from app.services.stripe_service import StripeService
 
 router = APIRouter(prefix="/store", tags=["store"])
 
+CATALOGUE_CACHE = CachePolicy(
+    max_age=300,
+    stale_while_revalidate=3600,
+    version=table_version(StoreItem, lambda params: [StoreItem.status == StoreItemStatus.ACTIVE]),
+    shared=True,
+)
+
 
 # ============================================================================
 # Pydantic Models (Request/Response Schemas)
@@ -107,7 +116,7 @@ class PublicKeyResponse(BaseModel):
 # Store Browse Endpoints
 # ============================================================================
 
-@router.get("/browse", response_model=List[StoreItemResponse])
+@router.get("/browse", response_model=List[StoreItemResponse], dependencies=[Depends(CATALOGUE_CACHE)])
 async def browse_store(
     search: Optional[str] = None,
     genre: Optional[str] = None,
@@ -243,7 +252,7 @@ async def browse_store(
             has_ebook=bool(item.epub_blob_url)
         ))
     
-    return response
+    return json_response(List[StoreItemResponse], response)
 
 
 @router.get("/{item_id}", response_model=StoreItemResponse)
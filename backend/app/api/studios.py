@@ -6,7 +6,7 @@ from typing import List
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_analytics_db, get_db
 from app.core.auth import get_current_user
 from app.schemas.studio import (
     StudioCreate, StudioUpdate, StudioResponse, StudioListResponse,
@@ -256,6 +256,7 @@ async def get_studio_analytics(
     start_date: str = None,
     end_date: str = None,
     db: AsyncSession = Depends(get_db),
+    analytics_db: AsyncSession = Depends(get_analytics_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Get studio analytics and metrics"""
@@ -265,7 +266,7 @@ async def get_studio_analytics(
     start = datetime.fromisoformat(start_date) if start_date else None
     end = datetime.fromisoformat(end_date) if end_date else None
     
-    metrics = await StudioAnalyticsService.get_studio_metrics(db, studio_id, start, end)
+    metrics = await StudioAnalyticsService.get_studio_metrics(analytics_db, studio_id, start, end)
     return metrics
 
 
@@ -275,12 +276,13 @@ async def get_time_series(
     metric: str = "views",
     days: int = 30,
     db: AsyncSession = Depends(get_db),
+    analytics_db: AsyncSession = Depends(get_analytics_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Get time series data for analytics"""
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
     
-    data = await StudioAnalyticsService.get_time_series_data(db, studio_id, metric, days)
+    data = await StudioAnalyticsService.get_time_series_data(analytics_db, studio_id, metric, days)
     return {"metric": metric, "data": data}
 
 
@@ -303,6 +305,7 @@ async def get_document_analytics(
     start_date: str = None,
     end_date: str = None,
     db: AsyncSession = Depends(get_db),
+    analytics_db: AsyncSession = Depends(get_analytics_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Get document analytics and metrics"""
@@ -312,5 +315,5 @@ async def get_document_analytics(
     start = datetime.fromisoformat(start_date) if start_date else None
     end = datetime.fromisoformat(end_date) if end_date else None
     
-    metrics = await StudioAnalyticsService.get_document_metrics(db, document_id, start, end)
+    metrics = await StudioAnalyticsService.get_document_metrics(analytics_db, document_id, start, end)
     return metrics
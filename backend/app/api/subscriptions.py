@@ -5,11 +5,12 @@ Endpoints for subscription management and Stripe integration
 from fastapi import APIRouter, Depends, HTTPException, Header, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
-import stripe
 import os
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.http_cache import CachePolicy, table_version
+from app.models.monetization import SubscriptionTier
 from app.schemas.monetization import (
     SubscriptionTierResponse,
     SubscriptionCreate,
@@ -19,15 +20,23 @@ from app.schemas.monetization import (
     PaymentResponse,
     StripeWebhookEvent
 )
+from app.services.stripe_service import stripe
 from app.services.subscription_service import SubscriptionService
 
 
 router = APIRouter(prefix="/subscriptions", tags=["subscriptions"])
 
+TIERS_CACHE = CachePolicy(
+    max_age=3600,
+    stale_while_revalidate=86400,
+    version=table_version(SubscriptionTier, lambda params: [SubscriptionTier.is_active == True]),
+    shared=True,
+)
+
 
 # ==================== Subscription Tiers ====================
 
-@router.get("/tiers", response_model=List[SubscriptionTierResponse])
+@router.get("/tiers", response_model=List[SubscriptionTierResponse], dependencies=[Depends(TIERS_CACHE)])
 async def get_subscription_tiers(
     db: AsyncSession = Depends(get_db)
 ):
@@ -0,0 +1,84 @@
+"""
+Tenant resolution API
+Host → group/studio lookup and compiled theme assets for branded pages
+
+Both endpoints are answered from the in-memory map in
+app.services.tenant_resolution_service - no database queries.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import RedirectResponse
+
+from app.services.tenant_resolution_service import GROUP, STUDIO, tenant_resolution
+
+router = APIRouter(prefix="/tenants", tags=["tenants"])
+
+# Versioned theme URLs never change content
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Host lookups may change on approval; keep edge caches short
+RESOLVE_MAX_AGE = "public, max-age=60"
+
+THEME_MEDIA_TYPES = {
+    "css": "text/css; charset=utf-8",
+    "json": "application/json",
+}
+
+
+@router.get("/resolve")
+async def resolve_tenant(
+    request: Request,
+    response: Response,
+    host: Optional[str] = Query(None, description="Host to resolve (default: the request's host)")
+):
+    """
+    Resolve a branded host (group subdomain, studio subdomain or verified
+    custom domain) to its group or studio and theme URLs (public endpoint)
+    """
+    host = host or request.headers.get("x-forwarded-host") or request.headers.get("host") or ""
+    await tenant_resolution.ensure_loaded()
+
+    tenant = tenant_resolution.resolve(host.split(",")[0])
+    if not tenant:
+        raise HTTPException(status_code=404, detail="No group or studio for this host")
+
+    response.headers["Cache-Control"] = RESOLVE_MAX_AGE
+    response.headers["Vary"] = "Host, X-Forwarded-Host"
+    return tenant_resolution.describe(tenant)
+
+
+@router.get("/themes/{kind}/{entity_id}/{version}.{fmt}")
+async def get_theme_asset(
+    kind: str,
+    entity_id: int,
+    version: str,
+    fmt: str,
+    request: Request
+):
+    """
+    Compiled theme CSS or JSON (public endpoint)
+
+    A stale version redirects to the current one, so pages cached before a
+    theme edit still get a theme.
+    """
+    if kind not in (GROUP, STUDIO) or fmt not in THEME_MEDIA_TYPES:
+        raise HTTPException(status_code=404, detail="Theme not found")
+
+    await tenant_resolution.ensure_loaded()
+    theme = tenant_resolution.get_theme(kind, entity_id)
+    if not theme:
+        raise HTTPException(status_code=404, detail="Theme not found")
+
+    if version != theme["version"]:
+        return RedirectResponse(
+            url=f"/api/v1/tenants/themes/{kind}/{entity_id}/{theme['version']}.{fmt}",
+            status_code=307,
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    etag = f'"{theme["version"]}"'
+    headers = {"Cache-Control": IMMUTABLE, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=theme[fmt], media_type=THEME_MEDIA_TYPES[fmt], headers=headers)
@@ -3,7 +3,7 @@ User Profile API endpoints
 """
 
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
@@ -13,6 +13,7 @@ from app.schemas.user_profile import (
     UserProfileUpdate, UserProfileResponse, PublicUserProfile
 )
 from app.services import user_profile_service, user_service
+from app.services.group_recommendation_service import GroupRecommendationService
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -102,6 +103,7 @@ async def update_my_profile(
 @router.put("/me/account", response_model=FullUserProfile)
 async def update_my_account(
     account_data: UserAccountUpdate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -128,12 +130,16 @@ async def update_my_account(
     if account_data.birth_year is not None:
         user.birth_year = account_data.birth_year
     
+    interests_changed = account_data.interests is not None and account_data.interests != (user.interests or [])
     if account_data.interests is not None:
         user.interests = account_data.interests
     
     await db.commit()
     await db.refresh(user)
     
+    if interests_changed:
+        background_tasks.add_task(GroupRecommendationService.mark_users_dirty, [user.id])
+    
     profile = await user_profile_service.get_user_profile(db, user.id)
     
     return FullUserProfile(
@@ -2,8 +2,9 @@
 API v1 Router
 Aggregates all v1 endpoints
 """
+from typing import Any, Dict, List, Tuple
 
-from fastapi import APIRouter
+from fastapi import APIRouter, FastAPI
 from app.api import (
     auth,
     bootstrap,  # Emergency admin access
@@ -58,13 +59,37 @@ from app.api import (
     trash,  # Trash bin for soft-deleted documents/projects
     collections,  # Universal bookmarking system
     pages,  # Page tracking and navigation
+    tenants,  # Host/subdomain resolution and compiled themes
     workspaces,  # Collaborative workspaces
 )
 
-api_router = APIRouter()
+class RouterSet:
+    """
+    The v1 routers, mounted straight onto the app
 
+    FastAPI rebuilds every route each time a router is included in another
+    one (dependency analysis and a pydantic schema per parameter), so going
+    through an intermediate APIRouter built all ~400 routes one extra time
+    on every startup. This collects the routers and their include options and
+    includes each one into the app once.
+    """
 
-@api_router.get("/status")
+    def __init__(self):
+        self.routers: List[Tuple[APIRouter, Dict[str, Any]]] = []
+
+    def include_router(self, router: APIRouter, **kwargs):
+        self.routers.append((router, kwargs))
+
+    def mount(self, app: FastAPI, prefix: str = ""):
+        for router, kwargs in self.routers:
+            kwargs = dict(kwargs)
+            app.include_router(router, prefix=prefix + kwargs.pop("prefix", ""), **kwargs)
+
+
+status_router = APIRouter()
+
+
+@status_router.get("/status")
 async def api_status():
     """API status endpoint"""
     return {
@@ -97,7 +122,10 @@ async def api_status():
     }
 
 
+api_router = RouterSet()
+
 # Include routers
+api_router.include_router(status_router)
 api_router.include_router(auth.router)
 api_router.include_router(bootstrap.router)  # Emergency admin access
 api_router.include_router(registration.router)  # Registration validation
@@ -191,3 +219,6 @@ api_router.include_router(trash.router)
 
 # Page tracking and navigation system
 api_router.include_router(pages.router)
+
+# Branded host resolution and theme assets
+api_router.include_router(tenants.router)
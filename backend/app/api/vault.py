@@ -10,16 +10,18 @@ from typing import Optional, List
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime, timezone
 import json
-import os
-from anthropic import Anthropic
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.responses import stream_json_array
 from app.models.vault import Article, ArticleType, ArticleStatus
 from app.models.author import Author, UserFollowsAuthor
 from app.models.document import Document
 from app.models import User
 from app.services import user_service
+from app.services.ai_gateway import ai_gateway
+from app.services.reading_progress_tracker import progress_tracker
+from app.services.similarity_service import DOCUMENT, STORE_ITEM, SimilarityService
 
 router = APIRouter(prefix="/vault", tags=["vault"])
 
@@ -158,6 +160,21 @@ class BookEnhanceResponse(BaseModel):
     fields_enhanced: List[str] = []
 
 
+# ============================================================================
+# Helpers
+# ============================================================================
+
+async def _with_buffered_progress(user_id: int, responses: List[ArticleResponse]) -> List[ArticleResponse]:
+    """Overlay progress still waiting in Redis for the flusher onto the rows read"""
+    buffered = await progress_tracker.get_vault_progress(user_id, [r.id for r in responses])
+    for response in responses:
+        progress = buffered.get(response.id)
+        if progress:
+            response.reading_progress = progress["reading_progress"]
+            response.last_location = progress["last_location"]
+    return responses
+
+
 # ============================================================================
 # Endpoints
 # ============================================================================
@@ -411,7 +428,8 @@ async def get_my_bookshelf(
         docs = doc_result.scalars().all()
         documents_map = {doc.id: doc for doc in docs}
     
-    return [
+    # Built here, while the session is open; encoded as the list streams
+    shelf = [
         ArticleResponse(
             id=item.id,
             user_id=item.user_id,
@@ -446,6 +464,8 @@ async def get_my_bookshelf(
         )
         for item in items
     ]
+    await _with_buffered_progress(user.id, shelf)
+    return stream_json_array(ArticleResponse, shelf)
 
 
 @router.get("/stats", response_model=BookshelfStats)
@@ -645,6 +665,61 @@ async def get_recommendations_by_favorite_authors(
     }
 
 
+# Most recent shelf items used to find similar works
+MAX_SIMILAR_SEEDS = 50
+
+
+@router.get("/recommendations/similar")
+async def get_similar_recommendations(
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of recommendations"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get Work Shelf documents and store books like the ones on your bookshelf.
+    Favorites and books rated 4+ count double; DNF and books rated 1-2 are ignored.
+    """
+    user = await user_service.get_or_create_user_from_keycloak(db, current_user)
+    
+    shelf_result = await db.execute(
+        select(
+            Article.document_id, Article.store_item_id, Article.status,
+            Article.rating, Article.is_favorite
+        )
+        .where(
+            Article.user_id == user.id,
+            (Article.document_id.isnot(None)) | (Article.store_item_id.isnot(None))
+        )
+        .order_by(Article.added_at.desc())
+    )
+    shelf = shelf_result.all()
+    
+    on_shelf = set()
+    seeds = []
+    for item in shelf:
+        key = (DOCUMENT, item.document_id) if item.document_id else (STORE_ITEM, item.store_item_id)
+        on_shelf.add(key)
+        if item.status == 'dnf' or (item.rating is not None and item.rating <= 2):
+            continue
+        if len(seeds) < MAX_SIMILAR_SEEDS:
+            weight = 2.0 if item.is_favorite or (item.rating or 0) >= 4 else 1.0
+            seeds.append((*key, weight))
+    
+    if not seeds:
+        return {
+            "message": "Add Work Shelf documents or store books to your bookshelf to get recommendations!",
+            "recommendations": []
+        }
+    
+    recommendations = await SimilarityService.recommend(
+        db, seeds, exclude=on_shelf, exclude_owner=user.id, limit=limit
+    )
+    return {
+        "seeds": len(seeds),
+        "recommendations": recommendations
+    }
+
+
 @router.get("/{item_id}", response_model=ArticleResponse)
 async def get_bookshelf_item(
     item_id: int,
@@ -666,7 +741,7 @@ async def get_bookshelf_item(
     if not item:
         raise HTTPException(status_code=404, detail="Bookshelf item not found")
     
-    return ArticleResponse(
+    response = ArticleResponse(
         id=item.id,
         user_id=item.user_id,
         item_type=item.item_type,
@@ -698,6 +773,8 @@ async def get_bookshelf_item(
         created_at=item.created_at,
         updated_at=item.updated_at
     )
+    (response,) = await _with_buffered_progress(user.id, [response])
+    return response
 
 
 @router.put("/{item_id}", response_model=ArticleResponse)
@@ -743,7 +820,7 @@ async def update_bookshelf_item(
     await db.commit()
     await db.refresh(item)
     
-    return ArticleResponse(
+    response = ArticleResponse(
         id=item.id,
         user_id=item.user_id,
         item_type=item.item_type,
@@ -775,6 +852,8 @@ async def update_bookshelf_item(
         created_at=item.created_at,
         updated_at=item.updated_at
     )
+    (response,) = await _with_buffered_progress(user.id, [response])
+    return response
 
 
 @router.delete("/{item_id}", status_code=204)
@@ -811,36 +890,20 @@ async def update_reading_progress(
     """Update reading progress for an EPUB book"""
     user = await user_service.get_or_create_user_from_keycloak(db, current_user)
     
-    result = await db.execute(
-        select(Article).where(
-            Article.id == item_id,
-            Article.user_id == user.id
-        )
+    # Buffered in Redis; the first update of a want-to-read item moves it
+    # to reading right away
+    progress = await progress_tracker.record_vault_progress(
+        db,
+        user.id,
+        item_id,
+        progress_data.last_location,
+        progress_data.reading_progress
     )
-    item = result.scalar_one_or_none()
     
-    if not item:
+    if not progress:
         raise HTTPException(status_code=404, detail="Bookshelf item not found")
     
-    # Update reading progress
-    item.last_location = progress_data.last_location
-    item.reading_progress = progress_data.reading_progress
-    
-    # Auto-update status if starting to read for the first time
-    if item.status == "want-to-read" and progress_data.reading_progress > 0:
-        item.status = "reading"
-        if not item.started_reading:
-            item.started_reading = datetime.now(timezone.utc)
-    
-    await db.commit()
-    await db.refresh(item)
-    
-    return {
-        "id": item.id,
-        "last_location": item.last_location,
-        "reading_progress": item.reading_progress,
-        "status": item.status
-    }
+    return progress
 
 
 # ============================================================================
@@ -884,7 +947,7 @@ async def get_public_bookshelf(
     result = await db.execute(query)
     items = result.scalars().unique().all()
     
-    return [
+    shelf = [
         ArticleResponse(
             id=item.id,
             user_id=item.user_id,
@@ -919,6 +982,7 @@ async def get_public_bookshelf(
         )
         for item in items
     ]
+    return await _with_buffered_progress(user.id, shelf)
 
 
 @router.post("/enhance-book-data", response_model=BookEnhanceResponse)
@@ -946,8 +1010,7 @@ async def enhance_book_data(
     - Self-published or international editions
     """
     # Check if Anthropic API key is configured
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
+    if not ai_gateway.is_configured:
         raise HTTPException(
             status_code=503, 
             detail="AI enhancement unavailable - API key not configured"
@@ -1003,18 +1066,17 @@ Important:
 - Return ONLY the JSON object, no other text"""
     
     try:
-        # Call Claude API
-        client = Anthropic(api_key=api_key)
-        message = client.messages.create(
+        # Call Claude through the gateway (identical book lookups are cached)
+        response_text = await ai_gateway.complete(
+            prompt,
             model="claude-3-5-sonnet-20241022",
             max_tokens=1024,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
+            feature="enhance_book_data",
+            user_id=current_user.get("sub")
         )
         
         # Parse Claude's response
-        response_text = message.content[0].text.strip()
+        response_text = response_text.strip()
         
         # Extract JSON from response (Claude sometimes wraps it in markdown)
         if response_text.startswith("```"):
@@ -42,7 +42,7 @@ async def create_workspace(
     )
 
     # Add counts
-    member_count = await WorkspaceService.get_member_count(db, workspace.id)
+    member_count = workspace.member_count
     collection_count = await WorkspaceService.get_collection_count(db, workspace.id)
 
     response = WorkspaceResponse.model_validate(workspace)
@@ -67,7 +67,7 @@ async def list_workspaces(
 
     responses = []
     for workspace in workspaces:
-        member_count = await WorkspaceService.get_member_count(db, workspace.id)
+        member_count = workspace.member_count
         collection_count = await WorkspaceService.get_collection_count(db, workspace.id)
         member = await WorkspaceService.get_member(db, workspace.id, current_user.id)
 
@@ -94,7 +94,7 @@ async def get_workspace(
             status_code=status.HTTP_404_NOT_FOUND, detail="Workspace not found"
         )
 
-    member_count = await WorkspaceService.get_member_count(db, workspace.id)
+    member_count = workspace.member_count
     collection_count = await WorkspaceService.get_collection_count(db, workspace.id)
     member = await WorkspaceService.get_member(db, workspace.id, current_user.id)
 
@@ -123,7 +123,7 @@ async def update_workspace(
             detail="Not authorized to edit workspace",
         )
 
-    member_count = await WorkspaceService.get_member_count(db, workspace.id)
+    member_count = workspace.member_count
     collection_count = await WorkspaceService.get_collection_count(db, workspace.id)
     member = await WorkspaceService.get_member(db, workspace.id, current_user.id)
 
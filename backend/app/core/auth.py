@@ -7,14 +7,17 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError, jwk
 from jose.backends import RSAKey
-import httpx
 from functools import lru_cache
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.lazy import LazyModule
 import json
 import os
 
+# Only needed to fetch Keycloak's signing keys
+httpx = LazyModule("httpx")
+
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
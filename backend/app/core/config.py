@@ -45,7 +45,52 @@ class Settings(BaseSettings):
     @property
     def DATABASE_URL_CLEAN(self) -> str:
         """Clean DATABASE_URL for asyncpg compatibility - uses staging DB for tests"""
-        url = self._effective_database_url
+        return self._asyncpg_url(self._effective_database_url)
+    
+    # Read replica; empty sends replica reads to the primary
+    DATABASE_READ_URL: str = ""
+    # After a write, the caller's reads stay on the primary this long (replica lag)
+    DB_REPLICA_STICKY_SECONDS: int = 10
+    
+    @property
+    def DATABASE_READ_URL_CLEAN(self) -> str:
+        """Clean DATABASE_READ_URL for asyncpg; empty when no replica is configured (or in tests)"""
+        is_test = os.getenv("PYTEST_CURRENT_TEST") is not None
+        if is_test or not self.DATABASE_READ_URL:
+            return ""
+        return self._asyncpg_url(self.DATABASE_READ_URL)
+    
+    # Connection pools per workload (see app/core/database.py)
+    # Request traffic - latency-sensitive reads and writes
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 10  # Seconds to wait for a free connection
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    # Replica reads (search, discovery)
+    DB_READ_POOL_SIZE: int = 5
+    DB_READ_MAX_OVERFLOW: int = 10
+    DB_READ_POOL_TIMEOUT: int = 10
+    DB_READ_STATEMENT_TIMEOUT_MS: int = 15000
+    # Background jobs - flushers, refreshers, price analysis, EPUB verification
+    DB_JOBS_POOL_SIZE: int = 3
+    DB_JOBS_MAX_OVERFLOW: int = 2
+    DB_JOBS_POOL_TIMEOUT: int = 60
+    DB_JOBS_STATEMENT_TIMEOUT_MS: int = 300000
+    # Analytics dashboards and admin stats (replica when configured)
+    DB_ANALYTICS_POOL_SIZE: int = 2
+    DB_ANALYTICS_MAX_OVERFLOW: int = 3
+    DB_ANALYTICS_POOL_TIMEOUT: int = 30
+    DB_ANALYTICS_STATEMENT_TIMEOUT_MS: int = 120000
+    
+    # Per-request query profiling (app/core/query_profiler.py)
+    QUERY_PROFILER_SAMPLE_RATE: float = 0.05  # Fraction of requests profiled; 0 disables
+    QUERY_PROFILER_N_PLUS_ONE_THRESHOLD: int = 10  # Same statement more often than this is flagged
+    # Allow clients to ask for a Server-Timing header with X-Query-Profile: 1
+    QUERY_PROFILER_SERVER_TIMING: bool = False
+    
+    @staticmethod
+    def _asyncpg_url(url: str) -> str:
+        """Rewrite a postgres URL for the asyncpg driver"""
         # Replace postgresql:// with postgresql+asyncpg:// for async driver
         if url.startswith('postgresql://'):
             url = url.replace('postgresql://', 'postgresql+asyncpg://', 1)
@@ -60,16 +105,25 @@ class Settings(BaseSettings):
         url = url.replace('&channel_binding=require', '')
         return url
     
+    # Redis (shared cache); cache_service falls back to localhost when empty
+    REDIS_URL: str = ""
+    
     # Azure (optional for local dev)
     AZURE_STORAGE_CONNECTION_STRING: str = ""
     AZURE_STORAGE_CONTAINER_NAME: str = "documents"
     
+    # Local content indexes (near-duplicate pre-screen), memory-mapped files
+    # rebuilt by scripts; one directory per index
+    CONTENT_INDEX_DIR: str = "data/indexes"
+    
     # AWS SES Email
     AWS_REGION: str = "us-east-1"
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
     FROM_EMAIL: str = "noreply@workshelf.dev"
     FRONTEND_URL: str = "https://workshelf.dev"
+    # Group and studio subdomains are <subdomain>.<TENANT_BASE_DOMAIN>
+    TENANT_BASE_DOMAIN: str = "workshelf.dev"
     
     # S3-Compatible Object Storage (AWS S3, MinIO, etc.)
     S3_ENDPOINT_URL: str = ""  # Leave empty for AWS S3, set for MinIO (e.g., http://minio:9000)
@@ -1,12 +1,32 @@
 """
 Database connection and session management
+
+Traffic is split across separate connection pools so one workload can't
+starve another:
+
+- request:   get_db - latency-sensitive request reads and writes (primary)
+- read:      get_read_db - read-only request traffic such as search and
+             discovery (read replica, falling back to the primary)
+- analytics: get_analytics_db - dashboards and admin stats (replica when
+             configured)
+- jobs:      get_jobs_session_local() - background workers (primary)
+
+Each pool has its own size, checkout timeout and statement timeout (see
+DB_* in app.core.config). Pool saturation is exported to Prometheus by
+app.core.db_metrics.
 """
+import hashlib
 import os
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker, AsyncEngine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session
 from sqlalchemy.pool import NullPool
+from starlette.requests import Request
 from app.core.config import settings
-from typing import Optional
+from app.core.db_metrics import POOL_CHECKOUT_TIMEOUTS
+from typing import Dict, Optional
 
 # Detect if we're in test mode
 IS_TEST = os.getenv("PYTEST_CURRENT_TEST") is not None
@@ -14,14 +34,37 @@ IS_TEST = os.getenv("PYTEST_CURRENT_TEST") is not None
 # Module-level engine cache - only used in production
 _engine_cache: Optional[AsyncEngine] = None
 
+
+def _create_pooled_engine(
+    url: str,
+    pool_size: int,
+    max_overflow: int,
+    pool_timeout: int,
+    statement_timeout_ms: int,
+) -> AsyncEngine:
+    """Engine with its own connection pool and server-side statement timeout"""
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG if hasattr(settings, 'DEBUG') else False,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        connect_args={
+            "ssl": "require",  # asyncpg SSL mode
+            "server_settings": {"statement_timeout": str(statement_timeout_ms)},
+        },
+    )
+
+
 def get_db_engine() -> AsyncEngine:
     """Get or create the database engine.
-    
+
     In tests: Creates a new engine with NullPool for each call (no caching).
     In production: Returns cached engine with connection pooling.
     """
     global _engine_cache
-    
+
     if IS_TEST:
         # In tests: create fresh engine each time to avoid event loop issues
         return create_async_engine(
@@ -30,22 +73,55 @@ def get_db_engine() -> AsyncEngine:
             poolclass=NullPool,
             connect_args={"ssl": "require"},  # asyncpg SSL mode
         )
-    
+
     # In production: use cached engine with connection pooling
     if _engine_cache is None:
-        _engine_cache = create_async_engine(
+        _engine_cache = _create_pooled_engine(
             settings.DATABASE_URL_CLEAN,
-            echo=settings.DEBUG if hasattr(settings, 'DEBUG') else False,
-            pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10,
-            connect_args={"ssl": "require"},  # asyncpg SSL mode
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
         )
     return _engine_cache
 
 # For backwards compatibility - but prefer using get_db_engine()
 engine = get_db_engine()
 
+# Read replica (falls back to the primary engine when not configured)
+REPLICA_CONFIGURED = bool(settings.DATABASE_READ_URL_CLEAN)
+
+if REPLICA_CONFIGURED:
+    read_engine = _create_pooled_engine(
+        settings.DATABASE_READ_URL_CLEAN,
+        pool_size=settings.DB_READ_POOL_SIZE,
+        max_overflow=settings.DB_READ_MAX_OVERFLOW,
+        pool_timeout=settings.DB_READ_POOL_TIMEOUT,
+        statement_timeout_ms=settings.DB_READ_STATEMENT_TIMEOUT_MS,
+    )
+else:
+    read_engine = engine
+
+# Background jobs and analytics get pools of their own
+if IS_TEST:
+    jobs_engine = engine
+    analytics_engine = engine
+else:
+    jobs_engine = _create_pooled_engine(
+        settings.DATABASE_URL_CLEAN,
+        pool_size=settings.DB_JOBS_POOL_SIZE,
+        max_overflow=settings.DB_JOBS_MAX_OVERFLOW,
+        pool_timeout=settings.DB_JOBS_POOL_TIMEOUT,
+        statement_timeout_ms=settings.DB_JOBS_STATEMENT_TIMEOUT_MS,
+    )
+    analytics_engine = _create_pooled_engine(
+        settings.DATABASE_READ_URL_CLEAN or settings.DATABASE_URL_CLEAN,
+        pool_size=settings.DB_ANALYTICS_POOL_SIZE,
+        max_overflow=settings.DB_ANALYTICS_MAX_OVERFLOW,
+        pool_timeout=settings.DB_ANALYTICS_POOL_TIMEOUT,
+        statement_timeout_ms=settings.DB_ANALYTICS_STATEMENT_TIMEOUT_MS,
+    )
+
 # Storage database (user documents only - permanent storage)
 STORAGE_DATABASE_URL = os.getenv(
     "STORAGE_DATABASE_URL",
@@ -57,14 +133,14 @@ _storage_engine_cache: Optional[AsyncEngine] = None
 def get_storage_engine() -> AsyncEngine:
     """Get or create the storage database engine."""
     global _storage_engine_cache
-    
+
     if IS_TEST:
         return create_async_engine(
             STORAGE_DATABASE_URL,
             echo=False,
             poolclass=NullPool,
         )
-    
+
     if _storage_engine_cache is None:
         _storage_engine_cache = create_async_engine(
             STORAGE_DATABASE_URL,
@@ -78,12 +154,89 @@ def get_storage_engine() -> AsyncEngine:
 # For backwards compatibility
 storage_engine = get_storage_engine()
 
+
+def get_pools() -> Dict[str, AsyncEngine]:
+    """Engines by workload name, each engine listed once (for metrics)"""
+    pools = {
+        "request": engine,
+        "read": read_engine,
+        "jobs": jobs_engine,
+        "analytics": analytics_engine,
+        "storage": storage_engine,
+    }
+    seen = set()
+    unique = {}
+    for name, pool_engine in pools.items():
+        if id(pool_engine) not in seen:
+            seen.add(id(pool_engine))
+            unique[name] = pool_engine
+    return unique
+
+
+# ============================================================================
+# Write tracking (read-your-writes)
+# ============================================================================
+
+# Session.info flag set once a session has written something
+WROTE_KEY = "wrote"
+
+STICKY_PREFIX = "db:primary_sticky:"
+
+
+class WriteTrackingSession(Session):
+    """Session that notes in .info whether it flushed or executed a write"""
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _after_flush(session, flush_context):
+    session.info[WROTE_KEY] = True
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _on_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE_KEY] = True
+
+
+def _sticky_key(request: Request) -> Optional[str]:
+    """Cache key identifying the caller; anonymous callers aren't tracked"""
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        return None
+    digest = hashlib.sha256(authorization.encode("utf-8")).hexdigest()[:32]
+    return f"{STICKY_PREFIX}{digest}"
+
+
+async def _mark_primary_sticky(request: Request):
+    """Send this caller's replica reads to the primary until the replica catches up"""
+    key = _sticky_key(request)
+    if key is None:
+        return
+    from app.services.cache_service import get_cache
+    cache = await get_cache()
+    await cache.set(key, 1, ttl=settings.DB_REPLICA_STICKY_SECONDS)
+
+
+async def _is_primary_sticky(request: Request) -> bool:
+    key = _sticky_key(request)
+    if key is None:
+        return False
+    from app.services.cache_service import get_cache
+    cache = await get_cache()
+    return await cache.get(key) is not None
+
+
+# ============================================================================
+# Session factories
+# ============================================================================
+
 # Main database session factory - recreated on each access in tests
 def get_async_session_local():
     """Get session factory for main database."""
     return async_sessionmaker(
         get_db_engine(),
         class_=AsyncSession,
+        sync_session_class=WriteTrackingSession,
         expire_on_commit=False,
         autocommit=False,
         autoflush=False,
@@ -92,6 +245,41 @@ def get_async_session_local():
 # For backwards compatibility
 AsyncSessionLocal = get_async_session_local()
 
+# Replica reads
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+# Analytics dashboards
+AnalyticsSessionLocal = async_sessionmaker(
+    analytics_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+# Background jobs
+JobsSessionLocal = async_sessionmaker(
+    jobs_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+
+def get_jobs_session_local():
+    """Get session factory for background jobs (separate pool from requests)."""
+    if IS_TEST:
+        return get_async_session_local()
+    return JobsSessionLocal
+
+
 # Storage database session factory
 StorageSessionLocal = async_sessionmaker(
     storage_engine,
@@ -109,7 +297,7 @@ def get_db_engine():
     return engine
 
 
-async def get_db():
+async def get_db(request: Request = None):
     """
     Dependency for getting async database session (main database)
     Usage in FastAPI:
@@ -120,13 +308,63 @@ async def get_db():
         try:
             yield session
             await session.commit()
-        except Exception:
+            if REPLICA_CONFIGURED and request is not None and session.info.get(WROTE_KEY):
+                await _mark_primary_sticky(request)
+        except Exception as e:
+            if isinstance(e, PoolTimeoutError):
+                POOL_CHECKOUT_TIMEOUTS.labels(pool="request").inc()
             await session.rollback()
             raise
         finally:
             await session.close()
 
 
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Dependency for read-only request traffic, served by the read replica
+    Usage in FastAPI:
+        async def endpoint(db: AsyncSession = Depends(get_read_db)):
+            ...
+
+    Never write through this session. Without a replica - or for a caller
+    who wrote within the last DB_REPLICA_STICKY_SECONDS, so they see their
+    own changes despite replication lag - this is the request's get_db
+    session; a session only takes a connection once it runs a query, so an
+    unused one costs nothing.
+    """
+    if not REPLICA_CONFIGURED or await _is_primary_sticky(request):
+        yield db
+        return
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        except PoolTimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(pool="read").inc()
+            raise
+        finally:
+            await session.close()
+
+
+async def get_analytics_db():
+    """
+    Dependency for analytics dashboards and admin stats (read-only)
+    Usage in FastAPI:
+        async def endpoint(analytics_db: AsyncSession = Depends(get_analytics_db)):
+            ...
+
+    Slow aggregate queries wait on their own small pool instead of the
+    request pool. Never write through this session - it is not committed.
+    """
+    async with AnalyticsSessionLocal() as session:
+        try:
+            yield session
+        except PoolTimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(pool="analytics").inc()
+            raise
+        finally:
+            await session.close()
+
+
 async def get_storage_db():
     """
     Dependency for getting async database session (storage database for documents)
@@ -148,7 +386,7 @@ async def get_storage_db():
 async def init_db():
     """Initialize database - create all tables"""
     from app.models import Base
-    
+
     async with engine.begin() as conn:
         # In production, use Alembic migrations instead
         await conn.run_sync(Base.metadata.create_all)
@@ -156,4 +394,5 @@ async def init_db():
 
 async def close_db():
     """Close database connections"""
-    await engine.dispose()
+    for pool_engine in get_pools().values():
+        await pool_engine.dispose()
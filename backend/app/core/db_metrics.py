@@ -0,0 +1,73 @@
+"""
+Connection pool metrics
+Exports the saturation of each database pool (app.core.database) to the
+Prometheus registry served at /metrics
+
+Gauges are read from the pools at scrape time, so they cost nothing between
+scrapes. A pool whose checked_out keeps reaching capacity is saturated:
+requests queue for up to its pool_timeout and then fail, which
+db_pool_checkout_timeouts_total counts.
+"""
+from prometheus_client import Counter, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy.pool import QueuePool
+
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Requests that gave up waiting for a pooled database connection",
+    ["pool"],
+)
+
+_registered = False
+
+
+class PoolCollector:
+    """Collects size and usage of every pooled engine"""
+
+    def collect(self):
+        from app.core.database import get_pools
+
+        gauges = {
+            "size": GaugeMetricFamily(
+                "db_pool_size", "Persistent connections kept by the pool", labels=["pool"]
+            ),
+            "capacity": GaugeMetricFamily(
+                "db_pool_capacity", "Most connections the pool will open (size + max overflow)", labels=["pool"]
+            ),
+            "checked_out": GaugeMetricFamily(
+                "db_pool_checked_out", "Connections currently in use", labels=["pool"]
+            ),
+            "idle": GaugeMetricFamily(
+                "db_pool_idle", "Open connections waiting in the pool", labels=["pool"]
+            ),
+            "overflow": GaugeMetricFamily(
+                "db_pool_overflow", "Connections open beyond the pool size", labels=["pool"]
+            ),
+            "utilization": GaugeMetricFamily(
+                "db_pool_utilization", "Connections in use as a fraction of capacity", labels=["pool"]
+            ),
+        }
+
+        for name, engine in get_pools().items():
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                # NullPool (tests) has nothing to report
+                continue
+            capacity = pool.size() + pool._max_overflow
+            checked_out = pool.checkedout()
+            gauges["size"].add_metric([name], pool.size())
+            gauges["capacity"].add_metric([name], capacity)
+            gauges["checked_out"].add_metric([name], checked_out)
+            gauges["idle"].add_metric([name], pool.checkedin())
+            gauges["overflow"].add_metric([name], max(pool.overflow(), 0))
+            gauges["utilization"].add_metric([name], checked_out / capacity if capacity else 0)
+
+        yield from gauges.values()
+
+
+def register_pool_metrics():
+    """Add the pool collector to the default registry (once)"""
+    global _registered
+    if not _registered:
+        REGISTRY.register(PoolCollector())
+        _registered = True
@@ -0,0 +1,233 @@
+"""
+HTTP caching for read-heavy endpoints
+Declarative per-route cache policies with strong ETags, conditional GET and
+an optional shared response cache in Redis
+
+A policy is a dependency on the route:
+
+    TIERS_CACHE = CachePolicy(
+        max_age=3600,
+        stale_while_revalidate=86400,
+        version=table_version(SubscriptionTier, lambda params: [SubscriptionTier.is_active == True]),
+    )
+
+    @router.get("/tiers", dependencies=[Depends(TIERS_CACHE)])
+    async def get_subscription_tiers(...): ...
+
+Before the endpoint runs, the policy asks its version function for a cheap
+fingerprint of the data behind the response - typically count(*) and
+max(updated_at) over the rows it lists - and derives the ETag from that
+fingerprint plus the path, query string and varying headers. So:
+
+- If-None-Match with the current ETag answers 304 without building the body
+- With shared=True, anonymous responses are kept in Redis under the ETag, so
+  every process can serve a hit without running the endpoint; a write moves
+  the fingerprint and the old entry is simply never asked for again
+- Otherwise the endpoint runs as usual and gets ETag, Cache-Control
+  (max-age, stale-while-revalidate) and Vary headers
+
+Responses that depend on the caller (personalized=True) are marked private
+for signed-in requests, hash the Authorization header into the ETag and are
+never stored in the shared cache.
+
+Storing bodies happens in app.middleware.http_cache.SharedResponseCacheMiddleware;
+serving cached responses needs the CachedResponse exception handler, both
+registered in app.main.
+"""
+import hashlib
+import json
+import time
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.services.cache_service import get_cache
+
+# Request state key read by SharedResponseCacheMiddleware
+STATE_KEY = "http_cache"
+
+SHARED_CACHE_PREFIX = "http_cache:"
+
+VersionFunc = Callable[[Request, AsyncSession], Awaitable[Any]]
+
+
+class CachedResponse(Exception):
+    """Short-circuits an endpoint with a 304 or a shared-cache hit"""
+
+    def __init__(self, response: Response):
+        self.response = response
+
+
+async def cached_response_handler(request: Request, exc: CachedResponse) -> Response:
+    """Exception handler sending the response a policy settled on"""
+    return exc.response
+
+
+# ============================================================================
+# Version functions
+# ============================================================================
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def table_version(
+    model,
+    where: Optional[Callable[[Dict[str, Any]], List]] = None,
+    column: str = "updated_at",
+) -> VersionFunc:
+    """
+    Fingerprint of a set of rows: their count and latest change
+
+    Args:
+        model: Model whose rows back the response
+        where: Builds filter criteria from the request's path params
+        column: Timestamp column bumped on every update
+
+    Inserts and updates move max(column); deletes move the count.
+    """
+    timestamp = getattr(model, column)
+
+    async def version(request: Request, db: AsyncSession) -> List[Any]:
+        query = select(func.count(), func.max(timestamp)).select_from(model)
+        if where is not None:
+            query = query.where(*where(request.path_params))
+        row = (await db.execute(query)).one()
+        return [row[0], _jsonable(row[1])]
+
+    return version
+
+
+def time_bucket(seconds: int) -> VersionFunc:
+    """Version that changes every `seconds`, for time-windowed results"""
+
+    async def version(request: Request, db: AsyncSession) -> int:
+        return int(time.time() // seconds)
+
+    return version
+
+
+def combine(*versions: VersionFunc) -> VersionFunc:
+    """Version made of several others"""
+
+    async def version(request: Request, db: AsyncSession) -> List[Any]:
+        # One session, so one statement at a time
+        return [await v(request, db) for v in versions]
+
+    return version
+
+
+# ============================================================================
+# Policies
+# ============================================================================
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # GET uses the weak comparison: W/"x" matches "x"
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+class CachePolicy:
+    """
+    Cache policy for one route, used as a dependency
+
+    Args:
+        max_age: Seconds clients and proxies may reuse a response
+        stale_while_revalidate: Further seconds a stale response may be
+            served while it is refetched in the background
+        version: Fingerprint of the data behind the response; without one
+            the ETag changes every max_age seconds
+        vary: Request headers the response depends on
+        personalized: The response depends on who is signed in
+        shared: Keep anonymous responses in Redis for every process
+    """
+
+    def __init__(
+        self,
+        max_age: int,
+        stale_while_revalidate: int = 0,
+        version: Optional[VersionFunc] = None,
+        vary: Sequence[str] = (),
+        personalized: bool = False,
+        shared: bool = False,
+    ):
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+        self.version = version or time_bucket(max(max_age, 1))
+        self.vary = list(vary) + (["Authorization"] if personalized else [])
+        self.personalized = personalized
+        self.shared = shared
+
+    def _cache_control(self, private: bool) -> str:
+        directives = ["private" if private else "public", f"max-age={self.max_age}"]
+        if self.stale_while_revalidate:
+            directives.append(f"stale-while-revalidate={self.stale_while_revalidate}")
+        return ", ".join(directives)
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_db),
+    ):
+        if request.method not in ("GET", "HEAD"):
+            return
+
+        try:
+            version = await self.version(request, db)
+        except (KeyError, ValueError):
+            # Path params the endpoint will reject anyway (422/404)
+            return
+
+        private = self.personalized and "authorization" in request.headers
+        seed = json.dumps(
+            [
+                settings.VERSION,
+                request.url.path,
+                sorted(request.query_params.multi_items()),
+                [request.headers.get(header, "") for header in self.vary],
+                version,
+            ],
+            default=str,
+            separators=(",", ":"),
+        )
+        digest = hashlib.sha256(seed.encode("utf-8")).hexdigest()[:32]
+        etag = f'"{digest}"'
+
+        headers = {"ETag": etag, "Cache-Control": self._cache_control(private)}
+        if self.vary:
+            headers["Vary"] = ", ".join(self.vary)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            raise CachedResponse(Response(status_code=304, headers=headers))
+
+        if self.shared and not private:
+            key = f"{SHARED_CACHE_PREFIX}{digest}"
+            cache = await get_cache()
+            cached = await cache.get(key)
+            if cached is not None:
+                hit = Response(content=cached["body"], media_type=cached["media_type"])
+                # Headers sent with the stored body; the policy's own replace
+                # theirs, since they are recomputed for this request
+                hit.raw_headers.extend(
+                    (name.encode("latin-1"), value.encode("latin-1"))
+                    for name, value in cached.get("headers", [])
+                )
+                hit.headers.update({**headers, "X-Cache": "HIT"})
+                raise CachedResponse(hit)
+            setattr(request.state, STATE_KEY, {
+                "key": key,
+                "ttl": self.max_age + self.stale_while_revalidate,
+            })
+
+        response.headers.update(headers)
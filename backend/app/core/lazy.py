@@ -0,0 +1,120 @@
+"""
+Lazy loading
+Defer heavy imports and service construction until first use
+
+Every router is imported when the app starts, so whatever a service module
+does at import time - loading boto3, stripe or a document parser, building
+an SES client - is paid by every new replica (and every test run) before it
+can serve a request, even if nothing ever sends an email.
+
+- LazyModule: a module that is imported on first attribute access, with an
+  optional hook to configure it (e.g. set stripe.api_key)
+- LazyService: a singleton built on first attribute access
+- module_available: whether an optional dependency is installed, without
+  importing it
+
+Usage:
+    from app.core.lazy import LazyModule, LazyService
+
+    stripe = LazyModule("stripe", configure=lambda m: setattr(m, "api_key", key))
+    email_service = LazyService(EmailService)
+
+Both are drop-in replacements for the module-level names they wrap, so
+callers keep doing `stripe.Customer.create(...)` and
+`email_service.send_email(...)`.
+
+Check the cost of imports with scripts/profile_imports.py.
+"""
+import importlib
+import importlib.util
+import threading
+from functools import lru_cache
+from types import ModuleType
+from typing import Any, Callable, Optional
+
+
+@lru_cache(maxsize=None)
+def module_available(name: str) -> bool:
+    """Whether a module can be imported, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """Imports a module the first time one of its attributes is used"""
+
+    def __init__(self, name: str, configure: Optional[Callable[[ModuleType], None]] = None):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_configure", configure)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self) -> ModuleType:
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    if self._configure is not None:
+                        self._configure(module)
+                    object.__setattr__(self, "_module", module)
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._load(), name, value)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+class LazyService:
+    """
+    A singleton built by factory the first time one of its attributes is used
+
+    Attribute writes and deletes go to the instance too, so tests can patch
+    methods on it as they would on the real object.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _get(self) -> Any:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._get(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self._get(), name)
+
+    def __repr__(self) -> str:
+        factory = getattr(self._factory, "__name__", repr(self._factory))
+        state = "built" if self.loaded else "not built"
+        return f"<LazyService {factory} ({state})>"
@@ -0,0 +1,308 @@
+"""
+Keyset (cursor) pagination
+Pages over (sort key..., id) with signed cursors, keeping offset paging for
+existing clients
+
+A cursor is the sort key of the last item on a page, signed with SECRET_KEY
+and bound to a scope string (the list plus its filters), so it can't be
+forged or replayed against another user's list. The next page is a single
+index range scan -
+
+    WHERE (updated_at, id) < (:last_updated_at, :last_id)
+    ORDER BY updated_at DESC, id DESC LIMIT :n
+
+- which costs the same on page 1,000 as on page 1.
+
+Counting is optional:
+- exact: count(*) over the filtered list (the default in offset mode)
+- cached: the exact count, kept in Redis for COUNT_CACHE_TTL seconds
+- estimate: the planner's row estimate from EXPLAIN, no scan at all
+- none: skipped (the default in cursor mode)
+
+Every page, offset or cursor, returns a next_cursor, so a client can switch
+to cursors after its first request. Envelope responses carry the fields from
+app.schemas.pagination.CursorPage; endpoints returning a bare list send them
+as X-Next-Cursor / X-Has-More / X-Total-Count headers instead.
+
+Usage:
+    from app.core.pagination import paginate
+
+    page = await paginate(
+        db, query,
+        keys=(Document.updated_at, Document.id),
+        limit=page_size,
+        cursor=cursor,
+        offset=(page - 1) * page_size,
+        scope=f"documents:user:{user_id}",
+    )
+    page["items"], page["total"], page["has_more"], page["next_cursor"]
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, false, func, or_, select, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATE, COUNT_NONE)
+
+# Query parameter pattern for endpoints exposing the count mode
+COUNT_MODE_PATTERN = "^(exact|cached|estimate|none)$"
+
+COUNT_CACHE_TTL = 60
+
+MAX_CURSOR_LENGTH = 512
+
+
+class InvalidCursor(HTTPException):
+    """Cursor that is malformed, tampered with or from another list"""
+
+    def __init__(self):
+        super().__init__(status_code=400, detail="Invalid pagination cursor")
+
+
+# ============================================================================
+# Cursor encoding
+# ============================================================================
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(scope: str, payload: str) -> str:
+    digest = hmac.new(
+        settings.SECRET_KEY.encode("utf-8"),
+        f"{scope}|{payload}".encode("utf-8"),
+        hashlib.sha256,
+    ).digest()
+    return _b64encode(digest[:16])
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _load_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("unknown cursor value")
+    return value
+
+
+def encode_cursor(values: Sequence[Any], scope: str) -> str:
+    """Opaque, signed cursor for a position in the list named by scope"""
+    payload = _b64encode(
+        json.dumps([_dump_value(v) for v in values], separators=(",", ":")).encode("utf-8")
+    )
+    return f"{payload}.{_signature(scope, payload)}"
+
+
+def decode_cursor(cursor: str, scope: str, size: int) -> List[Any]:
+    """
+    Sort key values from a cursor
+
+    Raises:
+        InvalidCursor: the cursor wasn't issued for this scope
+    """
+    if len(cursor) > MAX_CURSOR_LENGTH or "." not in cursor:
+        raise InvalidCursor()
+    payload, signature = cursor.rsplit(".", 1)
+    if not hmac.compare_digest(signature, _signature(scope, payload)):
+        raise InvalidCursor()
+    try:
+        values = [_load_value(v) for v in json.loads(_b64decode(payload))]
+    except (ValueError, TypeError):
+        raise InvalidCursor()
+    if len(values) != size:
+        raise InvalidCursor()
+    return values
+
+
+# ============================================================================
+# Counting
+# ============================================================================
+
+async def _exact_count(db: AsyncSession, query) -> int:
+    result = await db.execute(
+        select(func.count()).select_from(query.order_by(None).subquery())
+    )
+    return result.scalar_one()
+
+
+async def _cached_count(db: AsyncSession, query, scope: str) -> int:
+    cache = await get_cache()
+    key = f"pagination:count:{hashlib.sha1(scope.encode('utf-8')).hexdigest()}"
+    total = await cache.get(key)
+    if total is None:
+        total = await _exact_count(db, query)
+        await cache.set(key, total, ttl=COUNT_CACHE_TTL)
+    return total
+
+
+async def _estimated_count(db: AsyncSession, query) -> Optional[int]:
+    """Row estimate from the planner, or None if the query can't be explained"""
+    try:
+        sql = str(query.order_by(None).compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        ))
+    except Exception as e:
+        # Some bound types (arrays, JSON) have no literal rendering
+        logger.debug(f"Can't estimate count, falling back: {e}")
+        return None
+
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(db: AsyncSession, query, mode: str, scope: str) -> Dict[str, Any]:
+    """Total for a filtered query in the given count mode"""
+    if mode == COUNT_NONE:
+        return {"total": None, "total_is_estimate": False}
+    if mode == COUNT_ESTIMATE:
+        total = await _estimated_count(db, query)
+        if total is not None:
+            return {"total": total, "total_is_estimate": True}
+        mode = COUNT_CACHED
+    if mode == COUNT_CACHED:
+        return {"total": await _cached_count(db, query, scope), "total_is_estimate": False}
+    return {"total": await _exact_count(db, query), "total_is_estimate": False}
+
+
+# ============================================================================
+# Paging
+# ============================================================================
+
+def _after(keys: Sequence, values: Sequence[Any], nullable: bool):
+    """Rows after the cursor position in (keys DESC [NULLS LAST]) order"""
+    if not nullable:
+        # Row comparison lets Postgres seek a composite index directly
+        return tuple_(*keys) < tuple_(*values)
+
+    # Spelled out so NULLs (which sort last) compare sensibly; the id
+    # column at the end is never NULL
+    clauses = []
+    last = len(keys) - 1
+    for i, (key, value) in enumerate(zip(keys, values)):
+        equal_before = [
+            k.is_(None) if v is None else k == v
+            for k, v in zip(keys[:i], values[:i])
+        ]
+        if i == last:
+            after = key < value
+        elif value is None:
+            after = false()
+        else:
+            after = or_(key < value, key.is_(None))
+        clauses.append(and_(*equal_before, after))
+    return or_(*clauses)
+
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    keys: Sequence,
+    limit: int,
+    scope: str,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    count: Optional[str] = None,
+    nullable: bool = False,
+    options: Sequence = (),
+) -> Dict[str, Any]:
+    """
+    One page of a single-entity select, newest first
+
+    Args:
+        db: Database session
+        query: Filtered select() without ORDER BY, LIMIT or OFFSET
+        keys: Sort columns, all descending; the last must be unique (the id)
+        limit: Page size
+        scope: Names the list and its filters; cursors only work within it
+        cursor: next_cursor from the previous page (keyset mode)
+        offset: Rows to skip when no cursor is given (offset mode)
+        count: exact, cached, estimate or none (default: exact in offset
+            mode, none in cursor mode)
+        nullable: Set when a sort column can be NULL (NULLs sort last)
+        options: Loader options (joinedload etc.) for the page query only,
+            so the count doesn't pay for eager joins
+
+    Returns:
+        Dict with items, total, total_is_estimate, has_more and next_cursor
+    """
+    if count is None:
+        count = COUNT_NONE if cursor else COUNT_EXACT
+
+    counted = await count_rows(db, query, count, scope)
+
+    ordering = [k.desc().nullslast() if nullable else k.desc() for k in keys[:-1]]
+    ordering.append(keys[-1].desc())
+    page_query = query.options(*options).order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, scope, len(keys))
+        page_query = page_query.where(_after(keys, values, nullable))
+    elif offset:
+        page_query = page_query.offset(offset)
+
+    # One extra row answers has_more without a count
+    result = await db.execute(page_query.limit(limit + 1))
+    items = list(result.scalars().all())
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, key.key) for key in keys], scope)
+
+    return {
+        "items": items,
+        "total": counted["total"],
+        "total_is_estimate": counted["total_is_estimate"],
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+    }
+
+
+def set_page_headers(response: Response, page: Dict[str, Any]):
+    """
+    Paging metadata as response headers, for endpoints whose body is a
+    bare list and can't grow envelope fields without breaking clients
+    """
+    response.headers["X-Has-More"] = "true" if page["has_more"] else "false"
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    if page["total"] is not None:
+        response.headers["X-Total-Count"] = str(page["total"])
+        if page["total_is_estimate"]:
+            response.headers["X-Total-Is-Estimate"] = "true"
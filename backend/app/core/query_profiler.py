@@ -0,0 +1,204 @@
+"""
+Per-request query profiling
+Counts the statements each request issues, their total database time and
+how often the same statement repeats - the signature of an N+1 query
+
+A QueryProfile lives in a context variable for the duration of a request
+(set by app.middleware.query_profiler.QueryProfilerMiddleware); cursor
+events on every engine add to it. Outside a profiled request the event
+hooks only look up the context variable, so unsampled requests cost next
+to nothing.
+
+Statements are grouped by fingerprint - the SQL with literals and bind
+parameters replaced and IN lists collapsed - so
+
+    SELECT ... FROM users WHERE users.id = $1
+
+run 40 times with different ids counts as one statement repeated 40 times.
+
+Results go to Prometheus through the instrumentator (query_profile_metrics)
+and, on request, to a Server-Timing header.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from prometheus_client import Counter as CounterMetric, Histogram
+from prometheus_fastapi_instrumentator.metrics import Info
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Request state key holding the request's QueryProfile
+STATE_KEY = "query_profile"
+
+# Distinct fingerprints tracked per request; the rest are only counted
+MAX_FINGERPRINTS = 200
+
+# Statement prefix used for fingerprints (long VALUES lists add nothing)
+MAX_STATEMENT_CHARS = 2000
+
+_current_profile: ContextVar[Optional["QueryProfile"]] = ContextVar("query_profile", default=None)
+
+DB_QUERIES = Histogram(
+    "db_queries_per_request",
+    "SQL statements issued per profiled request",
+    ["handler", "method"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233),
+)
+DB_TIME = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing SQL per profiled request",
+    ["handler", "method"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_N_PLUS_ONE = CounterMetric(
+    "db_n_plus_one_requests_total",
+    "Profiled requests that repeated one statement more than the N+1 threshold",
+    ["handler", "method"],
+)
+
+
+# ============================================================================
+# Fingerprints
+# ============================================================================
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalized SQL: literals and parameters become ?, IN lists (...)"""
+    sql = statement[:MAX_STATEMENT_CHARS]
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _LIST.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+# ============================================================================
+# Profiles
+# ============================================================================
+
+class QueryProfile:
+    """Statements issued by one request"""
+
+    def __init__(self, server_timing: bool = False):
+        self.server_timing = server_timing
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints: Counter = Counter()
+        self.finished = False
+
+    def record(self, statement: str, duration: float):
+        if self.finished:
+            # Background tasks run after the response went out
+            return
+        self.count += 1
+        self.total_time += duration
+        key = fingerprint(statement)
+        if key in self.fingerprints or len(self.fingerprints) < MAX_FINGERPRINTS:
+            self.fingerprints[key] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Fingerprints run more than threshold times, most frequent first"""
+        return [(key, n) for key, n in self.fingerprints.most_common() if n > threshold]
+
+    def server_timing_header(self) -> str:
+        return f'db;dur={self.total_time * 1000:.1f};desc="{self.count} queries"'
+
+
+def start_profile(server_timing: bool = False) -> Tuple[QueryProfile, object]:
+    """Begin profiling the current request; returns the profile and a reset token"""
+    profile = QueryProfile(server_timing=server_timing)
+    return profile, _current_profile.set(profile)
+
+
+def stop_profile(token: object):
+    _current_profile.reset(token)
+
+
+def current_profile() -> Optional[QueryProfile]:
+    return _current_profile.get()
+
+
+# ============================================================================
+# Engine hooks
+# ============================================================================
+
+_instrumented = set()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("profile_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is None:
+        return
+    started = conn.info.get("profile_start_time")
+    if not started:
+        return
+    profile.record(statement, time.perf_counter() - started.pop())
+
+
+def install_query_profiler(engines: Dict[str, AsyncEngine]):
+    """Hook the profiler into each engine (once per engine)"""
+    for engine in engines.values():
+        sync_engine = engine.sync_engine
+        if id(sync_engine) in _instrumented:
+            continue
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        _instrumented.add(id(sync_engine))
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+# (handler, fingerprint) pairs already logged by this process
+_reported: set = set()
+MAX_REPORTED = 1000
+
+
+def query_profile_metrics(n_plus_one_threshold: int):
+    """
+    Instrumentator function exporting each profiled request's numbers under
+    its route template, and logging N+1 patterns the first time they show up
+    """
+
+    def instrumentation(info: Info):
+        profile = getattr(info.request.state, STATE_KEY, None)
+        if profile is None:
+            return
+        labels = {"handler": info.modified_handler, "method": info.method}
+        DB_QUERIES.labels(**labels).observe(profile.count)
+        DB_TIME.labels(**labels).observe(profile.total_time)
+
+        repeated = profile.repeated(n_plus_one_threshold)
+        if not repeated:
+            return
+        DB_N_PLUS_ONE.labels(**labels).inc()
+        for key, n in repeated:
+            if (info.modified_handler, key) in _reported or len(_reported) >= MAX_REPORTED:
+                continue
+            _reported.add((info.modified_handler, key))
+            logger.warning(
+                f"Possible N+1 in {info.method} {info.modified_handler}: "
+                f"statement ran {n} times ({profile.count} queries in request): {key[:300]}"
+            )
+
+    return instrumentation
@@ -0,0 +1,129 @@
+"""
+Fast JSON responses
+Serialize large payloads once, in pydantic-core, instead of FastAPI's
+response_model round trip
+
+When an endpoint returns data, FastAPI re-validates it against
+response_model, dumps it to Python dicts, and encodes those with a JSON
+library - three passes over every post in a 50-post feed. The app-wide
+default is ORJSONResponse, which makes the last pass cheap; for hot
+endpoints these helpers skip the first two as well:
+
+- json_response: one TypeAdapter.dump_json() straight to bytes
+- stream_json_array: the same, a chunk of items at a time, so a long list
+  starts reaching the client before it is fully encoded
+
+Keep response_model on the route for the OpenAPI schema - FastAPI doesn't
+touch a Response returned by the endpoint.
+
+Usage:
+    from app.core.responses import json_response
+
+    @router.get("", response_model=List[FeedPost])
+    async def get_feed(...):
+        posts = [FeedPost(...) for ...]
+        return json_response(List[FeedPost], posts)
+
+Streamed bodies are sent after the endpoint's dependencies have closed the
+database session, so load everything (including relationships) before
+returning.
+"""
+import asyncio
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+
+# Items encoded per streamed chunk
+STREAM_CHUNK_SIZE = 100
+
+
+@lru_cache(maxsize=None)
+def adapter(type_: Any) -> TypeAdapter:
+    """Cached TypeAdapter; building one compiles a validator and serializer"""
+    return TypeAdapter(type_)
+
+
+def json_response(
+    type_: Any,
+    value: Any,
+    validated: bool = True,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Response with value encoded as type_ in a single pass
+
+    Args:
+        type_: Response type, e.g. List[FeedPost]
+        value: Data to send
+        validated: value is already made of type_'s models; set False to
+            validate it first (from attributes, so ORM rows work)
+        status_code: HTTP status
+        headers: Extra response headers
+    """
+    type_adapter = adapter(type_)
+    if not validated:
+        value = type_adapter.validate_python(value, from_attributes=True)
+    return Response(
+        content=type_adapter.dump_json(value),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+async def _encode_array(item_type: Any, items: Iterable[Any], validated: bool, chunk_size: int):
+    item_adapter = adapter(item_type)
+    chunk_adapter = adapter(List[item_type])
+    yield b"["
+    separator = b""
+    chunk = []
+
+    def encode(chunk):
+        # One dump per chunk; drop the chunk's own brackets
+        return separator + chunk_adapter.dump_json(chunk)[1:-1]
+
+    for item in items:
+        if not validated:
+            item = item_adapter.validate_python(item, from_attributes=True)
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield encode(chunk)
+            separator = b","
+            chunk = []
+            # Let other requests run between chunks of a long list
+            await asyncio.sleep(0)
+    if chunk:
+        yield encode(chunk)
+    yield b"]"
+
+
+def stream_json_array(
+    item_type: Any,
+    items: Iterable[Any],
+    validated: bool = True,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> StreamingResponse:
+    """
+    JSON array response encoded and sent a chunk of items at a time
+
+    Args:
+        item_type: Type of one element, e.g. ArticleResponse
+        items: Loaded items (see the module note on sessions)
+        validated: items are already item_type instances; set False to
+            validate each one first (from attributes, so ORM rows work)
+        status_code: HTTP status
+        headers: Extra response headers
+        chunk_size: Items per chunk
+    """
+    return StreamingResponse(
+        _encode_array(item_type, items, validated, chunk_size),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
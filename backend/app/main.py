@@ -11,7 +11,7 @@ import logging
 import jwt  # PyJWT for token parsing in rate limiting
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import Response, JSONResponse, ORJSONResponse
 from starlette.middleware.httpsredirect import HTTPSRedirectMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
@@ -19,13 +19,13 @@ from app.api.v1 import api_router
 from app.core.config import settings
 from app.core.database import get_db
 
-# Initialize Sentry for error tracking
-import sentry_sdk
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
-
+# Initialize Sentry for error tracking (the SDK is only imported when configured)
 sentry_dsn = os.getenv("SENTRY_DSN")
 if sentry_dsn:
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+
     sentry_sdk.init(
         dsn=sentry_dsn,
         integrations=[
@@ -53,6 +53,8 @@ app = FastAPI(
     version=settings.VERSION,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    # orjson for every response; hot endpoints go further with app.core.responses
+    default_response_class=ORJSONResponse,
 )
 
 # Instrument app with Prometheus metrics
@@ -70,7 +72,18 @@ instrumentator = Instrumentator(
     inprogress_name="http_requests_inprogress",
     inprogress_labels=True,
 )
+# Custom instrumentations replace the default ones unless listed too
+from prometheus_fastapi_instrumentator import metrics
+from app.core.query_profiler import query_profile_metrics
+instrumentator.add(
+    metrics.default(),
+    # Queries / DB time per route for profiled requests (db_queries_per_request, ...)
+    query_profile_metrics(settings.QUERY_PROFILER_N_PLUS_ONE_THRESHOLD),
+)
 instrumentator.instrument(app).expose(app, endpoint="/metrics")
+# Database connection pool saturation (db_pool_*)
+from app.core.db_metrics import register_pool_metrics
+register_pool_metrics()
 print("[PROMETHEUS] Metrics exposed at /metrics")
 
 # CORS middleware - MUST be added before other middleware
@@ -98,6 +111,21 @@ from app.middleware.security_headers import SecurityHeadersMiddleware
 app.add_middleware(SecurityHeadersMiddleware)
 print("[SECURITY] Security headers middleware enabled")
 
+# HTTP caching: conditional GET / shared response cache for routes with a
+# CachePolicy (app.core.http_cache)
+from app.core.http_cache import CachedResponse, cached_response_handler
+from app.middleware.http_cache import SharedResponseCacheMiddleware
+app.add_middleware(SharedResponseCacheMiddleware)
+app.add_exception_handler(CachedResponse, cached_response_handler)
+
+# Per-request query profiling - a sample of requests, exported through the
+# instrumentator (must wrap its middleware, so it's added after it)
+from app.core.database import get_pools
+from app.core.query_profiler import install_query_profiler
+from app.middleware.query_profiler import QueryProfilerMiddleware
+install_query_profiler(get_pools())
+app.add_middleware(QueryProfilerMiddleware)
+
 # Health check endpoints
 @app.get("/health")
 async def health_check():
@@ -143,7 +171,31 @@ async def readiness(db: AsyncSession = Depends(get_db)):
         )
 
 # Include API routes
-app.include_router(api_router, prefix="/api/v1")
+api_router.mount(app, prefix="/api/v1")
+
+
+@app.on_event("startup")
+async def start_background_workers():
+    """Start in-process background workers"""
+    from app.services.activity_inbox import activity_inbox
+    from app.services.reading_progress_tracker import progress_tracker
+    from app.services.tenant_resolution_service import tenant_resolution
+    progress_tracker.start()
+    activity_inbox.start()
+    await tenant_resolution.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    """Flush buffered writes and stop worker pools"""
+    from app.services.activity_inbox import activity_inbox
+    from app.services.reading_progress_tracker import progress_tracker
+    from app.services.document_conversion_service import document_conversion
+    from app.services.tenant_resolution_service import tenant_resolution
+    await progress_tracker.stop()
+    await activity_inbox.stop()
+    await tenant_resolution.stop()
+    document_conversion.shutdown()
 
 # --------------------------
 # Request ID & Logging Middleware
@@ -0,0 +1,97 @@
+"""
+Shared Response Cache Middleware
+Stores responses of routes whose CachePolicy asked for it (app.core.http_cache)
+
+Written as plain ASGI rather than BaseHTTPMiddleware so responses of every
+other route pass through untouched - no buffering, no extra task.
+"""
+import logging
+
+from app.core.http_cache import STATE_KEY
+from app.services.cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+# Larger bodies aren't worth a Redis round trip per hit
+MAX_CACHED_BODY_BYTES = 512 * 1024
+
+# Headers that belong to one exchange rather than to the representation
+# (CORS answers depend on the request's Origin)
+UNSTORED_HEADERS = {
+    b"content-length", b"content-type", b"content-encoding", b"transfer-encoding",
+    b"connection", b"date", b"server", b"set-cookie", b"server-timing",
+}
+UNSTORED_PREFIXES = (b"access-control-",)
+
+
+class SharedResponseCacheMiddleware:
+    """
+    Captures successful responses flagged by a shared CachePolicy and keeps
+    them in Redis under the policy's key, after the client has been answered
+
+    The policy has run by the time the response starts, so that is where
+    the decision is made; every other response is passed on as it comes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        captured = None
+
+        async def capture(message):
+            nonlocal captured
+            if message["type"] == "http.response.start":
+                policy = scope.get("state", {}).get(STATE_KEY)
+                if policy is not None and message["status"] == 200:
+                    captured = self._start(policy, message.get("headers", []))
+            elif message["type"] == "http.response.body" and captured is not None:
+                body = message.get("body", b"")
+                captured["size"] += len(body)
+                if captured["size"] <= MAX_CACHED_BODY_BYTES:
+                    captured["chunks"].append(body)
+                else:
+                    captured = None
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+        if captured is None:
+            return
+
+        try:
+            body = b"".join(captured["chunks"]).decode("utf-8")
+        except UnicodeDecodeError:
+            return
+
+        policy = captured["policy"]
+        cache = await get_cache()
+        await cache.set(
+            policy["key"],
+            {
+                "body": body,
+                "media_type": captured["media_type"] or "application/json",
+                "headers": captured["headers"],
+            },
+            ttl=policy["ttl"],
+        )
+
+    @staticmethod
+    def _start(policy, raw_headers):
+        """Capture state for a response the policy wants stored, or None"""
+        media_type = None
+        headers = []
+        for name, value in raw_headers:
+            name = name.lower()
+            if name == b"content-encoding":
+                # Only plain bodies are stored
+                return None
+            if name == b"content-type":
+                media_type = value.decode("latin-1")
+            elif name not in UNSTORED_HEADERS and not name.startswith(UNSTORED_PREFIXES):
+                headers.append([name.decode("latin-1"), value.decode("latin-1")])
+        return {"policy": policy, "media_type": media_type, "headers": headers, "chunks": [], "size": 0}
@@ -0,0 +1,55 @@
+"""
+Query Profiler Middleware
+Profiles the SQL of a sample of requests (app.core.query_profiler)
+
+Written as plain ASGI so the context variable it sets is visible to the
+endpoint and its dependencies, and unsampled requests pass straight through.
+"""
+import random
+
+from app.core.config import settings
+from app.core.query_profiler import STATE_KEY, start_profile, stop_profile
+
+# Request header asking for a Server-Timing header (if QUERY_PROFILER_SERVER_TIMING)
+PROFILE_HEADER = b"x-query-profile"
+
+
+class QueryProfilerMiddleware:
+    """
+    Profiles QUERY_PROFILER_SAMPLE_RATE of requests, plus every request that
+    asks for Server-Timing when that is allowed
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        server_timing = settings.QUERY_PROFILER_SERVER_TIMING and any(
+            name == PROFILE_HEADER and value == b"1" for name, value in scope["headers"]
+        )
+        sampled = random.random() < settings.QUERY_PROFILER_SAMPLE_RATE
+        if not (server_timing or sampled):
+            await self.app(scope, receive, send)
+            return
+
+        profile, token = start_profile(server_timing=server_timing)
+        scope.setdefault("state", {})[STATE_KEY] = profile
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and profile.server_timing:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing_header().encode("latin-1")))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                profile.finished = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            profile.finished = True
+            stop_profile(token)
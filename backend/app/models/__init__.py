@@ -84,6 +84,12 @@ from app.models.workspace import (
     WorkspaceCollection,
     CollectionItem,
 )
+from app.models.content_fingerprint import (
+    ContentFingerprint,
+)
+from app.models.content_vector import (
+    ContentVector,
+)
 from app.models.document import (
     DocumentStatus,
     DocumentMode,
@@ -95,6 +101,9 @@ from app.models.document import (
     Tag,
     DocumentTag,
 )
+from app.models.document_trending import (
+    DocumentTrendingScore,
+)
 from app.models.epub_submission import (
     SubmissionStatus,
     EpubSubmission,
@@ -102,6 +111,7 @@ from app.models.epub_submission import (
 )
 from app.models.folder import (
     Folder,
+    FolderClosure,
 )
 from app.models.frozen_username import (
     FrozenUsername,
@@ -112,6 +122,9 @@ from app.models.group_analytics import (
 from app.models.group_customization import (
     GroupTheme,
 )
+from app.models.group_recommendation import (
+    GroupRecommendation,
+)
 from app.models.invitation import (
     InvitationStatus,
     Invitation,
@@ -165,6 +178,9 @@ from app.models.store import (
     AuthorEarnings,
     AudiobookSubmissionStatus,
     AudiobookSubmission,
+    PriceAnalysisJobStatus,
+    PriceAnalysisJob,
+    PriceAnalysisResult,
 )
 from app.models.studio import (
     StudioMemberRole,
@@ -236,7 +252,9 @@ __all__ = [
     "CollectionStatus",
     "Comment",
     "CommentReaction",
+    "ContentFingerprint",
     "ContentTag",
+    "ContentVector",
     "CreatorEarnings",
     "DiceRoll",
     "DiceSystem",
@@ -245,6 +263,7 @@ __all__ = [
     "DocumentMode",
     "DocumentStatus",
     "DocumentTag",
+    "DocumentTrendingScore",
     "DocumentVersion",
     "DocumentView",
     "DocumentVisibility",
@@ -254,6 +273,7 @@ __all__ = [
     "ExportStatus",
     "ExportType",
     "Folder",
+    "FolderClosure",
     "FrozenUsername",
     "Group",
     "GroupAnalytics",
@@ -267,6 +287,7 @@ __all__ = [
     "GroupPost",
     "GroupPostReaction",
     "GroupPrivacyType",
+    "GroupRecommendation",
     "GroupRole",
     "GroupTheme",
     "IntegrityCheck",
@@ -293,6 +314,9 @@ __all__ = [
     "Permission",
     "PostTag",
     "PostingOrder",
+    "PriceAnalysisJob",
+    "PriceAnalysisJobStatus",
+    "PriceAnalysisResult",
     "PrivacyLevel",
     "Project",
     "ProjectTemplate",
@@ -2,7 +2,7 @@
 Phase 4 Feedback & Collaboration Models
 Models for comments, beta reading, groups, and messaging
 """
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey, Enum as SQLEnum, JSON, Index, Numeric, ARRAY
+from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey, Enum as SQLEnum, JSON, Index, Numeric, ARRAY, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import ENUM as PGEnum
 from datetime import datetime, timezone
@@ -424,6 +424,13 @@ class Group(Base, TimestampMixin):
     is_deleted = Column(Boolean, default=False, nullable=False, index=True)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
     
+    # Members, active followers and posts, and the time of the latest post.
+    # Maintained by database triggers (GROUP_COUNTERS_DDL) - never written by the app.
+    member_count = Column(Integer, nullable=False, server_default="0")
+    follower_count = Column(Integer, nullable=False, server_default="0")
+    post_count = Column(Integer, nullable=False, server_default="0")
+    last_activity_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Relationships
     members = relationship("GroupMember", back_populates="group", cascade="all, delete-orphan")
     posts = relationship("GroupPost", back_populates="group", cascade="all, delete-orphan")
@@ -433,6 +440,18 @@ class Group(Base, TimestampMixin):
     theme = relationship("GroupTheme", back_populates="group", uselist=False, cascade="all, delete-orphan")
     followers = relationship("GroupFollower", back_populates="group", cascade="all, delete-orphan")
     analytics = relationship("GroupAnalytics", back_populates="group", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Discovery orderings over listed groups: most members, most recent post
+        Index(
+            'idx_groups_listed_popular', member_count.desc(), 'id',
+            postgresql_where=text("is_public AND is_active AND NOT is_deleted"),
+        ),
+        Index(
+            'idx_groups_listed_active', last_activity_at.desc().nulls_last(), 'id',
+            postgresql_where=text("is_public AND is_active AND NOT is_deleted"),
+        ),
+    )
 
 
 class GroupFollower(Base, TimestampMixin):
@@ -537,6 +556,105 @@ class GroupPostReaction(Base, TimestampMixin):
     )
 
 
+# Group counters: every path that adds or removes members, follows or posts -
+# the services, the admin endpoints, raw SQL seeding, FK cascades - goes
+# through these triggers, so the counters on groups can't drift.
+#
+# - Members count while the row exists
+# - Followers count while the follow is active (muting toggles is_active)
+# - Posts count while the row exists; a new post also bumps last_activity_at
+
+GROUP_COUNTERS_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION group_counts_member_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE groups SET member_count = member_count + 1 WHERE id = NEW.group_id;
+        ELSE
+            UPDATE groups SET member_count = GREATEST(member_count - 1, 0) WHERE id = OLD.group_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION group_counts_follower_change() RETURNS trigger AS $$
+    DECLARE
+        delta integer := 0;
+    BEGIN
+        IF TG_OP <> 'INSERT' AND OLD.is_active THEN
+            delta := delta - 1;
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.is_active THEN
+            delta := delta + 1;
+        END IF;
+        IF delta <> 0 THEN
+            UPDATE groups SET follower_count = GREATEST(follower_count + delta, 0)
+            WHERE id = COALESCE(NEW.group_id, OLD.group_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION group_counts_post_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE groups SET
+                post_count = post_count + 1,
+                last_activity_at = GREATEST(last_activity_at, COALESCE(NEW.created_at, now()))
+            WHERE id = NEW.group_id;
+        ELSE
+            UPDATE groups SET post_count = GREATEST(post_count - 1, 0) WHERE id = OLD.group_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS group_members_counts ON group_members",
+    """
+    CREATE TRIGGER group_members_counts AFTER INSERT OR DELETE ON group_members
+    FOR EACH ROW EXECUTE FUNCTION group_counts_member_change()
+    """,
+    "DROP TRIGGER IF EXISTS group_followers_counts ON group_followers",
+    """
+    CREATE TRIGGER group_followers_counts AFTER INSERT OR DELETE ON group_followers
+    FOR EACH ROW EXECUTE FUNCTION group_counts_follower_change()
+    """,
+    "DROP TRIGGER IF EXISTS group_followers_counts_update ON group_followers",
+    """
+    CREATE TRIGGER group_followers_counts_update AFTER UPDATE OF is_active ON group_followers
+    FOR EACH ROW WHEN (OLD.is_active IS DISTINCT FROM NEW.is_active)
+    EXECUTE FUNCTION group_counts_follower_change()
+    """,
+    "DROP TRIGGER IF EXISTS group_posts_counts ON group_posts",
+    """
+    CREATE TRIGGER group_posts_counts AFTER INSERT OR DELETE ON group_posts
+    FOR EACH ROW EXECUTE FUNCTION group_counts_post_change()
+    """,
+]
+
+# Recompute every group's counters from the member, follower and post tables
+GROUP_COUNTERS_BACKFILL = [
+    """
+    UPDATE groups g SET
+        member_count = (SELECT count(*) FROM group_members m WHERE m.group_id = g.id),
+        follower_count = (SELECT count(*) FROM group_followers f WHERE f.group_id = g.id AND f.is_active),
+        post_count = (SELECT count(*) FROM group_posts p WHERE p.group_id = g.id),
+        last_activity_at = (SELECT max(p.created_at) FROM group_posts p WHERE p.group_id = g.id)
+    """,
+]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_group_counter_triggers(target, connection, **kw):
+    """Install the triggers when the schema is built from the models (tests, CI)"""
+    if connection.dialect.name != "postgresql":
+        return
+    for statement in GROUP_COUNTERS_DDL + GROUP_COUNTERS_BACKFILL:
+        connection.execute(text(statement))
+
+
 # ============================================================================
 # Custom Group Roles (Discord-style)
 # ============================================================================
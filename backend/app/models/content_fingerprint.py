@@ -0,0 +1,29 @@
+"""
+Content Fingerprint Models
+MinHash signatures of published text, for local near-duplicate detection
+"""
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, Index
+from app.models.base import Base, utc_now
+
+
+class ContentFingerprint(Base):
+    """
+    MinHash signature of one published document, store item or EPUB
+    submission (app.services.near_duplicate_service). The source of truth
+    for the memory-mapped LSH index, which is rebuilt from this table.
+    """
+    __tablename__ = "content_fingerprints"
+
+    kind = Column(String(20), primary_key=True)  # document, store_item, epub_submission
+    source_id = Column(Integer, primary_key=True)
+    owner_id = Column(Integer, nullable=True)  # author / seller / uploader - never matched against themselves
+    signature = Column(LargeBinary, nullable=False)  # NUM_PERM little-endian uint32
+    word_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+
+    __table_args__ = (
+        Index('idx_content_fingerprints_updated_at', 'updated_at'),
+    )
+
+    def __repr__(self):
+        return f"<ContentFingerprint({self.kind} {self.source_id})>"
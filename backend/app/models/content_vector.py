@@ -0,0 +1,31 @@
+"""
+Content Vector Models
+Hashed term features of published works, for "more like this" similarity
+"""
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, Index
+from app.models.base import Base, utc_now
+
+
+class ContentVector(Base):
+    """
+    Term features of one published document or store item
+    (app.services.similarity_service): its most frequent words and its tags
+    or genres, hashed to feature ids, with sublinear term-frequency weights.
+    The source of truth for the memory-mapped TF-IDF matrix, which is
+    rebuilt from this table.
+    """
+    __tablename__ = "content_vectors"
+
+    kind = Column(String(20), primary_key=True)  # document, store_item
+    source_id = Column(Integer, primary_key=True)
+    owner_id = Column(Integer, nullable=True)  # author / seller
+    feature_ids = Column(LargeBinary, nullable=False)  # little-endian int32, ascending
+    weights = Column(LargeBinary, nullable=False)  # little-endian float32, one per feature
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+
+    __table_args__ = (
+        Index('idx_content_vectors_updated_at', 'updated_at'),
+    )
+
+    def __repr__(self):
+        return f"<ContentVector({self.kind} {self.source_id})>"
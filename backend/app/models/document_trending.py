@@ -0,0 +1,26 @@
+"""
+Document Trending Models
+Persisted trending scores, the durable copy of the Redis boards
+"""
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from app.models.base import Base, utc_now
+
+
+class DocumentTrendingScore(Base):
+    """
+    Time-decayed engagement score of a published document per window, as of
+    scored_at (app.services.trending_service). Written periodically from the
+    Redis boards and read back when Redis loses them.
+    """
+    __tablename__ = "document_trending_scores"
+
+    document_id = Column(Integer, ForeignKey('documents.id', ondelete='CASCADE'), primary_key=True)
+    score_day = Column(Float, default=0.0, nullable=False)
+    score_week = Column(Float, default=0.0, nullable=False)
+    score_month = Column(Float, default=0.0, nullable=False)
+    score_year = Column(Float, default=0.0, nullable=False)
+    score_all = Column(Float, default=0.0, nullable=False)  # undecayed
+    scored_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+    def __repr__(self):
+        return f"<DocumentTrendingScore(document_id={self.document_id}, week={self.score_week:.2f})>"
@@ -1,5 +1,5 @@
 """Folder database model."""
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, event, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 from datetime import datetime, timezone
@@ -12,16 +12,23 @@ class Folder(Base):
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    
+
     name = Column(String(255), nullable=False)
     parent_id = Column(Integer, ForeignKey("folders.id"), nullable=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=True, index=True)
     color = Column(String(7), nullable=True)  # Hex color code
     icon = Column(String(50), nullable=True)
-    
+
+    # Live (not trashed) documents directly in this folder and in its whole subtree.
+    # Maintained by database triggers (FOLDER_HIERARCHY_DDL) - never written by the app.
+    document_count = Column(Integer, nullable=False, server_default="0")
+    word_count = Column(BigInteger, nullable=False, server_default="0")
+    subtree_document_count = Column(Integer, nullable=False, server_default="0")
+    subtree_word_count = Column(BigInteger, nullable=False, server_default="0")
+
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
-    
+
     # Relationships
     tenant = relationship("Tenant", back_populates="folders")
     user = relationship("User", back_populates="folders")
@@ -29,3 +36,209 @@ class Folder(Base):
     children = relationship("Folder", back_populates="parent")
     project = relationship("Project", foreign_keys=[project_id], back_populates="folders")
     projects_in_folder = relationship("Project", foreign_keys="Project.folder_id", back_populates="folder")
+
+
+class FolderClosure(Base):
+    """
+    Closure table for the folder hierarchy: one row per (ancestor, descendant)
+    pair, including each folder with itself at depth 0.
+    A whole subtree, or all ancestors of a folder, is one indexed lookup.
+    Maintained by database triggers (FOLDER_HIERARCHY_DDL).
+    """
+    __tablename__ = "folder_closure"
+
+    ancestor_id = Column(Integer, ForeignKey("folders.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("folders.id", ondelete="CASCADE"), primary_key=True, index=True)
+    depth = Column(Integer, nullable=False)
+
+
+# ============================================================================
+# Triggers
+# ============================================================================
+# Every path that creates, moves, trashes or deletes documents and folders -
+# the ORM, bulk upload's raw SQL, trash purges, FK cascades - goes through
+# these, so the closure table and the counters can't drift.
+#
+# - Inserting a folder adds its closure rows (copies of its parent's, +1 depth)
+# - Changing a folder's parent rewires the subtree's closure rows and moves
+#   the subtree's totals from the old ancestors to the new ones; a move into
+#   its own subtree is rejected
+# - Deleting a folder detaches its documents first, so their counts come off
+#   its ancestors
+# - A document counts toward its folder and every ancestor while it has a
+#   folder and isn't trashed; changes apply the difference
+
+FOLDER_HIERARCHY_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION folder_counts_apply(p_folder_id integer, p_documents integer, p_words bigint)
+    RETURNS void AS $$
+        UPDATE folders f SET
+            subtree_document_count = f.subtree_document_count + p_documents,
+            subtree_word_count = f.subtree_word_count + p_words,
+            document_count = f.document_count + CASE WHEN c.depth = 0 THEN p_documents ELSE 0 END,
+            word_count = f.word_count + CASE WHEN c.depth = 0 THEN p_words ELSE 0 END
+        FROM folder_closure c
+        WHERE c.descendant_id = p_folder_id AND f.id = c.ancestor_id
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION folder_counts_document_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND OLD.folder_id IS NOT DISTINCT FROM NEW.folder_id
+                AND OLD.is_deleted = NEW.is_deleted THEN
+            -- Same folder, same state: only the word count changed
+            IF NEW.folder_id IS NOT NULL AND NOT NEW.is_deleted THEN
+                PERFORM folder_counts_apply(
+                    NEW.folder_id, 0, COALESCE(NEW.word_count, 0) - COALESCE(OLD.word_count, 0)
+                );
+            END IF;
+            RETURN NULL;
+        END IF;
+        IF TG_OP <> 'INSERT' AND OLD.folder_id IS NOT NULL AND NOT OLD.is_deleted THEN
+            PERFORM folder_counts_apply(OLD.folder_id, -1, -COALESCE(OLD.word_count, 0));
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.folder_id IS NOT NULL AND NOT NEW.is_deleted THEN
+            PERFORM folder_counts_apply(NEW.folder_id, 1, COALESCE(NEW.word_count, 0));
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION folder_closure_insert() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO folder_closure (ancestor_id, descendant_id, depth)
+        SELECT NEW.id, NEW.id, 0
+        UNION ALL
+        SELECT ancestor_id, NEW.id, depth + 1 FROM folder_closure WHERE descendant_id = NEW.parent_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION folder_closure_move() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.parent_id IS NOT NULL AND EXISTS (
+            SELECT 1 FROM folder_closure WHERE ancestor_id = NEW.id AND descendant_id = NEW.parent_id
+        ) THEN
+            RAISE EXCEPTION 'folder % cannot be moved into its own subtree', NEW.id
+                USING ERRCODE = 'check_violation';
+        END IF;
+
+        UPDATE folders f SET
+            subtree_document_count = f.subtree_document_count - NEW.subtree_document_count,
+            subtree_word_count = f.subtree_word_count - NEW.subtree_word_count
+        FROM folder_closure c
+        WHERE c.descendant_id = NEW.id AND c.depth > 0 AND f.id = c.ancestor_id;
+
+        DELETE FROM folder_closure c
+        USING folder_closure sub, folder_closure anc
+        WHERE sub.ancestor_id = NEW.id
+          AND anc.descendant_id = NEW.id AND anc.depth > 0
+          AND c.ancestor_id = anc.ancestor_id AND c.descendant_id = sub.descendant_id;
+
+        INSERT INTO folder_closure (ancestor_id, descendant_id, depth)
+        SELECT p.ancestor_id, s.descendant_id, p.depth + s.depth + 1
+        FROM folder_closure p, folder_closure s
+        WHERE p.descendant_id = NEW.parent_id AND s.ancestor_id = NEW.id;
+
+        UPDATE folders f SET
+            subtree_document_count = f.subtree_document_count + NEW.subtree_document_count,
+            subtree_word_count = f.subtree_word_count + NEW.subtree_word_count
+        FROM folder_closure c
+        WHERE c.descendant_id = NEW.id AND c.depth > 0 AND f.id = c.ancestor_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION folder_detach_documents() RETURNS trigger AS $$
+    BEGIN
+        UPDATE documents SET folder_id = NULL WHERE folder_id = OLD.id;
+        RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS folders_closure_insert ON folders",
+    """
+    CREATE TRIGGER folders_closure_insert AFTER INSERT ON folders
+    FOR EACH ROW EXECUTE FUNCTION folder_closure_insert()
+    """,
+    "DROP TRIGGER IF EXISTS folders_closure_move ON folders",
+    """
+    CREATE TRIGGER folders_closure_move AFTER UPDATE OF parent_id ON folders
+    FOR EACH ROW WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id)
+    EXECUTE FUNCTION folder_closure_move()
+    """,
+    "DROP TRIGGER IF EXISTS folders_detach_documents ON folders",
+    """
+    CREATE TRIGGER folders_detach_documents BEFORE DELETE ON folders
+    FOR EACH ROW EXECUTE FUNCTION folder_detach_documents()
+    """,
+    "DROP TRIGGER IF EXISTS documents_folder_counts_insert ON documents",
+    """
+    CREATE TRIGGER documents_folder_counts_insert AFTER INSERT ON documents
+    FOR EACH ROW WHEN (NEW.folder_id IS NOT NULL)
+    EXECUTE FUNCTION folder_counts_document_change()
+    """,
+    "DROP TRIGGER IF EXISTS documents_folder_counts_update ON documents",
+    """
+    CREATE TRIGGER documents_folder_counts_update AFTER UPDATE OF folder_id, word_count, is_deleted ON documents
+    FOR EACH ROW WHEN (
+        OLD.folder_id IS DISTINCT FROM NEW.folder_id
+        OR OLD.word_count IS DISTINCT FROM NEW.word_count
+        OR OLD.is_deleted IS DISTINCT FROM NEW.is_deleted
+    )
+    EXECUTE FUNCTION folder_counts_document_change()
+    """,
+    "DROP TRIGGER IF EXISTS documents_folder_counts_delete ON documents",
+    """
+    CREATE TRIGGER documents_folder_counts_delete AFTER DELETE ON documents
+    FOR EACH ROW WHEN (OLD.folder_id IS NOT NULL)
+    EXECUTE FUNCTION folder_counts_document_change()
+    """,
+]
+
+# Rebuild the closure table and the counters from folders.parent_id and documents
+FOLDER_HIERARCHY_BACKFILL = [
+    "DELETE FROM folder_closure",
+    """
+    INSERT INTO folder_closure (ancestor_id, descendant_id, depth)
+    WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+        SELECT id, id, 0 FROM folders
+        UNION ALL
+        SELECT t.ancestor_id, f.id, t.depth + 1
+        FROM tree t JOIN folders f ON f.parent_id = t.descendant_id
+        WHERE t.depth < 100  -- stop on parent_id cycles
+    )
+    SELECT ancestor_id, descendant_id, min(depth) FROM tree GROUP BY ancestor_id, descendant_id
+    """,
+    """
+    UPDATE folders f SET
+        document_count = COALESCE(own.documents, 0),
+        word_count = COALESCE(own.words, 0),
+        subtree_document_count = COALESCE(sub.documents, 0),
+        subtree_word_count = COALESCE(sub.words, 0)
+    FROM folders f2
+    LEFT JOIN (
+        SELECT folder_id, count(*) AS documents, sum(COALESCE(word_count, 0)) AS words
+        FROM documents WHERE folder_id IS NOT NULL AND NOT is_deleted
+        GROUP BY folder_id
+    ) own ON own.folder_id = f2.id
+    LEFT JOIN (
+        SELECT c.ancestor_id, count(*) AS documents, sum(COALESCE(d.word_count, 0)) AS words
+        FROM folder_closure c JOIN documents d ON d.folder_id = c.descendant_id AND NOT d.is_deleted
+        GROUP BY c.ancestor_id
+    ) sub ON sub.ancestor_id = f2.id
+    WHERE f.id = f2.id
+    """,
+]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_folder_hierarchy_triggers(target, connection, **kw):
+    """Install the triggers when the schema is built from the models (tests, CI)"""
+    if connection.dialect.name != "postgresql":
+        return
+    for statement in FOLDER_HIERARCHY_DDL + FOLDER_HIERARCHY_BACKFILL:
+        connection.execute(text(statement))
@@ -0,0 +1,22 @@
+"""
+Group Recommendation Models
+Precomputed group suggestions per user
+"""
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, ARRAY
+from app.models.base import Base, utc_now
+
+
+class GroupRecommendation(Base):
+    """
+    Top groups for one user, best first, as written by the recommender
+    (app.services.group_recommendation_service). Read by primary key.
+    """
+    __tablename__ = "group_recommendations"
+
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    group_ids = Column(ARRAY(Integer), nullable=False)
+    scores = Column(ARRAY(Float), nullable=False)
+    computed_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+    def __repr__(self):
+        return f"<GroupRecommendation(user_id={self.user_id}, groups={len(self.group_ids or [])})>"
@@ -2,7 +2,7 @@
 Phase 2 Social Infrastructure Models
 Models for relationships, notifications, sharing, and activity tracking
 """
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey, Enum as SQLEnum, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -189,5 +189,10 @@ class ActivityEvent(Base, TimestampMixin):
     # Relationships
     user = relationship("User", back_populates="activity_events")
     
+    __table_args__ = (
+        # Newest events of a set of users (feed pulls and inbox builds)
+        Index('idx_activity_events_user_id_id', 'user_id', 'id'),
+    )
+    
     def __repr__(self):
         return f"<ActivityEvent(id={self.id}, type={self.event_type}, user_id={self.user_id})>"
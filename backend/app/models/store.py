@@ -4,7 +4,7 @@ from decimal import Decimal
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Numeric, JSON, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Numeric, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -271,3 +271,82 @@ class AudiobookSubmission(Base):
     __table_args__ = (
         Index('idx_audiobook_submissions_user_status', 'user_id', 'status'),
     )
+
+
+class PriceAnalysisJobStatus(str, Enum):
+    """Status of a bulk price analysis job"""
+    PENDING = "pending"        # Created, not yet picked up
+    RUNNING = "running"        # Scraping market prices
+    APPLYING = "applying"      # Writing recommended prices back to store_items
+    COMPLETED = "completed"    # All items processed
+    FAILED = "failed"          # Stopped on an error; can be resumed
+
+
+class PriceAnalysisJob(Base):
+    """
+    Background job that scrapes market prices for many store items.
+    Results are written incrementally to price_analysis_results so a
+    failed or interrupted job can be resumed where it stopped.
+    """
+    __tablename__ = "price_analysis_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    requested_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    # Job configuration
+    apply_updates = Column(Boolean, default=False, nullable=False)  # False = analyze only
+    force_update = Column(Boolean, default=False, nullable=False)  # Update even if change is small
+    store_item_ids = Column(JSON, nullable=True)  # None = all active items
+
+    # Progress
+    status = Column(String(20), nullable=False, default=PriceAnalysisJobStatus.PENDING, index=True)
+    total_items = Column(Integer, default=0, nullable=False)
+    items_analyzed = Column(Integer, default=0, nullable=False)
+    items_updated = Column(Integer, default=0, nullable=False)
+    items_skipped = Column(Integer, default=0, nullable=False)
+    items_failed = Column(Integer, default=0, nullable=False)
+    error_message = Column(Text, nullable=True)
+
+    # Metadata
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+
+    # Relationships
+    results = relationship("PriceAnalysisResult", back_populates="job", cascade="all, delete-orphan")
+
+
+class PriceAnalysisResult(Base):
+    """
+    Per-item outcome of a price analysis job.
+    One row per (job, store item); its presence marks the item as done.
+    """
+    __tablename__ = "price_analysis_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("price_analysis_jobs.id", ondelete="CASCADE"), nullable=False)
+    store_item_id = Column(Integer, ForeignKey("store_items.id", ondelete="CASCADE"), nullable=False)
+
+    # Analysis
+    succeeded = Column(Boolean, default=True, nullable=False)
+    current_price = Column(Numeric(10, 2), nullable=True)
+    recommended_price = Column(Numeric(10, 2), nullable=True)
+    price_change = Column(Numeric(10, 2), nullable=True)
+    market_prices = Column(JSON, nullable=True)  # {"amazon": 9.99, "google": null, ...}
+    reason = Column(Text, nullable=True)
+    cost_breakdown = Column(JSON, nullable=True)
+    should_update = Column(Boolean, default=False, nullable=False)
+    applied = Column(Boolean, default=False, nullable=False)  # Written back to store_items
+    error_message = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    # Relationships
+    job = relationship("PriceAnalysisJob", back_populates="results")
+    store_item = relationship("StoreItem", foreign_keys=[store_item_id])
+
+    __table_args__ = (
+        UniqueConstraint('job_id', 'store_item_id', name='uq_price_analysis_result_item'),
+        Index('idx_price_analysis_results_job', 'job_id', 'id'),
+    )
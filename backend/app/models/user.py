@@ -13,6 +13,7 @@ from sqlalchemy import (
     ForeignKey,
     JSON,
     ARRAY,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.models.base import Base, TimestampMixin, TenantMixin
@@ -264,7 +265,11 @@ class User(Base, TimestampMixin, TenantMixin):
     )  # Track if user has seen Matrix explanation
 
     # Unique constraint: email must be unique within a tenant
-    __table_args__ = ({"schema": None},)  # Will add unique constraint in migration
+    __table_args__ = (
+        # Finds the users a group's tag change affects (interests && tags)
+        Index("idx_users_interests", "interests", postgresql_using="gin"),
+        {"schema": None},
+    )  # Will add unique constraint in migration
 
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}')>"
@@ -14,6 +14,8 @@ from sqlalchemy import (
     Enum as SQLEnum,
     Index,
     UniqueConstraint,
+    event,
+    text,
 )
 from sqlalchemy.orm import relationship
 import enum
@@ -79,6 +81,9 @@ class Workspace(Base, TimestampMixin):
     # Status
     is_active = Column(Boolean, default=True, nullable=False)
 
+    # Maintained by a database trigger (WORKSPACE_COUNTERS_DDL) - never written by the app
+    member_count = Column(Integer, nullable=False, server_default="0")
+
     # Relationships
     owner = relationship("User", back_populates="owned_workspaces")
     members = relationship(
@@ -236,3 +241,41 @@ class CollectionItem(Base, TimestampMixin):
 
     def __repr__(self):
         return f"<CollectionItem(id={self.id}, collection_id={self.collection_id}, type={self.item_type}, item_id={self.item_id})>"
+
+
+# Keep workspaces.member_count in step with workspace_members on every write path
+WORKSPACE_COUNTERS_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION workspace_counts_member_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE workspaces SET member_count = member_count + 1 WHERE id = NEW.workspace_id;
+        ELSE
+            UPDATE workspaces SET member_count = GREATEST(member_count - 1, 0) WHERE id = OLD.workspace_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS workspace_members_counts ON workspace_members",
+    """
+    CREATE TRIGGER workspace_members_counts AFTER INSERT OR DELETE ON workspace_members
+    FOR EACH ROW EXECUTE FUNCTION workspace_counts_member_change()
+    """,
+]
+
+WORKSPACE_COUNTERS_BACKFILL = [
+    """
+    UPDATE workspaces w SET
+        member_count = (SELECT count(*) FROM workspace_members m WHERE m.workspace_id = w.id)
+    """,
+]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_workspace_counter_triggers(target, connection, **kw):
+    """Install the trigger when the schema is built from the models (tests, CI)"""
+    if connection.dialect.name != "postgresql":
+        return
+    for statement in WORKSPACE_COUNTERS_DDL + WORKSPACE_COUNTERS_BACKFILL:
+        connection.execute(text(statement))
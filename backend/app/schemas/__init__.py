@@ -25,6 +25,7 @@ from app.schemas.messaging import *  # noqa: F401, F403
 from app.schemas.monetization import *  # noqa: F401, F403
 from app.schemas.notification import *  # noqa: F401, F403
 from app.schemas.page_tracking import *  # noqa: F401, F403
+from app.schemas.pagination import *  # noqa: F401, F403
 from app.schemas.project import *  # noqa: F401, F403
 from app.schemas.reading import *  # noqa: F401, F403
 from app.schemas.reading_list import *  # noqa: F401, F403
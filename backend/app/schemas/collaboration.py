@@ -224,6 +224,9 @@ class GroupResponse(BaseModel):
     scholarship_discount_percent: Optional[int]
     scholarship_monthly_price: Optional[float]
     member_count: int = 0
+    follower_count: int = 0
+    post_count: int = 0
+    last_activity_at: Optional[datetime] = None
     document_count: int = 0
     is_member: bool = False
     member_role: Optional[str] = None
@@ -8,6 +8,8 @@ from datetime import datetime
 from enum import Enum
 import json
 
+from app.schemas.pagination import CursorPage
+
 
 class DocumentStatus(str, Enum):
     """Document status values"""
@@ -91,13 +93,11 @@ class DocumentResponse(DocumentBase):
 
 
 # List response
-class DocumentListResponse(BaseModel):
+class DocumentListResponse(CursorPage):
     """Schema for paginated document list"""
     documents: List[DocumentResponse]
-    total: int
     page: int
     page_size: int
-    has_more: bool
 
 
 # Detailed document with relationships
@@ -0,0 +1,20 @@
+"""
+Pagination Schemas
+Shared envelope fields for paginated list responses
+"""
+from pydantic import BaseModel
+from typing import Optional
+
+
+class CursorPage(BaseModel):
+    """
+    Paging fields common to list responses
+
+    total is None when the client asked not to count (count=none, the
+    default with a cursor), and approximate when total_is_estimate is set.
+    Pass next_cursor back as ?cursor= to fetch the following page.
+    """
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    has_more: bool = False
+    next_cursor: Optional[str] = None
@@ -54,6 +54,9 @@ class FolderResponse(BaseModel):
     # Computed fields
     document_count: Optional[int] = None
     subfolder_count: Optional[int] = None
+    word_count: Optional[int] = None
+    subtree_document_count: Optional[int] = None  # Including all subfolders
+    subtree_word_count: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -3,6 +3,8 @@ from datetime import datetime
 from typing import Optional, List
 from enum import Enum
 
+from app.schemas.pagination import CursorPage
+
 
 # Enums
 class NotificationType(str, Enum):
@@ -170,6 +172,5 @@ class ActivityEventResponse(BaseModel):
         from_attributes = True
 
 
-class ActivityFeedResponse(BaseModel):
-    total: int
+class ActivityFeedResponse(CursorPage):
     events: List[ActivityEventResponse]
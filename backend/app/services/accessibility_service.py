@@ -9,6 +9,7 @@ from datetime import datetime, timezone
 import re
 
 from app.models import User, Document
+from app.services.tiptap_service import analyze_document, parse_content
 
 
 class AccessibilityService:
@@ -29,6 +30,11 @@ class AccessibilityService:
         "alt_text_preference": "verbose"  # "brief", "verbose", "technical"
     }
     
+    UNINFORMATIVE_LINK_TEXT = {
+        "click here", "here", "read more", "more", "link",
+        "this", "page", "website", "download"
+    }
+    
     @staticmethod
     async def get_user_settings(
         db: AsyncSession,
@@ -144,20 +150,26 @@ class AccessibilityService:
         # Run accessibility checks
         issues = []
         
-        # Check for images without alt text
-        alt_text_issues = AccessibilityService._check_alt_text(content)
-        issues.extend(alt_text_issues)
-        
-        # Check heading structure
-        heading_issues = AccessibilityService._check_heading_structure(content)
-        issues.extend(heading_issues)
-        
-        # Check link text
-        link_issues = AccessibilityService._check_link_text(content)
-        issues.extend(link_issues)
-        
-        # Check reading level
-        reading_level = AccessibilityService._calculate_reading_level(content)
+        if isinstance(parse_content(content), dict):
+            # TipTap JSON: one walk gives images, headings, links and text
+            analysis = await analyze_document(document.id, document.current_version, content)
+            issues.extend(AccessibilityService._check_document_structure(analysis))
+            reading_level = AccessibilityService._calculate_reading_level(analysis["text"])
+        else:
+            # Check for images without alt text
+            alt_text_issues = AccessibilityService._check_alt_text(content)
+            issues.extend(alt_text_issues)
+            
+            # Check heading structure
+            heading_issues = AccessibilityService._check_heading_structure(content)
+            issues.extend(heading_issues)
+            
+            # Check link text
+            link_issues = AccessibilityService._check_link_text(content)
+            issues.extend(link_issues)
+            
+            # Check reading level
+            reading_level = AccessibilityService._calculate_reading_level(content)
         
         # Calculate overall score
         total_checks = 10  # Number of checks performed
@@ -174,6 +186,49 @@ class AccessibilityService:
             "wcag_level": "AAA" if score >= 95 else "AA" if score >= 80 else "A" if score >= 60 else "Failed"
         }
     
+    @staticmethod
+    def _check_document_structure(analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Alt text, heading and link checks on a processed TipTap document"""
+        issues = []
+        
+        for index, image in enumerate(analysis["images"], 1):
+            if len(image["alt"].strip()) < 3:
+                issues.append({
+                    "type": "missing_alt_text",
+                    "severity": "error",
+                    "wcag": "WCAG 1.1.1 (A)",
+                    "message": "Image missing descriptive alt text",
+                    "location": f"Image {index}",
+                    "suggestion": "Add descriptive alt text that conveys the purpose of the image"
+                })
+        
+        previous_level = 0
+        for heading in analysis["outline"]:
+            current_level = heading["level"]
+            if current_level > previous_level + 1 and previous_level > 0:
+                issues.append({
+                    "type": "heading_hierarchy",
+                    "severity": "warning",
+                    "wcag": "WCAG 1.3.1 (A)",
+                    "message": f"Heading level skips from h{previous_level} to h{current_level}",
+                    "location": f"Heading '{heading['text'][:50]}'",
+                    "suggestion": "Use sequential heading levels for better screen reader navigation"
+                })
+            previous_level = current_level
+        
+        for link in analysis["links"]:
+            if link["text"].lower().strip() in AccessibilityService.UNINFORMATIVE_LINK_TEXT:
+                issues.append({
+                    "type": "uninformative_link",
+                    "severity": "warning",
+                    "wcag": "WCAG 2.4.4 (A)",
+                    "message": f"Link text '{link['text']}' is not descriptive",
+                    "location": f"Link to {link['href']}",
+                    "suggestion": "Use descriptive link text that explains the destination or purpose"
+                })
+        
+        return issues
+    
     @staticmethod
     def _check_alt_text(content: str) -> List[Dict[str, Any]]:
         """Check for images without alt text"""
@@ -245,15 +300,10 @@ class AccessibilityService:
         # Markdown links: [text](url)
         md_links = re.finditer(r'\[([^\]]+)\]\([^)]+\)', content)
         
-        uninformative_phrases = [
-            "click here", "here", "read more", "more", "link",
-            "this", "page", "website", "download"
-        ]
-        
         for match in md_links:
             link_text = match.group(1).lower().strip()
             
-            if link_text in uninformative_phrases:
+            if link_text in AccessibilityService.UNINFORMATIVE_LINK_TEXT:
                 issues.append({
                     "type": "uninformative_link",
                     "severity": "warning",
@@ -8,8 +8,11 @@ from sqlalchemy import select, delete, and_
 from typing import Optional, Dict, Any
 import logging
 
+from app.models.document import Document
+from app.models.project import Project
 from app.models.user import User
 from app.models.frozen_username import FrozenUsername
+from app.services.purge_service import PurgeService
 
 logger = logging.getLogger(__name__)
 
@@ -124,6 +127,8 @@ class AccountDeletionService:
         """
         Permanently delete a user account and all associated data.
         
+        Documents (with their storage objects) and projects are purged first
+        in short batches (PurgeService), so the final transaction stays small.
         The CASCADE delete will automatically remove:
         - User profile
         - Documents and document collaborations
@@ -155,6 +160,7 @@ class AccountDeletionService:
             - username: str
             - thaw_at: datetime (if frozen)
             - message: str
+            - purged: documents/projects purge stats
         """
         # Get user details before deletion
         result = await db.execute(
@@ -175,6 +181,10 @@ class AccountDeletionService:
         
         logger.info(f"Starting account deletion for user {user_id} (username: {username}, email: {email})")
         
+        # Purge the bulk of the user's content in batches
+        documents = await PurgeService.purge_documents(db, Document.owner_id == user_id)
+        projects = await PurgeService.purge_projects(db, Project.user_id == user_id)
+        
         # Freeze username if requested and username exists
         username_frozen = False
         thaw_at = None
@@ -198,13 +208,17 @@ class AccountDeletionService:
         
         await db.commit()
         
-        logger.info(f"Successfully deleted user {user_id} (username: {username})")
+        logger.info(
+            f"Successfully deleted user {user_id} (username: {username}, "
+            f"{documents['rows']} documents, {projects['rows']} projects)"
+        )
         
         return {
             "success": True,
             "username_frozen": username_frozen,
             "username": username,
             "thaw_at": thaw_at,
+            "purged": {"documents": documents, "projects": projects},
             "message": f"Account deleted successfully. Username '{username}' is frozen until {thaw_at.strftime('%Y-%m-%d') if thaw_at else 'N/A'}."
         }
     
@@ -0,0 +1,411 @@
+"""
+Activity Inbox
+Materialized activity feeds: an event is written once to the inbox of each
+follower, instead of every feed read gathering it from everyone they follow
+
+Redis keys:
+
+    activity:queue                committed events waiting for fan-out ("{event_id}:{actor_id}")
+    activity:inbox:{user_id}      sorted set of event ids (score = id), the newest
+                                  INBOX_SIZE kept, plus a LOADED sentinel
+    activity:followers:{user_id}  cached count of active followers
+    activity:celebrities          actors with CELEBRITY_FOLLOWERS or more followers
+
+ActivityService.log_event adds the event to the caller's transaction; once
+that commits, the event is queued (an after_commit hook). A fan-out worker
+in every process pops batches off the queue and pushes each public event to
+the actor's own inbox and, FANOUT_CHUNK followers per pipelined round trip,
+to every active follower's. Only inboxes that exist are written: one that
+is missing - never read, idle past INBOX_TTL, or dropped when its owner
+follows or unfollows someone - is built from the database on its next read.
+
+Celebrities are not fanned out. Their followers' reads pull their recent
+events (an IN list over the few celebrities one follows) and merge them
+with the inbox page.
+
+Pages are keyed by event id with the signed cursors of app.core.pagination.
+A page the inbox can't fill because older events were trimmed is read from
+the database instead (ActivityService), with the same cursor. Without Redis
+every read goes to the database.
+"""
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import event, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.social import ActivityEvent, UserFollow
+from app.services.cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "activity:queue"
+CELEBRITIES_KEY = "activity:celebrities"
+
+# Session.info key holding events to queue once the session commits
+PENDING_KEY = "activity_pending"
+
+# Scored +inf: above every event id, so pages never include it
+LOADED = "_"
+
+# Inserts the ids (ARGV[2..]) into an inbox that exists and trims it to
+# ARGV[1] events; returns 1 if the inbox was written
+_PUSH_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 2, #ARGV do
+    redis.call('ZADD', KEYS[1], ARGV[i], ARGV[i])
+end
+redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(tonumber(ARGV[1]) + 2))
+return 1
+"""
+
+
+def inbox_key(user_id: int) -> str:
+    return f"activity:inbox:{user_id}"
+
+
+def _follower_count_key(user_id: int) -> str:
+    return f"activity:followers:{user_id}"
+
+
+def feed_scope(user_id: int) -> str:
+    """Pagination scope of a user's feed, shared by the inbox and the database path"""
+    return f"activity:feed:{user_id}"
+
+
+class ActivityInbox:
+    """Fan-out writer and reader for per-user activity inboxes"""
+
+    # Events kept per inbox; older pages come from the database
+    INBOX_SIZE = 500
+
+    # Inboxes of users who stop reading expire, and stop costing fan-out
+    INBOX_TTL = 14 * 24 * 60 * 60
+
+    # Accounts with this many followers are pulled at read time
+    CELEBRITY_FOLLOWERS = 5000
+    FOLLOWER_COUNT_TTL = 60 * 60
+
+    # Seconds the worker sleeps once the queue is empty
+    FANOUT_INTERVAL = float(os.getenv("ACTIVITY_FANOUT_SECONDS", "1"))
+
+    # Events popped per batch, and inboxes written per round trip
+    FANOUT_BATCH = 200
+    FANOUT_CHUNK = 1000
+
+    def __init__(self):
+        self._worker: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._push_script = None
+
+    @staticmethod
+    async def _redis():
+        """Raw Redis client, or None if Redis is unavailable"""
+        cache = await get_cache()
+        return cache.redis
+
+    # ========================================================================
+    # Queue
+    # ========================================================================
+
+    @staticmethod
+    def queue_after_commit(db: AsyncSession, activity_event: ActivityEvent):
+        """Queue a flushed event for fan-out once the session commits"""
+        db.info.setdefault(PENDING_KEY, []).append((activity_event.id, activity_event.user_id))
+
+    def schedule(self, entries: List[Tuple[int, int]]):
+        """Queue committed events without holding up the caller"""
+        try:
+            task = asyncio.get_running_loop().create_task(self.enqueue(entries))
+        except RuntimeError:
+            return
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def wait_queued(self):
+        """Wait until committed events have been queued"""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def enqueue(self, entries: List[Tuple[int, int]]):
+        redis = await self._redis()
+        if not redis or not entries:
+            return
+        try:
+            await redis.lpush(QUEUE_KEY, *[f"{event_id}:{actor_id}" for event_id, actor_id in entries])
+        except Exception as e:
+            logger.error(f"Error queueing {len(entries)} activity events: {e}")
+
+    # ========================================================================
+    # Fan-out
+    # ========================================================================
+
+    async def _push(self, redis, user_ids: Iterable[int], event_ids: Sequence[int]) -> int:
+        """Add events to the inboxes that exist; returns how many were written"""
+        if self._push_script is None:
+            self._push_script = redis.register_script(_PUSH_SCRIPT)
+        pipe = redis.pipeline(transaction=False)
+        for user_id in user_ids:
+            await self._push_script(keys=[inbox_key(user_id)], args=[self.INBOX_SIZE, *event_ids], client=pipe)
+        return sum(await pipe.execute())
+
+    async def _follower_count(self, db: AsyncSession, redis, user_id: int) -> int:
+        key = _follower_count_key(user_id)
+        cached = await redis.get(key)
+        if cached is not None:
+            return int(cached)
+        result = await db.execute(
+            select(func.count()).select_from(UserFollow).where(
+                UserFollow.following_id == user_id,
+                UserFollow.is_active == True
+            )
+        )
+        count = result.scalar_one()
+        await redis.set(key, count, ex=self.FOLLOWER_COUNT_TTL)
+        return count
+
+    async def fan_out(self, db: AsyncSession, entries: Sequence[str]) -> int:
+        """Push queued events to their audiences; returns inboxes written"""
+        redis = await self._redis()
+        if not redis or not entries:
+            return 0
+
+        by_actor: Dict[int, List[int]] = defaultdict(list)
+        for entry in entries:
+            event_id, actor_id = entry.split(":")
+            by_actor[int(actor_id)].append(int(event_id))
+
+        # Private events never reach a feed
+        public = set((await db.execute(
+            select(ActivityEvent.id).where(
+                ActivityEvent.id.in_([i for ids in by_actor.values() for i in ids]),
+                ActivityEvent.is_public == True
+            )
+        )).scalars().all())
+
+        written = 0
+        celebrities, regular = [], []
+        for actor_id, event_ids in by_actor.items():
+            event_ids = sorted(i for i in event_ids if i in public)
+            if not event_ids:
+                continue
+            written += await self._push(redis, [actor_id], event_ids)
+
+            if await self._follower_count(db, redis, actor_id) >= self.CELEBRITY_FOLLOWERS:
+                celebrities.append(actor_id)
+                continue
+            regular.append(actor_id)
+
+            followers = await db.stream(
+                select(UserFollow.follower_id)
+                .where(UserFollow.following_id == actor_id, UserFollow.is_active == True)
+                .execution_options(yield_per=self.FANOUT_CHUNK)
+            )
+            async for partition in followers.partitions():
+                written += await self._push(redis, [row[0] for row in partition], event_ids)
+        # Read-only: don't hold a transaction between batches
+        await db.rollback()
+
+        if celebrities:
+            await redis.sadd(CELEBRITIES_KEY, *celebrities)
+        if regular:
+            await redis.srem(CELEBRITIES_KEY, *regular)
+        return written
+
+    async def fan_out_queued(self, db: AsyncSession) -> int:
+        """Drain the queue; returns events fanned out"""
+        redis = await self._redis()
+        if not redis:
+            return 0
+
+        fanned_out = 0
+        while True:
+            pipe = redis.pipeline(transaction=True)
+            pipe.lrange(QUEUE_KEY, -self.FANOUT_BATCH, -1)
+            pipe.ltrim(QUEUE_KEY, 0, -self.FANOUT_BATCH - 1)
+            entries, _ = await pipe.execute()
+            if not entries:
+                return fanned_out
+            await self.fan_out(db, entries)
+            fanned_out += len(entries)
+
+    async def _fan_out_forever(self):
+        from app.core.database import get_jobs_session_local
+
+        SessionLocal = get_jobs_session_local()
+        while True:
+            try:
+                async with SessionLocal() as db:
+                    fanned_out = await self.fan_out_queued(db)
+                if fanned_out:
+                    logger.debug(f"Fanned out {fanned_out} activity events")
+            except Exception as e:
+                logger.error(f"Activity fan-out failed: {e}")
+            await asyncio.sleep(self.FANOUT_INTERVAL)
+
+    def start(self):
+        """Start the fan-out worker (application startup)"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._fan_out_forever())
+
+    async def stop(self):
+        """Stop the worker; whatever is still queued is left for the other processes (application shutdown)"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        await self.wait_queued()
+
+    # ========================================================================
+    # Follow changes
+    # ========================================================================
+
+    async def follows_changed(self, follower_id: int, following_id: int):
+        """Rebuild the follower's inbox on its next read, and recount the followed account"""
+        redis = await self._redis()
+        if not redis:
+            return
+        try:
+            await redis.delete(inbox_key(follower_id), _follower_count_key(following_id))
+        except Exception as e:
+            logger.error(f"Error dropping activity inbox of user {follower_id}: {e}")
+
+    # ========================================================================
+    # Reads
+    # ========================================================================
+
+    async def _load(self, db: AsyncSession, redis, user_id: int, celebrities: Sequence[int]):
+        """Build an inbox from the database"""
+        followed = select(UserFollow.following_id).where(
+            UserFollow.follower_id == user_id,
+            UserFollow.is_active == True
+        )
+        if celebrities:
+            followed = followed.where(UserFollow.following_id.notin_(celebrities))
+        query = select(ActivityEvent.id).where(
+            ActivityEvent.is_public == True,
+            or_(ActivityEvent.user_id == user_id, ActivityEvent.user_id.in_(followed))
+        )
+
+        ids = (await db.execute(
+            query.order_by(ActivityEvent.id.desc()).limit(self.INBOX_SIZE)
+        )).scalars().all()
+        key = inbox_key(user_id)
+        staging_key = f"{key}:load"
+        pipe = redis.pipeline(transaction=True)
+        pipe.delete(staging_key)
+        pipe.zadd(staging_key, {LOADED: float("inf"), **{str(i): i for i in ids}})
+        pipe.expire(staging_key, self.INBOX_TTL)
+        pipe.rename(staging_key, key)
+        await pipe.execute()
+
+        # Fan-out skipped this inbox until it existed: catch up on anything
+        # committed since the query above
+        newer = (await db.execute(
+            query.where(ActivityEvent.id > (ids[0] if ids else 0)).order_by(ActivityEvent.id)
+        )).scalars().all()
+        if newer:
+            await self._push(redis, [user_id], newer)
+
+    async def page(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        offset: int = 0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Event ids of one feed page, newest first
+
+        Returns ids, has_more, next_cursor and inbox_total (the whole feed's
+        size when the inbox holds all of it, else None), or None when the
+        page has to be read from the database.
+        """
+        redis = await self._redis()
+        if not redis:
+            return None
+
+        scope = feed_scope(user_id)
+        before = decode_cursor(cursor, scope, 1)[0] if cursor else None
+        if cursor:
+            offset = 0
+        window = offset + limit + 1
+        key = inbox_key(user_id)
+
+        try:
+            celebrities = [int(i) for i in await redis.smembers(CELEBRITIES_KEY)]
+            if await redis.zscore(key, LOADED) is None:
+                await self._load(db, redis, user_id, celebrities)
+
+            pipe = redis.pipeline(transaction=False)
+            pipe.zrevrangebyscore(key, f"({before}" if before is not None else "(+inf", "-inf", start=0, num=window)
+            pipe.zcard(key)
+            pipe.expire(key, self.INBOX_TTL)
+            inbox_ids, size, _ = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error reading activity inbox of user {user_id}: {e}")
+            return None
+
+        stored = size - 1
+        # Trimmed: older events are only in the database
+        if len(inbox_ids) < window and stored >= self.INBOX_SIZE:
+            return None
+
+        ids = {int(i) for i in inbox_ids}
+        pulled = False
+        if celebrities:
+            followed = (await db.execute(
+                select(UserFollow.following_id).where(
+                    UserFollow.follower_id == user_id,
+                    UserFollow.is_active == True,
+                    UserFollow.following_id.in_(celebrities)
+                )
+            )).scalars().all()
+            if followed:
+                pulled = True
+                query = select(ActivityEvent.id).where(
+                    ActivityEvent.user_id.in_(followed),
+                    ActivityEvent.is_public == True
+                )
+                if before is not None:
+                    query = query.where(ActivityEvent.id < before)
+                ids.update((await db.execute(
+                    query.order_by(ActivityEvent.id.desc()).limit(window)
+                )).scalars().all())
+
+        ranked = sorted(ids, reverse=True)[offset:window]
+        has_more = len(ranked) > limit
+        ranked = ranked[:limit]
+        return {
+            "ids": ranked,
+            "has_more": has_more,
+            "next_cursor": encode_cursor([ranked[-1]], scope) if has_more and ranked else None,
+            "inbox_total": None if pulled or stored >= self.INBOX_SIZE else stored,
+        }
+
+
+# Global inbox instance
+activity_inbox = ActivityInbox()
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_committed_events(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        activity_inbox.schedule(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_events(session):
+    session.info.pop(PENDING_KEY, None)
@@ -1,9 +1,30 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import and_, or_, select, func
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional
 
+from ..core.pagination import COUNT_ESTIMATE, COUNT_NONE, count_rows, paginate
 from ..models.social import ActivityEvent, ActivityEventType, UserFollow
+from .activity_inbox import activity_inbox, feed_scope
+
+
+def _feed_query(user_id: int):
+    """Public events of the user and everyone they follow"""
+    following = select(UserFollow.following_id).filter(
+        and_(
+            UserFollow.follower_id == user_id,
+            UserFollow.is_active == True
+        )
+    )
+    return select(ActivityEvent).filter(
+        and_(
+            ActivityEvent.is_public == True,
+            or_(
+                ActivityEvent.user_id == user_id,
+                ActivityEvent.user_id.in_(following)
+            )
+        )
+    )
 
 
 class ActivityService:
@@ -20,7 +41,12 @@ class ActivityService:
         is_public: bool = True,
         metadata: dict = None
     ) -> ActivityEvent:
-        """Log an activity event."""
+        """
+        Log an activity event.
+        
+        The event joins the caller's transaction; followers' feeds get it
+        once that commits (app.services.activity_inbox).
+        """
         event = ActivityEvent(
             user_id=user_id,
             event_type=event_type.value,
@@ -31,8 +57,8 @@ class ActivityService:
             extra_data=metadata
         )
         db.add(event)
-        await db.commit()
-        await db.refresh(event)
+        await db.flush()
+        activity_inbox.queue_after_commit(db, event)
         return event
     
     @staticmethod
@@ -63,54 +89,55 @@ class ActivityService:
         db: AsyncSession,
         user_id: int,
         skip: int = 0,
-        limit: int = 50
-    ) -> tuple[List[ActivityEvent], int]:
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        count: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Get activity feed for a user.
         Shows activities from users they follow + their own activities.
+        Returns a page dict (see app.core.pagination); skip is ignored when
+        a cursor is given.
+        
+        Pages come from the user's materialized inbox when it can serve
+        them, else from the database; both page by event id, so a cursor
+        works on either. Totals are estimates unless count=exact or cached.
         """
-        # Get IDs of users being followed
-        following_result = await db.execute(
-            select(UserFollow.following_id).filter(
-                and_(
-                    UserFollow.follower_id == user_id,
-                    UserFollow.is_active == True
-                )
-            )
-        )
-        following_ids = [row[0] for row in following_result.all()]
+        if count is None:
+            count = COUNT_NONE if cursor else COUNT_ESTIMATE
+        query = _feed_query(user_id)
+        scope = feed_scope(user_id)
         
-        # Get activities from followed users + own activities
-        stmt = select(ActivityEvent).filter(
-            and_(
-                ActivityEvent.is_public == True,
-                or_(
-                    ActivityEvent.user_id == user_id,
-                    ActivityEvent.user_id.in_(following_ids) if following_ids else False
-                )
+        page = await activity_inbox.page(db, user_id, limit, cursor=cursor, offset=skip)
+        if page is None:
+            return await paginate(
+                db, query,
+                keys=(ActivityEvent.id,),
+                limit=limit,
+                cursor=cursor,
+                offset=skip,
+                count=count,
+                scope=scope,
             )
-        )
         
-        # Get count
-        count_stmt = select(func.count()).select_from(ActivityEvent).filter(
-            and_(
-                ActivityEvent.is_public == True,
-                or_(
-                    ActivityEvent.user_id == user_id,
-                    ActivityEvent.user_id.in_(following_ids) if following_ids else False
-                )
-            )
-        )
-        count_result = await db.execute(count_stmt)
-        total = count_result.scalar()
+        if count == COUNT_ESTIMATE and page["inbox_total"] is not None:
+            counted = {"total": page["inbox_total"], "total_is_estimate": True}
+        else:
+            counted = await count_rows(db, query, count, scope)
         
-        # Get events
-        result = await db.execute(
-            stmt.order_by(ActivityEvent.created_at.desc()).offset(skip).limit(limit)
-        )
-        events = list(result.scalars().all())
+        events = []
+        if page["ids"]:
+            result = await db.execute(select(ActivityEvent).filter(ActivityEvent.id.in_(page["ids"])))
+            by_id = {event.id: event for event in result.scalars().all()}
+            events = [by_id[event_id] for event_id in page["ids"] if event_id in by_id]
         
-        return events, total
+        return {
+            "items": events,
+            "total": counted["total"],
+            "total_is_estimate": counted["total_is_estimate"],
+            "has_more": page["has_more"],
+            "next_cursor": page["next_cursor"],
+        }
     
     # Convenience methods for logging specific events
     
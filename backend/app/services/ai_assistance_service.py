@@ -10,6 +10,8 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 import os
 
+from app.services.ai_gateway import ai_gateway
+
 
 class AIAssistanceService:
     """
@@ -37,37 +39,39 @@ class AIAssistanceService:
     CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-4-sonnet-20250514")  # Claude 4 Sonnet (newest, best for creative writing)
     
     @staticmethod
-    async def _call_claude(system_prompt: str, user_prompt: str, max_tokens: int = 1024) -> str:
+    async def _call_claude(
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int = 1024,
+        feature: str = "ai_assist",
+        user_id: Optional[str] = None
+    ) -> str:
         """
-        Helper method to call Claude API
+        Helper method to call Claude API through the AI gateway
         
         Args:
             system_prompt: System instructions for Claude
             user_prompt: User's request
             max_tokens: Maximum tokens in response
+            feature: Metrics label for the calling feature
+            user_id: Caller identity for per-user concurrency limits
             
         Returns:
-            Claude's response text
+            Claude's response text (cached for identical requests)
         """
         if not AIAssistanceService.ANTHROPIC_API_KEY:
             # Return mock data if API key not configured
             return "API key not configured. Using mock data."
         
         try:
-            from anthropic import AsyncAnthropic
-            
-            client = AsyncAnthropic(api_key=AIAssistanceService.ANTHROPIC_API_KEY)
-            
-            message = await client.messages.create(
+            return await ai_gateway.complete(
+                user_prompt,
+                system=system_prompt,
                 model=AIAssistanceService.CLAUDE_MODEL,
                 max_tokens=max_tokens,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": user_prompt}
-                ]
+                feature=feature,
+                user_id=user_id
             )
-            
-            return message.content[0].text
         except Exception as e:
             # Fallback to mock data on error
             return f"Error calling Claude API: {str(e)}. Using fallback data."
@@ -76,7 +80,8 @@ class AIAssistanceService:
     async def generate_writing_prompts(
         genre: Optional[str] = None,
         theme: Optional[str] = None,
-        count: int = 5
+        count: int = 5,
+        user_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate writing prompts to inspire the writer
@@ -98,7 +103,13 @@ Theme: {theme or 'any'}
 Format as a list of prompts. Each should be 1-2 sentences that spark ideas without writing the story."""
 
             try:
-                response = await AIAssistanceService._call_claude(system_prompt, user_prompt, max_tokens=1500)
+                response = await AIAssistanceService._call_claude(
+                    system_prompt,
+                    user_prompt,
+                    max_tokens=1500,
+                    feature="writing_prompts",
+                    user_id=user_id
+                )
                 
                 return {
                     "prompts_text": response,
@@ -0,0 +1,350 @@
+"""
+AI Gateway
+Single entry point for every Claude API call
+
+Provides:
+- One shared AsyncAnthropic client (connection pooling, no per-call setup)
+- Response cache keyed by a normalized prompt hash plus model and sampling
+  parameters, in process memory and Redis
+- In-flight coalescing: identical concurrent requests share one API call
+- Per-user concurrency limits
+- Prometheus metrics for requests, tokens and latency
+
+Usage:
+    from app.services.ai_gateway import ai_gateway
+
+    text = await ai_gateway.complete(
+        prompt="Suggest three titles",
+        system="You are a writing assistant",
+        feature="title_ideas",
+        user_id=current_user["sub"],
+    )
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+
+from app.services.cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+
+AI_REQUESTS = Counter(
+    "ai_gateway_requests_total",
+    "Claude requests handled by the AI gateway",
+    ["feature", "model", "outcome"],  # outcome: hit, miss, coalesced, error
+)
+AI_TOKENS = Counter(
+    "ai_gateway_tokens_total",
+    "Tokens consumed by Claude calls",
+    ["feature", "model", "direction"],  # direction: input, output
+)
+AI_LATENCY = Histogram(
+    "ai_gateway_latency_seconds",
+    "Latency of Claude API calls (cache hits excluded)",
+    ["feature", "model"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+
+
+class AIGatewayNotConfigured(Exception):
+    """Raised when no Anthropic API key is configured"""
+    pass
+
+
+class AIGateway:
+    """Shared, cached and rate-limited access to the Claude API"""
+
+    DEFAULT_MODEL = os.getenv("CLAUDE_MODEL", "claude-sonnet-4-20250514")
+
+    # Identical prompts get identical-enough answers for a day
+    DEFAULT_CACHE_TTL = int(os.getenv("AI_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+
+    # In-process cache in front of Redis
+    LOCAL_CACHE_SIZE = 512
+
+    # Concurrent Claude calls allowed per user
+    MAX_CONCURRENT_PER_USER = int(os.getenv("AI_MAX_CONCURRENT_PER_USER", "2"))
+
+    def __init__(self):
+        self._client = None
+        self._local_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        # Entries disappear once no request holds the semaphore
+        self._user_limits: "weakref.WeakValueDictionary[str, asyncio.Semaphore]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return os.getenv("ANTHROPIC_API_KEY")
+
+    @property
+    def is_configured(self) -> bool:
+        """True if an Anthropic API key is available"""
+        return bool(self.api_key)
+
+    @property
+    def client(self):
+        """Shared AsyncAnthropic client, created on first use"""
+        if self._client is None:
+            if not self.is_configured:
+                raise AIGatewayNotConfigured("ANTHROPIC_API_KEY is not set")
+            from anthropic import AsyncAnthropic
+
+            self._client = AsyncAnthropic(api_key=self.api_key)
+        return self._client
+
+    # ========================================================================
+    # Cache keys
+    # ========================================================================
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Collapse whitespace so trivially different prompts share a key
+
+        Case is kept: it can change the answer (proofreading, capitalization).
+        """
+        return " ".join(text.split())
+
+    def cache_key(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        system: Optional[str],
+        max_tokens: int,
+        temperature: Optional[float],
+    ) -> str:
+        """Hash of the normalized prompt plus everything that changes the answer"""
+        payload = {
+            "model": model,
+            "system": self._normalize(system or ""),
+            "messages": [
+                {"role": m["role"], "content": self._normalize(m["content"])}
+                for m in messages
+            ],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        digest = hashlib.sha256(
+            json.dumps(payload, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        # v2: keys no longer fold case, so entries cached under v1 keys are skipped
+        return f"ai:response:v2:{digest}"
+
+    def _local_get(self, key: str) -> Optional[str]:
+        entry = self._local_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at < time.monotonic():
+            del self._local_cache[key]
+            return None
+        self._local_cache.move_to_end(key)
+        return text
+
+    def _local_set(self, key: str, text: str, ttl: int):
+        self._local_cache[key] = (time.monotonic() + ttl, text)
+        self._local_cache.move_to_end(key)
+        while len(self._local_cache) > self.LOCAL_CACHE_SIZE:
+            self._local_cache.popitem(last=False)
+
+    def _user_limit(self, user_id: Optional[str]) -> Optional[asyncio.Semaphore]:
+        if user_id is None:
+            return None
+        key = str(user_id)
+        semaphore = self._user_limits.get(key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_PER_USER)
+            self._user_limits[key] = semaphore
+        return semaphore
+
+    # ========================================================================
+    # Calls
+    # ========================================================================
+
+    async def complete(
+        self,
+        prompt: Optional[str] = None,
+        *,
+        messages: Optional[List[Dict[str, str]]] = None,
+        system: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: int = 1024,
+        temperature: Optional[float] = None,
+        feature: str = "default",
+        user_id: Optional[str] = None,
+        cache_ttl: Optional[int] = None,
+    ) -> str:
+        """
+        Get a Claude completion as text
+
+        Args:
+            prompt: Single user message (shorthand for messages)
+            messages: Full conversation, if not using prompt
+            system: System prompt
+            model: Claude model (defaults to CLAUDE_MODEL)
+            max_tokens: Maximum tokens in response
+            temperature: Sampling temperature (API default if None)
+            feature: Label for metrics (e.g. "writing_prompts")
+            user_id: Caller identity for per-user concurrency limits
+            cache_ttl: Seconds to cache the response; 0 disables caching
+
+        Returns:
+            Response text
+
+        Raises:
+            AIGatewayNotConfigured: if no API key is set
+        """
+        if messages is None:
+            messages = [{"role": "user", "content": prompt or ""}]
+        model = model or self.DEFAULT_MODEL
+        ttl = self.DEFAULT_CACHE_TTL if cache_ttl is None else cache_ttl
+        key = self.cache_key(model, messages, system, max_tokens, temperature)
+
+        if ttl > 0:
+            cached = self._local_get(key)
+            if cached is None:
+                cache = await get_cache()
+                cached = await cache.get(key)
+                if cached is not None:
+                    self._local_set(key, cached, ttl)
+            if cached is not None:
+                AI_REQUESTS.labels(feature, model, "hit").inc()
+                return cached
+
+        while True:
+            # Someone is already asking exactly this - wait for their answer
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            AI_REQUESTS.labels(feature, model, "coalesced").inc()
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us: ask again ourselves
+                if asyncio.current_task().cancelling() or not in_flight.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            text = await self._create(
+                model, messages, system, max_tokens, temperature, feature, user_id
+            )
+            if ttl > 0:
+                self._local_set(key, text, ttl)
+                cache = await get_cache()
+                await cache.set(key, text, ttl=ttl)
+            future.set_result(text)
+            return text
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an un-awaited future doesn't log a warning
+            future.exception()
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            # Cancelled before an answer: waiters re-issue the call
+            future.cancel()
+
+    async def _create(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        system: Optional[str],
+        max_tokens: int,
+        temperature: Optional[float],
+        feature: str,
+        user_id: Optional[str],
+    ) -> str:
+        """Make the API call under the user's concurrency limit and record metrics"""
+        params: Dict[str, Any] = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": messages,
+        }
+        if system:
+            params["system"] = system
+        if temperature is not None:
+            params["temperature"] = temperature
+
+        semaphore = self._user_limit(user_id)
+        started = time.perf_counter()
+        try:
+            if semaphore is not None:
+                async with semaphore:
+                    message = await self.client.messages.create(**params)
+            else:
+                message = await self.client.messages.create(**params)
+        except Exception:
+            AI_REQUESTS.labels(feature, model, "error").inc()
+            raise
+
+        AI_LATENCY.labels(feature, model).observe(time.perf_counter() - started)
+        AI_REQUESTS.labels(feature, model, "miss").inc()
+        usage = getattr(message, "usage", None)
+        if usage is not None:
+            AI_TOKENS.labels(feature, model, "input").inc(usage.input_tokens or 0)
+            AI_TOKENS.labels(feature, model, "output").inc(usage.output_tokens or 0)
+
+        return message.content[0].text
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        system: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: int = 2048,
+        feature: str = "chat",
+        user_id: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a Claude response as text chunks (never cached)
+
+        Holds the user's concurrency slot for the whole stream.
+        """
+        model = model or self.DEFAULT_MODEL
+        params: Dict[str, Any] = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": messages,
+        }
+        if system:
+            params["system"] = system
+
+        semaphore = self._user_limit(user_id)
+        if semaphore is not None:
+            await semaphore.acquire()
+        started = time.perf_counter()
+        try:
+            async with self.client.messages.stream(**params) as stream:
+                async for text in stream.text_stream:
+                    yield text
+                final = await stream.get_final_message()
+        except Exception:
+            AI_REQUESTS.labels(feature, model, "error").inc()
+            raise
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+        AI_LATENCY.labels(feature, model).observe(time.perf_counter() - started)
+        AI_REQUESTS.labels(feature, model, "miss").inc()
+        if final.usage is not None:
+            AI_TOKENS.labels(feature, model, "input").inc(final.usage.input_tokens or 0)
+            AI_TOKENS.labels(feature, model, "output").inc(final.usage.output_tokens or 0)
+
+
+# Global gateway instance
+ai_gateway = AIGateway()
@@ -4,15 +4,14 @@ AI Template Generation Service
 Uses Claude API to generate custom project templates based on user interests.
 """
 
-import os
 import time
 import json
 from typing import List, Dict, Any, Optional
-from anthropic import Anthropic
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.services.ai_gateway import ai_gateway
 from app.models.ai_templates import AIGeneratedTemplate, AIGenerationLog
 from app.models.templates import ProjectTemplate, TemplateSection  # TemplateInterestMapping not yet implemented
 
@@ -23,7 +22,6 @@ class AITemplateGenerator:
     """
     
     def __init__(self):
-        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
         self.model = "claude-3-5-sonnet-20241022"  # Latest model
     
     async def generate_templates_for_interests(
@@ -58,20 +56,15 @@ class AITemplateGenerator:
         templates = []
         
         try:
-            # Call Claude API
-            message = self.client.messages.create(
+            # Call Claude API (identical interest prompts are served from cache)
+            response_text = await ai_gateway.complete(
+                prompt,
                 model=self.model,
                 max_tokens=8000,
                 temperature=0.7,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
+                feature="ai_templates",
+                user_id=str(user_id) if user_id else None
             )
-            
-            response_text = message.content[0].text
             generation_time_ms = int((time.time() - start_time) * 1000)
             
             # Parse Claude's response (expecting JSON)
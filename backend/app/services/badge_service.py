@@ -188,7 +188,7 @@ class ScoreService:
             select(func.count(ReadingProgress.id)).where(
                 and_(
                     ReadingProgress.user_id == user_id,
-                    ReadingProgress.status == 'completed'
+                    ReadingProgress.completed.is_(True)
                 )
             )
         )
@@ -16,7 +16,7 @@ Usage:
 """
 import json
 import logging
-from typing import Optional, Any, List
+from typing import Optional, Any, List, Tuple
 from datetime import timedelta
 import redis.asyncio as aioredis
 
@@ -32,6 +32,7 @@ class CacheService:
         """Initialize Redis connection"""
         self.redis: Optional[aioredis.Redis] = None
         self._initialized = False
+        self._scripts = {}
     
     async def initialize(self):
         """Initialize Redis client"""
@@ -111,6 +112,31 @@ class CacheService:
         except Exception as e:
             logger.error(f"Error setting cache key {key}: {e}")
     
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values in one round trip (None for each miss)"""
+        if not self.redis or not keys:
+            return [None] * len(keys)
+
+        try:
+            values = await self.redis.mget(keys)
+            return [self._deserialize(value) for value in values]
+        except Exception as e:
+            logger.error(f"Error getting {len(keys)} cache keys: {e}")
+            return [None] * len(keys)
+
+    async def set_many(self, values: dict, ttl: int = 300):
+        """Set several values with the same TTL in one round trip"""
+        if not self.redis or not values:
+            return
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, value in values.items():
+                pipe.setex(key, ttl, self._serialize(value))
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error setting {len(values)} cache keys: {e}")
+
     async def delete(self, key: str):
         """Delete value from cache"""
         if not self.redis:
@@ -166,7 +192,183 @@ class CacheService:
         except Exception as e:
             logger.error(f"Error decrementing cache key {key}: {e}")
             return 0
-    
+
+    # ========================================================================
+    # Sorted sets (leaderboards)
+    # ========================================================================
+
+    async def zadd(self, key: str, scores: dict):
+        """Set the score of each member in a sorted set"""
+        if not self.redis or not scores:
+            return
+
+        try:
+            await self.redis.zadd(key, scores)
+        except Exception as e:
+            logger.error(f"Error updating sorted set {key}: {e}")
+
+    async def zrem(self, key: str, *members):
+        """Remove members from a sorted set"""
+        if not self.redis or not members:
+            return
+
+        try:
+            await self.redis.zrem(key, *members)
+        except Exception as e:
+            logger.error(f"Error removing from sorted set {key}: {e}")
+
+    async def zrevrange(self, key: str, start: int = 0, stop: int = -1) -> List[str]:
+        """Get members of a sorted set, highest score first (empty if unavailable)"""
+        if not self.redis:
+            return []
+
+        try:
+            return await self.redis.zrevrange(key, start, stop)
+        except Exception as e:
+            logger.error(f"Error reading sorted set {key}: {e}")
+            return []
+
+    async def zrange_withscores(self, key: str) -> List[Tuple[str, float]]:
+        """Get every (member, score) of a sorted set, lowest score first"""
+        if not self.redis:
+            return []
+
+        try:
+            return await self.redis.zrange(key, 0, -1, withscores=True)
+        except Exception as e:
+            logger.error(f"Error reading sorted set {key}: {e}")
+            return []
+
+    async def zcard(self, key: str) -> int:
+        """Number of members in a sorted set"""
+        if not self.redis:
+            return 0
+
+        try:
+            return await self.redis.zcard(key)
+        except Exception as e:
+            logger.error(f"Error counting sorted set {key}: {e}")
+            return 0
+
+    async def zcombine(self, dest: str, keys: List[str], intersect: bool = False, ttl: int = 60):
+        """
+        Store the union (or intersection) of sorted sets in dest, keeping each
+        member's highest score; dest expires after ttl seconds
+        """
+        if not self.redis or not keys:
+            return
+
+        try:
+            pipe = self.redis.pipeline(transaction=True)
+            if intersect:
+                pipe.zinterstore(dest, keys, aggregate="MAX")
+            else:
+                pipe.zunionstore(dest, keys, aggregate="MAX")
+            pipe.expire(dest, ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error combining sorted sets into {dest}: {e}")
+
+    async def run_script(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        """Run a Lua script atomically (None if unavailable)"""
+        if not self.redis:
+            return None
+
+        try:
+            if script not in self._scripts:
+                self._scripts[script] = self.redis.register_script(script)
+            return await self._scripts[script](keys=keys, args=args)
+        except Exception as e:
+            logger.error(f"Error running script on {keys[:2]}: {e}")
+            return None
+
+    async def zreplace(self, key: str, scores: dict):
+        """Replace a whole sorted set atomically - readers never see it half built"""
+        if not self.redis:
+            return
+
+        try:
+            if not scores:
+                await self.redis.delete(key)
+                return
+            staging_key = f"{key}:rebuild"
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.delete(staging_key)
+            pipe.zadd(staging_key, scores)
+            pipe.rename(staging_key, key)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error replacing sorted set {key}: {e}")
+
+    # ========================================================================
+    # Sets (membership indexes)
+    # ========================================================================
+
+    async def sadd(self, key: str, members: List[Any], ttl: Optional[int] = None):
+        """Add members to a set, (re)setting its TTL if given"""
+        if not self.redis or not members:
+            return
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.sadd(key, *members)
+            if ttl:
+                pipe.expire(key, ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error adding to set {key}: {e}")
+
+    async def srem(self, key: str, members: List[Any]):
+        """Remove members from a set"""
+        if not self.redis or not members:
+            return
+
+        try:
+            await self.redis.srem(key, *members)
+        except Exception as e:
+            logger.error(f"Error removing from set {key}: {e}")
+
+    async def smembership(self, queries: dict) -> Optional[dict]:
+        """
+        Membership of many values in many sets in one round trip:
+        {key: [member, ...]} -> {key: [bool, ...]} (None if unavailable)
+        """
+        if not self.redis:
+            return None
+        if not queries:
+            return {}
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, members in queries.items():
+                pipe.smismember(key, list(members))
+            results = await pipe.execute()
+            return {
+                key: [bool(found) for found in result]
+                for key, result in zip(queries, results)
+            }
+        except Exception as e:
+            logger.error(f"Error checking membership of {len(queries)} sets: {e}")
+            return None
+
+    async def sreplace(self, sets: dict, ttl: Optional[int] = None):
+        """Replace whole sets atomically ({key: members}; no members deletes the set)"""
+        if not self.redis or not sets:
+            return
+
+        try:
+            pipe = self.redis.pipeline(transaction=True)
+            for key, members in sets.items():
+                members = list(members)
+                pipe.delete(key)
+                if members:
+                    pipe.sadd(key, *members)
+                    if ttl:
+                        pipe.expire(key, ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error replacing {len(sets)} sets: {e}")
+
     # ========================================================================
     # High-level caching methods for common use cases
     # ========================================================================
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models import Comment, CommentReaction, User
+from app.services.trending_service import COMMENT, REACTION, TrendingService
 
 
 class CommentService:
@@ -32,6 +33,7 @@ class CommentService:
         db.add(comment)
         await db.commit()
         await db.refresh(comment)
+        await TrendingService.record(db, document_id, COMMENT)
         
         # Load user relationship
         result = await db.execute(
@@ -159,6 +161,10 @@ class CommentService:
         db.add(reaction)
         await db.commit()
         await db.refresh(reaction)
+        
+        document_id = await db.scalar(select(Comment.document_id).where(Comment.id == comment_id))
+        if document_id:
+            await TrendingService.record(db, document_id, REACTION)
         return reaction
     
     @staticmethod
@@ -8,13 +8,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 import os
 import asyncio
-import httpx
 import xml.etree.ElementTree as ET
 
 from app.models import (
     IntegrityCheck, Document, User,
     IntegrityCheckType, IntegrityCheckStatus
 )
+from app.core.lazy import LazyModule
+from app.services.near_duplicate_service import NearDuplicateService, DOCUMENT
+
+httpx = LazyModule("httpx")
 
 
 class ContentIntegrityService:
@@ -187,6 +190,10 @@ class ContentIntegrityService:
         Searches billions of web pages to find matching content.
         Returns matches with URLs, snippets, and similarity percentages.
         
+        The local near-duplicate index is checked first: a near-identical
+        published work by another author settles the check without calling
+        Copyscape; weaker local matches are added to Copyscape's.
+        
         Minimum text length: 25 words recommended
         """
         try:
@@ -203,15 +210,62 @@ class ContentIntegrityService:
             check.processing_started_at = datetime.now(timezone.utc)
             await db.commit()
             
-            # Check if Copyscape credentials are configured
-            if not ContentIntegrityService.COPYSCAPE_USERNAME or not ContentIntegrityService.COPYSCAPE_API_KEY:
-                raise ValueError("Copyscape API credentials not configured. Set COPYSCAPE_USERNAME and COPYSCAPE_API_KEY environment variables.")
-            
             # Check minimum text length
             word_count = len(check.content_snapshot.split())
             if word_count < 25:
                 raise ValueError(f"Text too short for plagiarism detection. Minimum 25 words, got {word_count}.")
             
+            # Pre-screen against our own corpus
+            owner_id = (await db.execute(
+                select(Document.owner_id).where(Document.id == check.document_id)
+            )).scalar_one_or_none()
+            local = await NearDuplicateService.prescreen(
+                db,
+                check.content_snapshot,
+                exclude=(DOCUMENT, check.document_id),
+                exclude_owner=owner_id
+            )
+            local_matches = [
+                {
+                    "url": "",
+                    "title": match["title"],
+                    "snippet": "",
+                    "percent_matched": match["similarity"],
+                    "words_matched": round(word_count * match["similarity"] / 100),
+                    "source": "workshelf",
+                    "source_kind": match["kind"],
+                    "source_id": match["source_id"]
+                }
+                for match in local["matches"]
+            ]
+            
+            if local["high_confidence"]:
+                check.plagiarism_score = local["best_similarity"]
+                check.plagiarism_matches = local_matches
+                check.total_matches = len(local_matches)
+                check.external_service = "local_index"
+                check.status = IntegrityCheckStatus.COMPLETED
+                check.processing_completed_at = datetime.now(timezone.utc)
+                check.cost_cents = 0
+                
+                await db.commit()
+                await db.refresh(check)
+                
+                return {
+                    "check": check,
+                    "plagiarism_score": check.plagiarism_score,
+                    "match_count": len(local_matches),
+                    "matches": local_matches,
+                    "query_words": word_count,
+                    "cost_usd": 0.0,
+                    "balance_usd": None,
+                    "prescreen_ms": local["elapsed_ms"]
+                }
+            
+            # Check if Copyscape credentials are configured
+            if not ContentIntegrityService.COPYSCAPE_USERNAME or not ContentIntegrityService.COPYSCAPE_API_KEY:
+                raise ValueError("Copyscape API credentials not configured. Set COPYSCAPE_USERNAME and COPYSCAPE_API_KEY environment variables.")
+            
             # Call Copyscape API
             url = "https://www.copyscape.com/api/"
             
@@ -264,6 +318,9 @@ class ContentIntegrityService:
                 }
                 matches.append(match_data)
             
+            matches.extend(local_matches)
+            match_count += len(local_matches)
+            
             # Get API usage stats
             cost_elem = root.find("cost")
             balance_elem = root.find("balance")
@@ -296,7 +353,8 @@ class ContentIntegrityService:
                 "matches": matches,
                 "query_words": query_words,
                 "cost_usd": cost_usd,
-                "balance_usd": balance_usd
+                "balance_usd": balance_usd,
+                "prescreen_ms": local["elapsed_ms"]
             }
         
         except Exception as e:
@@ -1,16 +1,91 @@
 """
 Content Verification Service
 Check uploaded EPUBs for plagiarism, AI generation, and authenticity
+
+The independent checks run concurrently through the shared AI gateway,
+EPUB parsing runs in a process pool so it never blocks the event loop, and
+results are cached by the EPUB's SHA-256 so re-verifying the same file is free.
+The plagiarism check starts with the local near-duplicate index and skips the
+online searches when it already found a near-identical work.
 """
 import os
+import asyncio
 import hashlib
+import logging
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timezone
-import anthropic
-import httpx
-from ebooklib import epub
-import html2text
+
+from app.services.ai_gateway import ai_gateway
+from app.services.cache_service import get_cache
+from app.services.near_duplicate_service import NearDuplicateService, EPUB_SUBMISSION
+
+logger = logging.getLogger(__name__)
+
+# Verification results for a given file never change; keep them for 30 days
+VERIFICATION_CACHE_TTL = 30 * 24 * 60 * 60
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Get the shared process pool for CPU-bound EPUB parsing"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=int(os.getenv("VERIFICATION_PROCESS_WORKERS", "2"))
+        )
+    return _process_pool
+
+
+def _extract_epub_text_sync(epub_path: str, max_chars: int = 50000) -> str:
+    """
+    Extract text content from EPUB file (runs in a worker process)
+    Samples chapters to avoid processing massive books
+    """
+    import ebooklib
+    import html2text
+    from ebooklib import epub
+
+    h = html2text.HTML2Text()
+    h.ignore_links = True
+    h.ignore_images = True
+    
+    book = epub.read_epub(epub_path)
+    text_parts = []
+    total_chars = 0
+    
+    # Get all document items
+    items = [item for item in book.get_items() 
+            if item.get_type() == ebooklib.ITEM_DOCUMENT]
+    
+    # Sample first few chapters and some middle/end chapters
+    sample_indices = [0, 1, 2]  # First 3 chapters
+    if len(items) > 10:
+        sample_indices.extend([len(items)//2, len(items)-2, len(items)-1])
+    elif len(items) > 5:
+        sample_indices.extend([len(items)//2, len(items)-1])
+    
+    for idx in sample_indices:
+        if idx >= len(items):
+            continue
+            
+        item = items[idx]
+        html_content = item.get_content().decode('utf-8', errors='ignore')
+        text = h.handle(html_content)
+        
+        # Clean up whitespace
+        text = re.sub(r'\s+', ' ', text).strip()
+        
+        text_parts.append(text)
+        total_chars += len(text)
+        
+        if total_chars >= max_chars:
+            break
+    
+    return '\n\n'.join(text_parts)[:max_chars]
 
 
 class ContentVerificationService:
@@ -22,25 +97,41 @@ class ContentVerificationService:
     4. Content quality assessment
     """
     
-    def __init__(self):
-        self.anthropic_client = anthropic.Anthropic(
-            api_key=os.getenv("ANTHROPIC_API_KEY")
-        )
-        self.h = html2text.HTML2Text()
-        self.h.ignore_links = True
-        self.h.ignore_images = True
-    
     async def verify_epub_content(
         self, 
         epub_path: str,
         author_name: str,
-        title: str
+        title: str,
+        file_hash: Optional[str] = None,
+        submission_id: Optional[int] = None,
+        uploader_id: Optional[int] = None
     ) -> Dict:
         """
         Main verification pipeline for uploaded EPUB
         
-        Returns verification result with scores and flags
+        Args:
+            epub_path: Local path to the EPUB file
+            author_name: Claimed author
+            title: Book title
+            file_hash: SHA-256 of the file; when given, results are cached
+                under it and a previous verification is returned as-is
+            submission_id: The EPUB submission; its text is added to the
+                near-duplicate index
+            uploader_id: Uploader, whose own works aren't near-duplicate matches
+        
+        Returns verification result with scores, flags and per-stage
+        timings in milliseconds
         """
+        started = time.perf_counter()
+        cache_key = f"epub_verification:{file_hash}" if file_hash else None
+        
+        if cache_key:
+            cache = await get_cache()
+            cached = await cache.get(cache_key)
+            if cached:
+                cached["cache_hit"] = True
+                return cached
+        
         result = {
             "verified": False,
             "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -48,33 +139,54 @@ class ContentVerificationService:
             "overall_score": 0.0,
             "warnings": [],
             "errors": [],
-            "requires_review": False
+            "requires_review": False,
+            "timings_ms": {}
         }
+        timings = result["timings_ms"]
         
         try:
             # Extract text from EPUB
-            text_content = await self._extract_epub_text(epub_path)
+            text_content = await self._timed(
+                "extract", self._extract_epub_text(epub_path), timings
+            )
             
             if not text_content or len(text_content) < 1000:
                 result["errors"].append("EPUB content is too short or unreadable")
                 return result
             
-            # Run verification checks
-            result["checks"]["plagiarism"] = await self._check_plagiarism(
-                text_content, title, author_name
+            local_matches = await self._timed(
+                "prescreen",
+                self._prescreen(text_content, submission_id, uploader_id),
+                timings
             )
             
-            result["checks"]["ai_detection"] = await self._detect_ai_content(
-                text_content
-            )
-            
-            result["checks"]["quality"] = await self._assess_quality(
-                text_content, title
-            )
-            
-            result["checks"]["copyright"] = await self._check_copyright_violations(
-                text_content, title, author_name
+            # Run independent verification checks concurrently
+            plagiarism, ai_detection, quality, copyright = await asyncio.gather(
+                self._timed(
+                    "plagiarism",
+                    self._check_plagiarism(text_content, title, author_name, local_matches),
+                    timings
+                ),
+                self._timed(
+                    "ai_detection",
+                    self._detect_ai_content(text_content),
+                    timings
+                ),
+                self._timed(
+                    "quality",
+                    self._assess_quality(text_content, title),
+                    timings
+                ),
+                self._timed(
+                    "copyright",
+                    self._check_copyright_violations(text_content, title, author_name),
+                    timings
+                ),
             )
+            result["checks"]["plagiarism"] = plagiarism
+            result["checks"]["ai_detection"] = ai_detection
+            result["checks"]["quality"] = quality
+            result["checks"]["copyright"] = copyright
             
             # Calculate overall score and determine if verified
             result["overall_score"] = self._calculate_overall_score(result["checks"])
@@ -88,67 +200,84 @@ class ContentVerificationService:
             else:
                 result["errors"].append("Content failed verification checks")
             
+            timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+            
+            # Only completed verifications are worth reusing
+            if cache_key:
+                await cache.set(cache_key, result, ttl=VERIFICATION_CACHE_TTL)
+            
             return result
             
         except Exception as e:
             result["errors"].append(f"Verification error: {str(e)}")
             result["requires_review"] = True
+            timings["total"] = round((time.perf_counter() - started) * 1000, 1)
             return result
     
+    @staticmethod
+    async def _timed(stage: str, coro, timings: Dict[str, float]):
+        """Await a pipeline stage and record its duration in milliseconds"""
+        stage_started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            timings[stage] = round((time.perf_counter() - stage_started) * 1000, 1)
+    
     async def _extract_epub_text(self, epub_path: str, max_chars: int = 50000) -> str:
         """
         Extract text content from EPUB file
-        Samples chapters to avoid processing massive books
+        Parsing and HTML conversion run in the process pool
         """
         try:
-            book = epub.read_epub(epub_path)
-            text_parts = []
-            total_chars = 0
-            
-            # Get all document items
-            items = [item for item in book.get_items() 
-                    if item.get_type() == epub.ITEM_DOCUMENT]
-            
-            # Sample first few chapters and some middle/end chapters
-            sample_indices = [0, 1, 2]  # First 3 chapters
-            if len(items) > 10:
-                sample_indices.extend([len(items)//2, len(items)-2, len(items)-1])
-            elif len(items) > 5:
-                sample_indices.extend([len(items)//2, len(items)-1])
-            
-            for idx in sample_indices:
-                if idx >= len(items):
-                    continue
-                    
-                item = items[idx]
-                html_content = item.get_content().decode('utf-8', errors='ignore')
-                text = self.h.handle(html_content)
-                
-                # Clean up whitespace
-                text = re.sub(r'\s+', ' ', text).strip()
-                
-                text_parts.append(text)
-                total_chars += len(text)
-                
-                if total_chars >= max_chars:
-                    break
-            
-            return '\n\n'.join(text_parts)[:max_chars]
-            
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                _get_process_pool(), _extract_epub_text_sync, epub_path, max_chars
+            )
         except Exception as e:
             raise Exception(f"Failed to extract EPUB text: {str(e)}")
     
+    async def _prescreen(
+        self,
+        text: str,
+        submission_id: Optional[int],
+        uploader_id: Optional[int]
+    ) -> Dict:
+        """
+        Near-duplicates of the text among our published works and uploads,
+        then index the submission itself
+        """
+        from app.core.database import get_jobs_session_local
+        
+        try:
+            async with get_jobs_session_local()() as db:
+                local = await NearDuplicateService.prescreen(
+                    db,
+                    text,
+                    exclude=(EPUB_SUBMISSION, submission_id) if submission_id else None,
+                    exclude_owner=uploader_id
+                )
+                if submission_id:
+                    await NearDuplicateService.index(db, EPUB_SUBMISSION, submission_id, uploader_id, text)
+            return local
+        except Exception as e:
+            # The online checks still run
+            logger.error(f"Near-duplicate pre-screen failed: {e}")
+            return {}
+    
     async def _check_plagiarism(
         self, 
         text: str, 
         title: str,
-        author: str
+        author: str,
+        local_matches: Optional[Dict] = None
     ) -> Dict:
         """
         Check for plagiarism using multiple methods:
-        1. Search for exact text matches online
-        2. Check against known public domain works
-        3. Use AI to detect copied content patterns
+        1. Look for near-duplicates among our own works (local index);
+           a near-identical match ends the check here
+        2. Search for exact text matches online
+        3. Check against known public domain works
+        4. Use AI to detect copied content patterns
         """
         result = {
             "score": 100,  # Start at 100, deduct for issues
@@ -157,13 +286,39 @@ class ContentVerificationService:
             "flagged_passages": []
         }
         
+        local = (local_matches or {}).get("matches", [])
+        for match in local:
+            result["flagged_passages"].append({
+                "text": match["title"],
+                "reason": f"{match['similarity']}% similar to an existing {match['kind'].replace('_', ' ')} on WorkShelf"
+            })
+        
+        if local_matches and local_matches.get("high_confidence"):
+            result["score"] -= 60
+            result["details"].append(
+                f"Nearly identical to \"{local[0]['title']}\" already on WorkShelf ({local[0]['similarity']}% similar)"
+            )
+            result["confidence"] = "low"
+            return result
+        
+        if local:
+            result["score"] -= 20
+            result["details"].append(f"Found {len(local)} similar works already on WorkShelf")
+        
         # Get a few distinctive passages to check
         passages = self._extract_distinctive_passages(text, count=5, length=200)
         
         # Check online for exact matches (sampling to avoid rate limits)
+        # alongside the AI originality analysis
+        sampled = passages[:3]  # Check first 3 passages
+        *online_results, ai_analysis = await asyncio.gather(
+            *[self._search_text_online(passage) for passage in sampled],
+            self._ai_analyze_originality(text[:5000], title, author)
+        )
+        
         online_matches = 0
-        for passage in passages[:3]:  # Check first 3 passages
-            if await self._search_text_online(passage):
+        for passage, found in zip(sampled, online_results):
+            if found:
                 online_matches += 1
                 result["flagged_passages"].append({
                     "text": passage[:100] + "...",
@@ -176,9 +331,6 @@ class ContentVerificationService:
                 f"Found {online_matches} passages with online matches"
             )
         
-        # Use AI to analyze originality
-        ai_analysis = await self._ai_analyze_originality(text[:5000], title, author)
-        
         if ai_analysis["likely_copied"]:
             result["score"] -= 30
             result["details"].append(ai_analysis["reasoning"])
@@ -443,14 +595,14 @@ Respond in JSON format:
     "confidence": "high|medium|low"
 }}"""
 
-            message = self.anthropic_client.messages.create(
+            response = await ai_gateway.complete(
+                prompt,
                 model="claude-3-5-sonnet-20241022",
                 max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}]
+                feature="content_verification"
             )
             
             import json
-            response = message.content[0].text
             
             # Extract JSON from response
             json_match = re.search(r'\{.*\}', response, re.DOTALL)
@@ -496,14 +648,14 @@ Respond in JSON format:
     "reasoning": "explanation"
 }}"""
 
-            message = self.anthropic_client.messages.create(
+            response = await ai_gateway.complete(
+                prompt,
                 model="claude-3-5-sonnet-20241022",
                 max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}]
+                feature="content_verification"
             )
             
             import json
-            response = message.content[0].text
             
             json_match = re.search(r'\{.*\}', response, re.DOTALL)
             if json_match:
@@ -549,14 +701,14 @@ Respond in JSON format:
     "improvements": ["improvement1"]
 }}"""
 
-            message = self.anthropic_client.messages.create(
+            response = await ai_gateway.complete(
+                prompt,
                 model="claude-3-5-sonnet-20241022",
                 max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}]
+                feature="content_verification"
             )
             
             import json
-            response = message.content[0].text
             
             json_match = re.search(r'\{.*\}', response, re.DOTALL)
             if json_match:
@@ -608,14 +760,14 @@ Respond in JSON format:
     "potential_source": "work name or null"
 }}"""
 
-            message = self.anthropic_client.messages.create(
+            response = await ai_gateway.complete(
+                prompt,
                 model="claude-3-5-sonnet-20241022",
                 max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}]
+                feature="content_verification"
             )
             
             import json
-            response = message.content[0].text
             
             json_match = re.search(r'\{.*\}', response, re.DOTALL)
             if json_match:
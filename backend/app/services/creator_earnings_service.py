@@ -7,16 +7,13 @@ from typing import Optional, List, Dict, Any
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
-import stripe
 import os
 
 from app.models import (
     User, CreatorEarnings, Payout,
     PayoutStatus
 )
-
-
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "sk_test_")
+from app.services.stripe_service import stripe
 
 
 class CreatorEarningsService:
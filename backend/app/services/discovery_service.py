@@ -7,8 +7,42 @@ from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
 from ..models.reading import Category
-from ..models.document import Document
+from ..models.document import Document, DocumentTag, Tag
+from ..models.document_trending import DocumentTrendingScore
 from ..schemas.discovery import SortBy, TimeRange
+from .trending_service import TrendingService, decayed_score, min_score, normalize_tag
+
+# Read a few extra ids so documents unpublished since they were scored
+# don't leave the page short
+OVERFETCH = 20
+
+TIME_RANGE_DAYS = {
+    TimeRange.TODAY: 1,
+    TimeRange.WEEK: 7,
+    TimeRange.MONTH: 30,
+    TimeRange.YEAR: 365
+}
+
+# Trending board for each time range (app.services.trending_service)
+TIME_RANGE_WINDOWS = {
+    TimeRange.TODAY: "day",
+    TimeRange.WEEK: "week",
+    TimeRange.MONTH: "month",
+    TimeRange.YEAR: "year",
+    TimeRange.ALL_TIME: "all"
+}
+
+
+def _discoverable():
+    return and_(Document.status == 'published', Document.is_deleted == False)
+
+
+def _tagged(names: List[str]):
+    return Document.id.in_(
+        select(DocumentTag.document_id)
+        .join(Tag, Tag.id == DocumentTag.tag_id)
+        .where(func.lower(Tag.name).in_(names))
+    )
 
 
 class DiscoveryService:
@@ -21,40 +55,9 @@ class DiscoveryService:
         skip: int = 0,
         limit: int = 20
     ) -> tuple[List[Document], int]:
-        """Get trending published documents."""
-        # Calculate trending score based on views, likes (placeholder logic)
-        # In reality, would use more sophisticated algorithm
-        
-        stmt = select(Document).filter(
-            Document.status == 'published'
-        )
-        
-        # Filter by time range if specified
-        if time_range and time_range != TimeRange.ALL_TIME:
-            days = {
-                TimeRange.TODAY: 1,
-                TimeRange.WEEK: 7,
-                TimeRange.MONTH: 30,
-                TimeRange.YEAR: 365
-            }.get(time_range, 30)
-            
-            cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-            stmt = stmt.filter(Document.created_at >= cutoff)
-        
-        # Order by created_at (simplified - in production would use trending score)
-        stmt = stmt.order_by(desc(Document.created_at)).offset(skip).limit(limit)
-        
-        result = await db.execute(stmt)
-        items = list(result.scalars().all())
-        
-        # Count total
-        count_stmt = select(func.count()).select_from(Document).filter(
-            Document.status == 'published'
-        )
-        count_result = await db.execute(count_stmt)
-        total = count_result.scalar()
-        
-        return items, total
+        """Get trending published documents, ranked by time-decayed engagement (the week board by default)."""
+        window = TIME_RANGE_WINDOWS.get(time_range, "week")
+        return await DiscoveryService._ranked_documents(db, window, [], None, skip, limit)
     
     @staticmethod
     async def discover_documents(
@@ -66,55 +69,109 @@ class DiscoveryService:
         skip: int = 0,
         limit: int = 20
     ) -> tuple[List[Document], int]:
-        """Discover documents based on filters."""
-        stmt = select(Document).filter(
-            Document.status == 'published'
-        )
-        
-        # Filter by category (if implemented)
-        # if category:
-        #     stmt = stmt.filter(Document.category == category)
-        
-        # Filter by tags (if implemented)
-        # if tags:
-        #     stmt = stmt.join(DocumentTag).join(Tag).filter(Tag.name.in_(tags))
+        """
+        Discover documents based on filters.
+        
+        Documents have no category of their own; a category matches documents
+        tagged with its name. Popular and trending rank by engagement over the
+        time range (all time and a week by default); recent filters by it.
+        """
+        tag_names = sorted({normalize_tag(tag) for tag in tags or [] if tag.strip()})
+        category_tag = await DiscoveryService._category_tag(db, category) if category else None
+        
+        if sort_by in (SortBy.POPULAR, SortBy.TRENDING):
+            default_window = "all" if sort_by == SortBy.POPULAR else "week"
+            window = TIME_RANGE_WINDOWS.get(time_range, default_window)
+            return await DiscoveryService._ranked_documents(db, window, tag_names, category_tag, skip, limit)
+        
+        conditions = [_discoverable()]
+        if tag_names:
+            conditions.append(_tagged(tag_names))
+        if category_tag:
+            conditions.append(_tagged([category_tag]))
         
         # Filter by time range
         if time_range and time_range != TimeRange.ALL_TIME:
-            days = {
-                TimeRange.TODAY: 1,
-                TimeRange.WEEK: 7,
-                TimeRange.MONTH: 30,
-                TimeRange.YEAR: 365
-            }.get(time_range, 30)
-            
-            cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-            stmt = stmt.filter(Document.created_at >= cutoff)
+            cutoff = datetime.now(timezone.utc) - timedelta(days=TIME_RANGE_DAYS.get(time_range, 30))
+            conditions.append(Document.created_at >= cutoff)
         
-        # Sort
-        if sort_by == SortBy.RECENT:
-            stmt = stmt.order_by(desc(Document.created_at))
-        elif sort_by == SortBy.POPULAR:
-            # Simplified - would use view count or engagement metrics
-            stmt = stmt.order_by(desc(Document.created_at))
-        elif sort_by == SortBy.TRENDING:
-            # Simplified - would use trending algorithm
-            stmt = stmt.order_by(desc(Document.created_at))
+        stmt = select(Document).filter(*conditions).order_by(desc(Document.created_at)).offset(skip).limit(limit)
+        result = await db.execute(stmt)
+        items = list(result.scalars().all())
         
-        stmt = stmt.offset(skip).limit(limit)
+        count_stmt = select(func.count()).select_from(Document).filter(*conditions)
+        count_result = await db.execute(count_stmt)
+        total = count_result.scalar()
         
+        return items, total
+    
+    @staticmethod
+    async def _category_tag(db: AsyncSession, category: str) -> str:
+        """The tag a category slug (or name) stands for"""
+        category_obj = await DiscoveryService.get_category_by_slug(db, category)
+        return normalize_tag(category_obj.name if category_obj else category)
+    
+    @staticmethod
+    async def _ranked_documents(
+        db: AsyncSession,
+        window: str,
+        tag_names: List[str],
+        category_tag: Optional[str],
+        skip: int,
+        limit: int
+    ) -> tuple[List[Document], int]:
+        """
+        One page of a trending board: ids from Redis, rows from one batch
+        lookup re-checked as discoverable; without Redis the persisted scores
+        are ranked in SQL.
+        """
+        ranked = await TrendingService.ranked_ids(
+            db, window, tag_names, category_tag, skip, skip + limit + OVERFETCH - 1
+        )
+        if ranked is not None:
+            ids, total = ranked
+            if not ids:
+                return [], total
+            result = await db.execute(select(Document).filter(Document.id.in_(ids), _discoverable()))
+            by_id = {document.id: document for document in result.scalars().all()}
+            return [by_id[document_id] for document_id in ids if document_id in by_id][:limit], total
+        
+        score = decayed_score(window)
+        conditions = [_discoverable(), score > min_score(window)]
+        if tag_names:
+            conditions.append(_tagged(tag_names))
+        if category_tag:
+            conditions.append(_tagged([category_tag]))
+        
+        stmt = (
+            select(Document)
+            .join(DocumentTrendingScore, DocumentTrendingScore.document_id == Document.id)
+            .filter(*conditions)
+            .order_by(desc(score), Document.id)
+            .offset(skip)
+            .limit(limit)
+        )
         result = await db.execute(stmt)
         items = list(result.scalars().all())
         
-        # Count total (simplified - should match filters)
-        count_stmt = select(func.count()).select_from(Document).filter(
-            Document.status == 'published'
+        count_stmt = (
+            select(func.count())
+            .select_from(Document)
+            .join(DocumentTrendingScore, DocumentTrendingScore.document_id == Document.id)
+            .filter(*conditions)
         )
         count_result = await db.execute(count_stmt)
         total = count_result.scalar()
         
         return items, total
     
+    @staticmethod
+    async def is_discoverable(db: AsyncSession, document_id: int) -> bool:
+        """Whether a document is published and not deleted."""
+        stmt = select(Document.id).filter(Document.id == document_id, _discoverable())
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none() is not None
+    
     @staticmethod
     async def get_categories(
         db: AsyncSession,
@@ -0,0 +1,661 @@
+"""
+Document Conversion Service
+Format parsing and TipTap conversion, off the event loop
+
+PyPDF2, python-docx, odfpy and BeautifulSoup are CPU bound and the markdown
+to TipTap conversion walks text character by character, so all of it runs in
+a shared process pool:
+- Per-format timeouts, enforced inside the worker and again by the caller
+- An address space limit per worker so one huge file can't take the host down
+- A result cache keyed by the file's SHA-256, so re-uploading a file is free
+
+Usage:
+    from app.services.document_conversion_service import document_conversion
+
+    converted = await document_conversion.convert_upload(raw_bytes, "chapter.docx")
+    html = await document_conversion.run(render_html, tiptap_json)
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from prometheus_client import Histogram
+
+from app.core.lazy import module_available
+from app.services.cache_service import get_cache
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Document format libraries - checked here, imported by the worker that parses
+DOCX_AVAILABLE = module_available("docx")
+ODF_AVAILABLE = module_available("odf")
+PDF_AVAILABLE = module_available("PyPDF2")
+HTML_AVAILABLE = module_available("bs4")
+
+logger = logging.getLogger(__name__)
+
+
+CONVERSION_LATENCY = Histogram(
+    "document_conversion_seconds",
+    "Time spent converting documents, including queueing for a worker",
+    ["format", "outcome"],  # outcome: hit, inline, pool, error, timeout, crash
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120),
+)
+
+
+class DocumentConversionError(Exception):
+    """Raised when a document can't be converted; the message is safe to show users"""
+    pass
+
+
+# ============================================================================
+# Parsers (pure functions - safe to run in a worker process)
+# ============================================================================
+
+def convert_document_to_markdown(content: bytes, filename: str) -> str:
+    """
+    Convert various document formats to markdown.
+    Supports: .txt, .html, .docx, .odt, .pdf
+    """
+    ext = os.path.splitext(filename.lower())[1]
+
+    try:
+        # Plain text
+        if ext == '.txt':
+            return content.decode('utf-8')
+
+        # HTML
+        elif ext in ['.html', '.htm']:
+            if not HTML_AVAILABLE:
+                raise DocumentConversionError("HTML parsing not available")
+            from bs4 import BeautifulSoup
+
+            soup = BeautifulSoup(content, 'html.parser')
+            # Remove script and style elements
+            for script in soup(["script", "style"]):
+                script.decompose()
+            return soup.get_text()
+
+        # Microsoft Word (.docx)
+        elif ext == '.docx':
+            if not DOCX_AVAILABLE:
+                raise DocumentConversionError("DOCX parsing not available")
+            from docx import Document as DocxDocument
+
+            doc = DocxDocument(io.BytesIO(content))
+            paragraphs = []
+            for para in doc.paragraphs:
+                if para.text.strip():
+                    paragraphs.append(para.text)
+            return '\n\n'.join(paragraphs)
+
+        # OpenDocument Text (.odt)
+        elif ext == '.odt':
+            if not ODF_AVAILABLE:
+                raise DocumentConversionError("ODT parsing not available")
+            from odf import text as odf_text, teletype
+            from odf.opendocument import load as odf_load
+
+            doc = odf_load(io.BytesIO(content))
+            paragraphs = []
+            for para in doc.getElementsByType(odf_text.P):
+                text = teletype.extractText(para)
+                if text.strip():
+                    paragraphs.append(text)
+            return '\n\n'.join(paragraphs)
+
+        # PDF
+        elif ext == '.pdf':
+            if not PDF_AVAILABLE:
+                raise DocumentConversionError("PDF parsing not available")
+            from PyPDF2 import PdfReader
+
+            reader = PdfReader(io.BytesIO(content))
+            text_parts = []
+            for page in reader.pages:
+                text = page.extract_text()
+                if text.strip():
+                    text_parts.append(text)
+            return '\n\n'.join(text_parts)
+
+        # Markdown (no conversion needed)
+        elif ext in ['.md', '.markdown']:
+            return content.decode('utf-8')
+
+        else:
+            raise DocumentConversionError(f"Unsupported file format: {ext}")
+
+    except (DocumentConversionError, ConversionTimeout, MemoryError):
+        raise
+    except UnicodeDecodeError:
+        raise DocumentConversionError("File encoding not supported. Please use UTF-8.")
+    except Exception as e:
+        raise DocumentConversionError(f"Error parsing {ext} file: {str(e)}")
+
+
+def markdown_to_tiptap(markdown: str) -> dict:
+    """
+    Convert markdown text to TipTap JSON format.
+    Supports common markdown features: headings, bold, italic, lists, links, code, etc.
+    """
+    content = []
+    lines = markdown.split('\n')
+    i = 0
+
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        # Empty line - add empty paragraph to preserve spacing
+        if not stripped:
+            content.append({
+                "type": "paragraph",
+                "content": []
+            })
+            i += 1
+            continue
+
+        # Headings
+        if stripped.startswith('#'):
+            level = len(stripped) - len(stripped.lstrip('#'))
+            level = min(level, 3)  # Max level 3
+            text = stripped.lstrip('#').strip()
+            content.append({
+                "type": "heading",
+                "attrs": {"level": level},
+                "content": parse_inline_markdown(text)
+            })
+            i += 1
+            continue
+
+        # Bullet list
+        if stripped.startswith(('- ', '* ', '+ ')):
+            list_items = []
+            while i < len(lines) and lines[i].strip().startswith(('- ', '* ', '+ ')):
+                item_text = lines[i].strip()[2:]
+                list_items.append({
+                    "type": "listItem",
+                    "content": [{
+                        "type": "paragraph",
+                        "content": parse_inline_markdown(item_text)
+                    }]
+                })
+                i += 1
+            content.append({
+                "type": "bulletList",
+                "content": list_items
+            })
+            continue
+
+        # Numbered list
+        if re.match(r'^\d+\.\s', stripped):
+            list_items = []
+            while i < len(lines) and re.match(r'^\d+\.\s', lines[i].strip()):
+                item_text = re.sub(r'^\d+\.\s', '', lines[i].strip())
+                list_items.append({
+                    "type": "listItem",
+                    "content": [{
+                        "type": "paragraph",
+                        "content": parse_inline_markdown(item_text)
+                    }]
+                })
+                i += 1
+            content.append({
+                "type": "orderedList",
+                "content": list_items
+            })
+            continue
+
+        # Blockquote
+        if stripped.startswith('>'):
+            quote_lines = []
+            while i < len(lines) and lines[i].strip().startswith('>'):
+                quote_lines.append(lines[i].strip()[1:].strip())
+                i += 1
+            content.append({
+                "type": "blockquote",
+                "content": [{
+                    "type": "paragraph",
+                    "content": parse_inline_markdown(' '.join(quote_lines))
+                }]
+            })
+            continue
+
+        # Code block
+        if stripped.startswith('```'):
+            code_lines = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith('```'):
+                code_lines.append(lines[i])
+                i += 1
+            i += 1  # Skip closing ```
+            content.append({
+                "type": "codeBlock",
+                "content": [{
+                    "type": "text",
+                    "text": '\n'.join(code_lines)
+                }]
+            })
+            continue
+
+        # Regular paragraph - preserve line breaks within paragraph
+        para_lines = [line]
+        i += 1
+        while i < len(lines) and lines[i].strip() and not lines[i].strip().startswith(('#', '-', '*', '+', '>', '```')) and not re.match(r'^\d+\.\s', lines[i].strip()):
+            para_lines.append(lines[i])
+            i += 1
+
+        # Parse paragraph with line breaks preserved
+        para_content = []
+        for idx, pline in enumerate(para_lines):
+            para_content.extend(parse_inline_markdown(pline))
+            # Add hard break between lines (except last line)
+            if idx < len(para_lines) - 1:
+                para_content.append({"type": "hardBreak"})
+
+        content.append({
+            "type": "paragraph",
+            "content": para_content
+        })
+
+    return {
+        "type": "doc",
+        "content": content
+    }
+
+
+def parse_inline_markdown(text: str) -> list:
+    """Parse inline markdown formatting (bold, italic, code, links)"""
+    if not text:
+        return [{"type": "text", "text": ""}]
+
+    parts = []
+    current_text = ""
+    i = 0
+
+    while i < len(text):
+        # Bold **text**
+        if text[i:i+2] == '**':
+            if current_text:
+                parts.append({"type": "text", "text": current_text})
+                current_text = ""
+            end = text.find('**', i + 2)
+            if end != -1:
+                parts.append({
+                    "type": "text",
+                    "text": text[i+2:end],
+                    "marks": [{"type": "bold"}]
+                })
+                i = end + 2
+                continue
+
+        # Italic *text*
+        if text[i] == '*' and (i == 0 or text[i-1] != '*') and (i+1 >= len(text) or text[i+1] != '*'):
+            if current_text:
+                parts.append({"type": "text", "text": current_text})
+                current_text = ""
+            end = text.find('*', i + 1)
+            if end != -1 and (end+1 >= len(text) or text[end+1] != '*'):
+                parts.append({
+                    "type": "text",
+                    "text": text[i+1:end],
+                    "marks": [{"type": "italic"}]
+                })
+                i = end + 1
+                continue
+
+        # Code `text`
+        if text[i] == '`':
+            if current_text:
+                parts.append({"type": "text", "text": current_text})
+                current_text = ""
+            end = text.find('`', i + 1)
+            if end != -1:
+                parts.append({
+                    "type": "text",
+                    "text": text[i+1:end],
+                    "marks": [{"type": "code"}]
+                })
+                i = end + 1
+                continue
+
+        # Links [text](url)
+        if text[i] == '[':
+            link_match = re.match(r'\[([^\]]+)\]\(([^)]+)\)', text[i:])
+            if link_match:
+                if current_text:
+                    parts.append({"type": "text", "text": current_text})
+                    current_text = ""
+                parts.append({
+                    "type": "text",
+                    "text": link_match.group(1),
+                    "marks": [{"type": "link", "attrs": {"href": link_match.group(2)}}]
+                })
+                i += len(link_match.group(0))
+                continue
+
+        current_text += text[i]
+        i += 1
+
+    if current_text:
+        parts.append({"type": "text", "text": current_text})
+
+    return parts if parts else [{"type": "text", "text": ""}]
+
+
+def split_frontmatter(content: str) -> Tuple[Optional[str], str]:
+    """
+    Split Obsidian-style YAML frontmatter from the body.
+    Returns (frontmatter title or None, clean_content)
+    """
+    lines = content.split('\n')
+
+    # Check for frontmatter
+    if lines and lines[0].strip() == '---':
+        # Find end of frontmatter
+        title = None
+
+        for i, line in enumerate(lines[1:], 1):
+            if line.strip() == '---':
+                # Remove frontmatter from content
+                return title, '\n'.join(lines[i + 1:]).strip()
+            # Extract title from frontmatter
+            if line.startswith('title:'):
+                title = line.split(':', 1)[1].strip().strip('"\'')
+
+    return None, content
+
+
+def first_heading(content: str) -> Optional[str]:
+    """Text of the first markdown heading, if any"""
+    for line in content.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('#'):
+            return stripped.lstrip('#').strip()
+    return None
+
+
+def title_from_filename(filename: str) -> str:
+    """Readable title from a filename without its extension"""
+    return os.path.splitext(os.path.basename(filename))[0].replace('_', ' ').replace('-', ' ').title()
+
+
+def derive_title_from_content(content: str, filename: str) -> str:
+    """Extract title from first heading or use filename"""
+    return first_heading(content) or title_from_filename(filename)
+
+
+def parse_frontmatter(content: str, filename: str) -> Tuple[str, str]:
+    """
+    Parse Obsidian-style YAML frontmatter and extract title.
+    Returns (title, clean_content)
+    """
+    title, clean_content = split_frontmatter(content)
+    return title or derive_title_from_content(clean_content, filename), clean_content
+
+
+def _convert_upload_sync(content: bytes, filename: str) -> Dict[str, Any]:
+    """
+    Everything an upload needs, in one worker round trip
+
+    The result depends only on the file's bytes and extension (the filename
+    title fallback is applied by the caller), so it can be cached by hash.
+    """
+    markdown = convert_document_to_markdown(content, filename)
+    title, body = split_frontmatter(markdown)
+    return {
+        "markdown": markdown,
+        "title": title or first_heading(body),
+        "body": body,
+        "tiptap": markdown_to_tiptap(body),
+        "word_count": len(body.split()),
+    }
+
+
+# ============================================================================
+# Worker process plumbing
+# ============================================================================
+
+class ConversionTimeout(Exception):
+    """Raised inside a worker when a task runs past its deadline"""
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise ConversionTimeout()
+
+
+def _init_worker(memory_limit_mb: int):
+    """Process pool initializer: cap the worker's address space"""
+    if resource is not None and memory_limit_mb > 0:
+        limit = memory_limit_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError) as e:
+            logger.warning(f"Could not set conversion worker memory limit: {e}")
+    signal.signal(signal.SIGALRM, _raise_timeout)
+
+
+def _run_with_deadline(func: Callable, timeout: float, *args) -> Any:
+    """Run func in the worker, interrupting it after timeout seconds"""
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+# ============================================================================
+# Service
+# ============================================================================
+
+class DocumentConversionService:
+    """Runs document parsing and rendering in a bounded worker pool"""
+
+    WORKERS = int(os.getenv("DOCUMENT_CONVERSION_WORKERS", "2"))
+
+    # Address space per worker; parsers hold the whole file plus its DOM
+    MEMORY_LIMIT_MB = int(os.getenv("DOCUMENT_CONVERSION_MEMORY_MB", "1024"))
+
+    # Seconds a single conversion may run, by file extension
+    FORMAT_TIMEOUTS = {
+        '.pdf': 120,
+        '.docx': 60,
+        '.odt': 60,
+        '.html': 30,
+        '.htm': 30,
+        '.md': 30,
+        '.markdown': 30,
+        '.txt': 30,
+    }
+    DEFAULT_TIMEOUT = 60
+
+    # Extra time the caller waits before declaring the worker stuck
+    TIMEOUT_GRACE = 5
+
+    # Plain text this small converts faster than the round trip to a worker
+    INLINE_MAX_BYTES = 32 * 1024
+    INLINE_FORMATS = {'.md', '.markdown', '.txt'}
+
+    # Bump when parser output changes so stale cache entries are ignored
+    CONVERTER_VERSION = 1
+    CACHE_TTL = 7 * 24 * 60 * 60
+
+    # Very large conversions aren't worth the Redis memory
+    MAX_CACHED_BYTES = 2 * 1024 * 1024
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Calls awaiting each pool, and pools that take no new work
+        self._in_flight: Dict[ProcessPoolExecutor, int] = {}
+        self._retiring: set = set()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.WORKERS,
+                initializer=_init_worker,
+                initargs=(self.MEMORY_LIMIT_MB,),
+            )
+        return self._pool
+
+    @staticmethod
+    def _kill_pool(pool: ProcessPoolExecutor):
+        """Terminate a pool's workers, whatever they are doing"""
+        # A worker stuck in C code ignores SIGALRM; terminating is the only
+        # way to get its slot back. ProcessPoolExecutor has no public API for it.
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _retire_pool(self, pool: ProcessPoolExecutor):
+        """
+        Send new work to a fresh pool and kill this one once it is idle
+
+        Used when a worker is stuck: the pool's other conversions still run
+        to completion, then the stuck worker goes with the pool.
+        """
+        if self._pool is pool:
+            self._pool = None
+        self._retiring.add(pool)
+
+    def _release(self, pool: ProcessPoolExecutor):
+        """One call on pool finished; kill it if it is retiring and idle"""
+        remaining = self._in_flight.get(pool, 1) - 1
+        if remaining > 0:
+            self._in_flight[pool] = remaining
+            return
+        self._in_flight.pop(pool, None)
+        if pool in self._retiring:
+            self._retiring.discard(pool)
+            self._kill_pool(pool)
+
+    def shutdown(self):
+        """Stop the worker pools (called on application shutdown)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        for pool in self._retiring:
+            self._kill_pool(pool)
+        self._retiring.clear()
+        self._in_flight.clear()
+
+    async def run(
+        self,
+        func: Callable,
+        *args,
+        timeout: Optional[float] = None,
+        label: str = "render",
+    ) -> Any:
+        """
+        Run a module-level function in the conversion pool
+
+        Args:
+            func: Picklable (module-level) function
+            args: Picklable arguments
+            timeout: Seconds before the call is abandoned
+            label: Metrics label
+
+        Raises:
+            DocumentConversionError: on timeout, worker crash or memory limit
+        """
+        timeout = timeout or self.DEFAULT_TIMEOUT
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        outcome = "error"
+        pool = self._get_pool()
+        self._in_flight[pool] = self._in_flight.get(pool, 0) + 1
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(pool, _run_with_deadline, func, timeout, *args),
+                timeout=timeout + self.TIMEOUT_GRACE,
+            )
+            outcome = "pool"
+            return result
+        except ConversionTimeout:
+            # Interrupted inside the worker, which is free again
+            outcome = "timeout"
+            logger.warning(f"Document conversion ({label}) timed out after {timeout}s")
+            raise DocumentConversionError(
+                f"Conversion timed out after {int(timeout)} seconds. Try splitting the file."
+            )
+        except asyncio.TimeoutError:
+            # The worker ignored the alarm and is still busy
+            outcome = "timeout"
+            logger.warning(f"Document conversion ({label}) stuck after {timeout}s; retiring its pool")
+            self._retire_pool(pool)
+            raise DocumentConversionError(
+                f"Conversion timed out after {int(timeout)} seconds. Try splitting the file."
+            )
+        except MemoryError:
+            raise DocumentConversionError("File is too large to convert")
+        except BrokenProcessPool:
+            outcome = "crash"
+            logger.error(f"Document conversion worker died during {label}")
+            # Every other call on a broken pool fails too, so it empties fast
+            self._retire_pool(pool)
+            raise DocumentConversionError("Conversion failed, please try again")
+        finally:
+            self._release(pool)
+            CONVERSION_LATENCY.labels(label, outcome).observe(time.perf_counter() - started)
+
+    def cache_key(self, content: bytes, ext: str) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        return f"doc_conversion:v{self.CONVERTER_VERSION}:{ext}:{digest}"
+
+    async def convert_upload(self, content: bytes, filename: str) -> Dict[str, Any]:
+        """
+        Convert an uploaded file to markdown and TipTap JSON
+
+        Returns:
+            Dict with markdown, title, body (markdown without frontmatter),
+            tiptap and word_count
+
+        Raises:
+            DocumentConversionError: with a message suitable for the user
+        """
+        ext = os.path.splitext(filename.lower())[1]
+        started = time.perf_counter()
+
+        cache = await get_cache()
+        key = self.cache_key(content, ext)
+        result = await cache.get(key)
+
+        if result is not None:
+            CONVERSION_LATENCY.labels(ext, "hit").observe(time.perf_counter() - started)
+        else:
+            if ext in self.INLINE_FORMATS and len(content) <= self.INLINE_MAX_BYTES:
+                try:
+                    result = _convert_upload_sync(content, filename)
+                finally:
+                    CONVERSION_LATENCY.labels(ext, "inline").observe(time.perf_counter() - started)
+            else:
+                result = await self.run(
+                    _convert_upload_sync,
+                    content,
+                    filename,
+                    timeout=self.FORMAT_TIMEOUTS.get(ext, self.DEFAULT_TIMEOUT),
+                    label=ext,
+                )
+
+            # Text size is a good proxy for the size of the TipTap JSON
+            if len(result["markdown"]) <= self.MAX_CACHED_BYTES:
+                await cache.set(key, result, ttl=self.CACHE_TTL)
+
+        # The filename fallback isn't part of the cached result
+        return {**result, "title": result["title"] or title_from_filename(filename)}
+
+
+# Global conversion service instance
+document_conversion = DocumentConversionService()
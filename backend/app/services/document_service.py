@@ -3,39 +3,33 @@ Document Service
 Business logic for document operations
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
-from sqlalchemy.orm import joinedload
-from typing import Optional, List, Tuple, Union, Dict, Any
+from sqlalchemy import select, or_
+from sqlalchemy.orm import defer, joinedload
+from typing import Optional, List, Union, Dict, Any
 from datetime import datetime, timezone
+import asyncio
 import json
 
+from app.core.pagination import paginate
 from app.models.document import Document, DocumentStatus, DocumentVisibility, DocumentVersion
 from app.models.user import User
 from app.schemas.document import DocumentCreate, DocumentUpdate
 from app.services.storage_service import storage_service
+from app.services import tiptap_service
 from fastapi import HTTPException, status
 
 
 def extract_text_from_content(content: Union[str, dict, None]) -> str:
     """Extract plain text from content (handles both string and rich text JSON)"""
-    if not content:
-        return ""
-    if isinstance(content, str):
-        return content
-    if isinstance(content, dict):
-        # Extract text from TipTap/ProseMirror JSON structure
-        def extract_text(node):
-            if isinstance(node, dict):
-                text = ""
-                if node.get("type") == "text":
-                    return node.get("text", "")
-                if "content" in node:
-                    for child in node["content"]:
-                        text += extract_text(child) + " "
-                return text
-            return ""
-        return extract_text(content)
-    return ""
+    return tiptap_service.extract_text(content)
+
+
+async def document_text(document: Document) -> str:
+    """Plain text of a document, loaded from S3 when stored there"""
+    content = document.content
+    if not content and document.file_path:
+        content = await asyncio.to_thread(storage_service.download_document, document.file_path)
+    return tiptap_service.extract_text(content)
 
 
 def calculate_reading_time(content: Union[str, dict, None]) -> int:
@@ -43,19 +37,12 @@ def calculate_reading_time(content: Union[str, dict, None]) -> int:
     Calculate estimated reading time in minutes
     Assumes average reading speed of 200 words per minute
     """
-    text = extract_text_from_content(content)
-    if not text:
-        return 0
-    word_count = len(text.split())
-    return max(1, round(word_count / 200))
+    return tiptap_service.reading_time_minutes(count_words(content))
 
 
 def count_words(content: Union[str, dict, None]) -> int:
     """Count words in content (handles both string and rich text JSON)"""
-    text = extract_text_from_content(content)
-    if not text:
-        return 0
-    return len(text.split())
+    return tiptap_service.count_words(content)
 
 
 async def create_document(
@@ -249,22 +236,26 @@ async def list_user_documents(
     page_size: int = 20,
     status_filter: Optional[DocumentStatus] = None,
     project_id: Optional[int] = None,
-    folder_id: Optional[int] = None
-) -> Tuple[List[Document], int]:
+    folder_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    count: Optional[str] = None
+) -> Dict[str, Any]:
     """
-    List documents owned by a user
+    List documents owned by a user, most recently updated first
     
     Args:
         session: Database session
         user_id: Owner user ID
-        page: Page number (1-indexed)
+        page: Page number (1-indexed), ignored when a cursor is given
         page_size: Items per page
         status_filter: Optional status filter
         project_id: Optional project ID filter
         folder_id: Optional folder ID filter (filters by project.folder_id)
+        cursor: next_cursor from the previous page
+        count: Count mode (see app.core.pagination)
         
     Returns:
-        Tuple of (documents list, total count)
+        Page dict (items, total, total_is_estimate, has_more, next_cursor)
     """
     # Base query - join with Project to filter by folder
     # EXCLUDE soft-deleted documents by default
@@ -287,34 +278,15 @@ async def list_user_documents(
     if status_filter:
         query = query.where(Document.status == status_filter)
     
-    # Order by most recent first
-    query = query.order_by(Document.updated_at.desc())
-    
-    # Get total count
-    count_query = select(func.count()).select_from(Document).where(
-        Document.owner_id == user_id,
-        Document.is_deleted == False
+    return await paginate(
+        session, query,
+        keys=(Document.updated_at, Document.id),
+        limit=page_size,
+        cursor=cursor,
+        offset=(page - 1) * page_size,
+        count=count,
+        scope=f"documents:user:{user_id}:{status_filter}:{project_id}:{folder_id}",
     )
-    if project_id is not None:
-        count_query = count_query.where(Document.project_id == project_id)
-    if folder_id is not None:
-        from app.models.project import Project
-        count_query = count_query.join(Project, Document.project_id == Project.id).where(Project.folder_id == folder_id)
-    if status_filter:
-        count_query = count_query.where(Document.status == status_filter)
-    
-    total_result = await session.execute(count_query)
-    total = total_result.scalar()
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
-    
-    # Execute query
-    result = await session.execute(query)
-    documents = result.scalars().all()
-    
-    return list(documents), total
 
 
 async def update_document(
@@ -483,45 +455,40 @@ async def delete_document(
 async def list_public_documents(
     session: AsyncSession,
     page: int = 1,
-    page_size: int = 20
-) -> Tuple[List[Document], int]:
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    count: Optional[str] = None
+) -> Dict[str, Any]:
     """
-    List public published documents
+    List public published documents, most recently published first
     
     Args:
         session: Database session
-        page: Page number (1-indexed)
+        page: Page number (1-indexed), ignored when a cursor is given
         page_size: Items per page
+        cursor: next_cursor from the previous page
+        count: Count mode (see app.core.pagination)
         
     Returns:
-        Tuple of (documents list, total count)
+        Page dict (items, total, total_is_estimate, has_more, next_cursor)
     """
-    # Query for public, published documents with owner eager loaded
-    query = select(Document).options(
-        joinedload(Document.owner)
-    ).where(
-        Document.visibility == DocumentVisibility.PUBLIC,
-        Document.status == DocumentStatus.PUBLISHED
-    ).order_by(Document.published_at.desc())
-    
-    # Get total count
-    count_query = select(func.count()).select_from(Document).where(
+    # Query for public, published documents (owner eager loaded per page)
+    query = select(Document).where(
         Document.visibility == DocumentVisibility.PUBLIC,
         Document.status == DocumentStatus.PUBLISHED
     )
     
-    total_result = await session.execute(count_query)
-    total = total_result.scalar()
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
-    
-    # Execute query
-    result = await session.execute(query)
-    documents = result.scalars().all()
-    
-    return list(documents), total
+    return await paginate(
+        session, query,
+        keys=(Document.published_at, Document.id),
+        limit=page_size,
+        cursor=cursor,
+        offset=(page - 1) * page_size,
+        count=count,
+        nullable=True,
+        options=(joinedload(Document.owner),),
+        scope="documents:public",
+    )
 
 
 # ============================================================================
@@ -542,9 +509,12 @@ async def list_document_versions(
     # Get document and verify ownership
     document = await get_document_by_id(session, document_id, user_id)
     
-    # Query versions with creator eager loaded
+    # Query versions with creator eager loaded; the listing never shows
+    # content, which is a full copy of the document per version
     query = select(DocumentVersion).options(
-        joinedload(DocumentVersion.created_by)
+        joinedload(DocumentVersion.created_by),
+        defer(DocumentVersion.content),
+        defer(DocumentVersion.content_html)
     ).where(
         DocumentVersion.document_id == document_id
     ).order_by(DocumentVersion.version.desc())
@@ -2,11 +2,11 @@
 Email Service using AWS SES
 Handles sending transactional emails including group invitations
 """
-import boto3
 from botocore.exceptions import ClientError
 from typing import Optional
 import logging
 from app.core.config import settings
+from app.core.lazy import LazyService
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +16,8 @@ class EmailService:
     
     def __init__(self):
         """Initialize SES client"""
+        import boto3
+
         if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
             self.ses_client = boto3.client(
                 'ses',
@@ -264,5 +266,5 @@ Visit WorkShelf: {settings.FRONTEND_URL}
         return await self.send_email(to_email, subject, html_body, text_body)
 
 
-# Global email service instance
-email_service = EmailService()
+# Global email service instance, built on first use
+email_service = LazyService(EmailService)
@@ -6,8 +6,9 @@ import tempfile
 import hashlib
 from typing import Optional, Dict, Any
 from datetime import datetime, timezone
-from ebooklib import epub
-from bs4 import BeautifulSoup
+
+from app.services.document_conversion_service import document_conversion
+from app.services.tiptap_service import render_html
 
 
 class EpubGenerationService:
@@ -24,88 +25,7 @@ class EpubGenerationService:
         Returns:
             HTML string
         """
-        if isinstance(content, str):
-            # Plain text content
-            return f"<p>{content}</p>"
-        
-        if not isinstance(content, dict):
-            return ""
-        
-        def process_node(node: dict) -> str:
-            """Recursively process TipTap nodes"""
-            node_type = node.get("type", "")
-            attrs = node.get("attrs", {})
-            content = node.get("content", [])
-            marks = node.get("marks", [])
-            text = node.get("text", "")
-            
-            # Text node with marks (bold, italic, etc.)
-            if node_type == "text":
-                html = text
-                # Apply marks
-                for mark in marks:
-                    mark_type = mark.get("type")
-                    if mark_type == "bold":
-                        html = f"<strong>{html}</strong>"
-                    elif mark_type == "italic":
-                        html = f"<em>{html}</em>"
-                    elif mark_type == "code":
-                        html = f"<code>{html}</code>"
-                    elif mark_type == "link":
-                        href = mark.get("attrs", {}).get("href", "#")
-                        html = f'<a href="{href}">{html}</a>'
-                    elif mark_type == "strike":
-                        html = f"<s>{html}</s>"
-                    elif mark_type == "underline":
-                        html = f"<u>{html}</u>"
-                return html
-            
-            # Process child content
-            children_html = "".join(process_node(child) for child in content)
-            
-            # Block nodes
-            if node_type == "paragraph":
-                return f"<p>{children_html}</p>\n"
-            elif node_type == "heading":
-                level = attrs.get("level", 1)
-                return f"<h{level}>{children_html}</h{level}>\n"
-            elif node_type == "blockquote":
-                return f"<blockquote>{children_html}</blockquote>\n"
-            elif node_type == "codeBlock":
-                language = attrs.get("language", "")
-                return f'<pre><code class="language-{language}">{children_html}</code></pre>\n'
-            elif node_type == "bulletList":
-                return f"<ul>{children_html}</ul>\n"
-            elif node_type == "orderedList":
-                start = attrs.get("start", 1)
-                return f'<ol start="{start}">{children_html}</ol>\n'
-            elif node_type == "listItem":
-                return f"<li>{children_html}</li>\n"
-            elif node_type == "hardBreak":
-                return "<br/>\n"
-            elif node_type == "horizontalRule":
-                return "<hr/>\n"
-            elif node_type == "image":
-                src = attrs.get("src", "")
-                alt = attrs.get("alt", "")
-                title = attrs.get("title", "")
-                return f'<img src="{src}" alt="{alt}" title="{title}"/>\n'
-            elif node_type == "table":
-                return f"<table>{children_html}</table>\n"
-            elif node_type == "tableRow":
-                return f"<tr>{children_html}</tr>\n"
-            elif node_type == "tableCell":
-                return f"<td>{children_html}</td>\n"
-            elif node_type == "tableHeader":
-                return f"<th>{children_html}</th>\n"
-            elif node_type == "doc":
-                # Root document node
-                return children_html
-            
-            # Unknown node type - just process children
-            return children_html
-        
-        return process_node(content)
+        return render_html(content)
     
     @staticmethod
     async def generate_epub(
@@ -133,6 +53,8 @@ class EpubGenerationService:
                 - file_size: Size in bytes
                 - file_hash: SHA-256 hash
         """
+        from ebooklib import epub
+
         # Create EPUB book
         book = epub.EpubBook()
         
@@ -149,8 +71,10 @@ class EpubGenerationService:
         book.add_metadata('DC', 'publisher', 'WorkShelf')
         book.add_metadata('DC', 'date', datetime.now(timezone.utc).strftime('%Y-%m-%d'))
         
-        # Convert TipTap content to HTML
-        html_content = EpubGenerationService.tiptap_to_html(content)
+        # Convert TipTap content to HTML (CPU bound for full manuscripts)
+        html_content = await document_conversion.run(
+            render_html, content, label="epub_html"
+        )
         
         # Create chapter
         chapter = epub.EpubHtml(
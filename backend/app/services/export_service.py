@@ -13,6 +13,7 @@ from app.models import (
     ExportJob, Document, Studio, User,
     ExportFormat, ExportStatus, ExportType
 )
+from app.services.tiptap_service import analyze_document
 
 
 class ExportService:
@@ -303,6 +304,20 @@ class ExportService:
         # Similar to GDPR export but includes more metadata
         return await ExportService._export_gdpr_data(db, job)
     
+    @staticmethod
+    async def _render_text(document: Document) -> str:
+        """Plain text of the document"""
+        analysis = await analyze_document(document.id, document.current_version, document.content)
+        return analysis["text"]
+
+    @staticmethod
+    async def _render_html(document: Document) -> str:
+        """HTML body of the document"""
+        analysis = await analyze_document(
+            document.id, document.current_version, document.content, html=True
+        )
+        return analysis["html"]
+
     @staticmethod
     async def _generate_markdown(document: Document, job: ExportJob) -> str:
         """Generate Markdown export"""
@@ -313,7 +328,7 @@ class ExportService:
             content += f"**Created:** {document.created_at}\n"
             content += f"**Status:** {document.status}\n\n"
         
-        content += document.content or ""
+        content += await ExportService._render_text(document)
         
         return content
     
@@ -343,7 +358,7 @@ class ExportService:
 """
         
         html += f"""    <div class="content">
-        {document.content or ''}
+        {await ExportService._render_html(document)}
     </div>
 </body>
 </html>"""
@@ -360,7 +375,7 @@ class ExportService:
             content += f"Created: {document.created_at}\n"
             content += f"Status: {document.status}\n\n"
         
-        content += document.content or ""
+        content += await ExportService._render_text(document)
         
         return content
     
@@ -1,14 +1,36 @@
 """
 Folders Service Layer - Document organization.
+
+The hierarchy lives in a closure table (FolderClosure) and each folder
+carries its own and its subtree's document and word counts, all maintained
+by database triggers (app.models.folder). Trees, subtrees and recursive
+counts are therefore single queries, whatever the depth.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_, func, exists
+from sqlalchemy.orm import aliased
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone
-from app.models.folder import Folder
-from app.models.document import Document
+from app.models.folder import Folder, FolderClosure
 from app.schemas.project import FolderCreate, FolderUpdate, FolderResponse
-from app.core.exceptions import NotFoundError
+from app.core.exceptions import NotFoundError, ValidationError
+
+
+def _subfolder_count():
+    """Correlated count of a folder's direct children"""
+    child = aliased(Folder)
+    return (
+        select(func.count())
+        .where(child.parent_id == Folder.id)
+        .correlate(Folder)
+        .scalar_subquery()
+    )
+
+
+def _to_response(folder: Folder, subfolder_count: int) -> FolderResponse:
+    response = FolderResponse.model_validate(folder)
+    response.subfolder_count = subfolder_count
+    return response
 
 
 class FolderService:
@@ -27,15 +49,13 @@ class FolderService:
             user_id=user_id,
             tenant_id=tenant_id
         )
+        if data.parent_id is not None:
+            await FolderService._get_owned(db, data.parent_id, user_id, tenant_id)
         db.add(folder)
         await db.commit()
         await db.refresh(folder)
-        
-        response = FolderResponse.model_validate(folder)
-        response.document_count = 0
-        response.subfolder_count = 0
-        
-        return response
+
+        return _to_response(folder, 0)
 
     @staticmethod
     async def get_folder(
@@ -44,37 +64,20 @@ class FolderService:
         user_id: str,
         tenant_id: str
     ) -> Optional[FolderResponse]:
-        """Get folder by ID."""
-        stmt = select(Folder).where(
+        """Get folder by ID, with its own and its subtree's counts."""
+        stmt = select(Folder, _subfolder_count()).where(
             and_(
                 Folder.id == folder_id,
                 Folder.tenant_id == tenant_id,
                 Folder.user_id == user_id
             )
-        )
-        result = await db.execute(stmt)
-        folder = result.scalar_one_or_none()
-        
-        if not folder:
+        ).execution_options(populate_existing=True)
+        row = (await db.execute(stmt)).first()
+
+        if not row:
             raise NotFoundError("Folder not found")
-        
-        response = FolderResponse.model_validate(folder)
-        
-        # Count documents and subfolders
-        doc_stmt = select(func.count()).select_from(Document).where(
-            Document.folder_id == folder_id
-        )
-        doc_count = await db.scalar(doc_stmt) or 0
-        
-        sub_stmt = select(func.count()).select_from(Folder).where(
-            Folder.parent_id == folder_id
-        )
-        sub_count = await db.scalar(sub_stmt) or 0
-        
-        response.document_count = doc_count
-        response.subfolder_count = sub_count
-        
-        return response
+
+        return _to_response(*row)
 
     @staticmethod
     async def list_folders(
@@ -85,26 +88,17 @@ class FolderService:
         skip: int = 0,
         limit: int = 100
     ) -> List[FolderResponse]:
-        """List folders."""
-        stmt = select(Folder).where(
+        """List folders, with counts, in one query."""
+        stmt = select(Folder, _subfolder_count()).where(
             and_(
                 Folder.tenant_id == tenant_id,
                 Folder.user_id == user_id,
                 Folder.parent_id == parent_id
             )
-        ).offset(skip).limit(limit).order_by(Folder.name)
-        
+        ).offset(skip).limit(limit).order_by(Folder.name).execution_options(populate_existing=True)
+
         result = await db.execute(stmt)
-        folders = result.scalars().all()
-        
-        responses = []
-        for folder in folders:
-            response = FolderResponse.model_validate(folder)
-            response.document_count = 0
-            response.subfolder_count = 0
-            responses.append(response)
-        
-        return responses
+        return [_to_response(folder, subfolders) for folder, subfolders in result.all()]
 
     @staticmethod
     async def update_folder(
@@ -114,32 +108,27 @@ class FolderService:
         user_id: str,
         tenant_id: str
     ) -> FolderResponse:
-        """Update folder."""
-        stmt = select(Folder).where(
-            and_(
-                Folder.id == folder_id,
-                Folder.tenant_id == tenant_id,
-                Folder.user_id == user_id
-            )
-        )
-        result = await db.execute(stmt)
-        folder = result.scalar_one_or_none()
-        
-        if not folder:
-            raise NotFoundError("Folder not found")
-        
-        for field, value in data.model_dump(exclude_unset=True).items():
+        """
+        Update folder.
+        Changing parent_id moves the whole subtree; the triggers rewire the
+        closure table and move the counts in the same statement.
+        """
+        folder = await FolderService._get_owned(db, folder_id, user_id, tenant_id)
+        changes = data.model_dump(exclude_unset=True)
+
+        new_parent_id = changes.get("parent_id")
+        if "parent_id" in changes and new_parent_id != folder.parent_id and new_parent_id is not None:
+            await FolderService._get_owned(db, new_parent_id, user_id, tenant_id)
+            if await FolderService.is_descendant(db, new_parent_id, folder.id):
+                raise ValidationError("A folder can't be moved into itself or one of its subfolders")
+
+        for field, value in changes.items():
             setattr(folder, field, value)
-        
+
         folder.updated_at = datetime.now(timezone.utc)
         await db.commit()
-        await db.refresh(folder)
-        
-        response = FolderResponse.model_validate(folder)
-        response.document_count = 0
-        response.subfolder_count = 0
-        
-        return response
+        # The move updated counts on other rows; reload this one with them
+        return await FolderService.get_folder(db, folder_id, user_id, tenant_id)
 
     @staticmethod
     async def delete_folder(
@@ -148,20 +137,9 @@ class FolderService:
         user_id: str,
         tenant_id: str
     ) -> bool:
-        """Delete folder."""
-        stmt = select(Folder).where(
-            and_(
-                Folder.id == folder_id,
-                Folder.tenant_id == tenant_id,
-                Folder.user_id == user_id
-            )
-        )
-        result = await db.execute(stmt)
-        folder = result.scalar_one_or_none()
-        
-        if not folder:
-            raise NotFoundError("Folder not found")
-        
+        """Delete folder. Its documents and subfolders move up to the top level."""
+        folder = await FolderService._get_owned(db, folder_id, user_id, tenant_id)
+
         await db.delete(folder)
         await db.commit()
         return True
@@ -171,67 +149,86 @@ class FolderService:
         db: AsyncSession,
         user_id: str,
         tenant_id: str,
-        project_id: Optional[int] = None
+        project_id: Optional[int] = None,
+        root_id: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
-        Get complete folder tree for a project.
+        Get complete folder tree for a project, or the subtree under root_id.
         Returns folders organized hierarchically with children nested.
+        One query: counts are stored on the folders and the subtree comes
+        from the closure table.
         """
-        if project_id is None:
-            # If no project specified, return all folders (legacy behavior)
-            stmt = select(Folder).where(
-                and_(
-                    Folder.tenant_id == tenant_id,
-                    Folder.user_id == user_id
-                )
-            ).order_by(Folder.name)
-        else:
-            # Get all folders that belong to this project
-            stmt = select(Folder).where(
-                and_(
-                    Folder.tenant_id == tenant_id,
-                    Folder.user_id == user_id,
-                    Folder.project_id == project_id
-                )
-            ).order_by(Folder.name)
-        
-        result = await db.execute(stmt)
-        folders = result.scalars().all()
-        
-        # Build folder map with document counts
-        folder_map: Dict[int, Dict[str, Any]] = {}
-        for folder in folders:
-            # Count documents in this folder for this project
-            if project_id is not None:
-                doc_stmt = select(func.count()).select_from(Document).where(
-                    and_(
-                        Document.folder_id == folder.id,
-                        Document.project_id == project_id
-                    )
-                )
-            else:
-                doc_stmt = select(func.count()).select_from(Document).where(
-                    Document.folder_id == folder.id
-                )
-            doc_count = await db.scalar(doc_stmt) or 0
-            
-            folder_map[folder.id] = {
-                "id": folder.id,
-                "name": folder.name,
-                "parent_id": folder.parent_id,
-                "color": folder.color,
-                "icon": folder.icon,
-                "document_count": doc_count,
-                "children": []
-            }
-        
+        stmt = select(
+            Folder.id,
+            Folder.name,
+            Folder.parent_id,
+            Folder.color,
+            Folder.icon,
+            Folder.document_count,
+            Folder.word_count,
+            Folder.subtree_document_count,
+            Folder.subtree_word_count,
+        ).where(
+            and_(
+                Folder.tenant_id == tenant_id,
+                Folder.user_id == user_id
+            )
+        ).order_by(Folder.name)
+
+        if project_id is not None:
+            # Only folders that belong to this project
+            stmt = stmt.where(Folder.project_id == project_id)
+        if root_id is not None:
+            stmt = stmt.join(
+                FolderClosure,
+                and_(FolderClosure.descendant_id == Folder.id, FolderClosure.ancestor_id == root_id)
+            )
+
+        rows = (await db.execute(stmt)).all()
+
+        folder_map: Dict[int, Dict[str, Any]] = {
+            row.id: {**row._asdict(), "children": []} for row in rows
+        }
+
         # Build tree structure
         tree = []
-        for folder in folders:
-            folder_dict = folder_map[folder.id]
-            if folder.parent_id and folder.parent_id in folder_map:
-                folder_map[folder.parent_id]["children"].append(folder_dict)
+        for row in rows:
+            folder_dict = folder_map[row.id]
+            if row.parent_id and row.parent_id in folder_map and row.id != root_id:
+                folder_map[row.parent_id]["children"].append(folder_dict)
             else:
                 tree.append(folder_dict)
-        
+
         return tree
+
+    @staticmethod
+    async def is_descendant(db: AsyncSession, folder_id: int, ancestor_id: int) -> bool:
+        """Whether folder_id is ancestor_id or somewhere below it."""
+        stmt = select(exists().where(
+            and_(
+                FolderClosure.ancestor_id == ancestor_id,
+                FolderClosure.descendant_id == folder_id
+            )
+        ))
+        return bool(await db.scalar(stmt))
+
+    @staticmethod
+    async def _get_owned(
+        db: AsyncSession,
+        folder_id: int,
+        user_id: str,
+        tenant_id: str
+    ) -> Folder:
+        stmt = select(Folder).where(
+            and_(
+                Folder.id == folder_id,
+                Folder.tenant_id == tenant_id,
+                Folder.user_id == user_id
+            )
+        )
+        result = await db.execute(stmt)
+        folder = result.scalar_one_or_none()
+
+        if not folder:
+            raise NotFoundError("Folder not found")
+        return folder
@@ -41,17 +41,14 @@ class GroupAnalyticsService:
         )
         post_ids = [row[0] for row in post_result]
         
-        # Follower metrics
-        total_followers_result = await db.execute(
-            select(func.count(GroupFollower.id)).where(
-                and_(
-                    GroupFollower.group_id == group_id,
-                    GroupFollower.is_active == True
-                )
-            )
+        # All-time totals (maintained on the group row)
+        totals_result = await db.execute(
+            select(Group.follower_count, Group.member_count, Group.post_count)
+            .where(Group.id == group_id)
         )
-        total_followers = total_followers_result.scalar() or 0
+        total_followers, total_members, total_posts = totals_result.first() or (0, 0, 0)
         
+        # Follower metrics
         new_followers_result = await db.execute(
             select(func.count(GroupFollower.id)).where(
                 and_(
@@ -65,13 +62,6 @@ class GroupAnalyticsService:
         new_followers = new_followers_result.scalar() or 0
         
         # Member metrics
-        total_members_result = await db.execute(
-            select(func.count(GroupMember.id)).where(
-                GroupMember.group_id == group_id
-            )
-        )
-        total_members = total_members_result.scalar() or 0
-        
         new_members_result = await db.execute(
             select(func.count(GroupMember.id)).where(
                 and_(
@@ -84,13 +74,6 @@ class GroupAnalyticsService:
         new_members = new_members_result.scalar() or 0
         
         # Post metrics
-        total_posts_result = await db.execute(
-            select(func.count(GroupPost.id)).where(
-                GroupPost.group_id == group_id
-            )
-        )
-        total_posts = total_posts_result.scalar() or 0
-        
         new_posts_result = await db.execute(
             select(func.count(GroupPost.id)).where(
                 and_(
@@ -5,13 +5,14 @@ Manages group themes, branding, and custom styling
 from typing import Optional, List
 import secrets
 from datetime import datetime, timezone
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.group_customization import GroupTheme
 from app.models.collaboration import Group, GroupCustomDomain, GroupFollower
 from app.models.user import User
+from app.services.tenant_resolution_service import GROUP, tenant_resolution
 
 
 class GroupCustomizationService:
@@ -96,6 +97,7 @@ class GroupCustomizationService:
         
         await db.commit()
         await db.refresh(theme)
+        await tenant_resolution.publish_invalidation(GROUP, group_id)
         return theme
     
     @staticmethod
@@ -123,6 +125,7 @@ class GroupCustomizationService:
         if theme:
             await db.delete(theme)
             await db.commit()
+            await tenant_resolution.publish_invalidation(GROUP, group_id)
             return True
         return False
     
@@ -176,6 +179,7 @@ class GroupCustomizationService:
         
         await db.commit()
         await db.refresh(domain)
+        await tenant_resolution.publish_invalidation(GROUP, domain.group_id)
         return domain
     
     @staticmethod
@@ -207,6 +211,7 @@ class GroupCustomizationService:
         if domain:
             await db.delete(domain)
             await db.commit()
+            await tenant_resolution.publish_invalidation(GROUP, group_id)
             return True
         return False
     
@@ -317,16 +322,7 @@ class GroupCustomizationService:
             )
         )
         
-        # Get total count
-        # Get total count using func.count() for efficiency
-        count_stmt = select(func.count()).select_from(GroupFollower).filter(
-            and_(
-                GroupFollower.group_id == group_id,
-                GroupFollower.is_active == True
-            )
-        )
-        count_result = await db.execute(count_stmt)
-        total = count_result.scalar()
+        total = await GroupCustomizationService.get_follower_count(db, group_id)
         
         # Get paginated results
         result = await db.execute(stmt.offset(skip).limit(limit))
@@ -339,15 +335,10 @@ class GroupCustomizationService:
         db: AsyncSession,
         group_id: int
     ) -> int:
-        """Get follower count for a group."""
+        """Get follower count for a group (maintained on the group row)."""
         result = await db.execute(
-            select(func.count()).select_from(GroupFollower).filter(
-                and_(
-                    GroupFollower.group_id == group_id,
-                    GroupFollower.is_active == True
-                )
-            )
+            select(Group.follower_count).where(Group.id == group_id)
         )
-        return result.scalar()
+        return result.scalar() or 0
 
 
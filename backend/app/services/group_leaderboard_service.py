@@ -0,0 +1,137 @@
+"""
+Group Leaderboard Service
+Popular and recently active groups, ranked in Redis sorted sets
+
+Listed groups (public, active, not deleted) are scored by the counters the
+database triggers keep on the group row:
+
+    leaderboard:groups:popular   member_count
+    leaderboard:groups:active    last_activity_at (epoch seconds)
+
+Write paths call refresh() after committing; a missing leaderboard (Redis
+flushed or restarted) is rebuilt on the next read. Without Redis the same
+orderings run in SQL on the partial indexes idx_groups_listed_popular and
+idx_groups_listed_active.
+"""
+import logging
+from typing import Iterable, List, Optional
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.collaboration import Group
+from app.services.cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+POPULAR = "popular"
+ACTIVE = "active"
+
+LEADERBOARD_KEYS = {
+    POPULAR: "leaderboard:groups:popular",
+    ACTIVE: "leaderboard:groups:active",
+}
+
+# Read a few extra ids so exclusions and groups unlisted since the last
+# refresh don't leave the page short
+OVERFETCH = 20
+
+
+def _listed():
+    return and_(Group.is_public == True, Group.is_active == True, Group.is_deleted == False)
+
+
+def _sql_order(kind: str):
+    if kind == ACTIVE:
+        return [Group.last_activity_at.desc().nulls_last(), Group.id]
+    return [Group.member_count.desc(), Group.id]
+
+
+def _scores(member_count: int, last_activity_at) -> dict:
+    scores = {POPULAR: member_count or 0}
+    if last_activity_at is not None:
+        scores[ACTIVE] = last_activity_at.timestamp()
+    return scores
+
+
+class GroupLeaderboardService:
+    """Service for the popular and active group leaderboards."""
+
+    @staticmethod
+    async def refresh(db: AsyncSession, *group_ids: int) -> None:
+        """Re-score groups from their counters, dropping any no longer listed"""
+        group_ids = [group_id for group_id in group_ids if group_id]
+        cache = await get_cache()
+        if not cache.redis or not group_ids:
+            return
+
+        result = await db.execute(
+            select(Group.id, Group.member_count, Group.last_activity_at)
+            .where(Group.id.in_(group_ids), _listed())
+        )
+        listed = {row.id: _scores(row.member_count, row.last_activity_at) for row in result}
+
+        for kind, key in LEADERBOARD_KEYS.items():
+            scored = {str(group_id): scores[kind] for group_id, scores in listed.items() if kind in scores}
+            dropped = [str(group_id) for group_id in group_ids if str(group_id) not in scored]
+            await cache.zadd(key, scored)
+            await cache.zrem(key, *dropped)
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> None:
+        """Rebuild both leaderboards from every listed group"""
+        cache = await get_cache()
+        if not cache.redis:
+            return
+
+        result = await db.execute(
+            select(Group.id, Group.member_count, Group.last_activity_at).where(_listed())
+        )
+        boards = {kind: {} for kind in LEADERBOARD_KEYS}
+        for row in result:
+            for kind, score in _scores(row.member_count, row.last_activity_at).items():
+                boards[kind][str(row.id)] = score
+
+        for kind, key in LEADERBOARD_KEYS.items():
+            await cache.zreplace(key, boards[kind])
+        logger.info(f"Rebuilt group leaderboards ({len(boards[POPULAR])} listed groups)")
+
+    @staticmethod
+    async def top_groups(
+        db: AsyncSession,
+        kind: str = POPULAR,
+        limit: int = 10,
+        exclude_ids: Optional[Iterable[int]] = None
+    ) -> List[Group]:
+        """
+        Top listed groups by member count (popular) or latest post (active;
+        groups that never posted aren't ranked)
+
+        Ids come from the leaderboard and the rows from one primary-key lookup,
+        re-checked against the listing filter; falls back to SQL without Redis.
+        """
+        exclude = set(exclude_ids or ())
+        key = LEADERBOARD_KEYS[kind]
+        cache = await get_cache()
+
+        if cache.redis:
+            if not await cache.exists(key):
+                await GroupLeaderboardService.rebuild(db)
+            ranked = await cache.zrevrange(key, 0, len(exclude) + limit + OVERFETCH - 1)
+            ids = [int(group_id) for group_id in ranked if int(group_id) not in exclude]
+            if ids:
+                result = await db.execute(select(Group).where(Group.id.in_(ids), _listed()))
+                by_id = {group.id: group for group in result.scalars().all()}
+                groups = [by_id[group_id] for group_id in ids if group_id in by_id][:limit]
+                # A full page, or the whole leaderboard was read; otherwise too many
+                # entries were stale, and the SQL path is exact
+                if len(groups) == limit or len(ranked) < len(exclude) + limit + OVERFETCH:
+                    return groups
+
+        query = select(Group).where(_listed())
+        if kind == ACTIVE:
+            query = query.where(Group.last_activity_at.isnot(None))
+        if exclude:
+            query = query.where(Group.id.notin_(exclude))
+        result = await db.execute(query.order_by(*_sql_order(kind)).limit(limit))
+        return list(result.scalars().all())
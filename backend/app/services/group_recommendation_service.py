@@ -0,0 +1,520 @@
+"""
+Group Recommendation Service
+Precomputed "groups you might like" per user
+
+Groups and users are encoded as sparse vectors over a shared vocabulary of
+interest terms (group tags and interests, user interests). A user's top
+groups blend three signals:
+
+    interest     cosine similarity of the user's interests and the group's
+                 terms (TF-IDF weighted, so "fiction" counts less than
+                 "cozy-mystery")
+    co-members   groups that share members with the user's own groups
+    popularity   log-scaled member count
+
+Only listed groups (public, active, not deleted) are ranked, and the user's
+own groups are left out. Results go to group_recommendations, one row per
+user, so reads are a primary-key lookup.
+
+Refreshing happens offline, never in a request (fitting reads every group
+and membership):
+- mark_users_dirty: after a user's interests change, or when they have no
+  recommendations yet - queues the user
+- mark_terms_dirty: after a group's tags/interests change - queues its old
+  and new terms
+- refresh_dirty: refits once and rescores the queued users and every user
+  sharing a queued term (scripts/rebuild_group_recommendations.py --dirty)
+- rebuild: every user, in batches (scripts/rebuild_group_recommendations.py)
+
+Both score against a GroupRecommender fitted from the whole group table.
+Fitting and batch scoring are CPU bound and run in a worker thread.
+
+NumPy and SciPy are optional: without them the recommender is unavailable
+and suggestions fall back to interest matching and the popularity
+leaderboard.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.lazy import LazyModule, module_available
+from app.models.collaboration import Group, GroupMember
+from app.models.group_recommendation import GroupRecommendation
+from app.models.user import User
+from app.services.cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+np = LazyModule("numpy")
+sparse = LazyModule("scipy.sparse")
+
+RECOMMENDER_AVAILABLE = module_available("numpy") and module_available("scipy")
+
+TOP_K = 50
+INDEX_TTL_SECONDS = 900
+BATCH_SIZE = 5000
+
+# Terms of groups edited and users changed since the last refresh_dirty run
+DIRTY_TERMS_KEY = "group_recommendations:dirty_terms"
+DIRTY_USERS_KEY = "group_recommendations:dirty_users"
+
+DEFAULT_WEIGHTS = {"interest": 0.6, "co_members": 0.25, "popularity": 0.15}
+
+
+def normalize_term(term) -> str:
+    return str(term).strip().lower()
+
+
+def group_terms(tags, interests) -> List[str]:
+    """A group's vocabulary: its tags (JSON list) and interests (array)"""
+    terms = []
+    for values in (tags, interests):
+        if isinstance(values, list):
+            terms.extend(normalize_term(value) for value in values if value)
+    return sorted(set(terms))
+
+
+# ============================================================================
+# Sparse helpers
+# ============================================================================
+
+def _normalize_rows(matrix):
+    """Scale each row of a CSR matrix to unit L2 norm (empty rows stay empty)"""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).dot(matrix).tocsr()
+
+
+def _top_k_per_row(matrix, k: int, key=None):
+    """
+    The k largest entries of every row of a CSR matrix, ranked by `key`
+    (aligned with matrix.data, which must be in canonical order; defaults to
+    the values). Returns a CSR matrix whose entries are stored best first
+    within each row.
+    """
+    matrix = matrix.tocsr()
+    matrix.sum_duplicates()
+    key = np.asarray(matrix.data if key is None else key, dtype=np.float64)
+    counts = np.diff(matrix.indptr)
+    rows = np.repeat(np.arange(matrix.shape[0]), counts)
+    # One argsort on row + (1 - scaled key): rows stay contiguous, best first
+    # inside each - much cheaper than lexsort on two keys
+    if key.size:
+        low, high = key.min(), key.max()
+        scaled = (key - low) / (high - low) if high > low else np.zeros_like(key)
+        order = np.argsort(rows + (1.0 - scaled) * 0.5)
+    else:
+        order = np.zeros(0, dtype=np.int64)
+    rank = np.arange(order.size) - matrix.indptr[rows[order]]
+    keep = order[rank < k]
+    indptr = np.concatenate(([0], np.cumsum(np.minimum(counts, k))))
+    return sparse.csr_matrix(
+        (matrix.data[keep], matrix.indices[keep], indptr), shape=matrix.shape
+    )
+
+
+def _binary_csr(rows, cols, shape):
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=shape
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1.0
+    return matrix
+
+
+# ============================================================================
+# Recommender
+# ============================================================================
+
+class GroupRecommender:
+    """
+    Similarity index over the listed groups
+
+    Fitted once from every group's terms and member count plus all
+    memberships, then scores users in batches with sparse matrix products:
+
+        S = U · Gᵀ            interest similarity (U, G row-normalized TF-IDF)
+        C = M_u · N           co-membership (N: top group neighbours by
+                              member overlap, cosine-normalized)
+        score = wᵢS + w_cC + w_p·pop, then the user's own groups removed
+
+    To keep S sparse at scale, each term only points at its
+    `term_candidates` most popular groups. Groups outside every candidate
+    list can still be recommended on popularity alone.
+    """
+
+    def __init__(
+        self,
+        group_ids: Sequence[int],
+        terms: Sequence[Sequence[str]],
+        member_counts: Sequence[int],
+        member_user_ids: Sequence[int],
+        member_group_ids: Sequence[int],
+        weights: Optional[Dict[str, float]] = None,
+        term_candidates: int = 200,
+        neighbors: int = 50,
+    ):
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        group_ids = np.asarray(group_ids, dtype=np.int64)
+        order = np.argsort(group_ids, kind="stable")
+        self.group_ids = group_ids[order]
+        terms = [terms[i] for i in order]
+        counts = np.asarray(member_counts, dtype=np.float64)[order]
+        n_groups = len(self.group_ids)
+
+        # Vocabulary and TF-IDF group matrix
+        self.vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, group_terms_ in enumerate(terms):
+            for term in group_terms_:
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(normalize_term(term), len(self.vocabulary)))
+        n_terms = max(len(self.vocabulary), 1)
+        groups = _binary_csr(rows, cols, (n_groups, n_terms))
+        document_frequency = np.bincount(groups.indices, minlength=n_terms)
+        idf = np.log((1.0 + n_groups) / (1.0 + document_frequency)) + 1.0
+        groups = _normalize_rows(groups.dot(sparse.diags(idf.astype(np.float32))))
+
+        # Popularity in [0, 1]
+        peak = np.log1p(counts.max()) if n_groups and counts.max() > 0 else 1.0
+        self.popularity = (np.log1p(counts) / peak).astype(np.float32)
+        self.popular_order = np.argsort(-self.popularity, kind="stable")
+
+        # term -> candidate groups, the most popular first
+        term_groups = groups.T.tocsr()
+        term_groups.sum_duplicates()
+        self.term_groups = _top_k_per_row(
+            term_groups, term_candidates, key=self.popularity[term_groups.indices]
+        )
+
+        # group -> neighbour groups by shared members
+        memberships = self._memberships(member_user_ids, member_group_ids)
+        co_members = memberships.T.dot(memberships).tocsr()
+        co_members = (co_members - sparse.diags(co_members.diagonal())).tocsr()
+        co_members.eliminate_zeros()
+        sizes = np.sqrt(np.asarray(memberships.sum(axis=0)).ravel())
+        sizes[sizes == 0] = 1.0
+        co_members = sparse.diags(1.0 / sizes).dot(co_members).dot(sparse.diags(1.0 / sizes))
+        self.neighbors = _top_k_per_row(co_members.tocsr(), neighbors)
+
+    @property
+    def size(self) -> int:
+        return len(self.group_ids)
+
+    def _columns(self, group_ids) -> Tuple:
+        """Column of each group id, and which ids are in the index"""
+        group_ids = np.asarray(group_ids, dtype=np.int64)
+        if not self.size:
+            return np.zeros(len(group_ids), dtype=np.int64), np.zeros(len(group_ids), dtype=bool)
+        columns = np.minimum(np.searchsorted(self.group_ids, group_ids), self.size - 1)
+        return columns, self.group_ids[columns] == group_ids
+
+    def _memberships(self, user_ids, group_ids):
+        """Users x groups membership matrix (users renumbered 0..n)"""
+        columns, known = self._columns(group_ids)
+        _, rows = np.unique(np.asarray(user_ids, dtype=np.int64)[known], return_inverse=True)
+        return _binary_csr(rows, columns[known], (int(rows.max()) + 1 if rows.size else 0, self.size))
+
+    def recommend(
+        self,
+        user_interests: Sequence[Sequence[str]],
+        user_groups: Sequence[Sequence[int]],
+        k: int = TOP_K,
+    ) -> List[List[Tuple[int, float]]]:
+        """Top (group_id, score) pairs, best first, for each user of a batch"""
+        n_users = len(user_interests)
+        if not self.size or not n_users:
+            return [[] for _ in range(n_users)]
+        shape = (n_users, self.size)
+
+        rows, cols = [], []
+        for row, interests in enumerate(user_interests):
+            for term in interests or ():
+                column = self.vocabulary.get(normalize_term(term))
+                if column is not None:
+                    rows.append(row)
+                    cols.append(column)
+        interests = _normalize_rows(_binary_csr(rows, cols, (n_users, self.term_groups.shape[0])))
+
+        member_rows = np.repeat(np.arange(n_users), [len(groups) for groups in user_groups])
+        member_ids = np.concatenate([np.asarray(groups, dtype=np.int64) for groups in user_groups])
+        columns, known = self._columns(member_ids)
+        own = _binary_csr(member_rows[known], columns[known], shape)
+
+        similarity = interests.dot(self.term_groups).tocsr()
+        co_members = own.dot(self.neighbors).tocsr()
+        peaks = np.asarray(co_members.max(axis=1).todense()).ravel()
+        peaks[peaks == 0] = 1.0
+        co_members = sparse.diags(1.0 / peaks).dot(co_members)
+
+        scores = (
+            self.weights["interest"] * similarity + self.weights["co_members"] * co_members
+        ).tocsr()
+        scores.data += self.weights["popularity"] * self.popularity[scores.indices]
+
+        # Everyone also gets the most popular groups as candidates, enough to
+        # fill k after removing their own
+        extra = min(self.size, k + int(np.diff(own.indptr).max(initial=0)))
+        popular = self.popular_order[:extra]
+        fallback = sparse.csr_matrix(
+            (
+                np.tile(self.weights["popularity"] * self.popularity[popular], n_users),
+                np.tile(popular, n_users),
+                np.arange(n_users + 1) * extra,
+            ),
+            shape=shape,
+        )
+        fallback.sort_indices()
+        scores = scores.maximum(fallback)
+        scores = (scores - scores.multiply(own)).tocsr()
+        scores.eliminate_zeros()
+
+        top = _top_k_per_row(scores, k)
+        pairs = list(zip(self.group_ids[top.indices].tolist(), np.round(top.data.astype(np.float64), 6).tolist()))
+        bounds = top.indptr.tolist()
+        return [pairs[bounds[row]:bounds[row + 1]] for row in range(n_users)]
+
+
+# ============================================================================
+# Service
+# ============================================================================
+
+_index: Optional[GroupRecommender] = None
+_index_built_at = 0.0
+_index_lock = asyncio.Lock()
+
+
+class GroupRecommendationService:
+    """Service for precomputed group recommendations."""
+
+    @staticmethod
+    async def build_index(db: AsyncSession) -> GroupRecommender:
+        """Fit the recommender from every listed group and all memberships"""
+        listed = and_(Group.is_public == True, Group.is_active == True, Group.is_deleted == False)
+        result = await db.execute(
+            select(Group.id, Group.tags, Group.interests, Group.member_count).where(listed)
+        )
+        group_ids, terms, member_counts = [], [], []
+        for row in result:
+            group_ids.append(row.id)
+            terms.append(group_terms(row.tags, row.interests))
+            member_counts.append(row.member_count)
+
+        result = await db.execute(
+            select(GroupMember.user_id, GroupMember.group_id)
+            .join(Group, Group.id == GroupMember.group_id)
+            .where(listed)
+        )
+        memberships = result.all()
+
+        return await asyncio.to_thread(
+            GroupRecommender,
+            group_ids, terms, member_counts,
+            [user_id for user_id, _ in memberships],
+            [group_id for _, group_id in memberships],
+        )
+
+    @staticmethod
+    async def get_index(db: AsyncSession, max_age: float = INDEX_TTL_SECONDS) -> GroupRecommender:
+        """The fitted recommender for this process, refitted when older than max_age"""
+        global _index, _index_built_at
+        requested = time.monotonic()
+        # One fit at a time; callers that waited reuse it
+        async with _index_lock:
+            if _index is None or requested - _index_built_at > max_age:
+                started = time.monotonic()
+                _index = await GroupRecommendationService.build_index(db)
+                _index_built_at = time.monotonic()
+                logger.info(
+                    f"Fitted group recommender: {_index.size} groups, "
+                    f"{len(_index.vocabulary)} terms in {_index_built_at - started:.1f}s"
+                )
+            return _index
+
+    @staticmethod
+    async def _score_and_store(
+        db: AsyncSession,
+        index: GroupRecommender,
+        users: Sequence[Tuple[int, Optional[List[str]]]],
+    ) -> int:
+        """Score one batch of (user_id, interests) and upsert their rows"""
+        if not users:
+            return 0
+        user_ids = [user_id for user_id, _ in users]
+        result = await db.execute(
+            select(GroupMember.user_id, GroupMember.group_id)
+            .where(GroupMember.user_id.in_(user_ids))
+        )
+        own: Dict[int, List[int]] = {}
+        for user_id, group_id in result:
+            own.setdefault(user_id, []).append(group_id)
+
+        ranked = await asyncio.to_thread(
+            index.recommend,
+            [interests or [] for _, interests in users],
+            [own.get(user_id, []) for user_id in user_ids],
+        )
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "user_id": user_id,
+                "group_ids": [group_id for group_id, _ in top],
+                "scores": [score for _, score in top],
+                "computed_at": now,
+            }
+            for user_id, top in zip(user_ids, ranked)
+        ]
+        statement = insert(GroupRecommendation)
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[GroupRecommendation.user_id],
+                set_={
+                    "group_ids": statement.excluded.group_ids,
+                    "scores": statement.excluded.scores,
+                    "computed_at": statement.excluded.computed_at,
+                },
+            ),
+            rows,
+        )
+        await db.commit()
+        return len(rows)
+
+    @staticmethod
+    async def refresh_users(
+        db: AsyncSession,
+        user_ids: Iterable[int],
+        index: Optional[GroupRecommender] = None,
+        batch_size: int = BATCH_SIZE,
+    ) -> int:
+        """Recompute the recommendations of some users"""
+        if not RECOMMENDER_AVAILABLE:
+            return 0
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return 0
+        index = index or await GroupRecommendationService.get_index(db)
+        refreshed = 0
+        for start in range(0, len(user_ids), batch_size):
+            result = await db.execute(
+                select(User.id, User.interests).where(User.id.in_(user_ids[start:start + batch_size]))
+            )
+            refreshed += await GroupRecommendationService._score_and_store(db, index, result.all())
+        return refreshed
+
+    @staticmethod
+    async def _refresh_where(db: AsyncSession, index: GroupRecommender, condition, batch_size: int) -> int:
+        """Recompute every user matching condition, in id-ordered batches"""
+        refreshed, last_id = 0, 0
+        while True:
+            result = await db.execute(
+                select(User.id, User.interests)
+                .where(condition, User.id > last_id)
+                .order_by(User.id)
+                .limit(batch_size)
+            )
+            users = result.all()
+            if not users:
+                return refreshed
+            refreshed += await GroupRecommendationService._score_and_store(db, index, users)
+            last_id = users[-1].id
+
+    @staticmethod
+    async def mark_terms_dirty(terms: Iterable[str]) -> None:
+        """Queue the users sharing any of these terms for the next refresh_dirty"""
+        terms = sorted(set(terms))
+        if not RECOMMENDER_AVAILABLE or not terms:
+            return
+        cache = await get_cache()
+        await cache.sadd(DIRTY_TERMS_KEY, terms)
+
+    @staticmethod
+    async def mark_users_dirty(user_ids: Iterable[int]) -> None:
+        """Queue users for the next refresh_dirty"""
+        user_ids = sorted(set(user_ids))
+        if not RECOMMENDER_AVAILABLE or not user_ids:
+            return
+        cache = await get_cache()
+        await cache.sadd(DIRTY_USERS_KEY, user_ids)
+
+    @staticmethod
+    async def _take_dirty(key: str) -> List[str]:
+        """Every member of a queue, emptying it"""
+        cache = await get_cache()
+        if not cache.redis:
+            return []
+        try:
+            pipe = cache.redis.pipeline(transaction=True)
+            pipe.smembers(key)
+            pipe.delete(key)
+            members, _ = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error reading {key}: {e}")
+            return []
+        return sorted(members)
+
+    @staticmethod
+    async def refresh_for_terms(
+        db: AsyncSession,
+        terms: Iterable[str],
+        batch_size: int = BATCH_SIZE,
+        index: Optional[GroupRecommender] = None,
+    ) -> int:
+        """Recompute every user sharing one of the terms (refitting the index unless given)"""
+        terms = set(terms)
+        if not terms:
+            return 0
+        # Interests are stored as entered; match the usual spellings
+        variants = sorted(terms | {term.title() for term in terms} | {term.capitalize() for term in terms})
+        index = index or await GroupRecommendationService.get_index(db, max_age=0)
+        return await GroupRecommendationService._refresh_where(
+            db, index, User.interests.overlap(variants), batch_size
+        )
+
+    @staticmethod
+    async def refresh_dirty(db: AsyncSession, batch_size: int = BATCH_SIZE) -> int:
+        """Recompute the users queued by mark_users_dirty and those sharing a term queued by mark_terms_dirty"""
+        if not RECOMMENDER_AVAILABLE:
+            raise RuntimeError("numpy and scipy are required to build group recommendations")
+        terms = await GroupRecommendationService._take_dirty(DIRTY_TERMS_KEY)
+        user_ids = [int(user_id) for user_id in await GroupRecommendationService._take_dirty(DIRTY_USERS_KEY)]
+        if not terms and not user_ids:
+            return 0
+        try:
+            index = await GroupRecommendationService.get_index(db, max_age=0)
+            refreshed = await GroupRecommendationService.refresh_users(db, user_ids, index, batch_size)
+            return refreshed + await GroupRecommendationService.refresh_for_terms(db, terms, batch_size, index)
+        except Exception:
+            # Left for the next run
+            await GroupRecommendationService.mark_terms_dirty(terms)
+            await GroupRecommendationService.mark_users_dirty(user_ids)
+            raise
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, batch_size: int = BATCH_SIZE) -> int:
+        """Recompute every active user's recommendations"""
+        if not RECOMMENDER_AVAILABLE:
+            raise RuntimeError("numpy and scipy are required to build group recommendations")
+        # Covers every queued term and user; changes from here on are queued again
+        cache = await get_cache()
+        await cache.delete(DIRTY_TERMS_KEY)
+        await cache.delete(DIRTY_USERS_KEY)
+        index = await GroupRecommendationService.get_index(db, max_age=0)
+        return await GroupRecommendationService._refresh_where(
+            db, index, User.is_active == True, batch_size
+        )
+
+    @staticmethod
+    async def get_recommended_group_ids(db: AsyncSession, user_id: int) -> Optional[List[int]]:
+        """A user's stored recommendations, best first (None if never computed)"""
+        result = await db.execute(
+            select(GroupRecommendation.group_ids).where(GroupRecommendation.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
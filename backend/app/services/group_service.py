@@ -10,6 +10,8 @@ from fastapi import HTTPException
 from app.models import Group, GroupMember, GroupMemberRole, GroupPrivacyType
 from app.models.collaboration import PrivacyLevel
 from app.models.user import User
+from app.services.group_leaderboard_service import GroupLeaderboardService
+from app.services.loaders import GROUP, invalidate_summary
 
 
 class GroupService:
@@ -133,6 +135,7 @@ class GroupService:
         
         await db.commit()
         await db.refresh(group)
+        await GroupLeaderboardService.refresh(db, group.id)
         
         # Load members
         result = await db.execute(
@@ -233,6 +236,8 @@ class GroupService:
         
         await db.commit()
         await db.refresh(group)
+        await invalidate_summary(GROUP, group.id)
+        await GroupLeaderboardService.refresh(db, group.id)
         
         # Load members
         result = await db.execute(
@@ -247,11 +252,15 @@ class GroupService:
         db: AsyncSession,
         user_id: Optional[int] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        sort: str = "newest"
     ) -> List[Group]:
         """
         Get groups that are discoverable based on privacy level and user status.
         
+        sort: "newest", "popular" (most members) or "active" (latest post),
+        the latter two ordered by the maintained counters on the group row.
+        
         Privacy visibility:
         - PUBLIC: Always visible in search
         - GUARDED: Visible to logged-in users
@@ -283,7 +292,13 @@ class GroupService:
                 )
             )
         
-        query = query.order_by(Group.created_at.desc()).limit(limit).offset(offset)
+        if sort == "popular":
+            order = [Group.member_count.desc(), Group.id]
+        elif sort == "active":
+            order = [Group.last_activity_at.desc().nulls_last(), Group.id]
+        else:
+            order = [Group.created_at.desc()]
+        query = query.order_by(*order).limit(limit).offset(offset)
         
         result = await db.execute(query)
         return result.scalars().all()
@@ -331,11 +346,6 @@ class GroupService:
         existing = result.scalar_one_or_none()
         
         if existing:
-            # Reactivate if inactive
-            if not existing.is_active:
-                existing.is_active = True
-                await db.commit()
-                await db.refresh(existing)
             return existing
         
         member = GroupMember(
@@ -346,6 +356,7 @@ class GroupService:
         db.add(member)
         await db.commit()
         await db.refresh(member)
+        await GroupLeaderboardService.refresh(db, group_id)
         
         # Load user relationship
         result = await db.execute(
@@ -396,8 +407,9 @@ class GroupService:
         if member.role == GroupMemberRole.OWNER:
             return False
         
-        member.is_active = False
+        await db.delete(member)
         await db.commit()
+        await GroupLeaderboardService.refresh(db, group_id)
         return True
     
     @staticmethod
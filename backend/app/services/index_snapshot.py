@@ -0,0 +1,61 @@
+"""
+Index Snapshots
+Versioned directories of .npy arrays for the local content indexes under
+CONTENT_INDEX_DIR (near-duplicates, similarity)
+
+Each build is written to its own v{timestamp} directory next to a
+meta.json, then a CURRENT file naming it is swapped in atomically, so
+readers never see a half-written index. The previous version is kept for
+readers still opening it; older ones are removed.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.core.lazy import LazyModule
+
+np = LazyModule("numpy")
+
+
+def current_name(root: str) -> Optional[str]:
+    """Directory name of the live snapshot under root"""
+    try:
+        with open(os.path.join(root, "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_meta(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, "meta.json")) as f:
+        return json.load(f)
+
+
+def load_arrays(path: str, names) -> Dict[str, Any]:
+    """Arrays of a snapshot, memory-mapped"""
+    return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names}
+
+
+def save_snapshot(root: str, built_at: datetime, arrays: Dict[str, Any], meta: Dict[str, Any]) -> str:
+    """Write a snapshot and make it the current one; returns its path"""
+    name = f"v{built_at.strftime('%Y%m%d%H%M%S%f')}"
+    path = os.path.join(root, name)
+    os.makedirs(path, exist_ok=True)
+
+    for array_name, array in arrays.items():
+        np.save(os.path.join(path, f"{array_name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"built_at": built_at.isoformat(), **meta}, f)
+
+    current = os.path.join(root, "CURRENT")
+    previous = current_name(root)
+    with open(f"{current}.tmp", "w") as f:
+        f.write(name)
+    os.replace(f"{current}.tmp", current)
+
+    for entry in os.listdir(root):
+        if entry.startswith("v") and entry not in (name, previous):
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+    return path
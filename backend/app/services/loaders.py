@@ -0,0 +1,279 @@
+"""
+Request-scoped batch loaders
+Hydrate users, profiles, groups and badges without one query per row
+
+Every `.load(id)` made in the same event loop tick is collected and resolved
+by a single `IN (...)` query. Summaries are plain dicts, shared between
+requests through a short-TTL Redis cache, so hot authors and groups usually
+cost no query at all.
+
+A fresh set of loaders is created per request (FastAPI caches dependencies
+for the lifetime of a request), so results never leak between users beyond
+the public summaries kept in Redis.
+
+Usage:
+    from app.services.loaders import Loaders, get_loaders
+
+    @router.get("/posts")
+    async def list_posts(
+        db: AsyncSession = Depends(get_db),
+        loaders: Loaders = Depends(get_loaders),
+    ):
+        posts = ...
+        authors = await loaders.users.load_many([p.author_id for p in posts])
+
+Calls are only batched when they are pending together - use load_many() or
+asyncio.gather() rather than awaiting load() inside a loop. Don't run other
+queries on the same session while loads are pending; batches take the
+session in turn, but the endpoint's own queries don't.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.models.collaboration import Group
+from app.models.user import User, UserBadge, UserProfile
+from app.services.cache_service import get_cache
+
+# Summaries are small and cheap to rebuild; a short TTL keeps renamed users
+# and changed avatars from lingering even where nothing invalidates them
+SUMMARY_TTL = 60
+
+USER = "user"
+PROFILE = "profile"
+GROUP = "group"
+BADGES = "badges"
+
+
+def summary_key(kind: str, id: int) -> str:
+    return f"summary:{kind}:{id}"
+
+
+def user_label(user: dict) -> str:
+    """Name to show for a user summary, for users still without a username"""
+    return user["display_name"] or user["username"] or f"User {user['id']}"
+
+
+async def invalidate_summary(kind: str, id: int):
+    """Drop a cached summary after the underlying row changes"""
+    cache = await get_cache()
+    await cache.delete(summary_key(kind, id))
+
+
+class DataLoader:
+    """
+    Coalesces load(key) calls made in the same event loop tick into one
+    batch_load(keys) call, and memoizes results for the loader's lifetime
+
+    batch_load receives a list of unique keys and returns a dict; keys
+    missing from the dict resolve to None.
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        max_batch_size: int = 500,
+    ):
+        self._batch_load = batch_load
+        self.max_batch_size = max_batch_size
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self._dispatch_scheduled = False
+        self._tasks = set()
+
+    def load(self, key: Optional[Hashable]) -> Awaitable[Any]:
+        """Future resolving to the value for key (None for a None key)"""
+        loop = asyncio.get_running_loop()
+        if key is None:
+            future = loop.create_future()
+            future.set_result(None)
+            return future
+
+        future = self._futures.get(key)
+        if future is not None:
+            return future
+
+        future = loop.create_future()
+        self._futures[key] = future
+        self._queue.append(key)
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[Optional[Hashable]]) -> List[Any]:
+        """Values for keys, in order, fetched in as few batches as possible"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Hashable, value: Any):
+        """Seed the loader with a value the caller already has"""
+        if key in self._futures:
+            return
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._futures[key] = future
+
+    def clear(self, key: Hashable):
+        """Forget a memoized value so the next load fetches it again"""
+        self._futures.pop(key, None)
+
+    def _dispatch(self):
+        self._dispatch_scheduled = False
+        keys, self._queue = self._queue, []
+        for start in range(0, len(keys), self.max_batch_size):
+            task = asyncio.ensure_future(self._run_batch(keys[start:start + self.max_batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, keys: List[Hashable]):
+        try:
+            values = await self._batch_load(keys)
+        except Exception as e:
+            for key in keys:
+                # Failed keys are retried by the next load() instead of
+                # replaying the error for the rest of the request
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for key in keys:
+            future = self._futures.get(key)
+            if future is not None and not future.done():
+                future.set_result(values.get(key))
+
+
+# ============================================================================
+# Summary queries
+# ============================================================================
+
+async def _fetch_users(db: AsyncSession, ids: List[int]) -> Dict[int, dict]:
+    # Shared between users through Redis: nothing private (no email)
+    result = await db.execute(
+        select(
+            User.id, User.username, User.display_name,
+            User.reading_score, User.beta_score, User.writer_score,
+        ).where(User.id.in_(ids))
+    )
+    return {
+        row.id: {
+            "id": row.id,
+            "username": row.username,
+            "display_name": row.display_name,
+            "reading_score": row.reading_score,
+            "beta_score": row.beta_score,
+            "writer_score": row.writer_score,
+        }
+        for row in result.all()
+    }
+
+
+async def _fetch_profiles(db: AsyncSession, ids: List[int]) -> Dict[int, dict]:
+    result = await db.execute(
+        select(
+            UserProfile.user_id, UserProfile.avatar_url, UserProfile.bio,
+            UserProfile.location, UserProfile.profile_visibility,
+        ).where(UserProfile.user_id.in_(ids))
+    )
+    return {
+        row.user_id: {
+            "user_id": row.user_id,
+            "avatar_url": row.avatar_url,
+            "bio": row.bio,
+            "location": row.location,
+            "profile_visibility": row.profile_visibility,
+        }
+        for row in result.all()
+    }
+
+
+async def _fetch_groups(db: AsyncSession, ids: List[int]) -> Dict[int, dict]:
+    result = await db.execute(
+        select(
+            Group.id, Group.name, Group.slug, Group.avatar_url,
+            Group.is_public, Group.is_active,
+        ).where(Group.id.in_(ids))
+    )
+    return {
+        row.id: {
+            "id": row.id,
+            "name": row.name,
+            "slug": row.slug,
+            "avatar_url": row.avatar_url,
+            "is_public": row.is_public,
+            "is_active": row.is_active,
+        }
+        for row in result.all()
+    }
+
+
+async def _fetch_badges(db: AsyncSession, ids: List[int]) -> Dict[int, list]:
+    result = await db.execute(
+        select(
+            UserBadge.user_id, UserBadge.badge_type, UserBadge.badge_name,
+            UserBadge.badge_icon, UserBadge.is_visible,
+        )
+        .where(UserBadge.user_id.in_(ids))
+        .order_by(UserBadge.user_id, UserBadge.display_order, UserBadge.id)
+    )
+    # Every requested user gets a list, so "no badges" is cached too
+    badges = {id: [] for id in ids}
+    for row in result.all():
+        badges[row.user_id].append({
+            "badge_type": row.badge_type,
+            "badge_name": row.badge_name,
+            "badge_icon": row.badge_icon,
+            "is_visible": row.is_visible,
+        })
+    return badges
+
+
+class Loaders:
+    """The set of loaders for one request, sharing its database session"""
+
+    def __init__(self, db: AsyncSession, use_cache: bool = True):
+        self.db = db
+        self.use_cache = use_cache
+        # One AsyncSession can't run two statements at once, and batches
+        # from different loaders are dispatched in the same tick
+        self._lock = asyncio.Lock()
+
+        self.users = DataLoader(lambda ids: self._load(USER, ids, _fetch_users))
+        self.profiles = DataLoader(lambda ids: self._load(PROFILE, ids, _fetch_profiles))
+        self.groups = DataLoader(lambda ids: self._load(GROUP, ids, _fetch_groups))
+        self.badges = DataLoader(lambda ids: self._load(BADGES, ids, _fetch_badges))
+
+    async def _load(
+        self,
+        kind: str,
+        ids: List[int],
+        fetch: Callable[[AsyncSession, List[int]], Awaitable[Dict[int, Any]]],
+    ) -> Dict[int, Any]:
+        """Summaries from Redis where cached, the rest in one query"""
+        found = {}
+        cache = None
+        if self.use_cache:
+            cache = await get_cache()
+            cached = await cache.get_many([summary_key(kind, id) for id in ids])
+            found = {id: value for id, value in zip(ids, cached) if value is not None}
+
+        missing = [id for id in ids if id not in found]
+        if missing:
+            async with self._lock:
+                fetched = await fetch(self.db, missing)
+            found.update(fetched)
+            if cache is not None and fetched:
+                await cache.set_many(
+                    {summary_key(kind, id): value for id, value in fetched.items()},
+                    ttl=SUMMARY_TTL,
+                )
+        return found
+
+
+async def get_loaders(db: AsyncSession = Depends(get_db)) -> Loaders:
+    """FastAPI dependency: loaders bound to the request's session"""
+    return Loaders(db)
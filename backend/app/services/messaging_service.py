@@ -1,12 +1,13 @@
 """
 Messaging service for managing conversations and direct messages.
 """
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone
 from sqlalchemy import select, and_, or_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.pagination import COUNT_NONE, paginate
 from app.models import MessageThread, Message
 
 
@@ -122,18 +123,23 @@ class MessagingService:
         db: AsyncSession,
         conversation_id: int,
         limit: int = 50,
-        offset: int = 0
-    ) -> List[Message]:
-        """Get messages for a conversation."""
-        result = await db.execute(
-            select(Message)
-            .options(selectinload(Message.sender))
-            .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at.desc())
-            .limit(limit)
-            .offset(offset)
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get messages for a conversation, newest first (page dict, see app.core.pagination)."""
+        return await paginate(
+            db,
+            select(Message).where(Message.thread_id == conversation_id),
+            keys=(Message.created_at, Message.id),
+            limit=limit,
+            cursor=cursor,
+            offset=offset,
+            # Message lists never returned a total; only count on request
+            count=count or COUNT_NONE,
+            options=(selectinload(Message.sender),),
+            scope=f"messages:{conversation_id}",
         )
-        return result.scalars().all()
     
     @staticmethod
     async def mark_as_read(
@@ -0,0 +1,507 @@
+"""
+Near-Duplicate Service
+Local pre-screen for plagiarism checks: finds published documents, store
+items and EPUB submissions with nearly the same text before an external
+search is paid for
+
+Text is cut into word 5-shingles and summarized by a 128-permutation MinHash
+signature; the share of equal signature slots estimates the Jaccard
+similarity of two texts. Signatures are kept in content_fingerprints,
+written when a document is published, a store item is created or an EPUB is
+uploaded (the uploader's own work is never matched against them).
+
+Lookups use locality-sensitive hashing: signatures are cut into 32 bands of
+4 slots and texts sharing a band are candidates, so pairs above ~0.5
+similarity are found almost always and unrelated texts are never compared.
+The banded index is a snapshot of the table saved as .npy files under
+CONTENT_INDEX_DIR and opened memory-mapped - shared by the workers,
+kept across restarts and rebuilt by scripts/near_duplicate_index.py. Rows
+written since the snapshot are compared directly.
+
+NumPy is optional: without it the pre-screen finds nothing and every check
+goes to the external service.
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+import zlib
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, delete, func, and_, exists
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.lazy import LazyModule, module_available
+from app.models.base import utc_now
+from app.models.content_fingerprint import ContentFingerprint
+from app.models.document import Document, DocumentStatus
+from app.models.epub_submission import EpubSubmission
+from app.models.store import StoreItem
+from app.services.document_service import document_text
+from app.services.index_snapshot import current_name, load_arrays, read_meta, save_snapshot
+
+logger = logging.getLogger(__name__)
+
+np = LazyModule("numpy")
+
+PRESCREEN_AVAILABLE = module_available("numpy")
+
+DOCUMENT = "document"
+STORE_ITEM = "store_item"
+EPUB_SUBMISSION = "epub_submission"
+KINDS = (DOCUMENT, STORE_ITEM, EPUB_SUBMISSION)
+
+SHINGLE_WORDS = 5
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+# Copyscape's minimum too; shorter texts match too easily
+MIN_WORDS = 25
+MAX_CHARS = 500_000
+
+# Estimated similarity reported as a match, and at which a match is certain
+# enough to skip the external check
+MATCH_SIMILARITY = 0.5
+HIGH_CONFIDENCE = 0.8
+MAX_MATCHES = 10
+
+# Rows compared directly when the snapshot is missing or old
+MAX_DELTA_ROWS = 20_000
+BACKFILL_BATCH = 200
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_HASH_CHUNK = 8192
+_WORD = re.compile(r"\w+")
+
+
+def index_dir() -> str:
+    return os.path.join(settings.CONTENT_INDEX_DIR, "near_duplicate")
+
+
+# ============================================================================
+# MinHash
+# ============================================================================
+
+@lru_cache(maxsize=1)
+def _permutations():
+    """Fixed (a, b) of the NUM_PERM hash permutations - part of the index format"""
+    rng = np.random.RandomState(1)
+    a = rng.randint(1, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.uint64)
+    b = rng.randint(0, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.uint64)
+    return a, b
+
+
+def signature(text: str) -> Tuple[Optional[Any], int]:
+    """
+    MinHash signature (NUM_PERM uint32) of a text and its word count
+    The signature is None below MIN_WORDS
+    """
+    words = _WORD.findall((text or "")[:MAX_CHARS].lower())
+    if len(words) < MIN_WORDS:
+        return None, len(words)
+
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+    a, b = _permutations()
+    minimum = np.full(NUM_PERM, _MAX_HASH, dtype=np.uint64)
+    for start in range(0, len(hashes), _HASH_CHUNK):
+        chunk = hashes[start:start + _HASH_CHUNK, None]
+        # (a * x + b) mod p, wrapping in 64 bits like the reference MinHash
+        permuted = np.bitwise_and((chunk * a + b) % np.uint64(_MERSENNE_PRIME), np.uint64(_MAX_HASH))
+        np.minimum(minimum, permuted.min(axis=0), out=minimum)
+    return minimum.astype(np.uint32), len(words)
+
+
+def band_keys(signatures) -> Any:
+    """One uint64 key per band: (N, NUM_PERM) signatures -> (N, BANDS)"""
+    bands = signatures.reshape(-1, BANDS, ROWS).astype(np.uint64)
+    keys = np.zeros(bands.shape[:2], dtype=np.uint64)
+    for row in range(ROWS):
+        keys = keys * np.uint64(0x100000001B3) + bands[:, :, row]
+    return keys
+
+
+def _to_bytes(sig) -> bytes:
+    return sig.astype("<u4").tobytes()
+
+
+def _from_bytes(blobs: List[bytes]) -> Any:
+    return np.frombuffer(b"".join(blobs), dtype="<u4").reshape(-1, NUM_PERM)
+
+
+# ============================================================================
+# Memory-mapped snapshot
+# ============================================================================
+
+class LshSnapshot:
+    """
+    The banded index over content_fingerprints as of built_at
+
+    A snapshot directory holds signatures.npy (N x NUM_PERM), kinds.npy,
+    ids.npy, owners.npy, and per band the sorted keys and their rows
+    (band_keys.npy, band_rows.npy, BANDS x N). index_dir()/CURRENT names the
+    live snapshot, so a rebuild swaps it in atomically.
+    """
+
+    FILES = ("signatures", "kinds", "ids", "owners", "band_keys", "band_rows")
+
+    def __init__(self, path: str, meta: Dict[str, Any]):
+        self.path = path
+        self.built_at = datetime.fromisoformat(meta["built_at"])
+        for name, array in load_arrays(path, self.FILES).items():
+            setattr(self, name, array)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def candidates(self, keys) -> Any:
+        """Rows sharing at least one band key with a query"""
+        found = []
+        for band in range(BANDS):
+            sorted_keys = self.band_keys[band]
+            lo = np.searchsorted(sorted_keys, keys[band], side="left")
+            hi = np.searchsorted(sorted_keys, keys[band], side="right")
+            if hi > lo:
+                found.append(np.asarray(self.band_rows[band, lo:hi]))
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    @staticmethod
+    def write(signatures, kinds, ids, owners, built_at: datetime) -> str:
+        """Save a snapshot and make it the current one; returns its path"""
+        keys = band_keys(signatures).T  # BANDS x N
+        order = np.argsort(keys, axis=1, kind="stable").astype(np.int32)
+        arrays = {
+            "signatures": signatures,
+            "kinds": kinds,
+            "ids": ids,
+            "owners": owners,
+            "band_keys": np.take_along_axis(keys, order, axis=1),
+            "band_rows": order,
+        }
+        return save_snapshot(index_dir(), built_at, arrays, {
+            "count": int(len(ids)),
+            "num_perm": NUM_PERM,
+            "bands": BANDS,
+            "shingle_words": SHINGLE_WORDS,
+        })
+
+
+# Per-process: (snapshot name, snapshot)
+_loaded: Tuple[Optional[str], Optional[LshSnapshot]] = (None, None)
+
+
+def current_snapshot() -> Optional[LshSnapshot]:
+    """The live snapshot, reopened when a rebuild has replaced it"""
+    global _loaded
+    name = current_name(index_dir())
+    if name is None:
+        return None
+    if name != _loaded[0]:
+        path = os.path.join(index_dir(), name)
+        try:
+            meta = read_meta(path)
+            if meta.get("num_perm") != NUM_PERM or meta.get("bands") != BANDS:
+                logger.warning(f"Near-duplicate index {path} has other parameters; rebuild it")
+                return None
+            _loaded = (name, LshSnapshot(path, meta))
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to open near-duplicate index {path}: {e}")
+            return None
+    return _loaded[1]
+
+
+# ============================================================================
+# Service
+# ============================================================================
+
+class NearDuplicateService:
+    """Service for the local near-duplicate index."""
+
+    @staticmethod
+    async def prescreen(
+        db: AsyncSession,
+        text: str,
+        exclude: Optional[Tuple[str, int]] = None,
+        exclude_owner: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Near-duplicates of a text among indexed sources
+
+        Args:
+            exclude: (kind, source_id) of the text itself
+            exclude_owner: The author; their own work isn't a match
+
+        Returns:
+            - matches: [{kind, source_id, title, owner_id, similarity (%)}], best first
+            - best_similarity: highest similarity (%), 0 without matches
+            - high_confidence: the best match is certain enough to skip an external check
+            - elapsed_ms
+        """
+        started = time.perf_counter()
+        result = {"matches": [], "best_similarity": 0.0, "high_confidence": False, "elapsed_ms": 0.0}
+        if not PRESCREEN_AVAILABLE:
+            return result
+
+        sig, _ = await asyncio.to_thread(signature, text)
+        if sig is None:
+            return result
+
+        # (kind, source_id) -> (similarity, owner_id)
+        found: Dict[Tuple[str, int], Tuple[float, Optional[int]]] = {}
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            rows = snapshot.candidates(band_keys(sig[None, :])[0])
+            if len(rows):
+                similarities = (np.asarray(snapshot.signatures[rows]) == sig).mean(axis=1)
+                for row, similarity in zip(rows, similarities):
+                    owner = int(snapshot.owners[row])
+                    found[(KINDS[snapshot.kinds[row]], int(snapshot.ids[row]))] = (
+                        float(similarity), owner if owner >= 0 else None
+                    )
+
+        # Written since the snapshot: compared directly, and newer than it
+        since = snapshot.built_at if snapshot is not None else datetime.min.replace(tzinfo=timezone.utc)
+        delta = (await db.execute(
+            select(
+                ContentFingerprint.kind, ContentFingerprint.source_id,
+                ContentFingerprint.owner_id, ContentFingerprint.signature
+            )
+            .where(ContentFingerprint.updated_at > since)
+            .order_by(ContentFingerprint.updated_at.desc())
+            .limit(MAX_DELTA_ROWS)
+        )).all()
+        if len(delta) == MAX_DELTA_ROWS:
+            logger.warning("Near-duplicate index is far behind content_fingerprints; rebuild it")
+        if delta:
+            similarities = (_from_bytes([row.signature for row in delta]) == sig).mean(axis=1)
+            for row, similarity in zip(delta, similarities):
+                found[(row.kind, row.source_id)] = (float(similarity), row.owner_id)
+
+        ranked = sorted(
+            (
+                (similarity, kind, source_id, owner)
+                for (kind, source_id), (similarity, owner) in found.items()
+                if similarity >= MATCH_SIMILARITY
+                and (kind, source_id) != exclude
+                and (exclude_owner is None or owner != exclude_owner)
+            ),
+            reverse=True,
+        )
+        titles = await NearDuplicateService._live_titles(db, [(kind, source_id) for _, kind, source_id, _ in ranked])
+        for similarity, kind, source_id, owner in ranked:
+            if (kind, source_id) not in titles:
+                continue
+            result["matches"].append({
+                "kind": kind,
+                "source_id": source_id,
+                "title": titles[(kind, source_id)],
+                "owner_id": owner,
+                "similarity": round(similarity * 100, 1),
+            })
+            if len(result["matches"]) >= MAX_MATCHES:
+                break
+
+        if result["matches"]:
+            result["best_similarity"] = result["matches"][0]["similarity"]
+            result["high_confidence"] = result["best_similarity"] >= HIGH_CONFIDENCE * 100
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    @staticmethod
+    async def _live_titles(db: AsyncSession, sources: List[Tuple[str, int]]) -> Dict[Tuple[str, int], str]:
+        """Titles of the sources that still exist (and are still published)"""
+        ids = {kind: [source_id for k, source_id in sources if k == kind] for kind in KINDS}
+        titles: Dict[Tuple[str, int], str] = {}
+        queries = {
+            DOCUMENT: select(Document.id, Document.title).where(
+                Document.id.in_(ids[DOCUMENT]),
+                Document.status == DocumentStatus.PUBLISHED,
+                Document.is_deleted == False,
+            ),
+            STORE_ITEM: select(StoreItem.id, StoreItem.title).where(StoreItem.id.in_(ids[STORE_ITEM])),
+            EPUB_SUBMISSION: select(EpubSubmission.id, EpubSubmission.title).where(
+                EpubSubmission.id.in_(ids[EPUB_SUBMISSION])
+            ),
+        }
+        for kind, stmt in queries.items():
+            if ids[kind]:
+                for source_id, title in (await db.execute(stmt)).all():
+                    titles[(kind, source_id)] = title
+        return titles
+
+    # ========================================================================
+    # Writes
+    # ========================================================================
+
+    @staticmethod
+    async def index(
+        db: AsyncSession,
+        kind: str,
+        source_id: int,
+        owner_id: Optional[int],
+        text: str
+    ) -> bool:
+        """Store (or replace) the fingerprint of a source; False if too short to index"""
+        if not PRESCREEN_AVAILABLE:
+            return False
+        sig, word_count = await asyncio.to_thread(signature, text)
+        if sig is None:
+            await NearDuplicateService.remove(db, kind, source_id)
+            return False
+
+        values = {
+            "owner_id": owner_id,
+            "signature": _to_bytes(sig),
+            "word_count": word_count,
+            "updated_at": utc_now(),
+        }
+        await db.execute(
+            insert(ContentFingerprint)
+            .values(kind=kind, source_id=source_id, **values)
+            .on_conflict_do_update(index_elements=["kind", "source_id"], set_=values)
+        )
+        await db.commit()
+        return True
+
+    @staticmethod
+    async def remove(db: AsyncSession, kind: str, source_id: int) -> None:
+        await db.execute(
+            delete(ContentFingerprint).where(
+                ContentFingerprint.kind == kind, ContentFingerprint.source_id == source_id
+            )
+        )
+        await db.commit()
+
+    @staticmethod
+    async def index_document(
+        db: AsyncSession,
+        document_id: int,
+        store_item_id: Optional[int] = None
+    ) -> bool:
+        """Fingerprint a published document (and the store item made from it)"""
+        document = (await db.execute(
+            select(Document).where(Document.id == document_id)
+        )).scalar_one_or_none()
+        if not document or document.is_deleted or document.status != DocumentStatus.PUBLISHED:
+            return False
+
+        text = await document_text(document)
+        indexed = await NearDuplicateService.index(db, DOCUMENT, document.id, document.owner_id, text)
+        if store_item_id:
+            await NearDuplicateService.index(db, STORE_ITEM, store_item_id, document.owner_id, text)
+        return indexed
+
+    @staticmethod
+    async def index_document_in_background(document_id: int, store_item_id: Optional[int] = None):
+        from app.core.database import get_jobs_session_local
+
+        SessionLocal = get_jobs_session_local()
+        async with SessionLocal() as db:
+            try:
+                await NearDuplicateService.index_document(db, document_id, store_item_id)
+            except Exception as e:
+                logger.error(f"Near-duplicate indexing failed for document {document_id}: {e}")
+
+    # ========================================================================
+    # Maintenance (scripts/near_duplicate_index.py)
+    # ========================================================================
+
+    @staticmethod
+    async def prune(db: AsyncSession) -> int:
+        """Drop fingerprints of unpublished, deleted or removed sources"""
+        live = {
+            DOCUMENT: exists().where(
+                Document.id == ContentFingerprint.source_id,
+                Document.status == DocumentStatus.PUBLISHED,
+                Document.is_deleted == False,
+            ),
+            STORE_ITEM: exists().where(StoreItem.id == ContentFingerprint.source_id),
+            EPUB_SUBMISSION: exists().where(EpubSubmission.id == ContentFingerprint.source_id),
+        }
+        removed = 0
+        for kind, condition in live.items():
+            result = await db.execute(
+                delete(ContentFingerprint).where(ContentFingerprint.kind == kind, ~condition)
+            )
+            removed += result.rowcount
+        await db.commit()
+        return removed
+
+    @staticmethod
+    async def backfill(db: AsyncSession) -> int:
+        """Fingerprint published documents that have none yet"""
+        indexed = 0
+        last_id = 0
+        while True:
+            ids = (await db.execute(
+                select(Document.id)
+                .where(
+                    Document.id > last_id,
+                    Document.status == DocumentStatus.PUBLISHED,
+                    Document.is_deleted == False,
+                    ~exists().where(and_(
+                        ContentFingerprint.kind == DOCUMENT,
+                        ContentFingerprint.source_id == Document.id,
+                    )),
+                )
+                .order_by(Document.id)
+                .limit(BACKFILL_BATCH)
+            )).scalars().all()
+            if not ids:
+                return indexed
+            last_id = ids[-1]
+            for document_id in ids:
+                if await NearDuplicateService.index_document(db, document_id):
+                    indexed += 1
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> Dict[str, Any]:
+        """Snapshot content_fingerprints into a new memory-mapped index"""
+        if not PRESCREEN_AVAILABLE:
+            raise RuntimeError("NumPy is required to build the near-duplicate index")
+
+        # Anything written from here on is read as delta
+        built_at = utc_now()
+        count = (await db.execute(select(func.count()).select_from(ContentFingerprint))).scalar()
+
+        signatures = np.empty((count, NUM_PERM), dtype=np.uint32)
+        kinds = np.empty(count, dtype=np.uint8)
+        ids = np.empty(count, dtype=np.int64)
+        owners = np.empty(count, dtype=np.int64)
+
+        filled = 0
+        rows = await db.stream(
+            select(
+                ContentFingerprint.kind, ContentFingerprint.source_id,
+                ContentFingerprint.owner_id, ContentFingerprint.signature
+            )
+            .where(ContentFingerprint.updated_at <= built_at)
+            .execution_options(yield_per=5000)
+        )
+        async for partition in rows.partitions():
+            for row in partition:
+                if filled == count:
+                    break
+                signatures[filled] = np.frombuffer(row.signature, dtype="<u4")
+                kinds[filled] = KINDS.index(row.kind)
+                ids[filled] = row.source_id
+                owners[filled] = row.owner_id if row.owner_id is not None else -1
+                filled += 1
+        await db.rollback()
+
+        path = await asyncio.to_thread(
+            LshSnapshot.write,
+            signatures[:filled], kinds[:filled], ids[:filled], owners[:filled], built_at
+        )
+        return {"fingerprints": filled, "path": path}
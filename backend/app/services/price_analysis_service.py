@@ -0,0 +1,480 @@
+"""
+Price Analysis Job Service
+Runs bulk market price analysis for store items as a resumable background job
+
+Scraping fans out across items with bounded concurrency per external store,
+market prices are cached per ISBN, and results are written to
+price_analysis_results batch by batch. An interrupted job picks up with the
+items that have no result row yet. A running job renews a lease with every
+batch, so one whose worker died can be reclaimed once the lease is stale.
+Recommended prices are applied with one UPDATE ... FROM (VALUES ...)
+statement per chunk.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional, Dict, List, Any
+
+from sqlalchemy import select, update, insert, func, exists, values, column, or_, and_, Integer, Numeric
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.store import (
+    StoreItem,
+    StoreItemStatus,
+    PriceAnalysisJob,
+    PriceAnalysisJobStatus,
+    PriceAnalysisResult,
+)
+from app.services.cache_service import get_cache
+from app.services.price_scraper import PriceScraper
+from app.services.pricing_engine import PricingEngine
+
+logger = logging.getLogger(__name__)
+
+
+class JobLeaseLost(Exception):
+    """Another run reclaimed the job after this one's lease went stale"""
+    pass
+
+
+class PriceAnalysisService:
+    """Service for bulk, resumable store price analysis"""
+
+    # Items scraped concurrently and committed together
+    BATCH_SIZE = 25
+
+    # Maximum in-flight requests per external store across a whole job
+    SOURCE_CONCURRENCY = {
+        'amazon': 2,  # Scraped HTML - easily rate limited
+        'google': 8,
+        'apple': 4,
+    }
+
+    # Market prices change slowly; reuse them across jobs for a few hours
+    MARKET_PRICE_CACHE_TTL = 6 * 60 * 60
+
+    # Rows per UPDATE ... FROM (VALUES ...) statement
+    APPLY_CHUNK_SIZE = 1000
+
+    # Jobs that may be (re)started; anything else is running or finished
+    STARTABLE_STATUSES = (PriceAnalysisJobStatus.PENDING, PriceAnalysisJobStatus.FAILED)
+    ACTIVE_STATUSES = (PriceAnalysisJobStatus.RUNNING, PriceAnalysisJobStatus.APPLYING)
+
+    # A running job renews its lease (updated_at) with every batch; one not
+    # renewed for this long belongs to a dead worker and may be reclaimed
+    LEASE_SECONDS = 10 * 60
+
+    @staticmethod
+    def _target_items_filter(store_item_ids: Optional[List[int]]) -> list:
+        """WHERE clauses selecting the store items a job covers"""
+        clauses = [StoreItem.status == StoreItemStatus.ACTIVE]
+        if store_item_ids:
+            clauses.append(StoreItem.id.in_(store_item_ids))
+        return clauses
+
+    @staticmethod
+    async def create_job(
+        db: AsyncSession,
+        requested_by: Optional[int],
+        store_item_ids: Optional[List[int]] = None,
+        force_update: bool = False,
+        apply_updates: bool = False
+    ) -> Optional[PriceAnalysisJob]:
+        """
+        Create a price analysis job
+
+        Returns:
+            The new job, or None if no active store items match
+        """
+        total_items = await db.scalar(
+            select(func.count(StoreItem.id)).where(
+                *PriceAnalysisService._target_items_filter(store_item_ids)
+            )
+        )
+        if not total_items:
+            return None
+
+        job = PriceAnalysisJob(
+            requested_by=requested_by,
+            apply_updates=apply_updates,
+            force_update=force_update,
+            store_item_ids=store_item_ids,
+            status=PriceAnalysisJobStatus.PENDING,
+            total_items=total_items,
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    @staticmethod
+    async def get_job(db: AsyncSession, job_id: int) -> Optional[PriceAnalysisJob]:
+        """Get a price analysis job by ID"""
+        result = await db.execute(
+            select(PriceAnalysisJob).where(PriceAnalysisJob.id == job_id)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def is_resumable(job: PriceAnalysisJob, now: Optional[datetime] = None) -> bool:
+        """Whether a job may be started again: not yet run, failed, or abandoned"""
+        if job.status in PriceAnalysisService.STARTABLE_STATUSES:
+            return True
+        now = now or datetime.now(timezone.utc)
+        return (
+            job.status in PriceAnalysisService.ACTIVE_STATUSES
+            and job.updated_at < now - timedelta(seconds=PriceAnalysisService.LEASE_SECONDS)
+        )
+
+    @staticmethod
+    async def claim_job(db: AsyncSession, job_id: int) -> bool:
+        """
+        Atomically mark a resumable job RUNNING for this run
+
+        Two runs never hold the same job: the UPDATE only matches while the
+        job is resumable, and a stale run notices the new lease on its next
+        renewal.
+        """
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=PriceAnalysisService.LEASE_SECONDS)
+        claimed = await db.scalar(
+            update(PriceAnalysisJob)
+            .where(
+                PriceAnalysisJob.id == job_id,
+                or_(
+                    PriceAnalysisJob.status.in_(PriceAnalysisService.STARTABLE_STATUSES),
+                    and_(
+                        PriceAnalysisJob.status.in_(PriceAnalysisService.ACTIVE_STATUSES),
+                        PriceAnalysisJob.updated_at < stale
+                    )
+                )
+            )
+            .values(
+                status=PriceAnalysisJobStatus.RUNNING,
+                started_at=func.coalesce(PriceAnalysisJob.started_at, now),
+                error_message=None,
+                updated_at=now
+            )
+            .returning(PriceAnalysisJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return claimed is not None
+
+    @staticmethod
+    async def renew_lease(db: AsyncSession, job: PriceAnalysisJob):
+        """
+        Extend this run's lease, in the caller's transaction
+
+        Raises:
+            JobLeaseLost: if another run has reclaimed the job
+        """
+        now = datetime.now(timezone.utc)
+        renewed = await db.scalar(
+            update(PriceAnalysisJob)
+            .where(PriceAnalysisJob.id == job.id, PriceAnalysisJob.updated_at == job.updated_at)
+            .values(updated_at=now)
+            .returning(PriceAnalysisJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        if renewed is None:
+            raise JobLeaseLost(f"Price analysis job {job.id} was reclaimed by another run")
+        set_committed_value(job, "updated_at", now)
+
+    @staticmethod
+    async def get_results(
+        db: AsyncSession,
+        job_id: int,
+        after_id: int = 0,
+        limit: int = 100
+    ) -> List[Any]:
+        """
+        Get successful results for a job, oldest first
+
+        Uses the result ID as a cursor so callers can poll while the job runs.
+        """
+        result = await db.execute(
+            select(PriceAnalysisResult, StoreItem.title)
+            .join(StoreItem, StoreItem.id == PriceAnalysisResult.store_item_id)
+            .where(
+                PriceAnalysisResult.job_id == job_id,
+                PriceAnalysisResult.succeeded.is_(True),
+                PriceAnalysisResult.id > after_id
+            )
+            .order_by(PriceAnalysisResult.id)
+            .limit(limit)
+        )
+        return result.all()
+
+    # ========================================================================
+    # Market prices
+    # ========================================================================
+
+    @staticmethod
+    async def get_market_prices_cached(
+        isbn: Optional[str],
+        title: str,
+        author: str,
+        limits: Optional[Dict[str, asyncio.Semaphore]] = None
+    ) -> Dict[str, Optional[Decimal]]:
+        """
+        Get market prices, served from Redis when this ISBN was scraped recently
+
+        Items without an ISBN are always scraped (title searches are too
+        ambiguous to share).
+        """
+        cache = await get_cache() if isbn else None
+        cache_key = f"market_prices:isbn:{isbn}"
+
+        if cache:
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                return {
+                    source: Decimal(price) if price is not None else None
+                    for source, price in cached.items()
+                }
+
+        prices = await PriceScraper.get_market_prices(
+            isbn=isbn,
+            title=title,
+            author=author,
+            limits=limits
+        )
+
+        if cache:
+            await cache.set(
+                cache_key,
+                {source: str(price) if price is not None else None for source, price in prices.items()},
+                ttl=PriceAnalysisService.MARKET_PRICE_CACHE_TTL
+            )
+
+        return prices
+
+    @staticmethod
+    async def _analyze_item(
+        job_id: int,
+        item: Any,
+        force_update: bool,
+        limits: Dict[str, asyncio.Semaphore]
+    ) -> Dict[str, Any]:
+        """Analyze one store item and build its result row (never raises)"""
+        try:
+            market_prices = await PriceAnalysisService.get_market_prices_cached(
+                isbn=item.isbn,
+                title=item.title,
+                author=item.author_name,
+                limits=limits
+            )
+
+            pricing_result = PricingEngine.calculate_optimal_price(
+                market_prices=market_prices,
+                current_price=item.price_usd
+            )
+
+            return {
+                'job_id': job_id,
+                'store_item_id': item.id,
+                'succeeded': True,
+                'current_price': item.price_usd,
+                'recommended_price': pricing_result['recommended_price'],
+                'price_change': pricing_result['price_change'],
+                'market_prices': {k: float(v) if v else None for k, v in pricing_result['market_prices'].items()},
+                'reason': pricing_result['reason'],
+                'cost_breakdown': {k: float(v) if isinstance(v, (int, float, Decimal)) else v
+                                   for k, v in pricing_result['cost_breakdown'].items()},
+                'should_update': force_update or pricing_result['should_update'],
+                'applied': False,
+                'error_message': None,
+            }
+
+        except Exception as e:
+            logger.error(f"Error analyzing price for item {item.id}: {e}")
+            return {
+                'job_id': job_id,
+                'store_item_id': item.id,
+                'succeeded': False,
+                'current_price': item.price_usd,
+                'recommended_price': None,
+                'price_change': None,
+                'market_prices': None,
+                'reason': None,
+                'cost_breakdown': None,
+                'should_update': False,
+                'applied': False,
+                'error_message': str(e)[:1000],
+            }
+
+    # ========================================================================
+    # Job execution
+    # ========================================================================
+
+    @staticmethod
+    async def run_job(job_id: int):
+        """
+        Run (or resume) a price analysis job
+
+        Intended for BackgroundTasks: opens its own session, processes items
+        that have no result row yet, then applies updates if requested.
+        """
+        from app.core.database import get_jobs_session_local
+
+        SessionLocal = get_jobs_session_local()
+        async with SessionLocal() as db:
+            if not await PriceAnalysisService.claim_job(db, job_id):
+                logger.info(f"Price analysis job {job_id} is not resumable; skipping")
+                return
+
+            job = await PriceAnalysisService.get_job(db, job_id)
+
+            # Shared by every batch so limits hold for the whole job
+            limits = {
+                source: asyncio.Semaphore(limit)
+                for source, limit in PriceAnalysisService.SOURCE_CONCURRENCY.items()
+            }
+
+            try:
+                await PriceAnalysisService._analyze_pending_items(db, job, limits)
+
+                if job.apply_updates:
+                    await PriceAnalysisService.renew_lease(db, job)
+                    job.status = PriceAnalysisJobStatus.APPLYING
+                    await db.commit()
+                    await PriceAnalysisService._apply_updates(db, job)
+
+                await PriceAnalysisService.renew_lease(db, job)
+                job.status = PriceAnalysisJobStatus.COMPLETED
+                job.completed_at = datetime.now(timezone.utc)
+                await db.commit()
+                logger.info(
+                    f"Price analysis job {job.id} completed: {job.items_analyzed} analyzed, "
+                    f"{job.items_updated} updated, {job.items_failed} failed"
+                )
+
+            except JobLeaseLost as e:
+                # The run that reclaimed the job owns its status now
+                logger.warning(str(e))
+                await db.rollback()
+
+            except Exception as e:
+                logger.error(f"Price analysis job {job_id} failed: {e}")
+                await db.rollback()
+                job = await PriceAnalysisService.get_job(db, job_id)
+                if job:
+                    job.status = PriceAnalysisJobStatus.FAILED
+                    job.error_message = str(e)[:1000]
+                    await db.commit()
+
+    @staticmethod
+    async def _analyze_pending_items(
+        db: AsyncSession,
+        job: PriceAnalysisJob,
+        limits: Dict[str, asyncio.Semaphore]
+    ):
+        """Scrape and record every target item that has no result row yet"""
+        already_done = exists().where(
+            PriceAnalysisResult.job_id == job.id,
+            PriceAnalysisResult.store_item_id == StoreItem.id
+        )
+        last_id = 0
+
+        while True:
+            result = await db.execute(
+                select(
+                    StoreItem.id,
+                    StoreItem.title,
+                    StoreItem.author_name,
+                    StoreItem.isbn,
+                    StoreItem.price_usd,
+                )
+                .where(
+                    *PriceAnalysisService._target_items_filter(job.store_item_ids),
+                    StoreItem.id > last_id,
+                    ~already_done
+                )
+                .order_by(StoreItem.id)
+                .limit(PriceAnalysisService.BATCH_SIZE)
+            )
+            items = result.all()
+            if not items:
+                return
+            last_id = items[-1].id
+
+            rows = await asyncio.gather(*[
+                PriceAnalysisService._analyze_item(job.id, item, job.force_update, limits)
+                for item in items
+            ])
+
+            # Results and counters are committed together, so a restart
+            # never double counts an item
+            await PriceAnalysisService.renew_lease(db, job)
+            await db.execute(insert(PriceAnalysisResult), rows)
+            succeeded = [row for row in rows if row['succeeded']]
+            job.items_analyzed += len(rows)
+            job.items_failed += len(rows) - len(succeeded)
+            job.items_skipped += sum(1 for row in succeeded if not row['should_update'])
+            await db.commit()
+
+    @staticmethod
+    async def _apply_updates(db: AsyncSession, job: PriceAnalysisJob):
+        """Write recommended prices back to store_items in bulk"""
+        while True:
+            result = await db.execute(
+                select(
+                    PriceAnalysisResult.store_item_id,
+                    PriceAnalysisResult.recommended_price,
+                    StoreItem.price_usd,
+                )
+                .join(StoreItem, StoreItem.id == PriceAnalysisResult.store_item_id)
+                .where(
+                    PriceAnalysisResult.job_id == job.id,
+                    PriceAnalysisResult.succeeded.is_(True),
+                    PriceAnalysisResult.should_update.is_(True),
+                    PriceAnalysisResult.applied.is_(False)
+                )
+                .order_by(PriceAnalysisResult.store_item_id)
+                .limit(PriceAnalysisService.APPLY_CHUNK_SIZE)
+            )
+            pending = result.all()
+            if not pending:
+                return
+
+            new_prices = []
+            for store_item_id, new_price, current_price in pending:
+                # Discount is relative to the price being replaced
+                if current_price and new_price < current_price:
+                    discount = int((current_price - new_price) / current_price * 100)
+                else:
+                    discount = 0
+                new_prices.append((store_item_id, new_price, discount))
+
+            new_prices_table = values(
+                column('id', Integer),
+                column('price_usd', Numeric(10, 2)),
+                column('discount_percentage', Integer),
+                name='new_prices'
+            ).data(new_prices)
+
+            await db.execute(
+                update(StoreItem)
+                .where(StoreItem.id == new_prices_table.c.id)
+                .values(
+                    price_usd=new_prices_table.c.price_usd,
+                    discount_percentage=new_prices_table.c.discount_percentage,
+                    updated_at=datetime.now(timezone.utc)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.execute(
+                update(PriceAnalysisResult)
+                .where(
+                    PriceAnalysisResult.job_id == job.id,
+                    PriceAnalysisResult.store_item_id.in_([row[0] for row in new_prices])
+                )
+                .values(applied=True)
+                .execution_options(synchronize_session=False)
+            )
+            await PriceAnalysisService.renew_lease(db, job)
+            job.items_updated += len(new_prices)
+            await db.commit()
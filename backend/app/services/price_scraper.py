@@ -149,7 +149,20 @@ class PriceScraper:
             return None
     
     @staticmethod
-    async def get_market_prices(isbn: Optional[str], title: str, author: str) -> Dict[str, Optional[Decimal]]:
+    async def _bounded(semaphore: Optional[asyncio.Semaphore], coro):
+        """Await a scraper coroutine, holding the source's semaphore if given"""
+        if semaphore is None:
+            return await coro
+        async with semaphore:
+            return await coro
+    
+    @staticmethod
+    async def get_market_prices(
+        isbn: Optional[str],
+        title: str,
+        author: str,
+        limits: Optional[Dict[str, asyncio.Semaphore]] = None
+    ) -> Dict[str, Optional[Decimal]]:
         """
         Get prices from all competitors concurrently
         
@@ -157,14 +170,24 @@ class PriceScraper:
             isbn: Book ISBN
             title: Book title
             author: Author name
+            limits: Optional per-source semaphores ('amazon', 'google', 'apple')
+                used by bulk jobs to cap concurrent requests to each store
             
         Returns:
             Dict with prices from each source
         """
+        limits = limits or {}
+        
         # Run all scrapers concurrently
-        amazon_task = PriceScraper.get_amazon_price(isbn, title, author)
-        google_task = PriceScraper.get_google_books_price(isbn, title)
-        apple_task = PriceScraper.get_apple_books_price(isbn, title, author)
+        amazon_task = PriceScraper._bounded(
+            limits.get('amazon'), PriceScraper.get_amazon_price(isbn, title, author)
+        )
+        google_task = PriceScraper._bounded(
+            limits.get('google'), PriceScraper.get_google_books_price(isbn, title)
+        )
+        apple_task = PriceScraper._bounded(
+            limits.get('apple'), PriceScraper.get_apple_books_price(isbn, title, author)
+        )
         
         results = await asyncio.gather(
             amazon_task,
@@ -6,12 +6,27 @@ from sqlalchemy import select, and_, func
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone
 from app.models.project import Project
+from app.models.document import Document
 from app.models.templates import ProjectTemplate
 from app.models.ai_templates import AIGeneratedTemplate
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
 from app.core.exceptions import NotFoundError
 
 
+async def _document_counts(db: AsyncSession, project_ids: List[int]) -> Dict[int, int]:
+    """Live (not trashed) documents per project, in one grouped query."""
+    if not project_ids:
+        return {}
+    stmt = select(Document.project_id, func.count()).where(
+        and_(
+            Document.project_id.in_(project_ids),
+            Document.is_deleted == False
+        )
+    ).group_by(Document.project_id)
+    result = await db.execute(stmt)
+    return dict(result.all())
+
+
 class ProjectService:
     """Service for project management."""
 
@@ -73,8 +88,8 @@ class ProjectService:
             progress = (project.current_word_count / project.target_word_count) * 100
         response.progress_percentage = min(progress, 100.0)
         
-        # TODO: Get actual document count from relationships
-        response.document_count = 0
+        counts = await _document_counts(db, [project.id])
+        response.document_count = counts.get(project.id, 0)
         
         return response
 
@@ -96,6 +111,7 @@ class ProjectService:
         
         result = await db.execute(stmt)
         projects = result.scalars().all()
+        counts = await _document_counts(db, [project.id for project in projects])
         
         responses = []
         for project in projects:
@@ -106,7 +122,7 @@ class ProjectService:
             if project.target_word_count and project.target_word_count > 0:
                 progress = (project.current_word_count / project.target_word_count) * 100
             response.progress_percentage = min(progress, 100.0)
-            response.document_count = 0
+            response.document_count = counts.get(project.id, 0)
             
             responses.append(response)
         
@@ -146,7 +162,8 @@ class ProjectService:
         if project.target_word_count and project.target_word_count > 0:
             progress = (project.current_word_count / project.target_word_count) * 100
         response.progress_percentage = min(progress, 100.0)
-        response.document_count = 0
+        counts = await _document_counts(db, [project.id])
+        response.document_count = counts.get(project.id, 0)
         
         return response
 
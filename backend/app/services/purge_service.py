@@ -0,0 +1,190 @@
+"""
+Purge Service
+Hard deletes documents and projects in bounded batches, and removes the
+documents' blob storage objects
+
+Each batch takes the next ids matching the condition (keyset order, so no
+OFFSET scans), deletes them and commits - one short transaction per batch,
+with the database cascades (versions, comments, views, bookmarks, ...)
+limited to those rows. Storage keys of the documents and their versions are
+queued once their batch is committed and sent as DeleteObjects calls of up
+to 1000 keys.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import select, delete, union
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document, DocumentVersion
+from app.models.project import Project
+from app.models.reading import Bookmark, ReadingList, ReadingListItem
+from app.services.saved_items_service import SavedItemsService
+from app.services.storage_service import storage_service
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 500
+# S3 DeleteObjects limit
+STORAGE_DELETE_BATCH = 1000
+
+
+class StorageKeyQueue:
+    """Object keys of purged rows, deleted from storage 1000 at a time"""
+
+    def __init__(self):
+        self.pending: List[str] = []
+        self.deleted = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def add(self, keys) -> None:
+        self.pending.extend(key for key in keys if key)
+
+    async def flush(self, force: bool = False) -> None:
+        """Send every full batch (and the remainder too when forced)"""
+        while len(self.pending) >= STORAGE_DELETE_BATCH or (force and self.pending):
+            batch = self.pending[:STORAGE_DELETE_BATCH]
+            del self.pending[:STORAGE_DELETE_BATCH]
+            if not storage_service.s3_client:
+                self.skipped += len(batch)
+                continue
+            deleted = await asyncio.to_thread(storage_service.delete_documents, batch)
+            self.deleted += deleted
+            self.failed += len(batch) - deleted
+
+
+class PurgeService:
+    """Service for batched hard deletes."""
+
+    @staticmethod
+    async def purge_documents(
+        db: AsyncSession,
+        condition,
+        batch_size: int = PURGE_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Permanently delete the documents matching condition, with their
+        storage objects
+        """
+        storage = StorageKeyQueue()
+
+        async def before_delete(ids):
+            versions = await db.execute(
+                select(DocumentVersion.document_id, DocumentVersion.file_path)
+                .where(DocumentVersion.document_id.in_(ids), DocumentVersion.file_path.isnot(None))
+            )
+            savers = await db.execute(union(
+                select(Bookmark.user_id).where(Bookmark.document_id.in_(ids)),
+                select(ReadingList.user_id)
+                .join(ReadingListItem, ReadingListItem.reading_list_id == ReadingList.id)
+                .where(ReadingListItem.document_id.in_(ids)),
+            ))
+            return versions.all(), savers.scalars().all()
+
+        async def after_commit(deleted, context):
+            versions, savers = context
+            deleted_ids = {document_id for document_id, _ in deleted}
+            storage.add(file_path for _, file_path in deleted)
+            storage.add(file_path for document_id, file_path in versions if document_id in deleted_ids)
+            await storage.flush()
+            await SavedItemsService.invalidate(*savers)
+
+        stats = await PurgeService._purge(
+            db, Document, condition, batch_size,
+            returning=[Document.id, Document.file_path],
+            before_delete=before_delete,
+            after_commit=after_commit,
+        )
+        await storage.flush(force=True)
+        stats.update({
+            "storage_deleted": storage.deleted,
+            "storage_failed": storage.failed,
+            "storage_skipped": storage.skipped,
+        })
+        if storage.failed:
+            logger.warning(f"{storage.failed} storage objects could not be deleted while purging documents")
+        return stats
+
+    @staticmethod
+    async def purge_projects(
+        db: AsyncSession,
+        condition,
+        batch_size: int = PURGE_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Permanently delete the projects matching condition
+        Their folders go with them; their documents are kept (project_id is
+        cleared) and purged on their own
+        """
+        return await PurgeService._purge(
+            db, Project, condition, batch_size, returning=[Project.id]
+        )
+
+    @staticmethod
+    async def _purge(
+        db: AsyncSession,
+        model,
+        condition,
+        batch_size: int,
+        returning: list,
+        before_delete=None,
+        after_commit=None
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        rows = batches = 0
+        slowest = 0.0
+        last_id = 0
+
+        while True:
+            batch_started = time.perf_counter()
+            ids = (await db.execute(
+                select(model.id)
+                .where(condition, model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+            )).scalars().all()
+            if not ids:
+                await db.rollback()
+                break
+            last_id = ids[-1]
+
+            context = await before_delete(ids) if before_delete else None
+            # Condition again: a row restored since the select stays
+            deleted = (await db.execute(
+                delete(model)
+                .where(model.id.in_(ids), condition)
+                .returning(*returning)
+                .execution_options(synchronize_session=False)
+            )).all()
+            await db.commit()
+
+            if after_commit:
+                await after_commit(deleted, context)
+
+            batches += 1
+            rows += len(deleted)
+            elapsed = time.perf_counter() - batch_started
+            slowest = max(slowest, elapsed)
+            logger.debug(f"Purged {len(deleted)} {model.__tablename__} in batch {batches} ({elapsed * 1000:.0f} ms)")
+
+            if len(ids) < batch_size:
+                break
+
+        seconds = time.perf_counter() - started
+        stats = {
+            "rows": rows,
+            "batches": batches,
+            "rows_per_batch": round(rows / batches, 1) if batches else 0,
+            "slowest_batch_ms": round(slowest * 1000),
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(rows / seconds, 1) if seconds else 0,
+        }
+        if rows:
+            logger.info(
+                f"Purged {rows} {model.__tablename__} in {batches} batches "
+                f"({stats['rows_per_second']} rows/s, slowest batch {stats['slowest_batch_ms']} ms)"
+            )
+        return stats
@@ -8,6 +8,9 @@ from typing import List, Optional
 
 from ..models.reading import Bookmark, ReadingList, ReadingListItem
 from ..models.document import Document
+from . import saved_items_service as saved_items
+from .saved_items_service import SavedItemsService
+from .trending_service import BOOKMARK, READING_LIST, TrendingService
 
 
 class BookmarkService:
@@ -29,6 +32,8 @@ class BookmarkService:
         db.add(bookmark)
         await db.commit()
         await db.refresh(bookmark)
+        await SavedItemsService.mark_saved(user_id, saved_items.BOOKMARK, document_id)
+        await TrendingService.record(db, document_id, BOOKMARK)
         return bookmark
     
     @staticmethod
@@ -62,14 +67,20 @@ class BookmarkService:
         document_id: int
     ) -> bool:
         """Check if document is bookmarked."""
-        stmt = select(Bookmark).filter(
-            and_(
-                Bookmark.user_id == user_id,
-                Bookmark.document_id == document_id
-            )
+        saved = await SavedItemsService.lookup(db, user_id, [(saved_items.BOOKMARK, document_id)])
+        return saved[0]
+    
+    @staticmethod
+    async def bookmarked_ids(
+        db: AsyncSession,
+        user_id: int,
+        document_ids: List[int]
+    ) -> set[int]:
+        """Which of several documents are bookmarked (one lookup for a page)."""
+        saved = await SavedItemsService.lookup(
+            db, user_id, [(saved_items.BOOKMARK, document_id) for document_id in document_ids]
         )
-        result = await db.execute(stmt)
-        return result.scalar_one_or_none() is not None
+        return {document_id for document_id, is_saved in zip(document_ids, saved) if is_saved}
     
     @staticmethod
     async def delete_bookmark(
@@ -92,6 +103,7 @@ class BookmarkService:
         
         await db.delete(bookmark)
         await db.commit()
+        await SavedItemsService.mark_unsaved(db, user_id, saved_items.BOOKMARK, document_id)
         return True
 
 
@@ -217,6 +229,7 @@ class ReadingListService:
         
         await db.delete(reading_list)
         await db.commit()
+        await SavedItemsService.invalidate(user_id)
         return True
     
     @staticmethod
@@ -250,6 +263,8 @@ class ReadingListService:
         db.add(item)
         await db.commit()
         await db.refresh(item)
+        await SavedItemsService.mark_saved(user_id, saved_items.READING_LIST, document_id)
+        await TrendingService.record(db, document_id, READING_LIST)
         return item
     
     @staticmethod
@@ -279,8 +294,21 @@ class ReadingListService:
         
         await db.delete(item)
         await db.commit()
+        await SavedItemsService.mark_unsaved(db, user_id, saved_items.READING_LIST, document_id)
         return True
     
+    @staticmethod
+    async def in_any_list(
+        db: AsyncSession,
+        user_id: int,
+        document_ids: List[int]
+    ) -> set[int]:
+        """Which of several documents are in any of the user's reading lists."""
+        saved = await SavedItemsService.lookup(
+            db, user_id, [(saved_items.READING_LIST, document_id) for document_id in document_ids]
+        )
+        return {document_id for document_id, is_saved in zip(document_ids, saved) if is_saved}
+    
     @staticmethod
     async def get_list_items(
         db: AsyncSession,
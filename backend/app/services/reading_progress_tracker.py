@@ -0,0 +1,564 @@
+"""
+Reading Progress Tracker
+Absorbs e-reader progress updates in Redis and writes them to Postgres in bulk
+
+Readers report their position every few seconds. Instead of a SELECT, an
+upsert and two commits per page turn, each update is one Redis pipeline:
+the latest position lives in a hash per (user, document) or (user, vault
+item), and the entry is added to a dirty set. A background flusher pops dirty
+entries and upserts them with INSERT ... ON CONFLICT (documents) or
+UPDATE ... FROM (VALUES ...) (vault items).
+
+State that other features depend on is still written immediately:
+- Finishing a document (first time at 100%) marks the row completed and
+  recalculates reputation scores right away
+- A vault item's first progress moves it from want-to-read to reading
+
+If Redis is unavailable every update goes straight to the database.
+"""
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, select, update, values, column, Integer, Float, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document
+from app.models.reading import ReadingProgress
+from app.models.vault import Article
+from app.services.cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT = "document"
+VAULT = "vault"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class ReadingProgressTracker:
+    """Write-coalescing store for reading progress"""
+
+    # Seconds between flushes; the most progress a crash can lose
+    FLUSH_INTERVAL = int(os.getenv("READING_PROGRESS_FLUSH_SECONDS", "15"))
+
+    # Dirty entries written per database round trip
+    FLUSH_BATCH_SIZE = 500
+
+    # Hashes outlive a reading session so resumed sessions skip the database
+    STATE_TTL = 24 * 60 * 60
+
+    DIRTY_KEY = "reading_progress:dirty"
+
+    def __init__(self):
+        self._flusher: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _member(kind: str, user_id: int, target_id: int) -> str:
+        return f"{kind}:{user_id}:{target_id}"
+
+    @staticmethod
+    def _state_key(member: str) -> str:
+        return f"reading_progress:{member}"
+
+    @staticmethod
+    async def _redis():
+        """Raw Redis client, or None if Redis is unavailable"""
+        cache = await get_cache()
+        return cache.redis
+
+    # ========================================================================
+    # Documents
+    # ========================================================================
+
+    async def record_document_progress(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        document_id: int,
+        progress_percentage: int,
+        last_position: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Record progress through a document
+
+        Returns:
+            Progress in the shape of ReadingProgressResponse, or None if the
+            document doesn't exist
+        """
+        progress_percentage = min(100, max(0, progress_percentage))
+        redis = await self._redis()
+        if redis is None:
+            return await self._write_document_progress(
+                db, user_id, document_id, progress_percentage, last_position
+            )
+
+        member = self._member(DOCUMENT, user_id, document_id)
+        key = self._state_key(member)
+        now = _now().isoformat()
+
+        pipe = redis.pipeline(transaction=True)
+        pipe.hsetnx(key, "started_at", now)
+        pipe.hset(key, mapping={
+            "progress": progress_percentage,
+            "position": json.dumps(last_position),
+            "last_read": now,
+        })
+        if progress_percentage >= 100:
+            pipe.hsetnx(key, "completed_at", now)
+        pipe.expire(key, self.STATE_TTL)
+        pipe.sadd(self.DIRTY_KEY, member)
+        results = await pipe.execute()
+
+        is_new_session = bool(results[0])
+        just_completed = progress_percentage >= 100 and bool(results[2])
+
+        if is_new_session:
+            # Redis has no memory of this pair: check the document exists and
+            # take start/completion from the existing row
+            existing = await self._load_document_progress(db, user_id, document_id)
+            if existing is None:
+                await self.discard(DOCUMENT, user_id, document_id)
+                return None
+            if existing.started_at is not None:
+                seeded = {"started_at": existing.started_at.isoformat()}
+                if existing.completed:
+                    seeded["completed_at"] = (existing.completed_at or existing.started_at).isoformat()
+                    just_completed = False
+                await redis.hset(key, mapping=seeded)
+
+        state = await redis.hgetall(key)
+
+        if just_completed:
+            try:
+                await self._complete_document(db, user_id, document_id, state)
+            except Exception:
+                # Let the next 100% update try again
+                await redis.hdel(key, "completed_at")
+                raise
+            state = await redis.hgetall(key)
+
+        return self._document_response(document_id, state)
+
+    @staticmethod
+    async def _load_document_progress(db: AsyncSession, user_id: int, document_id: int):
+        """
+        The document joined to the user's progress row
+
+        Returns None if the document doesn't exist; progress columns are
+        None if the user has no row yet.
+        """
+        result = await db.execute(
+            select(
+                Document.id,
+                ReadingProgress.started_at,
+                ReadingProgress.completed_at,
+                ReadingProgress.completed,
+            )
+            .outerjoin(
+                ReadingProgress,
+                and_(
+                    ReadingProgress.document_id == Document.id,
+                    ReadingProgress.user_id == user_id
+                )
+            )
+            .where(Document.id == document_id)
+        )
+        return result.first()
+
+    async def get_document_progress(self, user_id: int, document_id: int) -> Optional[Dict[str, Any]]:
+        """Latest progress held in Redis (may be newer than the database), if any"""
+        redis = await self._redis()
+        if redis is None:
+            return None
+        state = await redis.hgetall(self._state_key(self._member(DOCUMENT, user_id, document_id)))
+        if not state or "progress" not in state:
+            return None
+        return self._document_response(document_id, state)
+
+    @staticmethod
+    def _document_response(document_id: int, state: Dict[str, str]) -> Dict[str, Any]:
+        return {
+            "document_id": document_id,
+            "progress_percentage": int(state["progress"]),
+            "last_position": json.loads(state.get("position") or "null"),
+            "started_at": _parse_time(state.get("started_at")),
+            "last_read": _parse_time(state.get("last_read")),
+            "completed": "completed_at" in state,
+        }
+
+    @staticmethod
+    def _document_upsert(rows: List[Dict[str, Any]], completing: bool = False):
+        """
+        INSERT ... ON CONFLICT for reading_progress rows
+
+        Only the completion path sets completed, so a flush can never beat
+        it to the transition and swallow the completion event.
+        """
+        stmt = pg_insert(ReadingProgress).values(rows)
+        excluded = stmt.excluded
+        set_ = {
+            "progress_percentage": excluded.progress_percentage,
+            "last_position": excluded.last_position,
+            "last_read": excluded.last_read,
+            "updated_at": excluded.updated_at,
+        }
+        if completing:
+            set_["completed"] = True
+            set_["completed_at"] = excluded.completed_at
+            where = ReadingProgress.completed.is_(False)
+        else:
+            # Never overwrite a newer position with an older one
+            where = ReadingProgress.last_read <= excluded.last_read
+        return stmt.on_conflict_do_update(
+            index_elements=[ReadingProgress.user_id, ReadingProgress.document_id],
+            set_=set_,
+            where=where,
+        )
+
+    @staticmethod
+    def _document_row(user_id: int, document_id: int, state: Dict[str, str]) -> Dict[str, Any]:
+        now = _now()
+        last_read = _parse_time(state.get("last_read")) or now
+        return {
+            "user_id": user_id,
+            "document_id": document_id,
+            "progress_percentage": int(state.get("progress") or 0),
+            "last_position": json.loads(state.get("position") or "null"),
+            "started_at": _parse_time(state.get("started_at")) or last_read,
+            "last_read": last_read,
+            "completed": False,
+            "completed_at": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    async def _complete_document(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        document_id: int,
+        state: Dict[str, str]
+    ):
+        """Persist a completion immediately and emit its side effects"""
+        row = self._document_row(user_id, document_id, state)
+        row["completed"] = True
+        row["completed_at"] = _parse_time(state.get("completed_at")) or _now()
+
+        result = await db.execute(
+            self._document_upsert([row], completing=True).returning(ReadingProgress.id)
+        )
+        transitioned = result.first() is not None
+        await db.commit()
+
+        if transitioned:
+            await self._on_document_completed(db, user_id, document_id)
+
+    @staticmethod
+    async def _on_document_completed(db: AsyncSession, user_id: int, document_id: int):
+        """Side effects of finishing a document"""
+        from app.services.badge_service import ScoreService
+
+        try:
+            await ScoreService.update_all_scores(db, user_id)
+        except Exception as e:
+            logger.error(f"Failed to update scores after user {user_id} finished document {document_id}: {e}")
+            await db.rollback()
+
+    async def _write_document_progress(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        document_id: int,
+        progress_percentage: int,
+        last_position: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Direct database write, used when Redis is unavailable"""
+        if await self._load_document_progress(db, user_id, document_id) is None:
+            return None
+
+        now = _now().isoformat()
+        state = {
+            "progress": str(progress_percentage),
+            "position": json.dumps(last_position),
+            "started_at": now,
+            "last_read": now,
+        }
+        await db.execute(self._document_upsert([self._document_row(user_id, document_id, state)]))
+        await db.commit()
+
+        if progress_percentage >= 100:
+            state["completed_at"] = now
+            await self._complete_document(db, user_id, document_id, state)
+
+        progress = await db.execute(
+            select(ReadingProgress).where(
+                ReadingProgress.user_id == user_id,
+                ReadingProgress.document_id == document_id
+            )
+        )
+        row = progress.scalar_one()
+        return {
+            "document_id": document_id,
+            "progress_percentage": row.progress_percentage,
+            "last_position": row.last_position,
+            "started_at": row.started_at,
+            "last_read": row.last_read,
+            "completed": row.completed,
+        }
+
+    # ========================================================================
+    # Vault items
+    # ========================================================================
+
+    async def record_vault_progress(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        item_id: int,
+        last_location: str,
+        reading_progress: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Record progress through a vault EPUB
+
+        Returns:
+            The vault progress response, or None if the user has no such item
+        """
+        redis = await self._redis()
+        member = self._member(VAULT, user_id, item_id)
+        key = self._state_key(member)
+
+        state = await redis.hgetall(key) if redis is not None else {}
+        status = state.get("status")
+
+        # Ownership and status come from the database once per session, and
+        # again whenever the status is about to change
+        if not status or (status == "want-to-read" and reading_progress > 0):
+            result = await db.execute(
+                select(Article).where(Article.id == item_id, Article.user_id == user_id)
+            )
+            item = result.scalar_one_or_none()
+            if not item:
+                return None
+
+            if redis is None or (item.status == "want-to-read" and reading_progress > 0):
+                item.last_location = last_location
+                item.reading_progress = reading_progress
+                # Auto-update status if starting to read for the first time
+                if item.status == "want-to-read" and reading_progress > 0:
+                    item.status = "reading"
+                    if not item.started_reading:
+                        item.started_reading = _now()
+                await db.commit()
+                await db.refresh(item)
+                if redis is not None:
+                    pipe = redis.pipeline(transaction=True)
+                    pipe.hset(key, mapping={
+                        "status": item.status,
+                        "location": item.last_location or "",
+                        "progress": item.reading_progress or 0,
+                    })
+                    pipe.expire(key, self.STATE_TTL)
+                    pipe.srem(self.DIRTY_KEY, member)
+                    await pipe.execute()
+                return {
+                    "id": item.id,
+                    "last_location": item.last_location,
+                    "reading_progress": item.reading_progress,
+                    "status": item.status
+                }
+            status = item.status
+
+        pipe = redis.pipeline(transaction=True)
+        pipe.hset(key, mapping={
+            "status": status,
+            "location": last_location,
+            "progress": reading_progress,
+        })
+        pipe.expire(key, self.STATE_TTL)
+        pipe.sadd(self.DIRTY_KEY, member)
+        await pipe.execute()
+
+        return {
+            "id": item_id,
+            "last_location": last_location,
+            "reading_progress": reading_progress,
+            "status": status
+        }
+
+    async def get_vault_progress(self, user_id: int, item_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Latest progress held in Redis for some of a user's vault items
+
+        One round trip however many items. Items with nothing buffered are
+        left out; their database row is current.
+        """
+        redis = await self._redis()
+        if redis is None or not item_ids:
+            return {}
+        pipe = redis.pipeline(transaction=False)
+        for item_id in item_ids:
+            pipe.hmget(self._state_key(self._member(VAULT, user_id, item_id)), "progress", "location")
+        states = await pipe.execute()
+        return {
+            item_id: {
+                "reading_progress": float(progress),
+                "last_location": location or None,
+            }
+            for item_id, (progress, location) in zip(item_ids, states)
+            if progress is not None
+        }
+
+    # ========================================================================
+    # Flushing
+    # ========================================================================
+
+    async def discard(self, kind: str, user_id: int, target_id: int):
+        """Forget buffered progress (e.g. when the progress record is deleted)"""
+        redis = await self._redis()
+        if redis is None:
+            return
+        member = self._member(kind, user_id, target_id)
+        pipe = redis.pipeline(transaction=True)
+        pipe.srem(self.DIRTY_KEY, member)
+        pipe.delete(self._state_key(member))
+        await pipe.execute()
+
+    async def flush(self, db: AsyncSession) -> int:
+        """
+        Write every dirty entry to the database
+
+        Safe to run from several workers at once: SPOP hands each entry to
+        exactly one flusher, and entries are put back if the write fails.
+
+        Returns:
+            Number of entries written
+        """
+        redis = await self._redis()
+        if redis is None:
+            return 0
+
+        written = 0
+        while True:
+            members = await redis.spop(self.DIRTY_KEY, self.FLUSH_BATCH_SIZE)
+            if not members:
+                return written
+
+            pipe = redis.pipeline(transaction=False)
+            for member in members:
+                pipe.hgetall(self._state_key(member))
+            states = await pipe.execute()
+
+            try:
+                await self._write_batch(db, list(zip(members, states)))
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                await redis.sadd(self.DIRTY_KEY, *members)
+                raise
+
+            written += len(members)
+            if len(members) < self.FLUSH_BATCH_SIZE:
+                return written
+
+    async def _write_batch(self, db: AsyncSession, entries: List[Tuple[str, Dict[str, str]]]):
+        document_rows = {}
+        vault_rows = {}
+        for member, state in entries:
+            if not state or "progress" not in state:
+                continue  # Expired or discarded since it was marked dirty
+            kind, user_id, target_id = member.split(":")
+            if kind == DOCUMENT:
+                document_rows[(int(user_id), int(target_id))] = state
+            elif kind == VAULT:
+                vault_rows[(int(user_id), int(target_id))] = state
+
+        if document_rows:
+            # Progress for deleted documents is dropped rather than failing the batch
+            result = await db.execute(
+                select(Document.id).where(Document.id.in_({doc_id for _, doc_id in document_rows}))
+            )
+            existing = set(result.scalars().all())
+            rows = [
+                self._document_row(user_id, document_id, state)
+                for (user_id, document_id), state in document_rows.items()
+                if document_id in existing
+            ]
+            if rows:
+                await db.execute(self._document_upsert(rows))
+
+        if vault_rows:
+            new_progress = values(
+                column('id', Integer),
+                column('user_id', Integer),
+                column('reading_progress', Float),
+                column('last_location', String(500)),
+                name='new_progress'
+            ).data([
+                (item_id, user_id, float(state["progress"]), state.get("location") or None)
+                for (user_id, item_id), state in vault_rows.items()
+            ])
+            await db.execute(
+                update(Article)
+                .where(
+                    Article.id == new_progress.c.id,
+                    Article.user_id == new_progress.c.user_id
+                )
+                .values(
+                    reading_progress=new_progress.c.reading_progress,
+                    last_location=new_progress.c.last_location
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+    async def _flush_forever(self):
+        from app.core.database import get_jobs_session_local
+
+        SessionLocal = get_jobs_session_local()
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            try:
+                async with SessionLocal() as db:
+                    written = await self.flush(db)
+                if written:
+                    logger.debug(f"Flushed {written} reading progress updates")
+            except Exception as e:
+                logger.error(f"Reading progress flush failed: {e}")
+
+    def start(self):
+        """Start the background flusher (application startup)"""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_forever())
+
+    async def stop(self):
+        """Stop the flusher and write whatever is still buffered (application shutdown)"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        from app.core.database import get_jobs_session_local
+
+        try:
+            async with get_jobs_session_local()() as db:
+                await self.flush(db)
+        except Exception as e:
+            logger.error(f"Final reading progress flush failed: {e}")
+
+
+# Global tracker instance
+progress_tracker = ReadingProgressTracker()
@@ -2,13 +2,15 @@
 Reading Service - Reading progress and public document viewing
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, select, func, or_
+from sqlalchemy import and_, select, or_
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 
+from ..core.pagination import paginate
 from ..models.reading import ReadingProgress
 from ..models.document import Document
 from ..models.user import User
+from .reading_progress_tracker import progress_tracker, DOCUMENT
 
 
 class ReadingService:
@@ -52,22 +54,29 @@ class ReadingService:
         document_id: int,
         progress_percentage: int,
         last_position: Optional[Dict[str, Any]] = None
-    ) -> ReadingProgress:
-        """Update reading progress."""
-        progress = await ReadingService.get_or_create_progress(db, user_id, document_id)
-        
-        progress.progress_percentage = min(100, max(0, progress_percentage))
-        progress.last_position = last_position
-        progress.last_read = datetime.now(timezone.utc)
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Update reading progress.
         
-        # Mark as completed if 100%
-        if progress.progress_percentage >= 100 and not progress.completed:
-            progress.completed = True
-            progress.completed_at = datetime.now(timezone.utc)
-        
-        await db.commit()
-        await db.refresh(progress)
-        return progress
+        Buffered in Redis and written to the database by the progress
+        flusher; completion is persisted immediately. Returns None if the
+        document doesn't exist.
+        """
+        return await progress_tracker.record_document_progress(
+            db, user_id, document_id, progress_percentage, last_position
+        )
+    
+    @staticmethod
+    async def get_latest_progress(
+        db: AsyncSession,
+        user_id: int,
+        document_id: int
+    ) -> Optional[Union[ReadingProgress, Dict[str, Any]]]:
+        """Get reading progress, including updates not yet flushed to the database."""
+        buffered = await progress_tracker.get_document_progress(user_id, document_id)
+        if buffered is not None:
+            return buffered
+        return await ReadingService.get_progress(db, user_id, document_id)
     
     @staticmethod
     async def get_progress(
@@ -90,24 +99,24 @@ class ReadingService:
         db: AsyncSession,
         user_id: int,
         skip: int = 0,
-        limit: int = 50
-    ) -> tuple[List[ReadingProgress], int]:
-        """Get user's reading history."""
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        count: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get user's reading history, most recently read first (page dict, see app.core.pagination)."""
         stmt = select(ReadingProgress).filter(
             ReadingProgress.user_id == user_id
-        ).order_by(ReadingProgress.last_read.desc()).offset(skip).limit(limit)
-        
-        result = await db.execute(stmt)
-        items = list(result.scalars().all())
-        
-        # Count total
-        count_stmt = select(func.count()).select_from(ReadingProgress).filter(
-            ReadingProgress.user_id == user_id
         )
-        count_result = await db.execute(count_stmt)
-        total = count_result.scalar()
         
-        return items, total
+        return await paginate(
+            db, stmt,
+            keys=(ReadingProgress.last_read, ReadingProgress.id),
+            limit=limit,
+            cursor=cursor,
+            offset=skip,
+            count=count,
+            scope=f"reading:history:{user_id}",
+        )
     
     @staticmethod
     async def get_currently_reading(
@@ -134,6 +143,7 @@ class ReadingService:
         document_id: int
     ) -> bool:
         """Delete reading progress."""
+        await progress_tracker.discard(DOCUMENT, user_id, document_id)
         progress = await ReadingService.get_progress(db, user_id, document_id)
         if not progress:
             return False
@@ -5,6 +5,7 @@ from typing import List, Optional
 
 from ..models.social import UserFollow
 from ..models.user import User
+from .activity_inbox import activity_inbox
 
 
 class RelationshipsService:
@@ -31,6 +32,7 @@ class RelationshipsService:
                 existing.updated_at = datetime.now(timezone.utc)
                 await db.commit()
                 await db.refresh(existing)
+                await activity_inbox.follows_changed(follower_id, following_id)
             return existing
         
         # Create new follow relationship
@@ -42,6 +44,7 @@ class RelationshipsService:
         db.add(follow)
         await db.commit()
         await db.refresh(follow)
+        await activity_inbox.follows_changed(follower_id, following_id)
         return follow
     
     @staticmethod
@@ -64,6 +67,7 @@ class RelationshipsService:
         follow.is_active = False
         follow.updated_at = datetime.now(timezone.utc)
         await db.commit()
+        await activity_inbox.follows_changed(follower_id, following_id)
         return True
     
     @staticmethod
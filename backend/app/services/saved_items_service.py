@@ -0,0 +1,191 @@
+"""
+Saved Items Service
+Per-user index of everything a user has saved, so a page of cards can show
+its saved state in one Redis round trip
+
+One Redis set per user and kind, holding item ids:
+
+    saved:{user_id}:bookmark           bookmarked documents
+    saved:{user_id}:reading_list       documents in any of the user's reading lists
+    saved:{user_id}:item:{item_type}   items in the user's bookmark folders, or
+                                       added by them to a workspace collection
+
+A set is loaded from the database, all kinds together, the first time it's
+read; a sentinel member marks it as loaded. Write paths add or remove ids
+after committing (removal only once no other folder or list still holds
+the item) and bump a per-user version; a load that raced a write sees the
+version move and drops what it wrote. Without Redis the same lookups run
+in SQL.
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.collection import BookmarkFolder, BookmarkFolderItem, BookmarkItemType
+from app.models.reading import Bookmark, ReadingList, ReadingListItem
+from app.models.workspace import CollectionItem as WorkspaceCollectionItem, CollectionItemType as WorkspaceItemType
+from app.services.cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+BOOKMARK = "bookmark"
+READING_LIST = "reading_list"
+
+INDEX_TTL = 6 * 3600
+# Present in every loaded set; never a valid id
+LOADED = "_"
+
+
+def item_kind(item_type) -> str:
+    """Kind for a bookmark-folder or workspace collection item type"""
+    return f"item:{getattr(item_type, 'value', item_type)}"
+
+
+ITEM_KINDS = sorted({item_kind(t) for t in BookmarkItemType} | {item_kind(t) for t in WorkspaceItemType})
+KINDS = [BOOKMARK, READING_LIST, *ITEM_KINDS]
+
+
+def _key(user_id: int, kind: str) -> str:
+    return f"saved:{user_id}:{kind}"
+
+
+def _version_key(user_id: int) -> str:
+    return f"saved:{user_id}:version"
+
+
+class SavedItemsService:
+    """Service for the per-user saved-items index."""
+
+    @staticmethod
+    async def lookup(db: AsyncSession, user_id: int, items: Sequence[Tuple[str, int]]) -> List[bool]:
+        """Saved state of each (kind, item_id), in order"""
+        if not items:
+            return []
+        wanted: Dict[str, List[int]] = defaultdict(list)
+        for kind, item_id in items:
+            wanted[kind].append(item_id)
+
+        cache = await get_cache()
+        if cache.redis:
+            saved = await SavedItemsService._lookup_index(db, cache, user_id, wanted)
+            if saved is not None:
+                return [item_id in saved[kind] for kind, item_id in items]
+
+        saved = await SavedItemsService._saved_in_db(db, user_id, wanted)
+        return [item_id in saved[kind] for kind, item_id in items]
+
+    @staticmethod
+    async def _lookup_index(db, cache, user_id: int, wanted: Dict[str, List[int]]) -> Optional[Dict[str, Set[int]]]:
+        queries = {_key(user_id, kind): [LOADED, *ids] for kind, ids in wanted.items()}
+        for attempt in range(2):
+            results = await cache.smembership(queries)
+            if results is None:
+                return None
+            if all(found[0] for found in results.values()):
+                return defaultdict(set, {
+                    kind: {item_id for item_id, found in zip(ids, results[_key(user_id, kind)][1:]) if found}
+                    for kind, ids in wanted.items()
+                })
+            if attempt == 0:
+                await SavedItemsService._load(db, cache, user_id)
+        # Lost the race with a write twice; the database answers this time
+        return None
+
+    @staticmethod
+    async def _load(db: AsyncSession, cache, user_id: int) -> None:
+        version = await cache.get(_version_key(user_id))
+        saved = await SavedItemsService._saved_in_db(db, user_id)
+        await cache.sreplace(
+            {_key(user_id, kind): [LOADED, *saved[kind]] for kind in KINDS},
+            ttl=INDEX_TTL,
+        )
+        if await cache.get(_version_key(user_id)) != version:
+            await SavedItemsService.invalidate(user_id)
+
+    @staticmethod
+    async def _saved_in_db(
+        db: AsyncSession,
+        user_id: int,
+        wanted: Optional[Dict[str, Iterable[int]]] = None
+    ) -> Dict[str, Set[int]]:
+        """A user's saved ids per kind, limited to wanted when given"""
+        saved: Dict[str, Set[int]] = defaultdict(set)
+
+        def ids_of(*kinds):
+            if wanted is None:
+                return None
+            return {item_id for kind in kinds for item_id in wanted.get(kind, ())}
+
+        document_ids = ids_of(BOOKMARK)
+        if document_ids is None or document_ids:
+            stmt = select(Bookmark.document_id).where(Bookmark.user_id == user_id)
+            if document_ids:
+                stmt = stmt.where(Bookmark.document_id.in_(document_ids))
+            saved[BOOKMARK].update((await db.execute(stmt)).scalars().all())
+
+        document_ids = ids_of(READING_LIST)
+        if document_ids is None or document_ids:
+            stmt = (
+                select(ReadingListItem.document_id)
+                .join(ReadingList, ReadingList.id == ReadingListItem.reading_list_id)
+                .where(ReadingList.user_id == user_id)
+            )
+            if document_ids:
+                stmt = stmt.where(ReadingListItem.document_id.in_(document_ids))
+            saved[READING_LIST].update((await db.execute(stmt)).scalars().all())
+
+        item_ids = ids_of(*ITEM_KINDS)
+        if item_ids is None or item_ids:
+            folder_items = (
+                select(BookmarkFolderItem.item_type, BookmarkFolderItem.item_id)
+                .join(BookmarkFolder, BookmarkFolder.id == BookmarkFolderItem.folder_id)
+                .where(BookmarkFolder.user_id == user_id)
+            )
+            workspace_items = (
+                select(WorkspaceCollectionItem.item_type, WorkspaceCollectionItem.item_id)
+                .where(WorkspaceCollectionItem.added_by == user_id)
+            )
+            for stmt, column in ((folder_items, BookmarkFolderItem.item_id), (workspace_items, WorkspaceCollectionItem.item_id)):
+                if item_ids:
+                    stmt = stmt.where(column.in_(item_ids))
+                for item_type, item_id in (await db.execute(stmt)).all():
+                    saved[item_kind(item_type)].add(item_id)
+
+        return saved
+
+    # ========================================================================
+    # Write paths (after commit)
+    # ========================================================================
+
+    @staticmethod
+    async def mark_saved(user_id: int, kind: str, item_id: int) -> None:
+        cache = await get_cache()
+        if not cache.redis:
+            return
+        await cache.increment(_version_key(user_id))
+        await cache.sadd(_key(user_id, kind), [item_id], ttl=INDEX_TTL)
+
+    @staticmethod
+    async def mark_unsaved(db: AsyncSession, user_id: int, kind: str, item_id: int) -> None:
+        """Drop an item from the index unless another folder or list still holds it"""
+        cache = await get_cache()
+        if not cache.redis:
+            return
+        still_saved = await SavedItemsService._saved_in_db(db, user_id, {kind: [item_id]})
+        if item_id in still_saved[kind]:
+            return
+        await cache.increment(_version_key(user_id))
+        await cache.srem(_key(user_id, kind), [item_id])
+
+    @staticmethod
+    async def invalidate(*user_ids: int) -> None:
+        """Drop users' indexes (bulk deletes); reloaded on the next lookup"""
+        cache = await get_cache()
+        if not cache.redis:
+            return
+        for user_id in set(user_ids):
+            await cache.increment(_version_key(user_id))
+            await cache.sreplace({_key(user_id, kind): () for kind in KINDS})
@@ -0,0 +1,585 @@
+"""
+Similarity Service
+"More like this" for published documents and store items, and bookshelf
+recommendations built on it
+
+Every published work is described by its MAX_TERMS most frequent words
+(sublinear term frequency) plus its tags and genres, hashed to 2^20
+feature ids and kept in content_vectors - written when a document is
+published or put in the store.
+
+The index weights those features by IDF over the whole table, projects
+them into DIM dimensions with signed feature hashing and L2-normalizes
+them, so similarity is the dot product of two rows. It is a float32
+matrix saved under CONTENT_INDEX_DIR and opened memory-mapped - shared by
+the workers, kept across restarts and rebuilt by
+scripts/similarity_index.py, which also refreshes the IDF. Neighbours are
+one matrix-vector product over it; rows written since the snapshot are
+projected with the snapshot's IDF and compared directly.
+
+NumPy is optional: without it nothing is similar.
+"""
+import asyncio
+import logging
+import math
+import os
+import re
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select, delete, func, and_, exists, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.lazy import LazyModule, module_available
+from app.models.base import utc_now
+from app.models.content_vector import ContentVector
+from app.models.document import Document, DocumentStatus, DocumentTag, Tag
+from app.models.store import StoreItem, StoreItemStatus
+from app.services.document_service import document_text
+from app.services.index_snapshot import current_name, load_arrays, read_meta, save_snapshot
+from app.services.trending_service import normalize_tag
+
+logger = logging.getLogger(__name__)
+
+np = LazyModule("numpy")
+
+SIMILARITY_AVAILABLE = module_available("numpy")
+
+DOCUMENT = "document"
+STORE_ITEM = "store_item"
+KINDS = (DOCUMENT, STORE_ITEM)
+
+FEATURE_BITS = 20
+DIM = 1024
+MAX_TERMS = 300
+MIN_WORD_LENGTH = 3
+MAX_CHARS = 500_000
+# A tag or genre counts like a word used e^2 times
+TAG_WEIGHT = 3.0
+
+# Below this a neighbour isn't shown; above SAME_WORK by the same author it is
+# the same text in another form (a document and its store edition)
+MIN_SIMILARITY = 0.05
+SAME_WORK_SIMILARITY = 0.95
+OVERFETCH = 20
+
+# Rows compared directly per lookup when the snapshot is missing or old
+MAX_DELTA_ROWS = 5_000
+BACKFILL_BATCH = 200
+PROJECT_BATCH = 2048
+
+_SIGN_BIT = DIM.bit_length() - 1
+_WORD = re.compile(r"[^\W\d_]+")
+_STOPWORDS = frozenset("""
+    the and for are but not you all any can had her was one our out has him his how its
+    may new now old see two way who did get let say she too use that with have this will
+    your from they been were said each which their there what about would when them then
+    into more some could other than only also back after just like over such well even
+    because these those very where while before being through down should again here
+    """.split())
+
+
+def index_dir() -> str:
+    return os.path.join(settings.CONTENT_INDEX_DIR, "similarity")
+
+
+# ============================================================================
+# Features
+# ============================================================================
+
+def _feature_id(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8")) & ((1 << FEATURE_BITS) - 1)
+
+
+def features(text: str, tags: Iterable[str] = ()) -> Tuple[Any, Any]:
+    """
+    Feature ids (int32, ascending) and weights (float32) of a text and its
+    tags or genres; both empty when there is nothing to go on
+    """
+    words = [
+        word for word in _WORD.findall((text or "")[:MAX_CHARS].lower())
+        if len(word) >= MIN_WORD_LENGTH and word not in _STOPWORDS
+    ]
+    weights: Dict[int, float] = {}
+    for word, count in Counter(words).most_common(MAX_TERMS):
+        feature = _feature_id(word)
+        weights[feature] = weights.get(feature, 0.0) + 1.0 + math.log(count)
+    for tag in {normalize_tag(tag) for tag in tags if tag and tag.strip()}:
+        feature = _feature_id(f"#{tag}")
+        weights[feature] = weights.get(feature, 0.0) + TAG_WEIGHT
+
+    ids = np.array(sorted(weights), dtype=np.int32)
+    return ids, np.array([weights[i] for i in ids.tolist()], dtype=np.float32)
+
+
+def _from_row(row) -> Tuple[Any, Any]:
+    return np.frombuffer(row.feature_ids, dtype="<i4"), np.frombuffer(row.weights, dtype="<f4")
+
+
+def project(rows: Sequence[Tuple[Any, Any]], idf) -> Any:
+    """
+    Unit-length DIM vectors (float32) of (feature_ids, weights) pairs, TF-IDF
+    weighted and folded with signed feature hashing
+    """
+    if not rows:
+        return np.zeros((0, DIM), dtype=np.float32)
+    ids = np.concatenate([row[0] for row in rows]).astype(np.int64)
+    weights = np.concatenate([row[1] for row in rows]) * idf[ids]
+    owner = np.repeat(np.arange(len(rows)), [len(row[0]) for row in rows])
+    # Low bits pick the dimension, the next one the sign
+    signs = 1.0 - 2.0 * ((ids >> _SIGN_BIT) & 1)
+    vectors = np.bincount(
+        owner * DIM + (ids & (DIM - 1)), weights=weights * signs, minlength=len(rows) * DIM
+    ).reshape(len(rows), DIM)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.where(norms > 0, norms, 1.0)).astype(np.float32)
+
+
+def similarities_to(rows: Sequence[Tuple[Any, Any]], idf, queries) -> Any:
+    """
+    Similarity of each (feature_ids, weights) row to each query vector,
+    projecting PROJECT_BATCH rows at a time to bound memory
+    """
+    if not rows:
+        return np.zeros((0, len(queries)), dtype=np.float32)
+    return np.concatenate([
+        project(rows[start:start + PROJECT_BATCH], idf) @ queries.T
+        for start in range(0, len(rows), PROJECT_BATCH)
+    ])
+
+
+def inverse_document_frequency(document_frequency, count: int) -> Any:
+    """Smoothed IDF, so features no work has yet still count"""
+    return (np.log((1.0 + count) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+
+
+# ============================================================================
+# Memory-mapped snapshot
+# ============================================================================
+
+class VectorSnapshot:
+    """
+    The similarity matrix over content_vectors as of built_at
+
+    A snapshot directory holds vectors.npy (N x DIM float32, unit rows),
+    kinds.npy, ids.npy and owners.npy describing the rows, and idf.npy
+    (2^FEATURE_BITS float32) for projecting queries the same way.
+    """
+
+    FILES = ("vectors", "kinds", "ids", "owners", "idf")
+
+    def __init__(self, path: str, meta: Dict[str, Any]):
+        self.path = path
+        self.built_at = datetime.fromisoformat(meta["built_at"])
+        for name, array in load_arrays(path, self.FILES).items():
+            setattr(self, name, array)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def write(vectors, kinds, ids, owners, idf, built_at: datetime) -> str:
+        """Save a snapshot and make it the current one; returns its path"""
+        arrays = {"vectors": vectors, "kinds": kinds, "ids": ids, "owners": owners, "idf": idf}
+        return save_snapshot(index_dir(), built_at, arrays, {
+            "count": int(len(ids)),
+            "dim": DIM,
+            "feature_bits": FEATURE_BITS,
+        })
+
+
+# Per-process: (snapshot name, snapshot)
+_loaded: Tuple[Optional[str], Optional[VectorSnapshot]] = (None, None)
+
+
+def current_snapshot() -> Optional[VectorSnapshot]:
+    """The live snapshot, reopened when a rebuild has replaced it"""
+    global _loaded
+    name = current_name(index_dir())
+    if name is None:
+        return None
+    if name != _loaded[0]:
+        path = os.path.join(index_dir(), name)
+        try:
+            meta = read_meta(path)
+            if meta.get("dim") != DIM or meta.get("feature_bits") != FEATURE_BITS:
+                logger.warning(f"Similarity index {path} has other parameters; rebuild it")
+                return None
+            _loaded = (name, VectorSnapshot(path, meta))
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to open similarity index {path}: {e}")
+            return None
+    return _loaded[1]
+
+
+# ============================================================================
+# Service
+# ============================================================================
+
+class SimilarityService:
+    """Service for the local similarity index."""
+
+    @staticmethod
+    async def similar(
+        db: AsyncSession,
+        kind: str,
+        source_id: int,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Published works most like one document or store item, best first
+
+        Returns [{kind, id, title, ..., similarity}]; empty when the work
+        isn't indexed. Its other editions (same author, same text) are left out.
+        """
+        return await SimilarityService.recommend(db, [(kind, source_id, 1.0)], limit=limit)
+
+    @staticmethod
+    async def recommend(
+        db: AsyncSession,
+        seeds: Sequence[Tuple[str, int, float]],
+        exclude: Optional[Set[Tuple[str, int]]] = None,
+        exclude_owner: Optional[int] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Published works most like any of several seeds
+
+        Args:
+            seeds: (kind, source_id, weight); a candidate scores its best
+                weighted similarity to one seed
+            exclude: (kind, source_id) never returned - the seeds always are
+            exclude_owner: Leave out this author's works
+
+        Returns:
+            [{kind, id, title, ..., similarity, because: {kind, id}}], best first
+        """
+        if not SIMILARITY_AVAILABLE or not seeds:
+            return []
+        started = time.perf_counter()
+
+        weight_of = {(kind, source_id): weight for kind, source_id, weight in seeds}
+        seed_rows = (await db.execute(
+            select(ContentVector).where(
+                tuple_(ContentVector.kind, ContentVector.source_id).in_(list(weight_of))
+            )
+        )).scalars().all()
+        if not seed_rows:
+            return []
+
+        snapshot = current_snapshot()
+        idf = snapshot.idf if snapshot is not None else np.ones(1 << FEATURE_BITS, dtype=np.float32)
+        queries = project([_from_row(row) for row in seed_rows], idf)
+        weights = np.array([weight_of[(row.kind, row.source_id)] for row in seed_rows], dtype=np.float32)
+        weights /= weights.max()
+        skip = set(exclude or ()) | set(weight_of)
+
+        # (kind, source_id) -> (per-seed similarities, owner_id)
+        found: Dict[Tuple[str, int], Tuple[Any, Optional[int]]] = {}
+        wanted = limit + OVERFETCH + len(skip)
+        if snapshot is not None and len(snapshot):
+            similarities = await asyncio.to_thread(np.dot, snapshot.vectors, queries.T)
+            scores = (similarities * weights).max(axis=1)
+            top = np.argpartition(-scores, wanted - 1)[:wanted] if len(scores) > wanted else np.arange(len(scores))
+            for row in top:
+                owner = int(snapshot.owners[row])
+                found[(KINDS[snapshot.kinds[row]], int(snapshot.ids[row]))] = (
+                    similarities[row], owner if owner >= 0 else None
+                )
+
+        # Written since the snapshot: projected the same way, and newer than it
+        since = snapshot.built_at if snapshot is not None else datetime.min.replace(tzinfo=timezone.utc)
+        delta = (await db.execute(
+            select(
+                ContentVector.kind, ContentVector.source_id, ContentVector.owner_id,
+                ContentVector.feature_ids, ContentVector.weights
+            )
+            .where(ContentVector.updated_at > since)
+            .order_by(ContentVector.updated_at.desc())
+            .limit(MAX_DELTA_ROWS)
+        )).all()
+        if len(delta) == MAX_DELTA_ROWS:
+            logger.warning("Similarity index is far behind content_vectors; rebuild it")
+        if delta:
+            similarities = await asyncio.to_thread(
+                similarities_to, [_from_row(row) for row in delta], idf, queries
+            )
+            for row, row_similarities in zip(delta, similarities):
+                found[(row.kind, row.source_id)] = (row_similarities, row.owner_id)
+
+        ranked = []
+        for key, (row_similarities, owner) in found.items():
+            if key in skip or (exclude_owner is not None and owner == exclude_owner):
+                continue
+            # Another edition of a seed rather than another work
+            if any(
+                similarity >= SAME_WORK_SIMILARITY and owner is not None and owner == seed.owner_id
+                for similarity, seed in zip(row_similarities.tolist(), seed_rows)
+            ):
+                continue
+            weighted = row_similarities * weights
+            best = int(weighted.argmax())
+            if weighted[best] >= MIN_SIMILARITY:
+                ranked.append((float(weighted[best]), key, seed_rows[best]))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+
+        items = await SimilarityService._live_items(db, [key for _, key, _ in ranked[:wanted]])
+        results = []
+        for score, key, seed in ranked:
+            if key not in items:
+                continue
+            results.append({
+                **items[key],
+                "similarity": round(score, 3),
+                "because": {"kind": seed.kind, "id": seed.source_id},
+            })
+            if len(results) >= limit:
+                break
+
+        logger.debug(
+            f"Similarity lookup: {len(seed_rows)} seeds, {len(found)} candidates, "
+            f"{(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return results
+
+    @staticmethod
+    async def _live_items(db: AsyncSession, keys: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        """Summaries of the works that are still published"""
+        ids = {kind: [source_id for k, source_id in keys if k == kind] for kind in KINDS}
+        items: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        if ids[DOCUMENT]:
+            documents = (await db.execute(
+                select(Document).where(
+                    Document.id.in_(ids[DOCUMENT]),
+                    Document.status == DocumentStatus.PUBLISHED,
+                    Document.is_deleted == False,
+                )
+            )).scalars().all()
+            for document in documents:
+                items[(DOCUMENT, document.id)] = {
+                    "kind": DOCUMENT,
+                    "id": document.id,
+                    "title": document.title,
+                    "description": document.description,
+                    "owner_id": document.owner_id,
+                    "word_count": document.word_count,
+                    "published_at": document.published_at,
+                }
+        if ids[STORE_ITEM]:
+            store_items = (await db.execute(
+                select(StoreItem).where(
+                    StoreItem.id.in_(ids[STORE_ITEM]),
+                    StoreItem.status == StoreItemStatus.ACTIVE,
+                )
+            )).scalars().all()
+            for item in store_items:
+                items[(STORE_ITEM, item.id)] = {
+                    "kind": STORE_ITEM,
+                    "id": item.id,
+                    "title": item.title,
+                    "description": item.description,
+                    "author_name": item.author_name,
+                    "cover_url": item.cover_blob_url,
+                    "price_usd": float(item.price_usd) if item.price_usd is not None else None,
+                    "genres": item.genres or [],
+                }
+        return items
+
+    # ========================================================================
+    # Writes
+    # ========================================================================
+
+    @staticmethod
+    async def index(
+        db: AsyncSession,
+        kind: str,
+        source_id: int,
+        owner_id: Optional[int],
+        text: str,
+        tags: Iterable[str] = ()
+    ) -> bool:
+        """Store (or replace) the features of a work; False if it has none"""
+        if not SIMILARITY_AVAILABLE:
+            return False
+        ids, weights = await asyncio.to_thread(features, text, list(tags))
+        if not len(ids):
+            await SimilarityService.remove(db, kind, source_id)
+            return False
+
+        values = {
+            "owner_id": owner_id,
+            "feature_ids": ids.astype("<i4").tobytes(),
+            "weights": weights.astype("<f4").tobytes(),
+            "updated_at": utc_now(),
+        }
+        await db.execute(
+            insert(ContentVector)
+            .values(kind=kind, source_id=source_id, **values)
+            .on_conflict_do_update(index_elements=["kind", "source_id"], set_=values)
+        )
+        await db.commit()
+        return True
+
+    @staticmethod
+    async def remove(db: AsyncSession, kind: str, source_id: int) -> None:
+        await db.execute(
+            delete(ContentVector).where(ContentVector.kind == kind, ContentVector.source_id == source_id)
+        )
+        await db.commit()
+
+    @staticmethod
+    async def index_document(
+        db: AsyncSession,
+        document_id: int,
+        store_item_id: Optional[int] = None
+    ) -> bool:
+        """Index a published document (and the store item made from it, with its genres)"""
+        document = (await db.execute(
+            select(Document).where(Document.id == document_id)
+        )).scalar_one_or_none()
+        if not document or document.is_deleted or document.status != DocumentStatus.PUBLISHED:
+            return False
+
+        text = await document_text(document)
+        tags = (await db.execute(
+            select(Tag.name).join(DocumentTag, DocumentTag.tag_id == Tag.id)
+            .where(DocumentTag.document_id == document.id)
+        )).scalars().all()
+        indexed = await SimilarityService.index(db, DOCUMENT, document.id, document.owner_id, text, tags)
+        if store_item_id:
+            genres = (await db.execute(
+                select(StoreItem.genres).where(StoreItem.id == store_item_id)
+            )).scalar_one_or_none() or []
+            await SimilarityService.index(
+                db, STORE_ITEM, store_item_id, document.owner_id, text, list(tags) + list(genres)
+            )
+        return indexed
+
+    @staticmethod
+    async def index_document_in_background(document_id: int, store_item_id: Optional[int] = None):
+        from app.core.database import get_jobs_session_local
+
+        SessionLocal = get_jobs_session_local()
+        async with SessionLocal() as db:
+            try:
+                await SimilarityService.index_document(db, document_id, store_item_id)
+            except Exception as e:
+                logger.error(f"Similarity indexing failed for document {document_id}: {e}")
+
+    # ========================================================================
+    # Maintenance (scripts/similarity_index.py)
+    # ========================================================================
+
+    @staticmethod
+    async def prune(db: AsyncSession) -> int:
+        """Drop the features of unpublished, deleted or delisted works"""
+        live = {
+            DOCUMENT: exists().where(
+                Document.id == ContentVector.source_id,
+                Document.status == DocumentStatus.PUBLISHED,
+                Document.is_deleted == False,
+            ),
+            STORE_ITEM: exists().where(
+                StoreItem.id == ContentVector.source_id,
+                StoreItem.status == StoreItemStatus.ACTIVE,
+            ),
+        }
+        removed = 0
+        for kind, condition in live.items():
+            result = await db.execute(
+                delete(ContentVector).where(ContentVector.kind == kind, ~condition)
+            )
+            removed += result.rowcount
+        await db.commit()
+        return removed
+
+    @staticmethod
+    async def backfill(db: AsyncSession) -> int:
+        """Index published documents that have no features yet"""
+        indexed = 0
+        last_id = 0
+        while True:
+            ids = (await db.execute(
+                select(Document.id)
+                .where(
+                    Document.id > last_id,
+                    Document.status == DocumentStatus.PUBLISHED,
+                    Document.is_deleted == False,
+                    ~exists().where(and_(
+                        ContentVector.kind == DOCUMENT,
+                        ContentVector.source_id == Document.id,
+                    )),
+                )
+                .order_by(Document.id)
+                .limit(BACKFILL_BATCH)
+            )).scalars().all()
+            if not ids:
+                return indexed
+            last_id = ids[-1]
+            for document_id in ids:
+                if await SimilarityService.index_document(db, document_id):
+                    indexed += 1
+
+    @staticmethod
+    async def _stream(db: AsyncSession, built_at: datetime):
+        """content_vectors as of built_at, a partition at a time"""
+        rows = await db.stream(
+            select(
+                ContentVector.kind, ContentVector.source_id, ContentVector.owner_id,
+                ContentVector.feature_ids, ContentVector.weights
+            )
+            .where(ContentVector.updated_at <= built_at)
+            .execution_options(yield_per=PROJECT_BATCH)
+        )
+        async for partition in rows.partitions():
+            yield partition
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> Dict[str, Any]:
+        """
+        Recompute the IDF and snapshot content_vectors into a new
+        memory-mapped matrix: one pass counts document frequencies, a second
+        projects the rows
+        """
+        if not SIMILARITY_AVAILABLE:
+            raise RuntimeError("NumPy is required to build the similarity index")
+
+        # Anything written from here on is read as delta
+        built_at = utc_now()
+        count = (await db.execute(select(func.count()).select_from(ContentVector))).scalar()
+
+        document_frequency = np.zeros(1 << FEATURE_BITS, dtype=np.int64)
+        async for partition in SimilarityService._stream(db, built_at):
+            ids = np.concatenate([np.frombuffer(row.feature_ids, dtype="<i4") for row in partition])
+            document_frequency += np.bincount(ids, minlength=1 << FEATURE_BITS)
+        await db.rollback()
+        idf = inverse_document_frequency(document_frequency, count)
+
+        vectors = np.empty((count, DIM), dtype=np.float32)
+        kinds = np.empty(count, dtype=np.uint8)
+        source_ids = np.empty(count, dtype=np.int64)
+        owners = np.empty(count, dtype=np.int64)
+        filled = 0
+        async for partition in SimilarityService._stream(db, built_at):
+            partition = partition[:count - filled]
+            if not partition:
+                break
+            end = filled + len(partition)
+            vectors[filled:end] = project([_from_row(row) for row in partition], idf)
+            for offset, row in enumerate(partition, start=filled):
+                kinds[offset] = KINDS.index(row.kind)
+                source_ids[offset] = row.source_id
+                owners[offset] = row.owner_id if row.owner_id is not None else -1
+            filled = end
+        await db.rollback()
+
+        path = await asyncio.to_thread(
+            VectorSnapshot.write,
+            vectors[:filled], kinds[:filled], source_ids[:filled], owners[:filled], idf, built_at
+        )
+        return {"vectors": filled, "path": path}
@@ -0,0 +1,256 @@
+"""
+Storage GC Service
+Finds blob storage objects no row references any more, and deletes them
+
+Only the key spaces the app writes and tracks are collected:
+
+    {tenant_id}/documents/...        documents.file_path, document_versions.file_path
+    epub-submissions/{hash}.epub     epub_submissions.file_hash
+
+Tenant prefixes are discovered from the bucket and collected in parallel.
+Within a prefix, the S3 listing (key order) is merge-diffed against the
+referenced paths paged from the database in the same byte order
+(COLLATE "C"), so neither side is ever held in memory. Objects modified
+within the grace period are kept, since an upload is written before the row
+that references it. Orphans are deleted with DeleteObjects, 1000 keys per
+call, and after each batch the prefix's position is saved to a checkpoint
+file, so an interrupted run resumes where it stopped.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import select, literal, collate
+
+from app.models.document import Document, DocumentVersion
+from app.models.epub_submission import EpubSubmission
+from app.services.storage_service import storage_service
+
+logger = logging.getLogger(__name__)
+
+EPUB_PREFIX = "epub-submissions/"
+DOCUMENT_PATHS = (Document.file_path, DocumentVersion.file_path)
+# Key written by the EPUB upload endpoint
+EPUB_PATHS = (literal(EPUB_PREFIX) + EpubSubmission.file_hash + ".epub",)
+
+DEFAULT_GRACE = timedelta(hours=24)
+DEFAULT_WORKERS = 8
+DB_PAGE_SIZE = 5000
+STAT_NAMES = ("scanned", "referenced", "recent", "orphaned", "deleted", "failed", "orphaned_bytes")
+# S3 DeleteObjects limit
+DELETE_BATCH = 1000
+
+
+def _prefix_end(prefix: str) -> str:
+    """Smallest string after every key starting with prefix"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class ReferencedPaths:
+    """
+    Paths under a prefix referenced by one column, read in key order a page
+    at a time; contains() must be called with ascending keys
+    """
+
+    def __init__(self, db, column, prefix: str, start_after: Optional[str] = None):
+        self.db = db
+        self.source = column
+        self.column = collate(column, "C")
+        self.prefix = prefix
+        self.last = start_after
+        self.page: List[str] = []
+        self.index = 0
+        self.exhausted = False
+
+    async def contains(self, key: str) -> bool:
+        while True:
+            while self.index < len(self.page) and self.page[self.index] < key:
+                self.index += 1
+            if self.index < len(self.page):
+                return self.page[self.index] == key
+            if self.exhausted:
+                return False
+            await self._fetch()
+
+    async def _fetch(self) -> None:
+        stmt = select(self.column).where(
+            self.source.isnot(None),
+            self.column >= self.prefix,
+            self.column < _prefix_end(self.prefix),
+        )
+        if self.last is not None:
+            stmt = stmt.where(self.column > self.last)
+        rows = (await self.db.execute(stmt.order_by(self.column).limit(DB_PAGE_SIZE))).scalars().all()
+        # Read-only: don't keep a transaction open while S3 is listed
+        await self.db.rollback()
+
+        self.page = list(rows)
+        self.index = 0
+        if rows:
+            self.last = rows[-1]
+        self.exhausted = len(rows) < DB_PAGE_SIZE
+
+
+class GcCheckpoint:
+    """Progress of a collection run, kept in a JSON file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.state: Dict[str, Any] = {"done": {}, "cursors": {}}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.state = json.load(f)
+            logger.info(
+                f"Resuming from {path}: {len(self.state['done'])} prefixes done, "
+                f"{len(self.state['cursors'])} in progress"
+            )
+
+    def is_done(self, prefix: str) -> bool:
+        return prefix in self.state["done"]
+
+    def cursor(self, prefix: str) -> Optional[str]:
+        return self.state["cursors"].get(prefix)
+
+    def advance(self, prefix: str, key: str) -> None:
+        self.state["cursors"][prefix] = key
+        self.save()
+
+    def finish(self, prefix: str, stats: Dict[str, int]) -> None:
+        self.state["cursors"].pop(prefix, None)
+        self.state["done"][prefix] = stats
+        self.save()
+
+    def save(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class StorageGarbageCollector:
+    """One collection run over the bucket"""
+
+    def __init__(
+        self,
+        dry_run: bool = True,
+        grace: timedelta = DEFAULT_GRACE,
+        workers: int = DEFAULT_WORKERS,
+        checkpoint: Optional[GcCheckpoint] = None
+    ):
+        self.dry_run = dry_run
+        self.grace = grace
+        self.workers = workers
+        # Dry runs delete nothing, so there is nothing to resume
+        self.checkpoint = None if dry_run else checkpoint
+
+    async def targets(self) -> List[tuple]:
+        """(prefix, referencing columns) for every collected key space"""
+        roots = await asyncio.to_thread(storage_service.list_prefixes)
+        tenants = [f"{root}documents/" for root in roots if root[:-1].isdigit()]
+        return [(prefix, DOCUMENT_PATHS) for prefix in tenants] + [(EPUB_PREFIX, EPUB_PATHS)]
+
+    async def run(self, prefixes: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Collect every target (or those under the given prefixes)
+        Returns totals: scanned, referenced, recent, orphaned, deleted,
+        failed, orphaned_bytes, plus prefixes, errors and throughput
+        """
+        started = time.perf_counter()
+        cutoff = datetime.now(timezone.utc) - self.grace
+        targets = [
+            (prefix, columns) for prefix, columns in await self.targets()
+            if not prefixes or any(prefix.startswith(p) for p in prefixes)
+        ]
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def collect(prefix, columns):
+            async with semaphore:
+                return await self.collect_prefix(prefix, columns, cutoff)
+
+        pending = [(p, c) for p, c in targets if not (self.checkpoint and self.checkpoint.is_done(p))]
+        results = await asyncio.gather(*(collect(p, c) for p, c in pending), return_exceptions=True)
+
+        totals = dict.fromkeys(STAT_NAMES, 0)
+        errors = 0
+        for (prefix, _), result in zip(pending, results):
+            if isinstance(result, Exception):
+                errors += 1
+                logger.error(f"Storage GC failed for {prefix}: {result}")
+                continue
+            for name in totals:
+                totals[name] += result[name]
+
+        if self.checkpoint and not errors:
+            self.checkpoint.clear()
+
+        seconds = time.perf_counter() - started
+        totals.update({
+            "prefixes": len(pending),
+            "errors": errors,
+            "seconds": round(seconds, 1),
+            "objects_per_second": round(totals["scanned"] / seconds, 1) if seconds else 0,
+        })
+        return totals
+
+    async def collect_prefix(self, prefix: str, columns, cutoff: datetime) -> Dict[str, int]:
+        """Merge-diff one prefix against its referenced paths"""
+        from app.core.database import get_jobs_session_local
+
+        start_after = self.checkpoint.cursor(prefix) if self.checkpoint else None
+        stats = dict.fromkeys(STAT_NAMES, 0)
+        orphans: List[str] = []
+
+        async def flush(position: Optional[str]):
+            if orphans and not self.dry_run:
+                deleted = await asyncio.to_thread(storage_service.delete_documents, orphans)
+                stats["deleted"] += deleted
+                stats["failed"] += len(orphans) - deleted
+            orphans.clear()
+            if self.checkpoint and position:
+                self.checkpoint.advance(prefix, position)
+
+        async with get_jobs_session_local()() as db:
+            referenced = [ReferencedPaths(db, column, prefix, start_after) for column in columns]
+            pages = storage_service.list_objects(prefix, start_after)
+            while True:
+                page = await asyncio.to_thread(next, pages, None)
+                if page is None:
+                    break
+                for obj in page:
+                    key = obj["Key"]
+                    stats["scanned"] += 1
+                    if await self._referenced(referenced, key):
+                        stats["referenced"] += 1
+                    elif obj["LastModified"] > cutoff:
+                        stats["recent"] += 1
+                    else:
+                        stats["orphaned"] += 1
+                        stats["orphaned_bytes"] += obj.get("Size", 0)
+                        orphans.append(key)
+                if len(orphans) >= DELETE_BATCH and page:
+                    await flush(page[-1]["Key"])
+            await flush(None)
+
+        if self.checkpoint:
+            self.checkpoint.finish(prefix, stats)
+        if stats["orphaned"]:
+            logger.info(
+                f"{prefix}: {stats['scanned']} objects, {stats['orphaned']} orphaned "
+                f"({stats['orphaned_bytes'] / 1024 / 1024:.2f} MB), {stats['deleted']} deleted"
+            )
+        return stats
+
+    @staticmethod
+    async def _referenced(referenced: List[ReferencedPaths], key: str) -> bool:
+        for paths in referenced:
+            if await paths.contains(key):
+                return True
+        return False
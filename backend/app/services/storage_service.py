@@ -2,14 +2,14 @@
 Storage Service
 Handles document file storage using S3-compatible object storage (AWS S3, MinIO, etc.)
 """
-import boto3
 from botocore.exceptions import ClientError
-from typing import Optional, BinaryIO
+from typing import Optional, BinaryIO, Iterator, List
 import logging
 from datetime import datetime
 from io import BytesIO
 
 from app.core.config import settings
+from app.core.lazy import LazyService
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +25,8 @@ class StorageService:
         # Only initialize if S3 is configured
         if settings.S3_ACCESS_KEY_ID_CLEAN and settings.S3_SECRET_ACCESS_KEY_CLEAN:
             try:
+                import boto3
+
                 self.s3_client = boto3.client(
                     's3',
                     endpoint_url=settings.S3_ENDPOINT_URL if settings.S3_ENDPOINT_URL else None,
@@ -165,6 +167,80 @@ class StorageService:
             logger.error(f"Failed to delete document from S3: {e}")
             return False
     
+    def delete_documents(self, object_keys: List[str]) -> int:
+        """
+        Delete documents from S3, up to 1000 keys per DeleteObjects call
+        
+        Args:
+            object_keys: S3 object keys (paths)
+            
+        Returns:
+            Number of objects deleted
+        """
+        if not self.s3_client:
+            return 0
+        
+        deleted = 0
+        for start in range(0, len(object_keys), 1000):
+            batch = object_keys[start:start + 1000]
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+                )
+            except ClientError as e:
+                logger.error(f"Failed to delete {len(batch)} documents from S3: {e}")
+                continue
+            
+            # Quiet mode only reports the failures
+            errors = response.get('Errors', [])
+            for error in errors[:5]:
+                logger.error(f"Failed to delete document from S3: {error.get('Key')} ({error.get('Code')})")
+            deleted += len(batch) - len(errors)
+        
+        logger.info(f"Deleted {deleted} documents from S3")
+        return deleted
+    
+    def list_prefixes(self, prefix: str = "") -> List[str]:
+        """
+        List the "folders" directly under a prefix (CommonPrefixes)
+        
+        Args:
+            prefix: Parent prefix, ending with "/" (or empty for the root)
+            
+        Returns:
+            Child prefixes, each ending with "/"
+        """
+        if not self.s3_client:
+            return []
+        
+        prefixes = []
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix, Delimiter='/'):
+            prefixes.extend(p['Prefix'] for p in page.get('CommonPrefixes', []))
+        return prefixes
+    
+    def list_objects(self, prefix: str, start_after: Optional[str] = None) -> Iterator[List[dict]]:
+        """
+        List objects under a prefix, one page (up to 1000) at a time
+        
+        Args:
+            prefix: Key prefix
+            start_after: Only keys after this one (resuming a listing)
+            
+        Yields:
+            Pages of {'Key', 'Size', 'LastModified'}, in key (UTF-8 byte) order
+        """
+        if not self.s3_client:
+            return
+        
+        params = {'Bucket': self.bucket_name, 'Prefix': prefix}
+        if start_after:
+            params['StartAfter'] = start_after
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(**params):
+            yield page.get('Contents', [])
+    
     def get_document_url(self, object_key: str, expiration: int = 3600) -> Optional[str]:
         """
         Generate presigned URL for direct document access
@@ -195,5 +271,5 @@ class StorageService:
             return None
 
 
-# Global storage service instance
-storage_service = StorageService()
+# Global storage service instance, built on first use
+storage_service = LazyService(StorageService)
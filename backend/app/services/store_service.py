@@ -3,7 +3,6 @@ Store Service - Publishing documents to the WorkShelf marketplace
 """
 import json
 import os
-import boto3
 from botocore.exceptions import ClientError
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone
@@ -146,6 +145,8 @@ async def _upload_epub_to_s3(epub_path: str, file_hash: str) -> str:
         raise HTTPException(status_code=500, detail="S3 storage not configured")
     
     # Initialize S3 client
+    import boto3
+
     s3_client = boto3.client(
         's3',
         endpoint_url=settings.S3_ENDPOINT_URL if settings.S3_ENDPOINT_URL else None,
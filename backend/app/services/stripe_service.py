@@ -3,7 +3,6 @@ Stripe Service for WorkShelf Store
 Handles payment processing, checkout sessions, and webhooks
 """
 import os
-import stripe
 from typing import Optional, Dict, Any
 from decimal import Decimal
 from datetime import datetime, timezone
@@ -15,11 +14,17 @@ from fastapi import HTTPException
 from app.models.store import StoreItem, Purchase, PurchaseStatus, AuthorEarnings
 from app.models.vault import Article
 from app.models.author import Author
+from app.core.lazy import LazyModule
 
 
-# Initialize Stripe with secret key
-# Support both local (.env) and Azure naming conventions
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY") or os.getenv("stripe-secret-key")
+def _configure_stripe(module):
+    """Set the secret key; supports both local (.env) and Azure naming conventions"""
+    module.api_key = os.getenv("STRIPE_SECRET_KEY") or os.getenv("stripe-secret-key") or "sk_test_"
+
+
+# The stripe SDK is imported (and configured) the first time a payment needs it.
+# Every module that talks to Stripe uses this one instance.
+stripe = LazyModule("stripe", configure=_configure_stripe)
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET") or os.getenv("stripe-webhook-secret")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
@@ -12,6 +12,8 @@ from sqlalchemy.orm import selectinload
 from app.models import (
     Studio, StudioTheme, StudioCustomDomain, DocumentView
 )
+from app.services.tenant_resolution_service import STUDIO, tenant_resolution
+from app.services.trending_service import VIEW, TrendingService
 
 
 class StudioCustomizationService:
@@ -84,6 +86,7 @@ class StudioCustomizationService:
         
         await db.commit()
         await db.refresh(theme)
+        await tenant_resolution.publish_invalidation(STUDIO, studio_id)
         return theme
     
     @staticmethod
@@ -113,6 +116,7 @@ class StudioCustomizationService:
         
         await db.delete(theme)
         await db.commit()
+        await tenant_resolution.publish_invalidation(STUDIO, studio_id)
         return True
     
     # ========================================================================
@@ -186,6 +190,7 @@ class StudioCustomizationService:
         
         await db.commit()
         await db.refresh(custom_domain)
+        await tenant_resolution.publish_invalidation(STUDIO, custom_domain.studio_id)
         return custom_domain
     
     @staticmethod
@@ -221,6 +226,7 @@ class StudioCustomizationService:
         
         await db.delete(custom_domain)
         await db.commit()
+        await tenant_resolution.publish_invalidation(STUDIO, studio_id)
         return True
     
     # ========================================================================
@@ -270,6 +276,8 @@ class StudioCustomizationService:
         db.add(view)
         await db.commit()
         await db.refresh(view)
+        if is_unique:
+            await TrendingService.record(db, document_id, VIEW)
         return view
     
     @staticmethod
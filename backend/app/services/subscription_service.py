@@ -7,17 +7,12 @@ from typing import Optional, List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import joinedload
-import stripe
-import os
 
 from app.models import (
     User, Subscription, SubscriptionTier, Payment,
     SubscriptionStatus, BillingInterval, PaymentStatus
 )
-
-
-# Initialize Stripe
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "sk_test_")
+from app.services.stripe_service import stripe
 
 
 class SubscriptionService:
@@ -0,0 +1,405 @@
+"""
+Tenant Resolution Service
+Maps request hosts to groups and studios, and serves their compiled themes,
+without touching the database
+
+Branded pages are reached through an approved group subdomain
+(writers.workshelf.dev), a studio subdomain, or a verified custom domain
+(GroupCustomDomain / StudioCustomDomain). Every process keeps the complete
+host map and every active theme in memory - there are only as many entries as
+branded tenants - so resolving a host and fetching its theme are dict
+lookups.
+
+Themes are compiled once per change into a CSS blob (custom properties plus
+the tenant's custom CSS) and a JSON blob, both versioned by a hash of their
+content. Versioned URLs never change meaning, so they are served with
+`immutable` cache headers; a theme edit produces a new version and a new URL.
+
+The map is loaded at startup and rebuilt whenever a change is published on
+the Redis channel below (subdomain approval, domain verification or removal,
+theme edits), plus a periodic rebuild as a safety net for missed messages and
+changes made outside the API. Without Redis, changes apply to the local
+process immediately and to other processes on the next periodic rebuild.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.collaboration import Group, GroupCustomDomain
+from app.models.group_customization import GroupTheme
+from app.models.studio import Studio
+from app.models.studio_customization import StudioCustomDomain, StudioTheme
+from app.services.cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+GROUP = "group"
+STUDIO = "studio"
+
+INVALIDATION_CHANNEL = "tenant_resolution:invalidate"
+
+_COLOR_PATTERN = re.compile(r"^#[0-9A-Fa-f]{3,8}$")
+_PORT_PATTERN = re.compile(r":\d+$")
+
+
+def normalize_host(host: str) -> str:
+    """Lowercase host name without port or trailing dot"""
+    return _PORT_PATTERN.sub("", host.strip().lower()).rstrip(".")
+
+
+def _css_string(value: str) -> str:
+    """Quoted CSS string that can't escape its declaration"""
+    value = re.sub(r"[\r\n\f]", " ", value)
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def compile_theme(kind: str, entity_id: int, theme: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    CSS and JSON blobs for a theme, versioned by content
+
+    Args:
+        kind: GROUP or STUDIO
+        entity_id: Group or studio ID
+        theme: Dict with colors, fonts, assets, layout and custom_css
+
+    Returns:
+        Dict with version, css and json (both encoded, ready to send)
+    """
+    declarations = []
+    for name, value in theme["colors"].items():
+        # Colors are stored unvalidated; anything that isn't a hex color
+        # could break out of the :root block
+        if value and _COLOR_PATTERN.match(value):
+            declarations.append(f"  --theme-{name.replace('_', '-')}: {value};")
+    for name, value in theme["fonts"].items():
+        if value:
+            declarations.append(f"  --theme-{name.replace('_', '-')}: {_css_string(value)};")
+    for name, value in theme["assets"].items():
+        if value:
+            declarations.append(f"  --theme-{name.replace('_', '-')}: url({_css_string(value)});")
+
+    css = ":root {\n" + "\n".join(declarations) + "\n}\n"
+    if theme.get("custom_css"):
+        css += "\n" + theme["custom_css"].strip() + "\n"
+
+    document = {
+        "kind": kind,
+        "id": entity_id,
+        "colors": theme["colors"],
+        "fonts": theme["fonts"],
+        "assets": theme["assets"],
+        "layout": theme.get("layout") or {},
+    }
+    json_blob = json.dumps(document, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    css_blob = css.encode("utf-8")
+
+    version = hashlib.sha256(json_blob + b"\0" + css_blob).hexdigest()[:16]
+    document["version"] = version
+    return {
+        "version": version,
+        "css": css_blob,
+        "json": json.dumps(document, sort_keys=True, separators=(",", ":")).encode("utf-8"),
+    }
+
+
+class TenantResolutionService:
+    """In-memory host → tenant map and compiled theme store"""
+
+    # Seconds between safety-net rebuilds
+    REFRESH_INTERVAL = int(os.getenv("TENANT_RESOLUTION_REFRESH_SECONDS", "300"))
+
+    # Seconds before retrying a failed rebuild or a dropped subscription
+    RETRY_DELAY = 10
+
+    def __init__(self):
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._themes: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self._loaded = False
+        self._load_lock: Optional[asyncio.Lock] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._tasks = []
+
+    # ========================================================================
+    # Lookups (no I/O once loaded)
+    # ========================================================================
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def resolve(self, host: str) -> Optional[Dict[str, Any]]:
+        """Tenant for a host name, or None if it isn't a branded host"""
+        return self._hosts.get(normalize_host(host))
+
+    def get_theme(self, kind: str, entity_id: int) -> Optional[Dict[str, Any]]:
+        """Compiled theme (version, css, json) or None for the default theme"""
+        return self._themes.get((kind, entity_id))
+
+    def describe(self, tenant: Dict[str, Any]) -> Dict[str, Any]:
+        """Public description of a resolved tenant, with its theme URLs"""
+        theme = self.get_theme(tenant["kind"], tenant["id"])
+        description = dict(tenant)
+        description["theme"] = None
+        if theme:
+            base = f"/api/v1/tenants/themes/{tenant['kind']}/{tenant['id']}/{theme['version']}"
+            description["theme"] = {
+                "version": theme["version"],
+                "css_url": f"{base}.css",
+                "json_url": f"{base}.json",
+            }
+        return description
+
+    # ========================================================================
+    # Loading
+    # ========================================================================
+
+    async def load(self, db: AsyncSession):
+        """Rebuild the host map and compiled themes from the database"""
+        hosts: Dict[str, Dict[str, Any]] = {}
+        themes: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        base_domain = normalize_host(settings.TENANT_BASE_DOMAIN)
+
+        # Groups: approved subdomains plus verified custom domains
+        result = await db.execute(
+            select(Group.id, Group.name, Group.slug, Group.subdomain_requested)
+            .where(
+                Group.subdomain_approved == True,
+                Group.subdomain_requested.isnot(None),
+                Group.is_active == True,
+                Group.is_deleted == False,
+            )
+        )
+        groups = {}
+        for row in result.all():
+            groups[row.id] = {"kind": GROUP, "id": row.id, "name": row.name, "slug": row.slug}
+            hosts[f"{row.subdomain_requested.lower()}.{base_domain}"] = groups[row.id]
+
+        result = await db.execute(
+            select(GroupCustomDomain.domain, Group.id, Group.name, Group.slug)
+            .join(Group, Group.id == GroupCustomDomain.group_id)
+            .where(
+                GroupCustomDomain.dns_verified == True,
+                GroupCustomDomain.status == "active",
+                Group.is_active == True,
+                Group.is_deleted == False,
+            )
+        )
+        for row in result.all():
+            tenant = groups.setdefault(
+                row.id, {"kind": GROUP, "id": row.id, "name": row.name, "slug": row.slug}
+            )
+            hosts[normalize_host(row.domain)] = tenant
+
+        # Studios: their subdomain plus verified custom domains
+        result = await db.execute(
+            select(Studio.id, Studio.name, Studio.slug, Studio.subdomain)
+            .where(Studio.subdomain.isnot(None), Studio.is_active == True)
+        )
+        studios = {}
+        for row in result.all():
+            studios[row.id] = {"kind": STUDIO, "id": row.id, "name": row.name, "slug": row.slug}
+            hosts[f"{row.subdomain.lower()}.{base_domain}"] = studios[row.id]
+
+        result = await db.execute(
+            select(StudioCustomDomain.domain, StudioCustomDomain.subdomain, Studio.id, Studio.name, Studio.slug)
+            .join(Studio, Studio.id == StudioCustomDomain.studio_id)
+            .where(
+                StudioCustomDomain.is_verified == True,
+                StudioCustomDomain.is_active == True,
+                StudioCustomDomain.status == "active",
+                Studio.is_active == True,
+            )
+        )
+        for row in result.all():
+            tenant = studios.setdefault(
+                row.id, {"kind": STUDIO, "id": row.id, "name": row.name, "slug": row.slug}
+            )
+            domain = normalize_host(row.domain)
+            # The CNAME is set up on the subdomain when one was given
+            if row.subdomain and row.subdomain != "@":
+                domain = f"{normalize_host(row.subdomain)}.{domain}"
+            hosts[domain] = tenant
+
+        # Themes, for the tenants that can be reached by host
+        if groups:
+            result = await db.execute(
+                select(GroupTheme).where(
+                    GroupTheme.group_id.in_(list(groups)),
+                    GroupTheme.is_active == True,
+                )
+            )
+            for theme in result.scalars().all():
+                themes[(GROUP, theme.group_id)] = compile_theme(GROUP, theme.group_id, {
+                    "colors": {
+                        "primary_color": theme.primary_color,
+                        "secondary_color": theme.secondary_color,
+                        "accent_color": theme.accent_color,
+                        "background_color": theme.background_color,
+                        "text_color": theme.text_color,
+                    },
+                    "fonts": {
+                        "heading_font": theme.heading_font,
+                        "body_font": theme.body_font,
+                    },
+                    "assets": {
+                        "logo_url": theme.logo_url,
+                        "banner_url": theme.banner_url,
+                        "favicon_url": theme.favicon_url,
+                    },
+                    "layout": theme.layout_config,
+                    "custom_css": theme.custom_css,
+                })
+
+        if studios:
+            result = await db.execute(
+                select(StudioTheme).where(
+                    StudioTheme.studio_id.in_(list(studios)),
+                    StudioTheme.is_active == True,
+                )
+            )
+            for theme in result.scalars().all():
+                themes[(STUDIO, theme.studio_id)] = compile_theme(STUDIO, theme.studio_id, {
+                    "colors": {
+                        "primary_color": theme.primary_color,
+                        "secondary_color": theme.secondary_color,
+                        "accent_color": theme.accent_color,
+                        "background_color": theme.background_color,
+                        "text_color": theme.text_color,
+                    },
+                    "fonts": {
+                        "heading_font": theme.heading_font,
+                        "body_font": theme.body_font,
+                        "code_font": theme.code_font,
+                    },
+                    "assets": {},
+                    "layout": theme.layout_config,
+                    "custom_css": theme.custom_css,
+                })
+
+        # Swap in whole so lookups never see a half-built map
+        self._hosts = hosts
+        self._themes = themes
+        self._loaded = True
+        logger.info(f"Tenant resolution loaded: {len(hosts)} hosts, {len(themes)} themes")
+
+    async def refresh(self) -> bool:
+        """Rebuild from a fresh session; False if the database was unavailable"""
+        from app.core.database import get_jobs_session_local
+
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            try:
+                async with get_jobs_session_local()() as db:
+                    await self.load(db)
+                return True
+            except Exception as e:
+                logger.error(f"Tenant resolution refresh failed: {e}")
+                return False
+
+    async def ensure_loaded(self):
+        """Load on first use if startup couldn't (e.g. the database was down)"""
+        if not self._loaded:
+            await self.refresh()
+
+    # ========================================================================
+    # Invalidation
+    # ========================================================================
+
+    async def publish_invalidation(self, kind: str, entity_id: int):
+        """
+        Announce that a tenant's hosts or theme changed
+
+        Call after the change is committed. Every process rebuilds its map;
+        without Redis only this one does.
+        """
+        cache = await get_cache()
+        if cache.redis is not None:
+            try:
+                await cache.redis.publish(INVALIDATION_CHANNEL, f"{kind}:{entity_id}")
+                return
+            except Exception as e:
+                logger.warning(f"Tenant invalidation publish failed: {e}")
+
+        if self._changed is not None:
+            self._changed.set()
+        else:
+            await self.refresh()
+
+    async def _subscribe_forever(self):
+        """Turn messages on the invalidation channel into rebuilds"""
+        resubscribing = False
+        while True:
+            cache = await get_cache()
+            if cache.redis is None:
+                # Periodic rebuilds only
+                return
+
+            pubsub = cache.redis.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                if resubscribing:
+                    # Anything published while we weren't subscribed is lost
+                    self._changed.set()
+                resubscribing = True
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._changed.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Tenant invalidation subscription dropped: {e}")
+                await asyncio.sleep(self.RETRY_DELAY)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    async def _refresh_forever(self):
+        """Rebuild on change (bursts coalesce into one rebuild) or on a timer"""
+        delay = self.REFRESH_INTERVAL
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            ok = await self.refresh()
+            delay = self.REFRESH_INTERVAL if ok else self.RETRY_DELAY
+
+    async def start(self):
+        """Warm the map and start listening for changes (application startup)"""
+        if self._tasks:
+            return
+        self._changed = asyncio.Event()
+        if not await self.refresh():
+            self._changed.set()
+        self._tasks = [
+            asyncio.create_task(self._refresh_forever()),
+            asyncio.create_task(self._subscribe_forever()),
+        ]
+
+    async def stop(self):
+        """Stop the listener and refresher (application shutdown)"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._changed = None
+
+
+# Global resolver instance
+tenant_resolution = TenantResolutionService()
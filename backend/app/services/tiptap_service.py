@@ -0,0 +1,337 @@
+"""
+TipTap Service
+Single-pass processing of TipTap (ProseMirror) JSON documents
+
+One iterative walk produces everything the other services need - plain
+text, word count, reading time, HTML, the heading outline, and the images and
+links used by accessibility checks. Output is collected in lists and joined
+once, so cost stays linear in document size, and there is no recursion limit
+to hit on deeply nested content.
+
+Usage:
+    from app.services.tiptap_service import process_content, analyze_document
+
+    result = process_content(tiptap_json)
+    result["word_count"], result["html"], result["outline"]
+
+    # Cached per (document_id, version), large documents run in the worker pool
+    result = await analyze_document(document.id, document.current_version, document.content)
+"""
+import json
+from collections import OrderedDict
+from html import escape
+from typing import Any, Dict, Optional, Tuple, Union
+
+from app.services.document_conversion_service import document_conversion
+
+# Average adult reading speed used for reading time estimates
+WORDS_PER_MINUTE = 200
+
+# Nodes that end a line of plain text
+BLOCK_TYPES = {
+    "paragraph", "heading", "blockquote", "codeBlock", "listItem",
+    "tableRow", "tableCell", "tableHeader",
+}
+
+# Simple wrappers: node type -> (opening tag, closing tag)
+HTML_TAGS = {
+    "paragraph": ("<p>", "</p>\n"),
+    "blockquote": ("<blockquote>", "</blockquote>\n"),
+    "bulletList": ("<ul>", "</ul>\n"),
+    "listItem": ("<li>", "</li>\n"),
+    "table": ("<table>", "</table>\n"),
+    "tableRow": ("<tr>", "</tr>\n"),
+    "tableCell": ("<td>", "</td>\n"),
+    "tableHeader": ("<th>", "</th>\n"),
+}
+
+# Nodes that never have children
+LEAF_TYPES = {"text", "hardBreak", "horizontalRule", "image"}
+
+MARK_TAGS = {
+    "bold": ("<strong>", "</strong>"),
+    "italic": ("<em>", "</em>"),
+    "code": ("<code>", "</code>"),
+    "strike": ("<s>", "</s>"),
+    "underline": ("<u>", "</u>"),
+}
+
+
+def parse_content(content: Union[str, dict, None]) -> Union[str, dict]:
+    """
+    Normalize stored content: TipTap JSON strings become dicts, anything
+    else is treated as plain text
+    """
+    if not content:
+        return ""
+    if isinstance(content, dict):
+        return content
+    if isinstance(content, str):
+        if content.lstrip().startswith("{"):
+            try:
+                parsed = json.loads(content)
+            except ValueError:
+                return content
+            if isinstance(parsed, dict) and "type" in parsed:
+                return parsed
+        return content
+    return ""
+
+
+def reading_time_minutes(word_count: int) -> int:
+    """Estimated reading time in minutes (0 for empty content)"""
+    if not word_count:
+        return 0
+    return max(1, round(word_count / WORDS_PER_MINUTE))
+
+
+def _int_attr(attrs: dict, name: str, default: int, low: Optional[int] = None, high: Optional[int] = None) -> int:
+    """Integer attribute, clamped, since it ends up inside a tag"""
+    try:
+        value = int(attrs.get(name, default))
+    except (TypeError, ValueError):
+        return default
+    if low is not None:
+        value = max(low, value)
+    if high is not None:
+        value = min(high, value)
+    return value
+
+
+def _escape_text(text: str) -> str:
+    """html.escape for text content, skipped when there is nothing to escape"""
+    if "&" in text or "<" in text or ">" in text:
+        return escape(text, quote=False)
+    return text
+
+
+def _emit_leaf(
+    node: dict,
+    node_type: str,
+    html: bool,
+    text_parts: list,
+    html_parts: list,
+    images: list,
+    links: list,
+):
+    """Handle a node without children: text, hard break, rule or image"""
+    if node_type == "text":
+        text = node.get("text") or ""
+        text_parts.append(text)
+        rendered = _escape_text(text) if html else None
+        for mark in node.get("marks") or ():
+            mark_type = mark.get("type")
+            if mark_type == "link":
+                href = (mark.get("attrs") or {}).get("href") or "#"
+                links.append({"text": text, "href": href})
+                if html:
+                    rendered = f'<a href="{escape(href)}">{rendered}</a>'
+            elif html:
+                # First mark ends up innermost
+                tags = MARK_TAGS.get(mark_type)
+                if tags is not None:
+                    rendered = tags[0] + rendered + tags[1]
+        if html:
+            html_parts.append(rendered)
+
+    elif node_type == "hardBreak":
+        text_parts.append("\n")
+        if html:
+            html_parts.append("<br/>\n")
+
+    elif node_type == "horizontalRule":
+        if html:
+            html_parts.append("<hr/>\n")
+
+    elif node_type == "image":
+        attrs = node.get("attrs") or {}
+        src = attrs.get("src") or ""
+        alt = attrs.get("alt") or ""
+        images.append({"src": src, "alt": alt})
+        if html:
+            html_parts.append(
+                f'<img src="{escape(src)}" alt="{escape(alt)}" '
+                f'title="{escape(attrs.get("title") or "")}"/>\n'
+            )
+
+
+def process_content(content: Union[str, dict, None], html: bool = True) -> Dict[str, Any]:
+    """
+    Walk a TipTap document once and collect everything derived from it
+
+    Args:
+        content: TipTap JSON (dict or JSON string) or plain text
+        html: Also render HTML (skip it when only counts are needed)
+
+    Returns:
+        Dict with text, word_count, reading_time, html (None if not
+        requested), outline (headings), images and links
+    """
+    content = parse_content(content)
+
+    if isinstance(content, str):
+        word_count = len(content.split())
+        return {
+            "text": content,
+            "word_count": word_count,
+            "reading_time": reading_time_minutes(word_count),
+            "html": f"<p>{escape(content, quote=False)}</p>" if html else None,
+            "outline": [],
+            "images": [],
+            "links": [],
+        }
+
+    text_parts = []
+    html_parts = []
+    outline = []
+    images = []
+    links = []
+    add_text = text_parts.append
+    add_html = html_parts.append
+
+    # Items are nodes still to visit, or closing tuples pushed before a
+    # node's remaining children: (closing html, ends a text block, heading
+    # level, index in text_parts where the heading started)
+    stack = [content]
+    while stack:
+        node = stack.pop()
+
+        if node.__class__ is tuple:
+            closing, is_block, level, text_start = node
+            if level is not None:
+                outline.append({"level": level, "text": "".join(text_parts[text_start:]).strip()})
+            if is_block:
+                add_text("\n")
+            if html:
+                add_html(closing)
+            continue
+
+        if node.__class__ is not dict:
+            continue
+
+        node_type = node.get("type")
+        if node_type in LEAF_TYPES:
+            _emit_leaf(node, node_type, html, text_parts, html_parts, images, links)
+            continue
+
+        attrs = node.get("attrs") or {}
+        level = None
+        if node_type == "heading":
+            level = _int_attr(attrs, "level", 1, 1, 6)
+            opening, closing = f"<h{level}>", f"</h{level}>\n"
+        elif node_type == "codeBlock":
+            language = escape(attrs.get("language") or "")
+            opening, closing = f'<pre><code class="language-{language}">', "</code></pre>\n"
+        elif node_type == "orderedList":
+            opening, closing = f'<ol start="{_int_attr(attrs, "start", 1)}">', "</ol>\n"
+        else:
+            # doc and unknown node types just render their children
+            opening, closing = HTML_TAGS.get(node_type, ("", ""))
+
+        if html and opening:
+            add_html(opening)
+        text_start = len(text_parts)
+
+        # Leaf children (nearly every child of a paragraph) are handled
+        # right here; the stack is only needed once a nested block appears
+        children = node.get("content") or ()
+        index = 0
+        for child in children:
+            if child.__class__ is not dict:
+                index += 1
+                continue
+            child_type = child.get("type")
+            if child_type == "text" and not child.get("marks"):
+                text = child.get("text") or ""
+                add_text(text)
+                if html:
+                    add_html(_escape_text(text))
+            elif child_type in LEAF_TYPES:
+                _emit_leaf(child, child_type, html, text_parts, html_parts, images, links)
+            else:
+                break
+            index += 1
+
+        is_block = node_type in BLOCK_TYPES
+        if index < len(children):
+            stack.append((closing, is_block, level, text_start))
+            stack.extend(reversed(children[index:]))
+            continue
+
+        if level is not None:
+            outline.append({"level": level, "text": "".join(text_parts[text_start:]).strip()})
+        if is_block:
+            add_text("\n")
+        if html:
+            add_html(closing)
+    text = "".join(text_parts).strip()
+    word_count = len(text.split())
+    return {
+        "text": text,
+        "word_count": word_count,
+        "reading_time": reading_time_minutes(word_count),
+        "html": "".join(html_parts) if html else None,
+        "outline": outline,
+        "images": images,
+        "links": links,
+    }
+
+
+def extract_text(content: Union[str, dict, None]) -> str:
+    """Plain text of a document, one line per block"""
+    return process_content(content, html=False)["text"]
+
+
+def count_words(content: Union[str, dict, None]) -> int:
+    """Word count of a document"""
+    return process_content(content, html=False)["word_count"]
+
+
+def render_html(content: Union[str, dict, None]) -> str:
+    """HTML body for a document"""
+    return process_content(content)["html"]
+
+
+# ============================================================================
+# Cached analysis per document version
+# ============================================================================
+
+# A document version never changes, so entries never need invalidating
+_ANALYSIS_CACHE_SIZE = 128
+_analysis_cache: "OrderedDict[Tuple[int, int], Dict[str, Any]]" = OrderedDict()
+
+# Documents above this many characters are processed in the worker pool
+INLINE_MAX_CHARS = 200_000
+
+
+async def analyze_document(
+    document_id: int,
+    version: Optional[int],
+    content: Union[str, dict, None],
+    html: bool = False,
+) -> Dict[str, Any]:
+    """
+    process_content for a stored document, cached per (document_id, version)
+
+    Large documents are processed in the document conversion worker pool so
+    a full manuscript doesn't stall the event loop.
+    """
+    key = (document_id, version or 0)
+    cached = _analysis_cache.get(key)
+    if cached is not None and (cached["html"] is not None or not html):
+        _analysis_cache.move_to_end(key)
+        return cached
+
+    size = len(content) if isinstance(content, str) else None
+    if size is not None and size <= INLINE_MAX_CHARS:
+        result = process_content(content, html)
+    else:
+        result = await document_conversion.run(
+            process_content, content, html, label="tiptap"
+        )
+
+    _analysis_cache[key] = result
+    _analysis_cache.move_to_end(key)
+    while len(_analysis_cache) > _ANALYSIS_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
+    return result
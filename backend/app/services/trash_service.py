@@ -1,15 +1,17 @@
 """
 Trash Service
 Manages soft-deleted documents and projects with 30-day auto-purge
+Hard deletes go through PurgeService (batched, removes storage objects)
 """
 from datetime import datetime, timezone, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, and_, or_
+from sqlalchemy import select, update, and_
 from typing import List, Dict, Any, Tuple
 import logging
 
 from app.models.document import Document
 from app.models.project import Project
+from app.services.purge_service import PurgeService
 
 logger = logging.getLogger(__name__)
 
@@ -101,22 +103,17 @@ class TrashService:
         """
         Permanently delete a document (bypass trash or delete from trash)
         """
-        result = await db.execute(
-            select(Document).where(
-                and_(
-                    Document.id == document_id,
-                    Document.owner_id == user_id
-                )
+        stats = await PurgeService.purge_documents(
+            db,
+            and_(
+                Document.id == document_id,
+                Document.owner_id == user_id
             )
         )
-        document = result.scalar_one_or_none()
         
-        if not document:
+        if not stats["rows"]:
             return False
         
-        await db.delete(document)
-        await db.commit()
-        
         logger.info(f"Permanently deleted document {document_id} (user {user_id})")
         
         return True
@@ -168,17 +165,15 @@ class TrashService:
         Permanently delete all documents in trash for a user
         Returns number of documents deleted
         """
-        result = await db.execute(
-            delete(Document).where(
-                and_(
-                    Document.owner_id == user_id,
-                    Document.is_deleted == True
-                )
+        stats = await PurgeService.purge_documents(
+            db,
+            and_(
+                Document.owner_id == user_id,
+                Document.is_deleted == True
             )
         )
         
-        count = result.rowcount
-        await db.commit()
+        count = stats["rows"]
         
         logger.info(f"Emptied trash for user {user_id}: {count} documents deleted")
         
@@ -217,28 +212,26 @@ class TrashService:
         if project.is_deleted:
             raise ValueError("Project is already in trash")
         
+        deleted_at = datetime.now(timezone.utc)
         project.is_deleted = True
-        project.deleted_at = datetime.now(timezone.utc)
+        project.deleted_at = deleted_at
         
-        # Optionally move documents to trash
+        # Optionally move documents to trash (one UPDATE, no rows loaded)
         if move_documents:
-            documents_result = await db.execute(
-                select(Document).where(
+            result = await db.execute(
+                update(Document)
+                .where(
                     and_(
                         Document.project_id == project_id,
                         Document.owner_id == user_id,
                         Document.is_deleted == False
                     )
                 )
+                .values(is_deleted=True, deleted_at=deleted_at)
+                .execution_options(synchronize_session=False)
             )
-            documents = documents_result.scalars().all()
-            
-            deleted_at = datetime.now(timezone.utc)
-            for doc in documents:
-                doc.is_deleted = True
-                doc.deleted_at = deleted_at
             
-            logger.info(f"Moved {len(documents)} documents to trash with project {project_id}")
+            logger.info(f"Moved {result.rowcount} documents to trash with project {project_id}")
         
         await db.commit()
         await db.refresh(project)
@@ -279,22 +272,20 @@ class TrashService:
         
         # Optionally restore documents
         if restore_documents:
-            documents_result = await db.execute(
-                select(Document).where(
+            result = await db.execute(
+                update(Document)
+                .where(
                     and_(
                         Document.project_id == project_id,
                         Document.owner_id == user_id,
                         Document.is_deleted == True
                     )
                 )
+                .values(is_deleted=False, deleted_at=None)
+                .execution_options(synchronize_session=False)
             )
-            documents = documents_result.scalars().all()
-            
-            for doc in documents:
-                doc.is_deleted = False
-                doc.deleted_at = None
             
-            logger.info(f"Restored {len(documents)} documents with project {project_id}")
+            logger.info(f"Restored {result.rowcount} documents with project {project_id}")
         
         await db.commit()
         await db.refresh(project)
@@ -312,22 +303,17 @@ class TrashService:
         """
         Permanently delete a project (bypass trash or delete from trash)
         """
-        result = await db.execute(
-            select(Project).where(
-                and_(
-                    Project.id == project_id,
-                    Project.user_id == user_id
-                )
+        stats = await PurgeService.purge_projects(
+            db,
+            and_(
+                Project.id == project_id,
+                Project.user_id == user_id
             )
         )
-        project = result.scalar_one_or_none()
         
-        if not project:
+        if not stats["rows"]:
             return False
         
-        await db.delete(project)
-        await db.commit()
-        
         logger.info(f"Permanently deleted project {project_id} (user {user_id})")
         
         return True
@@ -379,17 +365,15 @@ class TrashService:
         Permanently delete all projects in trash for a user
         Returns number of projects deleted
         """
-        result = await db.execute(
-            delete(Project).where(
-                and_(
-                    Project.user_id == user_id,
-                    Project.is_deleted == True
-                )
+        stats = await PurgeService.purge_projects(
+            db,
+            and_(
+                Project.user_id == user_id,
+                Project.is_deleted == True
             )
         )
         
-        count = result.rowcount
-        await db.commit()
+        count = stats["rows"]
         
         logger.info(f"Emptied project trash for user {user_id}: {count} projects deleted")
         
@@ -400,64 +384,60 @@ class TrashService:
     # ========================================================================
     
     @staticmethod
-    async def purge_expired_trash_documents(db: AsyncSession) -> int:
+    async def purge_expired_trash_documents(db: AsyncSession) -> Dict[str, Any]:
         """
-        Permanently delete documents that have been in trash for > 30 days
-        Returns number of documents deleted
+        Permanently delete documents that have been in trash for > 30 days,
+        in batches, with their storage objects
+        Returns purge stats (rows, batches, throughput, storage objects deleted)
         """
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=TRASH_RETENTION_DAYS)
         
-        result = await db.execute(
-            delete(Document).where(
-                and_(
-                    Document.is_deleted == True,
-                    Document.deleted_at <= cutoff_date
-                )
+        stats = await PurgeService.purge_documents(
+            db,
+            and_(
+                Document.is_deleted == True,
+                Document.deleted_at <= cutoff_date
             )
         )
         
-        count = result.rowcount
-        await db.commit()
-        
-        if count > 0:
-            logger.info(f"Auto-purged {count} expired documents from trash (older than {TRASH_RETENTION_DAYS} days)")
+        if stats["rows"] > 0:
+            logger.info(f"Auto-purged {stats['rows']} expired documents from trash (older than {TRASH_RETENTION_DAYS} days)")
         
-        return count
+        return stats
     
     @staticmethod
-    async def purge_expired_trash_projects(db: AsyncSession) -> int:
+    async def purge_expired_trash_projects(db: AsyncSession) -> Dict[str, Any]:
         """
-        Permanently delete projects that have been in trash for > 30 days
-        Returns number of projects deleted
+        Permanently delete projects that have been in trash for > 30 days,
+        in batches
+        Returns purge stats (rows, batches, throughput)
         """
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=TRASH_RETENTION_DAYS)
         
-        result = await db.execute(
-            delete(Project).where(
-                and_(
-                    Project.is_deleted == True,
-                    Project.deleted_at <= cutoff_date
-                )
+        stats = await PurgeService.purge_projects(
+            db,
+            and_(
+                Project.is_deleted == True,
+                Project.deleted_at <= cutoff_date
             )
         )
         
-        count = result.rowcount
-        await db.commit()
-        
-        if count > 0:
-            logger.info(f"Auto-purged {count} expired projects from trash (older than {TRASH_RETENTION_DAYS} days)")
+        if stats["rows"] > 0:
+            logger.info(f"Auto-purged {stats['rows']} expired projects from trash (older than {TRASH_RETENTION_DAYS} days)")
         
-        return count
+        return stats
     
     @staticmethod
-    async def purge_all_expired_trash(db: AsyncSession) -> Dict[str, int]:
+    async def purge_all_expired_trash(db: AsyncSession) -> Dict[str, Any]:
         """
         Run complete trash purge for both documents and projects
-        Returns counts of deleted items
+        Returns counts of deleted items and the stats of each purge
         """
-        docs_deleted = await TrashService.purge_expired_trash_documents(db)
-        projects_deleted = await TrashService.purge_expired_trash_projects(db)
+        documents = await TrashService.purge_expired_trash_documents(db)
+        projects = await TrashService.purge_expired_trash_projects(db)
         
+        docs_deleted = documents["rows"]
+        projects_deleted = projects["rows"]
         total = docs_deleted + projects_deleted
         
         if total > 0:
@@ -466,7 +446,9 @@ class TrashService:
         return {
             "documents_deleted": docs_deleted,
             "projects_deleted": projects_deleted,
-            "total_deleted": total
+            "total_deleted": total,
+            "documents": documents,
+            "projects": projects
         }
     
     # ========================================================================
@@ -0,0 +1,439 @@
+"""
+Trending Service
+Time-decayed engagement scores for published documents, ranked in Redis
+sorted sets
+
+Views, bookmarks, reading-list adds, comments and comment reactions add a
+weighted amount to every board the document belongs to:
+
+    trending:{window}                  every published document
+    trending:{window}:tag:{name}       documents carrying the tag
+
+The day, week, month and year windows decay exponentially with their own
+half-life; "all" is a plain engagement total. Decay is applied forward: an
+event at time t adds weight * 2^((t - epoch) / half_life), so existing
+entries never need rewriting and the order within a board is always
+current. maintain() (cron) moves each epoch up to now by rescaling the
+boards, prunes entries that have decayed away and persists the scores to
+document_trending_scores. Boards Redis has lost are restored from that table
+on the next read or event, and replay() rebuilds everything from the event
+tables. Without Redis, discovery ranks straight from the table.
+"""
+import hashlib
+import heapq
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Float, and_, cast, delete, extract, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.base import utc_now
+from app.models.collaboration import Comment, CommentReaction
+from app.models.document import Document, DocumentStatus, DocumentTag, Tag
+from app.models.document_trending import DocumentTrendingScore
+from app.models.reading import Bookmark, ReadingListItem
+from app.models.studio_customization import DocumentView
+from app.services.cache_service import get_cache
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Half-life per window in seconds; 0 means no decay
+HALF_LIVES = {
+    "day": 6 * HOUR,
+    "week": 2 * DAY,
+    "month": 7 * DAY,
+    "year": 60 * DAY,
+    "all": 0,
+}
+
+SCORE_COLUMNS = {
+    "day": DocumentTrendingScore.score_day,
+    "week": DocumentTrendingScore.score_week,
+    "month": DocumentTrendingScore.score_month,
+    "year": DocumentTrendingScore.score_year,
+    "all": DocumentTrendingScore.score_all,
+}
+
+VIEW = "view"
+REACTION = "reaction"
+BOOKMARK = "bookmark"
+READING_LIST = "reading_list"
+COMMENT = "comment"
+
+EVENT_WEIGHTS = {
+    VIEW: 1.0,  # unique views only
+    REACTION: 1.0,
+    BOOKMARK: 3.0,
+    READING_LIST: 3.0,
+    COMMENT: 4.0,
+}
+
+EPOCHS_KEY = "trending:epochs"  # window -> epoch (unix seconds)
+BOARDS_KEY = "trending:boards"  # every board key, for maintain()
+
+# Entries worth less than a hundredth of a fresh view are dropped
+MIN_SCORE = 0.01
+MAX_BOARD_SIZE = 50000
+# Filtered boards (tag unions/intersections) are cached this long
+QUERY_TTL = 60
+PERSIST_BATCH_SIZE = 1000
+
+# KEYS: epochs, board registry, boards...
+# ARGV: now, member, weight, then window and half-life of each board
+_RECORD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  return 0
+end
+local now = tonumber(ARGV[1])
+for i = 3, #KEYS do
+  local window = ARGV[2 * i - 2]
+  local half_life = tonumber(ARGV[2 * i - 1])
+  local amount = tonumber(ARGV[3])
+  if half_life > 0 then
+    local epoch = tonumber(redis.call('HGET', KEYS[1], window))
+    if not epoch then
+      epoch = now
+      redis.call('HSET', KEYS[1], window, now)
+    end
+    amount = amount * math.pow(2, (now - epoch) / half_life)
+  end
+  redis.call('ZINCRBY', KEYS[i], amount, ARGV[2])
+  redis.call('SADD', KEYS[2], KEYS[i])
+end
+return #KEYS - 2
+"""
+
+# KEYS: epochs, board registry
+# ARGV: now, min score, max board size, then window and half-life pairs
+_MAINTAIN_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  return -1
+end
+local now = tonumber(ARGV[1])
+local factors = {}
+for i = 4, #ARGV, 2 do
+  local half_life = tonumber(ARGV[i + 1])
+  local epoch = tonumber(redis.call('HGET', KEYS[1], ARGV[i]))
+  if half_life > 0 and epoch then
+    factors[ARGV[i]] = math.pow(2, (epoch - now) / half_life)
+    redis.call('HSET', KEYS[1], ARGV[i], now)
+  end
+end
+local kept = 0
+for _, key in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+  local factor = factors[string.match(key, '^trending:([^:]+)')]
+  if factor then
+    redis.call('ZUNIONSTORE', key, 1, key, 'WEIGHTS', factor)
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', '(' .. ARGV[2])
+  end
+  redis.call('ZREMRANGEBYRANK', key, 0, -(tonumber(ARGV[3]) + 1))
+  if redis.call('EXISTS', key) == 1 then
+    kept = kept + 1
+  else
+    redis.call('SREM', KEYS[2], key)
+  end
+end
+return kept
+"""
+
+# KEYS: epochs, board registry
+# ARGV: now, number of decayed windows, the windows, then the new board keys
+_RESET_SCRIPT = """
+for _, key in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+  redis.call('DEL', key)
+end
+redis.call('DEL', KEYS[1], KEYS[2])
+local windows = tonumber(ARGV[2])
+redis.call('HSET', KEYS[1], 'reset_at', ARGV[1])
+for i = 3, 2 + windows do
+  redis.call('HSET', KEYS[1], ARGV[i], ARGV[1])
+end
+for i = 3 + windows, #ARGV do
+  redis.call('SADD', KEYS[2], ARGV[i])
+end
+return #ARGV - 2 - windows
+"""
+
+
+def normalize_tag(name: str) -> str:
+    return name.strip().lower()
+
+
+def board_key(window: str, tag: Optional[str] = None) -> str:
+    if tag is None:
+        return f"trending:{window}"
+    return f"trending:{window}:tag:{tag}"
+
+
+def _published():
+    return and_(Document.status == DocumentStatus.PUBLISHED, Document.is_deleted == False)
+
+
+def _decay(age_seconds: float, half_life: int) -> float:
+    return 2.0 ** (-age_seconds / half_life) if half_life else 1.0
+
+
+def decayed_score(window: str):
+    """SQL expression: a document's persisted score for window, decayed to now"""
+    column = SCORE_COLUMNS[window]
+    half_life = HALF_LIVES[window]
+    if not half_life:
+        return column
+    age = cast(extract("epoch", func.now() - DocumentTrendingScore.scored_at), Float)
+    # Clamped: Postgres raises on float underflow
+    return column * func.power(2.0, func.greatest(-age / float(half_life), -60.0))
+
+
+def min_score(window: str) -> float:
+    return MIN_SCORE if HALF_LIVES[window] else 0.0
+
+
+class TrendingService:
+    """Service for the document trending boards."""
+
+    @staticmethod
+    async def record(db: AsyncSession, document_id: int, event: str) -> None:
+        """Add an engagement event to a published document's boards"""
+        cache = await get_cache()
+        if not cache.redis:
+            return
+
+        result = await db.execute(
+            select(Document.status, Document.is_deleted, Tag.name)
+            .outerjoin(DocumentTag, DocumentTag.document_id == Document.id)
+            .outerjoin(Tag, Tag.id == DocumentTag.tag_id)
+            .where(Document.id == document_id)
+        )
+        rows = result.all()
+        if not rows or rows[0].status != DocumentStatus.PUBLISHED or rows[0].is_deleted:
+            return
+        tags = sorted({normalize_tag(row.name) for row in rows if row.name and row.name.strip()})
+
+        keys = [EPOCHS_KEY, BOARDS_KEY]
+        args = [time.time(), str(document_id), EVENT_WEIGHTS[event]]
+        for window, half_life in HALF_LIVES.items():
+            for tag in [None, *tags]:
+                keys.append(board_key(window, tag))
+                args += [window, half_life]
+
+        recorded = await cache.run_script(_RECORD_SCRIPT, keys, args)
+        if recorded == 0:
+            # Redis lost the boards: bring them back, then count this event
+            await TrendingService.restore(db)
+            await cache.run_script(_RECORD_SCRIPT, keys, args)
+
+    @staticmethod
+    async def ranked_ids(
+        db: AsyncSession,
+        window: str,
+        tags: Sequence[str] = (),
+        category_tag: Optional[str] = None,
+        start: int = 0,
+        stop: int = -1
+    ) -> Optional[Tuple[List[int], int]]:
+        """
+        A window of document ids, best first, and the size of the ranking
+
+        Tags match any of them; a category tag must also match. Ids may include
+        documents unpublished since they were scored - callers re-check.
+        None without Redis (rank from document_trending_scores instead).
+        """
+        cache = await get_cache()
+        if not cache.redis:
+            return None
+        if not await cache.exists(EPOCHS_KEY):
+            await TrendingService.restore(db)
+
+        key = board_key(window)
+        tag_keys = [board_key(window, tag) for tag in sorted(set(tags))]
+        if len(tag_keys) > 1:
+            key = TrendingService._query_key(window, tag_keys)
+            await cache.zcombine(key, tag_keys, ttl=QUERY_TTL)
+        elif tag_keys:
+            key = tag_keys[0]
+        if category_tag is not None:
+            category_key = board_key(window, category_tag)
+            if tag_keys:
+                combined = TrendingService._query_key(window, [category_key, key])
+                await cache.zcombine(combined, [category_key, key], intersect=True, ttl=QUERY_TTL)
+                key = combined
+            else:
+                key = category_key
+
+        ids = [int(document_id) for document_id in await cache.zrevrange(key, start, stop)]
+        return ids, await cache.zcard(key)
+
+    @staticmethod
+    def _query_key(window: str, keys: List[str]) -> str:
+        digest = hashlib.sha1("\n".join(keys).encode()).hexdigest()[:16]
+        return f"trending:{window}:query:{digest}"
+
+    # ========================================================================
+    # Maintenance and persistence
+    # ========================================================================
+
+    @staticmethod
+    async def maintain(db: AsyncSession) -> Dict[str, int]:
+        """Move the epochs to now, prune decayed entries and persist the scores"""
+        cache = await get_cache()
+        if not cache.redis:
+            return {"boards": 0, "documents": 0}
+        if not await cache.exists(EPOCHS_KEY):
+            await TrendingService.restore(db)
+
+        now = time.time()
+        args = [now, MIN_SCORE, MAX_BOARD_SIZE]
+        for window, half_life in HALF_LIVES.items():
+            args += [window, half_life]
+        boards = await cache.run_script(_MAINTAIN_SCRIPT, [EPOCHS_KEY, BOARDS_KEY], args) or 0
+
+        # The epochs are now, so the stored scores are current
+        documents = await TrendingService._persist(db, cache)
+        return {"boards": boards, "documents": documents}
+
+    @staticmethod
+    async def _persist(db: AsyncSession, cache) -> int:
+        """Upsert the global boards into document_trending_scores"""
+        scores: Dict[int, Dict[str, float]] = defaultdict(dict)
+        for window in HALF_LIVES:
+            for document_id, score in await cache.zrange_withscores(board_key(window)):
+                scores[int(document_id)][window] = score
+
+        scored_at = utc_now()
+        document_ids = sorted(scores)
+        persisted = 0
+        for first in range(0, len(document_ids), PERSIST_BATCH_SIZE):
+            batch = document_ids[first:first + PERSIST_BATCH_SIZE]
+            # Hard-deleted documents would fail the foreign key
+            result = await db.execute(select(Document.id).where(Document.id.in_(batch)))
+            existing = [document_id for document_id, in result.all()]
+            if not existing:
+                continue
+            stmt = insert(DocumentTrendingScore).values([
+                {
+                    "document_id": document_id,
+                    **{SCORE_COLUMNS[window].key: scores[document_id].get(window, 0.0) for window in HALF_LIVES},
+                    "scored_at": scored_at,
+                }
+                for document_id in existing
+            ])
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=[DocumentTrendingScore.document_id],
+                set_={
+                    **{column.key: stmt.excluded[column.key] for column in SCORE_COLUMNS.values()},
+                    "scored_at": stmt.excluded.scored_at,
+                },
+            ))
+            persisted += len(existing)
+        await db.commit()
+        return persisted
+
+    @staticmethod
+    async def restore(db: AsyncSession) -> int:
+        """Rebuild every board from document_trending_scores, decayed to now"""
+        cache = await get_cache()
+        if not cache.redis:
+            return 0
+
+        result = await db.execute(
+            select(DocumentTrendingScore)
+            .join(Document, Document.id == DocumentTrendingScore.document_id)
+            .where(_published())
+        )
+        rows = result.scalars().all()
+        result = await db.execute(
+            select(DocumentTag.document_id, Tag.name)
+            .join(Tag, Tag.id == DocumentTag.tag_id)
+            .join(DocumentTrendingScore, DocumentTrendingScore.document_id == DocumentTag.document_id)
+        )
+        document_tags = defaultdict(set)
+        for document_id, name in result.all():
+            if name and name.strip():
+                document_tags[document_id].add(normalize_tag(name))
+
+        now = utc_now()
+        boards: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for row in rows:
+            age = (now - row.scored_at).total_seconds()
+            for window, half_life in HALF_LIVES.items():
+                score = getattr(row, SCORE_COLUMNS[window].key) * _decay(age, half_life)
+                if score <= min_score(window):
+                    continue
+                for tag in [None, *document_tags[row.document_id]]:
+                    boards[board_key(window, tag)][str(row.document_id)] = score
+
+        decayed_windows = [window for window, half_life in HALF_LIVES.items() if half_life]
+        await cache.run_script(
+            _RESET_SCRIPT,
+            [EPOCHS_KEY, BOARDS_KEY],
+            [now.timestamp(), len(decayed_windows), *decayed_windows, *boards],
+        )
+        for key, scores in boards.items():
+            if len(scores) > MAX_BOARD_SIZE:
+                scores = dict(heapq.nlargest(MAX_BOARD_SIZE, scores.items(), key=lambda item: item[1]))
+            await cache.zreplace(key, scores)
+        logger.info(f"Restored {len(boards)} trending boards ({len(rows)} documents)")
+        return len(rows)
+
+    @staticmethod
+    async def replay(db: AsyncSession) -> int:
+        """
+        Recompute every score from the event history (unique views,
+        bookmarks, reading-list adds, comments, comment reactions), then
+        restore the boards from the result
+        """
+        def source(document_id, created_at, event, *where):
+            return select(
+                document_id.label("document_id"),
+                created_at.label("created_at"),
+                literal(EVENT_WEIGHTS[event], Float).label("weight"),
+            ).where(*where)
+
+        events = union_all(
+            source(DocumentView.document_id, DocumentView.created_at, VIEW, DocumentView.is_unique == True),
+            source(Bookmark.document_id, Bookmark.created_at, BOOKMARK),
+            source(ReadingListItem.document_id, ReadingListItem.created_at, READING_LIST),
+            source(Comment.document_id, Comment.created_at, COMMENT),
+            source(Comment.document_id, CommentReaction.created_at, REACTION)
+            .select_from(CommentReaction)
+            .join(Comment, Comment.id == CommentReaction.comment_id),
+        ).subquery()
+
+        age = cast(extract("epoch", func.now() - events.c.created_at), Float)
+        totals = []
+        for window, half_life in HALF_LIVES.items():
+            weight = events.c.weight
+            if half_life:
+                weight = weight * func.power(2.0, func.greatest(-age / float(half_life), -60.0))
+            totals.append(func.sum(weight).label(window))
+
+        result = await db.execute(
+            select(events.c.document_id, *totals)
+            .join(Document, Document.id == events.c.document_id)
+            .where(_published())
+            .group_by(events.c.document_id)
+        )
+        scored_at = utc_now()
+        rows = [
+            {
+                "document_id": row.document_id,
+                **{SCORE_COLUMNS[window].key: float(getattr(row, window) or 0.0) for window in HALF_LIVES},
+                "scored_at": scored_at,
+            }
+            for row in result.all()
+        ]
+
+        await db.execute(delete(DocumentTrendingScore))
+        for first in range(0, len(rows), PERSIST_BATCH_SIZE):
+            await db.execute(insert(DocumentTrendingScore).values(rows[first:first + PERSIST_BATCH_SIZE]))
+        await db.commit()
+        logger.info(f"Replayed trending scores for {len(rows)} documents")
+
+        await TrendingService.restore(db)
+        return len(rows)
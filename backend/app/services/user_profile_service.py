@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User, UserProfile
 from app.schemas.user_profile import UserProfileUpdate
 from app.core.exceptions import NotFoundError, ForbiddenError
+from app.services.loaders import PROFILE, invalidate_summary
 
 
 async def get_user_profile(db: AsyncSession, user_id: int) -> Optional[UserProfile]:
@@ -41,6 +42,7 @@ async def update_user_profile(
     
     await db.commit()
     await db.refresh(profile)
+    await invalidate_summary(PROFILE, user_id)
     
     return profile
 
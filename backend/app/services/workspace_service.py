@@ -27,6 +27,7 @@ from app.schemas.workspace import (
     WorkspaceUpdate,
 )
 from app.schemas.collection_item import CollectionItemCreate
+from app.services.saved_items_service import SavedItemsService, item_kind
 
 
 def _generate_slug(name: str) -> str:
@@ -167,8 +168,12 @@ class WorkspaceService:
         if not workspace or workspace.owner_id != user_id:
             return False
 
+        adders = await WorkspaceService._item_adders(
+            db, WorkspaceCollection.workspace_id == workspace_id
+        )
         await db.delete(workspace)
         await db.commit()
+        await SavedItemsService.invalidate(*adders)
         return True
 
     @staticmethod
@@ -291,11 +296,9 @@ class WorkspaceService:
 
     @staticmethod
     async def get_member_count(db: AsyncSession, workspace_id: int) -> int:
-        """Get member count for workspace."""
+        """Get member count for workspace (maintained on the workspace row)."""
         result = await db.execute(
-            select(func.count(WorkspaceMember.id)).where(
-                WorkspaceMember.workspace_id == workspace_id
-            )
+            select(Workspace.member_count).where(Workspace.id == workspace_id)
         )
         return result.scalar() or 0
 
@@ -414,10 +417,23 @@ class WorkspaceService:
         if collection.created_by != user_id and not member.can_edit_workspace:
             return False
 
+        adders = await WorkspaceService._item_adders(db, WorkspaceCollection.id == collection_id)
         await db.delete(collection)
         await db.commit()
+        await SavedItemsService.invalidate(*adders)
         return True
 
+    @staticmethod
+    async def _item_adders(db: AsyncSession, condition) -> List[int]:
+        """Users who added items to the matching collections (their saved indexes)."""
+        result = await db.execute(
+            select(CollectionItem.added_by)
+            .join(WorkspaceCollection, WorkspaceCollection.id == CollectionItem.collection_id)
+            .where(condition)
+            .distinct()
+        )
+        return list(result.scalars().all())
+
     # Collection Item methods
     @staticmethod
     async def add_item_to_collection(
@@ -471,6 +487,7 @@ class WorkspaceService:
         db.add(item)
         await db.commit()
         await db.refresh(item)
+        await SavedItemsService.mark_saved(user_id, item_kind(item.item_type), item.item_id)
         return item
 
     @staticmethod
@@ -541,4 +558,5 @@ class WorkspaceService:
 
         await db.delete(item)
         await db.commit()
+        await SavedItemsService.mark_unsaved(db, item.added_by, item_kind(item.item_type), item.item_id)
         return True
@@ -0,0 +1,399 @@
+"""
+Load test for the API hot paths
+Runs scripted scenarios - feed, search, document open/save, bulk upload,
+notifications polling and studio analytics - against the app in-process,
+on the Postgres/Redis/MinIO configured in .env, using the dataset from
+scripts/seed_benchmark_data.py.
+
+Per scenario it records latency percentiles (p50/p95/p99), throughput,
+status codes and - from the query profiler's Server-Timing header - SQL
+statements and database time per request, and writes them to a JSON file.
+With --compare it diffs the run against an earlier one and exits 1 on a
+regression, so CI can keep a baseline.
+
+Requests go through the ASGI transport rather than a socket: no network
+noise, and each request is authenticated as a seeded user by overriding
+get_current_user, so runs are comparable from machine to machine.
+
+Usage:
+    python scripts/seed_benchmark_data.py --scale small
+    python scripts/benchmark_api.py --output baseline.json
+    python scripts/benchmark_api.py --scenarios feed,search --requests 500 --concurrency 20
+    python scripts/benchmark_api.py --output current.json --compare baseline.json
+"""
+import os
+import sys
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import re
+import statistics
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Every request comes from one address; don't let the limiter skew results
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "100000000")
+
+from fastapi import HTTPException, Request
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select, text
+
+from app.core import auth
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.main import app
+from app.models.collaboration import GroupMember
+from app.models.document import Document
+from app.models.studio import Studio, StudioMember, StudioMemberRole
+from app.models.user import User
+from scripts.benchmark_tiptap import WORDS, make_manuscript
+from scripts.seed_benchmark_data import STUDIO_PREFIX, USER_PREFIX
+
+# Request header naming the seeded user a request runs as
+USER_HEADER = "X-Bench-User"
+
+# Seeded entities sampled per run
+SAMPLE_SIZE = 2000
+
+# p95 may grow this much before it counts as a regression ...
+DEFAULT_MAX_REGRESSION = 0.25
+# ... and never for less than this (timer noise on fast endpoints)
+NOISE_FLOOR_MS = 2.0
+
+_SERVER_TIMING = re.compile(r'dur=([\d.]+);desc="(\d+) queries"')
+
+
+# ============================================================================
+# Dataset and auth
+# ============================================================================
+
+def bench_user(request: Request) -> Dict[str, Any]:
+    """get_current_user override: the seeded user named in USER_HEADER"""
+    keycloak_id = request.headers.get(USER_HEADER)
+    if not keycloak_id or not keycloak_id.startswith(USER_PREFIX):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    number = keycloak_id[len(USER_PREFIX):]
+    return {
+        "sub": keycloak_id,
+        "email": f"bench{number}@bench.workshelf.dev",
+        "preferred_username": f"bench_{number}",
+        "name": f"Bench Writer {number}",
+        "email_verified": True,
+        "realm_access": {"roles": ["user"]},
+    }
+
+
+def as_user(keycloak_id: str) -> Dict[str, str]:
+    return {USER_HEADER: keycloak_id, "X-Query-Profile": "1"}
+
+
+async def load_dataset() -> Dict[str, Any]:
+    """Sample seeded users, documents and studios to drive the scenarios"""
+    async with AsyncSessionLocal() as db:
+        bench_users = User.keycloak_id.like(f"{USER_PREFIX}%")
+        members = (await db.execute(
+            select(User.keycloak_id)
+            .join(GroupMember, GroupMember.user_id == User.id)
+            .where(bench_users)
+            .group_by(User.keycloak_id)
+            .order_by(func.random())
+            .limit(SAMPLE_SIZE)
+        )).scalars().all()
+        users = (await db.execute(
+            select(User.keycloak_id).where(bench_users).order_by(func.random()).limit(SAMPLE_SIZE)
+        )).scalars().all()
+        documents = (await db.execute(
+            select(Document.id, User.keycloak_id)
+            .join(User, Document.owner_id == User.id)
+            .where(bench_users, Document.is_deleted == False)
+            .order_by(func.random())
+            .limit(SAMPLE_SIZE)
+        )).all()
+        studios = (await db.execute(
+            select(Studio.id, User.keycloak_id)
+            .join(StudioMember, StudioMember.studio_id == Studio.id)
+            .join(User, StudioMember.user_id == User.id)
+            .where(Studio.slug.like(f"{STUDIO_PREFIX}%"), StudioMember.role == StudioMemberRole.OWNER)
+        )).all()
+
+        counts = {}
+        for table in ("users", "groups", "group_members", "group_posts", "group_post_reactions",
+                      "documents", "document_views", "notifications"):
+            counts[table] = (await db.execute(text(f"SELECT count(*) FROM {table}"))).scalar()
+
+    if not users:
+        raise SystemExit("No benchmark data - run scripts/seed_benchmark_data.py first")
+
+    return {
+        "members": list(members) or list(users),
+        "users": list(users),
+        "documents": [tuple(row) for row in documents],
+        "studios": [tuple(row) for row in studios],
+        "counts": counts,
+    }
+
+
+# ============================================================================
+# Scenarios
+# ============================================================================
+
+async def scenario_feed(client, data, rng):
+    return await client.get("/api/v1/feed", params={"limit": 20}, headers=as_user(rng.choice(data["members"])))
+
+
+async def scenario_search(client, data, rng):
+    return await client.post(
+        "/api/v1/search",
+        json={"q": rng.choice(WORDS), "page_size": 20},
+        headers=as_user(rng.choice(data["users"])),
+    )
+
+
+async def scenario_document_open(client, data, rng):
+    document_id, owner = rng.choice(data["documents"])
+    return await client.get(f"/api/v1/documents/{document_id}", headers=as_user(owner))
+
+
+async def scenario_document_save(client, data, rng):
+    document_id, owner = rng.choice(data["documents"])
+    body = make_manuscript(rng.randint(300, 3000), seed=rng.randrange(10_000))
+    return await client.put(
+        f"/api/v1/documents/{document_id}",
+        json={"content": body},
+        headers=as_user(owner),
+    )
+
+
+async def scenario_bulk_upload(client, data, rng):
+    files = [
+        ("files", (f"chapter-{i + 1}.md", f"# Chapter {i + 1}\n\n" + " ".join(
+            rng.choice(WORDS) for _ in range(rng.randint(200, 1500))
+        ), "text/markdown"))
+        for i in range(5)
+    ]
+    return await client.post("/api/v1/storage/bulk-upload", files=files, headers=as_user(rng.choice(data["users"])))
+
+
+async def scenario_notifications_poll(client, data, rng):
+    return await client.get("/api/v1/notifications", headers=as_user(rng.choice(data["users"])))
+
+
+async def scenario_studio_analytics(client, data, rng):
+    studio_id, owner = rng.choice(data["studios"])
+    return await client.get(f"/api/v1/studios/{studio_id}/analytics", headers=as_user(owner))
+
+
+SCENARIOS = {
+    "feed": (scenario_feed, None),
+    "search": (scenario_search, None),
+    "document_open": (scenario_document_open, "documents"),
+    "document_save": (scenario_document_save, "documents"),
+    "bulk_upload": (scenario_bulk_upload, None),
+    "notifications_poll": (scenario_notifications_poll, None),
+    "studio_analytics": (scenario_studio_analytics, "studios"),
+}
+
+
+# ============================================================================
+# Runner
+# ============================================================================
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+def summarize(latencies: List[float], queries: List[int], db_times: List[float],
+              statuses: Counter, wall_time: float) -> Dict[str, Any]:
+    ms = [value * 1000 for value in latencies]
+    summary = {
+        "requests": len(latencies),
+        "errors": sum(n for code, n in statuses.items() if code >= 400),
+        "status_codes": {str(code): n for code, n in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / wall_time, 1) if wall_time else None,
+        "latency_ms": {
+            "p50": round(percentile(ms, 50), 2),
+            "p95": round(percentile(ms, 95), 2),
+            "p99": round(percentile(ms, 99), 2),
+            "mean": round(statistics.fmean(ms), 2),
+            "max": round(max(ms), 2),
+        },
+        "queries": None,
+        "db_time_ms": None,
+    }
+    if queries:
+        summary["queries"] = {
+            "mean": round(statistics.fmean(queries), 1),
+            "p95": percentile(queries, 95),
+            "max": max(queries),
+        }
+        summary["db_time_ms"] = {
+            "p50": round(percentile(db_times, 50), 2),
+            "p95": round(percentile(db_times, 95), 2),
+        }
+    return summary
+
+
+async def run_scenario(client, name: str, data, requests: int, concurrency: int,
+                       warmup: int, seed: int) -> Dict[str, Any]:
+    scenario, _ = SCENARIOS[name]
+    rng = random.Random(f"{seed}:{name}")
+    for _ in range(warmup):
+        await scenario(client, data, rng)
+
+    latencies, queries, db_times = [], [], []
+    statuses: Counter = Counter()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await scenario(client, data, rng)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+            timing = _SERVER_TIMING.search(response.headers.get("server-timing", ""))
+            if timing:
+                db_times.append(float(timing.group(1)))
+                queries.append(int(timing.group(2)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, queries, db_times, statuses, time.perf_counter() - started)
+
+
+def git_sha() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> Dict[str, Any]:
+    # Profile every request and report through Server-Timing
+    settings.QUERY_PROFILER_SERVER_TIMING = True
+    app.dependency_overrides[auth.get_current_user] = bench_user
+
+    data = await load_dataset()
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    results = {}
+    await app.router.startup()
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            for name in names:
+                needs = SCENARIOS[name][1]
+                if needs and not data[needs]:
+                    print(f"⏭️  {name}: no seeded {needs}")
+                    continue
+                requests = max(1, args.requests // 10) if name == "bulk_upload" else args.requests
+                results[name] = await run_scenario(
+                    client, name, data, requests, args.concurrency, args.warmup, args.seed
+                )
+                print_row(name, results[name])
+    finally:
+        await app.router.shutdown()
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_sha": git_sha(),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "dataset": data["counts"],
+        },
+        "scenarios": results,
+    }
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def print_header():
+    print(f"{'scenario':<20} {'req':>6} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}")
+
+
+def print_row(name: str, result: Dict[str, Any]):
+    latency = result["latency_ms"]
+    queries = result["queries"]["mean"] if result["queries"] else "-"
+    print(f"{name:<20} {result['requests']:>6} {result['errors']:>5} {result['throughput_rps']:>8} "
+          f"{latency['p50']:>9} {latency['p95']:>9} {latency['p99']:>9} {queries:>8}")
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], max_regression: float) -> List[str]:
+    """Print the change per scenario; returns the regressions"""
+    regressions = []
+    print(f"\n{'scenario':<20} {'p95 before':>11} {'p95 now':>9} {'change':>8} {'queries':>14}")
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            print(f"{name:<20} {'(new)':>11}")
+            continue
+        old_p95, new_p95 = before["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        change = (new_p95 - old_p95) / old_p95 if old_p95 else 0.0
+        old_queries = (before.get("queries") or {}).get("mean")
+        new_queries = (result.get("queries") or {}).get("mean")
+        query_change = f"{old_queries} -> {new_queries}" if old_queries is not None else "-"
+        print(f"{name:<20} {old_p95:>11} {new_p95:>9} {change:>+8.0%} {query_change:>14}")
+
+        if change > max_regression and new_p95 - old_p95 > NOISE_FLOOR_MS:
+            regressions.append(f"{name}: p95 {old_p95} -> {new_p95} ms ({change:+.0%})")
+        if old_queries is not None and new_queries is not None and new_queries > old_queries + 0.5:
+            regressions.append(f"{name}: queries per request {old_queries} -> {new_queries}")
+        if result["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API hot paths")
+    parser.add_argument("--scenarios", help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario (bulk upload runs a tenth)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent clients")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per scenario")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for request mix")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON to diff against; exits 1 on regression")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="Allowed relative p95 increase (default 0.25)")
+    args = parser.parse_args()
+
+    print_header()
+    results = asyncio.run(run(args))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\n📝 Results written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(baseline, results, args.max_regression)
+        if regressions:
+            print("\n❌ Regressions:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
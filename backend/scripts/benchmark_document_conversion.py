@@ -0,0 +1,235 @@
+"""
+Benchmark document conversion per format
+Generates representative documents (markdown, txt, html, docx, odt, pdf) in
+a few sizes and converts each one in the event loop and through the
+conversion worker pool, reporting conversion time and the worst event loop
+stall observed while it ran.
+
+Usage:
+    python scripts/benchmark_document_conversion.py
+    python scripts/benchmark_document_conversion.py --sizes 1000 50000 --repeat 5
+    python scripts/benchmark_document_conversion.py --json results.json
+"""
+import sys
+import argparse
+import asyncio
+import io
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.document_conversion_service import (
+    document_conversion,
+    _convert_upload_sync,
+    DOCX_AVAILABLE,
+    ODF_AVAILABLE,
+)
+
+WORDS = (
+    "the manuscript river lantern quietly between shadows northern letter "
+    "garden voice remembered harbor winter stranger promise window morning"
+).split()
+
+
+def _paragraphs(word_count: int, seed: int = 42) -> list:
+    """Deterministic prose split into paragraphs of 40-120 words"""
+    rng = random.Random(seed)
+    paragraphs = []
+    remaining = word_count
+    while remaining > 0:
+        n = min(remaining, rng.randint(40, 120))
+        paragraphs.append(" ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + ".")
+        remaining -= n
+    return paragraphs
+
+
+def make_markdown(word_count: int) -> bytes:
+    lines = ["---", "title: Benchmark Manuscript", "---", ""]
+    for i, para in enumerate(_paragraphs(word_count)):
+        if i % 20 == 0:
+            lines.append(f"## Chapter {i // 20 + 1}\n")
+        if i % 7 == 3:
+            lines.append(f"- **{para[:30]}** item\n- *second* `item`\n")
+        lines.append(para.replace(" river ", " **river** ").replace(" letter ", " [letter](https://example.com) "))
+        lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+def make_txt(word_count: int) -> bytes:
+    return "\n\n".join(_paragraphs(word_count)).encode("utf-8")
+
+
+def make_html(word_count: int) -> bytes:
+    body = "".join(
+        f"<h2>Chapter {i // 20 + 1}</h2>" * (i % 20 == 0) + f"<p>{para}</p>"
+        for i, para in enumerate(_paragraphs(word_count))
+    )
+    return (
+        "<html><head><style>p{margin:0}</style><script>var x=1;</script></head>"
+        f"<body>{body}</body></html>"
+    ).encode("utf-8")
+
+
+def make_docx(word_count: int) -> bytes:
+    from docx import Document as DocxDocument
+
+    doc = DocxDocument()
+    for para in _paragraphs(word_count):
+        doc.add_paragraph(para)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_odt(word_count: int) -> bytes:
+    from odf.opendocument import OpenDocumentText
+    from odf.text import P
+
+    doc = OpenDocumentText()
+    for para in _paragraphs(word_count):
+        doc.text.addElement(P(text=para))
+    buffer = io.BytesIO()
+    doc.write(buffer)
+    return buffer.getvalue()
+
+
+def make_pdf(word_count: int) -> bytes:
+    """Minimal text-only PDF (no PDF writer dependency needed)"""
+    words = " ".join(_paragraphs(word_count)).split()
+    lines = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+    pages = [lines[i:i + 45] for i in range(0, len(lines), 45)] or [[""]]
+
+    objects = []  # 1: catalog, 2: pages, 3: font, then page/content pairs
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(
+        f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in page_ids)}] /Count {len(pages)} >>".encode()
+    )
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for page_id, page_lines in zip(page_ids, pages):
+        text = "".join(
+            f"({line.replace('(', '').replace(')', '')}) Tj T* " for line in page_lines
+        )
+        stream = f"BT /F1 10 Tf 14 TL 50 780 Td {text}ET".encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+GENERATORS = {
+    ".md": make_markdown,
+    ".txt": make_txt,
+    ".html": make_html,
+    ".pdf": make_pdf,
+}
+if DOCX_AVAILABLE:
+    GENERATORS[".docx"] = make_docx
+if ODF_AVAILABLE:
+    GENERATORS[".odt"] = make_odt
+
+
+async def _measure(convert) -> tuple:
+    """Run convert() while a ticker records the worst event loop stall"""
+    worst_stall = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal worst_stall
+        interval = 0.005
+        while running:
+            before = time.perf_counter()
+            await asyncio.sleep(interval)
+            worst_stall = max(worst_stall, time.perf_counter() - before - interval)
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await convert()
+    elapsed = time.perf_counter() - started
+    running = False
+    await tick_task
+    return elapsed, worst_stall
+
+
+async def run_benchmarks(sizes: list, repeat: int) -> list:
+    results = []
+    # Warm the pool so process start-up isn't counted
+    await document_conversion.run(len, "warm-up")
+
+    for ext, generate in GENERATORS.items():
+        for words in sizes:
+            content = generate(words)
+            filename = f"benchmark{ext}"
+
+            async def in_loop():
+                _convert_upload_sync(content, filename)
+
+            async def in_pool():
+                await document_conversion.run(
+                    _convert_upload_sync, content, filename, timeout=600, label=ext
+                )
+
+            for mode, convert in (("event_loop", in_loop), ("worker_pool", in_pool)):
+                timings, stalls = [], []
+                for _ in range(repeat):
+                    elapsed, stall = await _measure(convert)
+                    timings.append(elapsed)
+                    stalls.append(stall)
+                results.append({
+                    "format": ext,
+                    "words": words,
+                    "bytes": len(content),
+                    "mode": mode,
+                    "median_ms": round(statistics.median(timings) * 1000, 1),
+                    "max_ms": round(max(timings) * 1000, 1),
+                    "worst_loop_stall_ms": round(max(stalls) * 1000, 1),
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document conversion per format")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000, 100000],
+                        help="Document sizes in words")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per document and mode")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args.sizes, args.repeat))
+    document_conversion.shutdown()
+
+    print(f"{'format':<7} {'words':>7} {'bytes':>10} {'mode':<12} {'median ms':>10} {'max ms':>9} {'loop stall ms':>14}")
+    for row in results:
+        print(
+            f"{row['format']:<7} {row['words']:>7} {row['bytes']:>10} {row['mode']:<12} "
+            f"{row['median_ms']:>10} {row['max_ms']:>9} {row['worst_loop_stall_ms']:>14}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
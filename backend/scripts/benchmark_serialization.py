@@ -0,0 +1,153 @@
+"""
+Micro-benchmarks for JSON response serialization
+Builds a synthetic /feed page (50 posts with full content) and a /vault
+bookshelf (500 items) and times FastAPI's response_model path - validate,
+dump to dicts, encode with json / orjson - against the single-pass
+helpers in app.core.responses.
+
+Usage:
+    python scripts/benchmark_serialization.py
+    python scripts/benchmark_serialization.py --posts 100 --books 2000 --repeat 50
+"""
+import sys
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.feed import FeedPost, GroupInfo, PostAuthor
+from app.api.vault import ArticleResponse
+from app.core.responses import json_response, stream_json_array
+
+WORDS = (
+    "the manuscript river lantern quietly between shadows northern letter "
+    "garden voice remembered harbor winter stranger promise window morning"
+).split()
+
+
+def make_feed(count: int, words_per_post: int, seed: int = 42) -> List[FeedPost]:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    return [
+        FeedPost(
+            id=i,
+            title=f"Post {i}",
+            content=" ".join(rng.choice(WORDS) for _ in range(words_per_post)),
+            created_at=now - timedelta(minutes=i),
+            is_pinned=i == 0,
+            is_locked=False,
+            pinned_feeds=["global"] if i == 0 else [],
+            author=PostAuthor(id=i % 17, username=f"writer{i % 17}", display_name=f"Writer {i % 17}", avatar_url=None),
+            group=GroupInfo(id=i % 5, name=f"Group {i % 5}", slug=f"group-{i % 5}", avatar_url=None),
+            upvotes=rng.randint(0, 40),
+            downvotes=rng.randint(0, 5),
+            score=0,
+        )
+        for i in range(count)
+    ]
+
+
+def make_shelf(count: int, seed: int = 42) -> List[ArticleResponse]:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    empty = {
+        field: None for field in (
+            "document_id", "document_title", "document_author", "store_item_id", "isbn",
+            "cover_url", "publisher", "publish_year", "page_count", "epub_url",
+            "last_location", "rating", "review", "notes", "started_reading", "finished_reading",
+        )
+    }
+    return [
+        ArticleResponse(
+            **empty,
+            id=i,
+            user_id=1,
+            item_type="book",
+            title=f"Book {i}",
+            author=f"Author {i % 50}",
+            description=" ".join(rng.choice(WORDS) for _ in range(60)),
+            genres=["fiction", "mystery"],
+            reading_progress=rng.randint(0, 100),
+            status="reading",
+            is_favorite=i % 7 == 0,
+            review_public=False,
+            added_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+LOOP = asyncio.new_event_loop()
+
+
+def response_model_path(field, content, response_class):
+    """What FastAPI does with a returned list and a response_model"""
+    serialized = LOOP.run_until_complete(serialize_response(field=field, response_content=content))
+    return response_class(serialized).body
+
+
+async def _drain(response):
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def _time(func, repeat: int) -> dict:
+    func()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "min_ms": round(min(timings) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON response serialization")
+    parser.add_argument("--posts", type=int, default=50, help="Posts per feed page")
+    parser.add_argument("--words", type=int, default=800, help="Words per post")
+    parser.add_argument("--books", type=int, default=500, help="Bookshelf items")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per benchmark")
+    args = parser.parse_args()
+
+    feed = make_feed(args.posts, args.words)
+    shelf = make_shelf(args.books)
+    feed_field = create_model_field(name="feed", type_=List[FeedPost], mode="serialization")
+    shelf_field = create_model_field(name="shelf", type_=List[ArticleResponse], mode="serialization")
+
+    feed_bytes = json_response(List[FeedPost], feed).body
+    print(f"Feed: {args.posts} posts, {len(feed_bytes) / 1024:.0f} KB; "
+          f"bookshelf: {args.books} items\n")
+
+    benchmarks = [
+        ("/feed response_model + json (before)", lambda: response_model_path(feed_field, feed, JSONResponse)),
+        ("/feed response_model + orjson", lambda: response_model_path(feed_field, feed, ORJSONResponse)),
+        ("/feed json_response (after)", lambda: json_response(List[FeedPost], feed).body),
+        ("/vault response_model + json (before)", lambda: response_model_path(shelf_field, shelf, JSONResponse)),
+        ("/vault response_model + orjson", lambda: response_model_path(shelf_field, shelf, ORJSONResponse)),
+        ("/vault stream_json_array (after)",
+         lambda: LOOP.run_until_complete(_drain(stream_json_array(ArticleResponse, shelf)))),
+    ]
+
+    print(f"{'benchmark':<42} {'median ms':>10} {'min ms':>9}")
+    for name, func in benchmarks:
+        result = _time(func, args.repeat)
+        print(f"{name:<42} {result['median_ms']:>10} {result['min_ms']:>9}")
+
+
+if __name__ == "__main__":
+    main()
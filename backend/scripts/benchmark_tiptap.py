@@ -0,0 +1,167 @@
+"""
+Micro-benchmarks for TipTap document processing
+Builds a synthetic manuscript (100k words by default) and times the
+single-pass walker in tiptap_service against the recursive implementations
+it replaced.
+
+Usage:
+    python scripts/benchmark_tiptap.py
+    python scripts/benchmark_tiptap.py --words 250000 --repeat 10
+"""
+import sys
+import argparse
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.tiptap_service import process_content, count_words, render_html
+
+WORDS = (
+    "the manuscript river lantern quietly between shadows northern letter "
+    "garden voice remembered harbor winter stranger promise window morning"
+).split()
+
+
+def make_manuscript(word_count: int, seed: int = 42) -> dict:
+    """TipTap doc with chapters, marked-up paragraphs, lists and quotes"""
+    rng = random.Random(seed)
+    content = []
+    remaining = word_count
+    paragraph_index = 0
+    while remaining > 0:
+        if paragraph_index % 25 == 0:
+            content.append({
+                "type": "heading",
+                "attrs": {"level": 2},
+                "content": [{"type": "text", "text": f"Chapter {paragraph_index // 25 + 1}"}],
+            })
+        n = min(remaining, rng.randint(40, 120))
+        words = [rng.choice(WORDS) for _ in range(n)]
+        third = n // 3
+        paragraph = {
+            "type": "paragraph",
+            "content": [
+                {"type": "text", "text": " ".join(words[:third]) + " "},
+                {"type": "text", "text": " ".join(words[third:2 * third]) + " ", "marks": [{"type": "italic"}]},
+                {"type": "text", "text": " ".join(words[2 * third:])},
+            ],
+        }
+        if paragraph_index % 10 == 5:
+            content.append({"type": "blockquote", "content": [paragraph]})
+        elif paragraph_index % 10 == 7:
+            content.append({
+                "type": "bulletList",
+                "content": [{"type": "listItem", "content": [paragraph]}],
+            })
+        else:
+            content.append(paragraph)
+        remaining -= n
+        paragraph_index += 1
+    return {"type": "doc", "content": content}
+
+
+# ============================================================================
+# Previous implementations, kept here as the baseline
+# ============================================================================
+
+def legacy_extract_text(content):
+    def extract_text(node):
+        if isinstance(node, dict):
+            text = ""
+            if node.get("type") == "text":
+                return node.get("text", "")
+            if "content" in node:
+                for child in node["content"]:
+                    text += extract_text(child) + " "
+            return text
+        return ""
+    return extract_text(content)
+
+
+def legacy_count_words(content):
+    return len(legacy_extract_text(content).split())
+
+
+def legacy_tiptap_to_html(content):
+    def process_node(node):
+        node_type = node.get("type", "")
+        attrs = node.get("attrs", {})
+        marks = node.get("marks", [])
+        if node_type == "text":
+            html = node.get("text", "")
+            for mark in marks:
+                if mark.get("type") == "italic":
+                    html = f"<em>{html}</em>"
+                elif mark.get("type") == "bold":
+                    html = f"<strong>{html}</strong>"
+            return html
+        children_html = "".join(process_node(child) for child in node.get("content", []))
+        if node_type == "paragraph":
+            return f"<p>{children_html}</p>\n"
+        elif node_type == "heading":
+            level = attrs.get("level", 1)
+            return f"<h{level}>{children_html}</h{level}>\n"
+        elif node_type == "blockquote":
+            return f"<blockquote>{children_html}</blockquote>\n"
+        elif node_type == "bulletList":
+            return f"<ul>{children_html}</ul>\n"
+        elif node_type == "listItem":
+            return f"<li>{children_html}</li>\n"
+        return children_html
+    return process_node(content)
+
+
+def legacy_all(content):
+    """What a create + export + outline used to cost: three separate walks"""
+    legacy_count_words(content)
+    legacy_extract_text(content)
+    legacy_tiptap_to_html(content)
+
+
+def _time(func, arg, repeat: int) -> dict:
+    func(arg)  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - started)
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "min_ms": round(min(timings) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TipTap document processing")
+    parser.add_argument("--words", type=int, default=100_000, help="Manuscript size in words")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark")
+    args = parser.parse_args()
+
+    doc = make_manuscript(args.words)
+    doc_json = json.dumps(doc)
+    print(f"Manuscript: {args.words} words, {len(doc['content'])} top-level nodes, "
+          f"{len(doc_json) / 1024 / 1024:.1f} MB JSON\n")
+
+    benchmarks = [
+        ("word count (legacy)", legacy_count_words, doc),
+        ("word count", count_words, doc),
+        ("html (legacy)", legacy_tiptap_to_html, doc),
+        ("html", render_html, doc),
+        ("text + html + outline (legacy, 3 walks)", legacy_all, doc),
+        ("text + html + outline (single pass)", process_content, doc),
+        ("single pass from stored JSON string", process_content, doc_json),
+    ]
+
+    print(f"{'benchmark':<42} {'median ms':>10} {'min ms':>9}")
+    for name, func, arg in benchmarks:
+        result = _time(func, arg, args.repeat)
+        print(f"{name:<42} {result['median_ms']:>10} {result['min_ms']:>9}")
+
+
+if __name__ == "__main__":
+    main()
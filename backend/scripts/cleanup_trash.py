@@ -1,6 +1,8 @@
 """
 Auto-purge expired trash items
 Run this script daily via cron to automatically delete items older than 30 days
+Deletes in short batches and removes the documents' storage objects
+(app.services.purge_service)
 
 Usage:
     python scripts/cleanup_trash.py
@@ -15,7 +17,7 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.core.database import async_session
+from app.core.database import get_jobs_session_local
 from app.services.trash_service import TrashService
 import logging
 
@@ -29,13 +31,26 @@ async def cleanup_expired_trash():
     """
     logger.info("Starting trash cleanup...")
     
-    async with async_session() as db:
+    async with get_jobs_session_local()() as db:
         result = await TrashService.purge_all_expired_trash(db)
         
         if result["total_deleted"] > 0:
+            documents = result["documents"]
+            projects = result["projects"]
             logger.info(f"✅ Trash cleanup complete:")
-            logger.info(f"   - Documents deleted: {result['documents_deleted']}")
-            logger.info(f"   - Projects deleted: {result['projects_deleted']}")
+            logger.info(
+                f"   - Documents deleted: {result['documents_deleted']} "
+                f"({documents['batches']} batches, {documents['rows_per_batch']} rows/batch, "
+                f"{documents['rows_per_second']} rows/s)"
+            )
+            logger.info(
+                f"   - Storage objects deleted: {documents['storage_deleted']} "
+                f"({documents['storage_failed']} failed, {documents['storage_skipped']} skipped)"
+            )
+            logger.info(
+                f"   - Projects deleted: {result['projects_deleted']} "
+                f"({projects['batches']} batches, {projects['rows_per_second']} rows/s)"
+            )
             logger.info(f"   - Total deleted: {result['total_deleted']}")
         else:
             logger.info("✅ Trash cleanup complete: No expired items found")
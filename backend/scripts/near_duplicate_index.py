@@ -0,0 +1,61 @@
+"""
+Rebuild the near-duplicate index
+Drops fingerprints of unpublished or removed sources, then snapshots
+content_fingerprints into a new memory-mapped LSH index under
+CONTENT_INDEX_DIR (app.services.near_duplicate_service). Fingerprints
+written since the last snapshot are still found, by a direct comparison
+that grows until the next rebuild; run this hourly.
+
+--backfill first fingerprints published documents that have none (after
+deploying, or after changing the shingling or MinHash parameters, which
+also needs the table emptied).
+
+Usage:
+    python scripts/near_duplicate_index.py
+    python scripts/near_duplicate_index.py --backfill
+
+Cron schedule (hourly):
+    15 * * * * cd /app/backend && python scripts/near_duplicate_index.py
+"""
+import sys
+import argparse
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.near_duplicate_service import NearDuplicateService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run(backfill: bool):
+    from app.core.database import get_jobs_session_local
+
+    started = time.perf_counter()
+    async with get_jobs_session_local()() as db:
+        if backfill:
+            indexed = await NearDuplicateService.backfill(db)
+            logger.info(f"✅ Fingerprinted {indexed} published documents")
+
+        pruned = await NearDuplicateService.prune(db)
+        result = await NearDuplicateService.rebuild(db)
+        logger.info(
+            f"✅ Near-duplicate index rebuilt: {result['fingerprints']} fingerprints "
+            f"({pruned} pruned) in {time.perf_counter() - started:.1f}s -> {result['path']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the near-duplicate index")
+    parser.add_argument("--backfill", action="store_true", help="Fingerprint published documents first")
+    args = parser.parse_args()
+    asyncio.run(run(args.backfill))
+
+
+if __name__ == "__main__":
+    main()
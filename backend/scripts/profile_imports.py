@@ -0,0 +1,160 @@
+"""
+Import-time profile of the API
+Runs `python -X importtime -c "import app.main"` and summarizes it: total
+startup import time, the slowest app modules and the third-party packages
+they pull in. Exits 1 when the import is over budget or when a module that
+should only load on first use (boto3, stripe, document parsers, ...) is
+imported at startup, so CI catches a stray top-level import before it
+slows down every new replica.
+
+Each run is a fresh interpreter; with --runs N the fastest time per module
+is kept, which filters out most of the noise of a shared CI machine.
+
+Usage:
+    python scripts/profile_imports.py
+    python scripts/profile_imports.py --runs 5 --top 30
+    python scripts/profile_imports.py --budget-ms 2500 --output imports.json
+"""
+import os
+import sys
+import argparse
+import json
+import re
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+DEFAULT_BUDGET_MS = 4000
+
+# Loaded on first use (see app.core.lazy); importing any of these at startup is a regression
+LAZY_MODULES = [
+    "aiohttp",
+    "anthropic",
+    "boto3",
+    "bs4",
+    "docx",
+    "ebooklib",
+    "html2text",
+    "httpx",
+    "numpy",
+    "odf",
+    "PyPDF2",
+    "scipy",
+    "sentry_sdk",
+    "stripe",
+]
+
+# import time:       self [us] |  cumulative | imported package
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile_once(target: str) -> Dict[str, Dict[str, Any]]:
+    """One fresh interpreter: {module: {self_us, cumulative_us, depth}}"""
+    env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:], file=sys.stderr)
+        raise SystemExit(f"❌ import {target} failed")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = {
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": len(indent) // 2,
+        }
+    return modules
+
+
+def profile(target: str, runs: int) -> Dict[str, Dict[str, Any]]:
+    """Fastest self and cumulative time per module over several runs"""
+    best: Dict[str, Dict[str, Any]] = {}
+    for _ in range(runs):
+        for name, timing in profile_once(target).items():
+            if name not in best:
+                best[name] = dict(timing)
+                continue
+            best[name]["self_us"] = min(best[name]["self_us"], timing["self_us"])
+            best[name]["cumulative_us"] = min(best[name]["cumulative_us"], timing["cumulative_us"])
+    return best
+
+
+def summarize(modules: Dict[str, Dict[str, Any]], target: str, top: int) -> Dict[str, Any]:
+    packages = defaultdict(int)
+    for name, timing in modules.items():
+        packages[name.split(".")[0]] += timing["self_us"]
+
+    app_modules = sorted(
+        ((name, t["cumulative_us"]) for name, t in modules.items()
+         if name.startswith("app.") and name != target),
+        key=lambda item: item[1], reverse=True,
+    )
+    return {
+        "total_ms": round(modules[target]["cumulative_us"] / 1000, 1),
+        "modules": len(modules),
+        "packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        "app_modules_ms": {name: round(us / 1000, 1) for name, us in app_modules[:top]},
+        "eager_lazy_modules": [name for name in LAZY_MODULES if name in modules],
+    }
+
+
+def print_summary(summary: Dict[str, Any], target: str):
+    print(f"⏱️  import {target}: {summary['total_ms']} ms ({summary['modules']} modules)\n")
+    print(f"{'package (self time)':<40} {'ms':>8}")
+    for name, ms in summary["packages_ms"].items():
+        print(f"{name:<40} {ms:>8}")
+    print(f"\n{'app module (cumulative)':<40} {'ms':>8}")
+    for name, ms in summary["app_modules_ms"].items():
+        print(f"{name:<40} {ms:>8}")
+
+
+def check(summary: Dict[str, Any], budget_ms: float) -> List[str]:
+    problems = []
+    if summary["total_ms"] > budget_ms:
+        problems.append(f"startup imports take {summary['total_ms']} ms (budget {budget_ms} ms)")
+    for name in summary["eager_lazy_modules"]:
+        problems.append(f"{name} is imported at startup; import it where it's used or via app.core.lazy")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile and budget the API's import time")
+    parser.add_argument("--target", default="app.main", help="Module to import (default app.main)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to run; fastest wins")
+    parser.add_argument("--top", type=int, default=20, help="Rows per table")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Fail above this total import time (default {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--output", help="Write the summary to this JSON file")
+    args = parser.parse_args()
+
+    summary = summarize(profile(args.target, max(1, args.runs)), args.target, args.top)
+    print_summary(summary, args.target)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(summary, indent=2) + "\n")
+        print(f"\n📝 Summary written to {args.output}")
+
+    problems = check(summary, args.budget_ms)
+    if problems:
+        print("\n❌ Over budget:")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print(f"\n✅ Within budget ({args.budget_ms} ms)")
+
+
+if __name__ == "__main__":
+    main()
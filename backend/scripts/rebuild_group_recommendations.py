@@ -0,0 +1,172 @@
+"""
+Rebuild precomputed group recommendations
+Refits the recommender from every listed group and rescores every active
+user in batches (app.services.group_recommendation_service). Day-to-day
+changes are refreshed incrementally; run this nightly, after bulk imports,
+or after changing the weights.
+
+--dirty refits once and rescores only the users queued by the API since the
+last run - new users, changed interests, and everyone sharing a term of an
+edited group; run it every few minutes. The API never fits the index itself.
+
+--benchmark runs the same fit and batch scoring on a synthetic dataset
+(skewed interests and memberships) without touching the database, and
+reports fit time, scoring throughput and peak memory.
+
+Usage:
+    python scripts/rebuild_group_recommendations.py
+    python scripts/rebuild_group_recommendations.py --batch-size 2000
+    python scripts/rebuild_group_recommendations.py --dirty
+
+    python scripts/rebuild_group_recommendations.py --benchmark --users 1000000 --groups 100000
+    python scripts/rebuild_group_recommendations.py --benchmark --users 100000 --groups 10000 --output recs.json
+
+Cron schedule (nightly at 3 AM, queued changes every 10 minutes):
+    0 3 * * * cd /app/backend && python scripts/rebuild_group_recommendations.py
+    */10 * * * * cd /app/backend && python scripts/rebuild_group_recommendations.py --dirty
+"""
+import sys
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import statistics
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.group_recommendation_service import (
+    BATCH_SIZE, TOP_K, GroupRecommendationService, GroupRecommender, np,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def rebuild(batch_size: int):
+    from app.core.database import get_jobs_session_local
+
+    started = time.perf_counter()
+    async with get_jobs_session_local()() as db:
+        refreshed = await GroupRecommendationService.rebuild(db, batch_size=batch_size)
+    logger.info(f"✅ Rebuilt group recommendations for {refreshed} users in {time.perf_counter() - started:.1f}s")
+
+
+async def refresh_dirty(batch_size: int):
+    from app.core.database import get_jobs_session_local
+
+    started = time.perf_counter()
+    async with get_jobs_session_local()() as db:
+        refreshed = await GroupRecommendationService.refresh_dirty(db, batch_size=batch_size)
+    logger.info(
+        f"✅ Refreshed group recommendations for {refreshed} queued users "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+# ============================================================================
+# Synthetic benchmark
+# ============================================================================
+
+def _zipf_choice(rng, n: int, size: int, exponent: float = 1.1):
+    """Indexes 0..n-1, a few very popular and a long tail"""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return rng.choice(n, size=size, p=weights / weights.sum())
+
+
+def _ragged(rng, n_rows: int, low: int, high: int, n_values: int):
+    """Per-row value lists as (offsets, values), Zipf-distributed values"""
+    lengths = rng.integers(low, high + 1, size=n_rows)
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    return offsets, _zipf_choice(rng, n_values, int(offsets[-1]))
+
+
+def benchmark(users: int, groups: int, terms: int, batch_size: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"term-{i}" for i in range(terms)]
+
+    group_offsets, group_terms = _ragged(rng, groups, 1, 6, terms)
+    interest_offsets, interests = _ragged(rng, users, 0, 5, terms)
+    member_offsets, member_groups = _ragged(rng, users, 0, 8, groups)
+    member_users = np.repeat(np.arange(users), np.diff(member_offsets))
+    member_counts = np.bincount(member_groups, minlength=groups)
+    logger.info(
+        f"Synthetic data: {users} users, {groups} groups, {terms} terms, "
+        f"{len(member_groups)} memberships"
+    )
+
+    started = time.perf_counter()
+    recommender = GroupRecommender(
+        np.arange(groups),
+        [[vocabulary[t] for t in group_terms[group_offsets[g]:group_offsets[g + 1]]] for g in range(groups)],
+        member_counts,
+        member_users,
+        member_groups,
+    )
+    fit_seconds = time.perf_counter() - started
+    logger.info(f"Fitted in {fit_seconds:.1f}s")
+
+    batch_seconds = []
+    recommended = 0
+    started = time.perf_counter()
+    for first in range(0, users, batch_size):
+        last = min(first + batch_size, users)
+        batch_interests = [
+            [vocabulary[t] for t in interests[interest_offsets[u]:interest_offsets[u + 1]]]
+            for u in range(first, last)
+        ]
+        batch_groups = [member_groups[member_offsets[u]:member_offsets[u + 1]] for u in range(first, last)]
+        batch_started = time.perf_counter()
+        results = recommender.recommend(batch_interests, batch_groups, k=TOP_K)
+        batch_seconds.append(time.perf_counter() - batch_started)
+        recommended += sum(len(top) for top in results)
+        if len(batch_seconds) % 20 == 0:
+            logger.info(f"  scored {last}/{users} users")
+    score_seconds = time.perf_counter() - started
+
+    return {
+        "users": users,
+        "groups": groups,
+        "terms": terms,
+        "memberships": int(len(member_groups)),
+        "batch_size": batch_size,
+        "fit_seconds": round(fit_seconds, 2),
+        "score_seconds": round(score_seconds, 2),
+        "users_per_second": round(users / score_seconds) if score_seconds else None,
+        "batch_p50_ms": round(statistics.median(batch_seconds) * 1000, 1),
+        "batch_max_ms": round(max(batch_seconds) * 1000, 1),
+        "avg_recommendations": round(recommended / users, 1) if users else 0,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild precomputed group recommendations")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--dirty", action="store_true", help="Only users queued since the last run")
+    parser.add_argument("--benchmark", action="store_true", help="Synthetic run, no database")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--groups", type=int, default=100_000)
+    parser.add_argument("--terms", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write benchmark results as JSON")
+    args = parser.parse_args()
+
+    if args.dirty:
+        asyncio.run(refresh_dirty(args.batch_size))
+        return
+    if not args.benchmark:
+        asyncio.run(rebuild(args.batch_size))
+        return
+
+    results = benchmark(args.users, args.groups, args.terms, args.batch_size, args.seed)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Seed a large synthetic dataset for the API benchmarks
+Users, groups with skewed membership, posts and votes, documents with
+TipTap bodies, document views, studios and notifications - enough rows for
+query plans and N+1 patterns to show up the way they do in production.
+
+Every row is deterministic for a given --seed and --scale, and tagged so it
+can be removed again (bench-user-* keycloak ids, bench-* slugs). Run
+scripts/benchmark_api.py against the result.
+
+Usage:
+    python scripts/seed_benchmark_data.py --scale small
+    python scripts/seed_benchmark_data.py --scale medium --seed 7
+    python scripts/seed_benchmark_data.py --reset          # remove benchmark rows
+"""
+import sys
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, func, insert, select
+
+from app.core.database import AsyncSessionLocal
+from app.models.collaboration import Group, GroupMember, GroupMemberRole, GroupPost, GroupPostReaction
+from app.models.document import Document, DocumentStatus, DocumentVisibility
+from app.models.social import Notification, NotificationType
+from app.models.studio import Studio, StudioMember, StudioMemberRole
+from app.models.studio_customization import DocumentView
+from app.models.user import User
+from app.services.tiptap_service import process_content
+from scripts.benchmark_tiptap import WORDS, make_manuscript
+
+USER_PREFIX = "bench-user-"
+GROUP_PREFIX = "bench-group-"
+STUDIO_PREFIX = "bench-studio-"
+
+SCALES = {
+    "small": {"users": 500, "groups": 50, "posts": 5_000, "documents": 2_000, "studios": 20},
+    "medium": {"users": 5_000, "groups": 300, "posts": 50_000, "documents": 20_000, "studios": 100},
+    "large": {"users": 50_000, "groups": 2_000, "posts": 500_000, "documents": 200_000, "studios": 500},
+}
+
+# Averages per entity; actual counts are skewed around them
+MEMBERSHIPS_PER_USER = 6
+VOTES_PER_POST = 4
+VIEWS_PER_DOCUMENT = 15
+NOTIFICATIONS_PER_USER = 25
+STUDIO_MEMBERS = 8
+
+# Distinct TipTap bodies; documents reuse them (rendering is the slow part)
+BODY_POOL = 120
+
+# Rows per INSERT batch
+BATCH_SIZE = 5_000
+
+# History the timestamps are spread over
+HISTORY_DAYS = 90
+
+
+class ZipfSampler:
+    """Draws indexes 0..n-1 with probability proportional to 1 / (rank + 1) ** s"""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1 / (rank + 1) ** s for rank in range(n)))
+
+    def sample(self) -> int:
+        return bisect.bisect_left(self.cumulative, self.rng.random() * self.cumulative[-1])
+
+
+def timestamp(rng: random.Random, now: datetime) -> datetime:
+    """Recent-heavy timestamp within the history window"""
+    return now - timedelta(seconds=int(HISTORY_DAYS * 86400 * rng.random() ** 2))
+
+
+def sentence(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+async def insert_rows(db, model, rows, returning: bool = False):
+    """
+    Insert rows (any iterable - generators keep memory flat) in batches
+
+    Returns the new ids in row order if returning, else the row count.
+    """
+    ids = []
+    count = 0
+    table = model.__table__
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, BATCH_SIZE))
+        if not batch:
+            break
+        if returning:
+            result = await db.execute(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True), batch
+            )
+            ids.extend(row[0] for row in result.all())
+        else:
+            await db.execute(insert(table), batch)
+        count += len(batch)
+    await db.commit()
+    return ids if returning else count
+
+
+def make_bodies(rng: random.Random):
+    """TipTap bodies of realistic, long-tailed length, rendered once"""
+    bodies = []
+    for i in range(BODY_POOL):
+        words = min(int(rng.lognormvariate(7.2, 0.9)), 20_000)  # median ~1,300 words
+        doc = make_manuscript(max(words, 50), seed=i)
+        processed = process_content(doc)
+        bodies.append((json.dumps(doc), processed["html"], processed["word_count"]))
+    return bodies
+
+
+async def seed(scale: str, seed_value: int):
+    sizes = SCALES[scale]
+    rng = random.Random(seed_value)
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+
+    async with AsyncSessionLocal() as db:
+        existing = await db.scalar(
+            select(func.count()).select_from(User).where(User.keycloak_id.like(f"{USER_PREFIX}%"))
+        )
+        if existing:
+            print(f"❌ {existing} benchmark users already exist - run with --reset first")
+            return
+
+        # Users
+        user_ids = await insert_rows(db, User, [
+            {
+                "keycloak_id": f"{USER_PREFIX}{i}",
+                "email": f"bench{i}@bench.workshelf.dev",
+                "username": f"bench_{i}",
+                "display_name": f"Bench Writer {i}",
+                "is_active": True,
+                "created_at": timestamp(rng, now),
+            }
+            for i in range(sizes["users"])
+        ], returning=True)
+        print(f"✅ {len(user_ids)} users")
+
+        # Groups; a few are huge, most are small
+        group_ids = await insert_rows(db, Group, [
+            {
+                "name": f"Bench Group {i}",
+                "slug": f"{GROUP_PREFIX}{i}",
+                "description": sentence(rng, 10, 40),
+                "privacy_level": "public",
+                "is_public": True,
+                "interests": rng.sample(WORDS, 3),
+                "created_at": timestamp(rng, now),
+            }
+            for i in range(sizes["groups"])
+        ], returning=True)
+        group_rank = ZipfSampler(len(group_ids), 1.1, rng)
+
+        members_by_group = {group_id: [] for group_id in group_ids}
+        memberships = []
+        for user_id in user_ids:
+            wanted = min(max(1, int(rng.expovariate(1 / MEMBERSHIPS_PER_USER))), len(group_ids))
+            joined = set()
+            for _ in range(wanted * 3):
+                if len(joined) >= wanted:
+                    break
+                joined.add(group_ids[group_rank.sample()])
+            for group_id in joined:
+                owner = not members_by_group[group_id]
+                members_by_group[group_id].append(user_id)
+                memberships.append({
+                    "group_id": group_id,
+                    "user_id": user_id,
+                    "role": GroupMemberRole.OWNER if owner else GroupMemberRole.MEMBER,
+                })
+        await insert_rows(db, GroupMember, memberships)
+        print(f"✅ {len(group_ids)} groups, {len(memberships)} memberships")
+        del memberships
+
+        # Posts, in proportion to group size
+        active_groups = [group_id for group_id in group_ids if members_by_group[group_id]]
+        weights = list(itertools.accumulate(len(members_by_group[g]) for g in active_groups))
+        posts = []
+        for i in range(sizes["posts"]):
+            group_id = active_groups[bisect.bisect_left(weights, rng.random() * weights[-1])]
+            posts.append({
+                "group_id": group_id,
+                "author_id": rng.choice(members_by_group[group_id]),
+                "title": sentence(rng, 3, 10).capitalize(),
+                "content": "\n\n".join(sentence(rng, 20, 80) for _ in range(rng.randint(1, 5))),
+                "is_pinned": i % 500 == 0,
+                "pinned_feeds": [],
+                "created_at": timestamp(rng, now),
+            })
+        post_ids = await insert_rows(db, GroupPost, posts, returning=True)
+
+        def votes():
+            for post_id, post in zip(post_ids, posts):
+                voters = members_by_group[post["group_id"]]
+                count = min(int(rng.expovariate(1 / VOTES_PER_POST)), len(voters))
+                for user_id in rng.sample(voters, count):
+                    yield {
+                        "post_id": post_id,
+                        "user_id": user_id,
+                        "reaction_type": "upvote" if rng.random() < 0.85 else "downvote",
+                    }
+
+        vote_count = await insert_rows(db, GroupPostReaction, votes())
+        print(f"✅ {len(post_ids)} posts, {vote_count} votes")
+        del posts
+
+        # Studios
+        studio_ids = await insert_rows(db, Studio, [
+            {"name": f"Bench Studio {i}", "slug": f"{STUDIO_PREFIX}{i}", "description": sentence(rng, 8, 20)}
+            for i in range(sizes["studios"])
+        ], returning=True)
+        studio_members = []
+        for studio_id in studio_ids:
+            for position, user_id in enumerate(rng.sample(user_ids, min(STUDIO_MEMBERS, len(user_ids)))):
+                studio_members.append({
+                    "studio_id": studio_id,
+                    "user_id": user_id,
+                    "role": StudioMemberRole.OWNER if position == 0 else StudioMemberRole.MEMBER,
+                })
+        await insert_rows(db, StudioMember, studio_members)
+        print(f"✅ {len(studio_ids)} studios")
+
+        # Documents; prolific authors write most of them
+        bodies = make_bodies(rng)
+        author_rank = ZipfSampler(len(user_ids), 0.8, rng)
+        documents = []
+        for i in range(sizes["documents"]):
+            content, html, word_count = bodies[rng.randrange(len(bodies))]
+            published = rng.random() < 0.4
+            documents.append({
+                "owner_id": user_ids[author_rank.sample()],
+                "studio_id": rng.choice(studio_ids) if studio_ids and rng.random() < 0.2 else None,
+                "title": sentence(rng, 2, 8).title(),
+                "description": sentence(rng, 10, 30),
+                "content": content,
+                "content_html": html,
+                "word_count": word_count,
+                "status": DocumentStatus.PUBLISHED if published else DocumentStatus.DRAFT,
+                "visibility": DocumentVisibility.PUBLIC if published else DocumentVisibility.PRIVATE,
+                "published_at": timestamp(rng, now).replace(tzinfo=None) if published else None,
+                "created_at": timestamp(rng, now),
+            })
+        document_ids = await insert_rows(db, Document, documents, returning=True)
+
+        # Views; a handful of documents get most of the traffic
+        document_rank = ZipfSampler(len(document_ids), 1.05, rng)
+        views = (
+            {
+                "document_id": document_ids[document_rank.sample()],
+                "user_id": rng.choice(user_ids) if rng.random() < 0.6 else None,
+                "view_duration": int(rng.expovariate(1 / 120)),
+                "scroll_depth": rng.randint(5, 100),
+                "referrer": rng.choice(["search", "feed", "direct", "social"]),
+                "is_unique": rng.random() < 0.7,
+                "session_id": f"bench-{rng.getrandbits(48):x}",
+                "created_at": timestamp(rng, now),
+            }
+            for _ in range(sizes["documents"] * VIEWS_PER_DOCUMENT)
+        )
+        view_count = await insert_rows(db, DocumentView, views)
+        print(f"✅ {len(document_ids)} documents, {view_count} views")
+
+        notification_types = [NotificationType.COMMENT, NotificationType.LIKE, NotificationType.FOLLOW, NotificationType.MENTION]
+
+        def notifications():
+            for user_id in user_ids:
+                for _ in range(int(rng.expovariate(1 / NOTIFICATIONS_PER_USER))):
+                    created_at = timestamp(rng, now)
+                    yield {
+                        "user_id": user_id,
+                        "type": rng.choice(notification_types),
+                        "title": sentence(rng, 2, 5).capitalize(),
+                        "message": sentence(rng, 8, 20),
+                        "is_read": created_at < now - timedelta(days=3),
+                        "created_at": created_at,
+                    }
+
+        notification_count = await insert_rows(db, Notification, notifications())
+        print(f"✅ {notification_count} notifications")
+
+    print(f"\n🎉 Seeded '{scale}' dataset (seed {seed_value}) in {time.perf_counter() - started:.0f}s")
+
+
+async def reset():
+    """Remove every benchmark row (users cascade to their content)"""
+    async with AsyncSessionLocal() as db:
+        users = await db.execute(delete(User).where(User.keycloak_id.like(f"{USER_PREFIX}%")))
+        groups = await db.execute(delete(Group).where(Group.slug.like(f"{GROUP_PREFIX}%")))
+        studios = await db.execute(delete(Studio).where(Studio.slug.like(f"{STUDIO_PREFIX}%")))
+        await db.commit()
+    print(f"🗑️  Removed {users.rowcount} users, {groups.rowcount} groups, {studios.rowcount} studios")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic dataset for API benchmarks")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Dataset size")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--reset", action="store_true", help="Remove benchmark rows and exit")
+    args = parser.parse_args()
+
+    if args.reset:
+        asyncio.run(reset())
+    else:
+        asyncio.run(seed(args.scale, args.seed))
+
+
+if __name__ == "__main__":
+    main()
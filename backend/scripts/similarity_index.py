@@ -0,0 +1,61 @@
+"""
+Rebuild the similarity index
+Drops the features of unpublished or delisted works, then recomputes the
+IDF and snapshots content_vectors into a new memory-mapped matrix under
+CONTENT_INDEX_DIR (app.services.similarity_service). Works indexed since
+the last snapshot are still found, by a direct comparison that grows until
+the next rebuild; run this hourly.
+
+--backfill first indexes published documents that have no features (after
+deploying, or after changing the feature parameters, which also needs the
+table emptied).
+
+Usage:
+    python scripts/similarity_index.py
+    python scripts/similarity_index.py --backfill
+
+Cron schedule (hourly):
+    45 * * * * cd /app/backend && python scripts/similarity_index.py
+"""
+import sys
+import argparse
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.similarity_service import SimilarityService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run(backfill: bool):
+    from app.core.database import get_jobs_session_local
+
+    started = time.perf_counter()
+    async with get_jobs_session_local()() as db:
+        if backfill:
+            indexed = await SimilarityService.backfill(db)
+            logger.info(f"✅ Indexed {indexed} published documents")
+
+        pruned = await SimilarityService.prune(db)
+        result = await SimilarityService.rebuild(db)
+        logger.info(
+            f"✅ Similarity index rebuilt: {result['vectors']} vectors "
+            f"({pruned} pruned) in {time.perf_counter() - started:.1f}s -> {result['path']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the similarity index")
+    parser.add_argument("--backfill", action="store_true", help="Index published documents first")
+    args = parser.parse_args()
+    asyncio.run(run(args.backfill))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Maintain the document trending boards
+Moves the decay epochs up to now, prunes entries that have decayed away and
+persists the scores to document_trending_scores
+(app.services.trending_service). Run it every few minutes; the persisted
+scores are what Redis is restored from.
+
+--replay recomputes every score from the event history (unique document
+views, bookmarks, reading-list adds, comments, comment reactions) and
+rebuilds the boards - after deploying, after changing the weights or
+half-lives, or when both Redis and the table are lost.
+
+Usage:
+    python scripts/trending_scores.py
+    python scripts/trending_scores.py --replay
+
+Cron schedule (every 10 minutes):
+    */10 * * * * cd /app/backend && python scripts/trending_scores.py
+"""
+import sys
+import argparse
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.trending_service import TrendingService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run(replay: bool):
+    from app.core.database import get_jobs_session_local
+
+    started = time.perf_counter()
+    async with get_jobs_session_local()() as db:
+        if replay:
+            documents = await TrendingService.replay(db)
+            logger.info(f"✅ Replayed trending scores for {documents} documents in {time.perf_counter() - started:.1f}s")
+        else:
+            result = await TrendingService.maintain(db)
+            logger.info(
+                f"✅ Trending boards maintained: {result['boards']} boards, "
+                f"{result['documents']} documents persisted in {time.perf_counter() - started:.1f}s"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the document trending boards")
+    parser.add_argument("--replay", action="store_true", help="Rebuild every score from the event history")
+    args = parser.parse_args()
+    asyncio.run(run(args.replay))
+
+
+if __name__ == "__main__":
+    main()
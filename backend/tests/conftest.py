@@ -297,6 +297,78 @@ async def test_db_session():
     # NullPool closes connections immediately - no disposal needed
 
 
+@pytest.fixture
+async def test_user(test_db_session):
+    """
+    The mock user's row (see setup_test_user_in_db), loaded in test_db_session
+    """
+    from sqlalchemy import select
+    from app.models.user import User
+
+    result = await test_db_session.execute(
+        select(User).where(User.keycloak_id == mock_get_current_user_id())
+    )
+    return result.scalar_one()
+
+
+@pytest.fixture
+async def cleanup(test_db_session):
+    """
+    Undo what a test created once it finishes, pass or fail
+
+    Register targets as they are created:
+    - ORM instances are deleted by primary key (skipped if never saved)
+    - SQL statements are executed
+    Both run in reverse order (children before parents) in one transaction.
+    Callables (e.g. cache invalidation) are then called, also in reverse
+    order, and awaited if they return an awaitable. Bind their arguments up
+    front (functools.partial): instances are expired by then.
+
+    Usage:
+        async def test_feature(test_db_session, test_user, cleanup):
+            document = Document(owner_id=test_user.id, tenant_id=test_user.tenant_id, title="x")
+            test_db_session.add(document)
+            cleanup(document)
+            await test_db_session.commit()
+    """
+    import inspect
+    from sqlalchemy import delete, inspect as sa_inspect
+    from sqlalchemy.sql import Executable
+
+    targets = []
+
+    def register(*items):
+        targets.extend(items)
+
+    yield register
+
+    db = test_db_session
+    statements, callbacks = [], []
+    for target in reversed(targets):
+        if isinstance(target, Executable):
+            statements.append(target)
+        elif callable(target):
+            callbacks.append(target)
+        else:
+            # Read before the rollback below expires the instance
+            state = sa_inspect(target)
+            if state.identity is not None:
+                statements.append(delete(type(target)).where(*[
+                    column == value for column, value in zip(state.mapper.primary_key, state.identity)
+                ]))
+
+    # A failed test may leave the session mid-transaction
+    await db.rollback()
+    for statement in statements:
+        await db.execute(statement)
+    await db.commit()
+
+    for callback in callbacks:
+        result = callback()
+        if inspect.isawaitable(result):
+            await result
+
+
 # ============================================================================
 # Cleanup
 # ============================================================================
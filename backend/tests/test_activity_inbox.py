@@ -0,0 +1,77 @@
+"""
+Test the materialized activity feed
+Followed users' public events reach the feed after commit and fan-out, page
+by cursor, and leave it on unfollow (with or without Redis)
+"""
+from functools import partial
+
+import pytest
+from sqlalchemy import delete
+
+from app.models.social import ActivityEvent, ActivityEventType, UserFollow
+from app.models.user import User
+from app.services.activity_inbox import activity_inbox
+from app.services.activity_service import ActivityService
+from app.services.relationships_service import RelationshipsService
+
+
+async def _log(db, user_id, is_public=True):
+    return await ActivityService.log_event(
+        db, user_id, ActivityEventType.DOCUMENT_CREATED, "Created document 'inbox'",
+        "document", 1, is_public=is_public
+    )
+
+
+async def _fan_out():
+    """What the worker does, on its own session"""
+    from app.core.database import get_jobs_session_local
+
+    await activity_inbox.wait_queued()
+    async with get_jobs_session_local()() as jobs_db:
+        await activity_inbox.fan_out_queued(jobs_db)
+
+
+@pytest.mark.asyncio
+async def test_feed_fans_out_and_pages(test_db_session, test_user, cleanup):
+    db = test_db_session
+    user = test_user
+
+    author, stranger = others = [
+        User(keycloak_id=f"activity-inbox-{name}", email=f"activity-{name}@example.com",
+             username=f"activity-{name}", tenant_id=user.tenant_id)
+        for name in ("author", "stranger")
+    ]
+    db.add_all(others)
+    await db.commit()
+    cleanup(
+        partial(activity_inbox.follows_changed, user.id, author.id),
+        *others,
+        delete(ActivityEvent).where(ActivityEvent.user_id.in_([user.id, author.id, stranger.id])),
+        delete(UserFollow).where(UserFollow.follower_id == user.id, UserFollow.following_id == author.id),
+    )
+
+    await RelationshipsService.follow_user(db, user.id, author.id)
+    # Builds the (empty) inbox, so what follows arrives by fan-out
+    await ActivityService.get_activity_feed(db, user.id)
+
+    first = await _log(db, author.id)
+    await _log(db, author.id, is_public=False)
+    await _log(db, stranger.id)
+    own = await _log(db, user.id)
+    await db.commit()
+    second = await _log(db, author.id)
+    await db.commit()
+    await _fan_out()
+
+    page = await ActivityService.get_activity_feed(db, user.id, limit=2)
+    assert [e.id for e in page["items"]] == [second.id, own.id]
+    assert page["has_more"] and page["total"] is not None
+
+    page = await ActivityService.get_activity_feed(db, user.id, limit=2, cursor=page["next_cursor"])
+    assert [e.id for e in page["items"]] == [first.id]
+    assert not page["has_more"] and page["total"] is None
+
+    await RelationshipsService.unfollow_user(db, user.id, author.id)
+    page = await ActivityService.get_activity_feed(db, user.id, count="exact")
+    assert [e.id for e in page["items"]] == [own.id]
+    assert page["total"] == 1
@@ -0,0 +1,55 @@
+"""
+Test AI gateway request coalescing
+Identical concurrent prompts share one Claude call, and a waiter that goes
+away doesn't take the others down with it
+"""
+import asyncio
+
+import pytest
+
+from app.services.ai_gateway import AIGateway
+
+
+class SlowGateway(AIGateway):
+    """Gateway whose Claude call just sleeps and counts"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def _create(self, *args):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return "answer"
+
+
+@pytest.mark.asyncio
+async def test_waiters_reissue_when_leader_is_cancelled():
+    gateway = SlowGateway()
+    leader = asyncio.create_task(gateway.complete("hi", cache_ttl=0))
+    await asyncio.sleep(0.01)
+    followers = [asyncio.create_task(gateway.complete("hi", cache_ttl=0)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    leader.cancel()
+
+    assert await asyncio.gather(*followers) == ["answer", "answer"]
+    # One call for the cancelled leader, one shared by the followers
+    assert gateway.calls == 2
+    assert leader.cancelled()
+    assert not gateway._in_flight
+
+
+@pytest.mark.asyncio
+async def test_cancelled_follower_leaves_leader_alone():
+    gateway = SlowGateway()
+    leader = asyncio.create_task(gateway.complete("hi", cache_ttl=0))
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(gateway.complete("hi", cache_ttl=0))
+    await asyncio.sleep(0.01)
+
+    follower.cancel()
+
+    assert await leader == "answer"
+    assert follower.cancelled()
+    assert gateway.calls == 1
@@ -0,0 +1,92 @@
+"""
+Test the folder hierarchy: closure table and trigger-maintained counts
+
+Folders are created and moved through the API; documents are written
+directly, the way bulk upload does, since the triggers must catch every
+write path.
+"""
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import delete, update
+
+from app.main import app
+from app.models.document import Document
+from app.models.folder import Folder
+
+
+def _find(tree, folder_id):
+    for node in tree:
+        if node["id"] == folder_id:
+            return node
+        found = _find(node["children"], folder_id)
+        if found:
+            return found
+    return None
+
+
+@pytest.mark.asyncio
+async def test_subtree_counts_follow_documents_and_moves(test_db_session, test_user, cleanup):
+    db = test_db_session
+    user = test_user
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", follow_redirects=True) as client:
+        async def create(name, parent_id=None):
+            response = await client.post("/api/v1/folders/", json={"name": name, "parent_id": parent_id})
+            assert response.status_code == 201
+            return response.json()["id"]
+
+        async def tree(root_id):
+            response = await client.get("/api/v1/folders/tree", params={"root_id": root_id})
+            assert response.status_code == 200
+            return response.json()
+
+        a = await create("hierarchy-a")
+        b = await create("hierarchy-b", a)
+        c = await create("hierarchy-c", b)
+        d = await create("hierarchy-d")
+        # Undone last to first: detached (parent_id doesn't cascade), then deleted
+        folders = [a, b, c, d]
+        cleanup(
+            delete(Folder).where(Folder.id.in_(folders)),
+            update(Folder).where(Folder.id.in_(folders)).values(parent_id=None),
+        )
+
+        docs = [
+            Document(owner_id=user.id, tenant_id=user.tenant_id, title="in c", folder_id=c, word_count=100),
+            Document(owner_id=user.id, tenant_id=user.tenant_id, title="in b", folder_id=b, word_count=50),
+            Document(owner_id=user.id, tenant_id=user.tenant_id, title="in a", folder_id=a, word_count=10),
+        ]
+        db.add_all(docs)
+        cleanup(*docs)
+        await db.commit()
+
+        subtree = await tree(a)
+        assert len(subtree) == 1
+        root = subtree[0]
+        assert (root["document_count"], root["word_count"]) == (1, 10)
+        assert (root["subtree_document_count"], root["subtree_word_count"]) == (3, 160)
+        assert _find(subtree, b)["subtree_word_count"] == 150
+        assert _find(subtree, c)["subtree_document_count"] == 1
+
+        # Move b (with c) under d
+        response = await client.put(f"/api/v1/folders/{b}", json={"parent_id": d})
+        assert response.status_code == 200
+        assert response.json()["subtree_document_count"] == 2
+        assert (await tree(a))[0]["subtree_document_count"] == 1
+        moved = await tree(d)
+        assert moved[0]["subtree_word_count"] == 150
+        assert _find(moved, c)["word_count"] == 100
+
+        # d now contains c; putting d under c would be a cycle
+        response = await client.put(f"/api/v1/folders/{d}", json={"parent_id": c})
+        assert response.status_code == 400
+
+        # Editing and trashing documents adjusts every ancestor
+        await db.execute(update(Document).where(Document.id == docs[0].id).values(word_count=120))
+        await db.execute(update(Document).where(Document.id == docs[1].id).values(is_deleted=True))
+        await db.commit()
+        root = (await tree(d))[0]
+        assert (root["subtree_document_count"], root["subtree_word_count"]) == (1, 120)
+
+        response = await client.get(f"/api/v1/folders/{d}")
+        assert response.json()["subfolder_count"] == 1
@@ -0,0 +1,65 @@
+"""
+Test the trigger-maintained group counters and the popularity ordering
+
+Rows are written directly, the way admin tools and seed scripts do, since the
+triggers must catch every write path.
+"""
+import pytest
+from sqlalchemy import select
+
+from app.models.collaboration import Group, GroupFollower, GroupMember, GroupMemberRole, GroupPost
+from app.services.group_leaderboard_service import GroupLeaderboardService, POPULAR, ACTIVE
+
+
+async def _counters(db, group_id):
+    result = await db.execute(
+        select(Group.member_count, Group.follower_count, Group.post_count, Group.last_activity_at)
+        .where(Group.id == group_id)
+    )
+    return result.one()
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_members_followers_and_posts(test_db_session, test_user, cleanup):
+    db = test_db_session
+    user = test_user
+
+    busy = Group(name="counters-busy", slug="counters-busy", privacy_level="public", is_public=True)
+    quiet = Group(name="counters-quiet", slug="counters-quiet", privacy_level="public", is_public=True)
+    db.add_all([busy, quiet])
+    cleanup(busy, quiet)
+    await db.commit()
+
+    member = GroupMember(group_id=busy.id, user_id=user.id, role=GroupMemberRole.OWNER)
+    follow = GroupFollower(group_id=busy.id, user_id=user.id, is_active=True)
+    posts = [
+        GroupPost(group_id=busy.id, author_id=user.id, title=f"post {i}", content="...")
+        for i in range(2)
+    ]
+    db.add_all([member, follow, *posts])
+    await db.commit()
+    await GroupLeaderboardService.refresh(db, busy.id, quiet.id)
+
+    members, followers, post_count, last_activity_at = await _counters(db, busy.id)
+    assert (members, followers, post_count) == (1, 1, 2)
+    assert last_activity_at == max(post.created_at for post in posts)
+    assert (await _counters(db, quiet.id))[:3] == (0, 0, 0)
+
+    ranked = [g.id for g in await GroupLeaderboardService.top_groups(db, POPULAR, limit=1000)]
+    assert ranked.index(busy.id) < ranked.index(quiet.id)
+    ranked = [g.id for g in await GroupLeaderboardService.top_groups(db, ACTIVE, limit=1000)]
+    assert busy.id in ranked and quiet.id not in ranked
+
+    # Muting a follow, deleting a post and removing the member count down
+    follow.is_active = False
+    await db.delete(posts[0])
+    await db.delete(member)
+    await db.commit()
+    await GroupLeaderboardService.refresh(db, busy.id)
+
+    members, followers, post_count, last_activity_at = await _counters(db, busy.id)
+    assert (members, followers, post_count) == (0, 0, 1)
+    assert last_activity_at is not None
+
+    excluded = await GroupLeaderboardService.top_groups(db, POPULAR, limit=1000, exclude_ids=[busy.id])
+    assert busy.id not in [g.id for g in excluded]
@@ -0,0 +1,51 @@
+"""
+Test the group recommender
+Interest similarity, co-membership and popularity are blended, a user's own
+groups are never recommended, and users with nothing to go on get popular groups
+"""
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from app.services.group_recommendation_service import GroupRecommender, group_terms
+
+
+def _recommender():
+    # Group 10: poetry, the second most popular; 20: small fantasy group;
+    # 30: fantasy and dragons; 40: untagged but the most popular.
+    # User 2 belongs to both 20 and 30, so those are co-member neighbours.
+    return GroupRecommender(
+        group_ids=[30, 10, 20, 40],
+        terms=[["fantasy", "dragons"], ["poetry"], ["fantasy"], []],
+        member_counts=[5, 50, 3, 100],
+        member_user_ids=[1, 1, 2, 2, 3],
+        member_group_ids=[10, 20, 20, 30, 40],
+    )
+
+
+def test_recommendations_blend_interests_co_members_and_popularity():
+    results = _recommender().recommend(
+        user_interests=[["Fantasy"], ["poetry"], [], ["dragons", "poetry"]],
+        user_groups=[[10], [], [40], []],
+        k=3,
+    )
+
+    assert [[group_id for group_id, _ in top] for top in results] == [
+        # Interest match, then its co-member neighbour; never group 10
+        [20, 30, 40],
+        [10, 40, 30],
+        # No interests: popular groups, excluding their own
+        [10, 30, 20],
+        [10, 30, 40],
+    ]
+    for top in results:
+        scores = [score for _, score in top]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_empty_index_and_terms():
+    empty = GroupRecommender([], [], [], [], [])
+    assert empty.recommend([["poetry"]], [[]]) == [[]]
+
+    assert group_terms(["Poetry ", "poetry"], ["Sci-Fi"]) == ["poetry", "sci-fi"]
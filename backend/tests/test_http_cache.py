@@ -0,0 +1,65 @@
+"""
+Test HTTP caching policies
+Read-mostly endpoints must send validators and answer conditional GETs with 304
+"""
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.services.cache_service import get_cache
+
+
+@pytest.mark.asyncio
+async def test_interests_conditional_get():
+    """A repeated poll with the ETag gets 304 and no body"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", follow_redirects=True) as client:
+        response = await client.get("/api/v1/interests")
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert "max-age=" in response.headers["cache-control"]
+        assert "stale-while-revalidate=" in response.headers["cache-control"]
+
+        response = await client.get("/api/v1/interests", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+        # Different query, different representation
+        response = await client.get("/api/v1/discovery/trending", params={"limit": 5})
+        other = await client.get("/api/v1/discovery/trending", params={"limit": 6})
+        assert response.headers["etag"] != other.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_public_listing_etag_follows_query():
+    """Pages of the public listing validate independently"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", follow_redirects=True) as client:
+        first = await client.get("/api/v1/documents/public", params={"page_size": 5})
+        second = await client.get("/api/v1/documents/public", params={"page_size": 5, "page": 2})
+        assert first.status_code == second.status_code == 200
+        assert first.headers["etag"] != second.headers["etag"]
+
+        response = await client.get(
+            "/api/v1/documents/public",
+            params={"page_size": 5},
+            headers={"If-None-Match": second.headers["etag"]},
+        )
+        assert response.status_code == 200
+        assert response.json() == first.json()
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_hit_keeps_headers():
+    """A shared-cache hit carries the same validators as the response it replays"""
+    cache = await get_cache()
+    if cache.redis is None:
+        pytest.skip("shared response cache needs Redis")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", follow_redirects=True) as client:
+        first = await client.get("/api/v1/interests")
+        hit = await client.get("/api/v1/interests")
+
+    assert hit.headers["x-cache"] == "HIT"
+    assert hit.json() == first.json()
+    for header in ("etag", "cache-control", "content-type"):
+        assert hit.headers[header] == first.headers[header]
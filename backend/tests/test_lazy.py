@@ -0,0 +1,54 @@
+"""
+Test lazy loading helpers
+Nothing may be imported or built until it's used, and then only once
+"""
+import sys
+from unittest.mock import patch
+
+from app.core.lazy import LazyModule, LazyService, module_available
+
+
+def test_lazy_module_imports_and_configures_on_first_use():
+    configured = []
+    sys.modules.pop("colorsys", None)
+    colorsys = LazyModule("colorsys", configure=lambda module: configured.append(module.__name__))
+
+    assert not colorsys.loaded
+    assert "colorsys" not in sys.modules
+
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    colorsys.ONE_THIRD
+    assert colorsys.loaded
+    assert configured == ["colorsys"]
+
+
+def test_lazy_service_builds_once_and_forwards_writes():
+    built = []
+
+    class Service:
+        def __init__(self):
+            built.append(self)
+            self.client = "client"
+
+        def ping(self):
+            return "pong"
+
+    service = LazyService(Service)
+    assert not service.loaded and built == []
+
+    assert service.ping() == "pong"
+    assert service.client == "client"
+    assert len(built) == 1
+
+    service.client = None
+    assert built[0].client is None
+
+    with patch.object(service, "ping", return_value="patched"):
+        assert service.ping() == "patched"
+    assert service.ping() == "pong"
+
+
+def test_module_available():
+    assert module_available("json")
+    assert not module_available("not_a_real_module_anywhere")
+    assert not module_available("not_a_real_package.submodule")
@@ -0,0 +1,161 @@
+"""
+Test request-scoped batch loaders
+Loads made together must resolve with one query per loader, however many ids
+"""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import get_db_engine
+from app.core.query_profiler import start_profile, stop_profile
+from app.main import app
+from app.models.user import BetaReaderProfile, User
+from app.services.cache_service import get_cache
+from app.services.loaders import BADGES, USER, DataLoader, Loaders, invalidate_summary, summary_key
+
+
+class QueryCounter:
+    """Counts statements sent to the database through an engine"""
+
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.mark.asyncio
+async def test_dataloader_coalesces_loads_in_one_tick():
+    """All loads pending together go to batch_load once, deduplicated"""
+    calls = []
+
+    async def batch_load(keys):
+        calls.append(list(keys))
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader = DataLoader(batch_load)
+    values = await loader.load_many([1, 2, 2, 3, None])
+
+    assert values == [10, 20, 20, None, None]
+    assert calls == [[1, 2, 3]]
+
+    # Memoized for the loader's lifetime
+    assert await loader.load(1) == 10
+    assert len(calls) == 1
+
+    loader.clear(1)
+    assert await loader.load(1) == 10
+    assert calls[-1] == [1]
+
+
+@pytest.mark.asyncio
+async def test_dataloader_failed_batch_is_retried():
+    """A failed batch rejects its loads, and the next load tries again"""
+    attempts = []
+
+    async def batch_load(keys):
+        attempts.append(keys)
+        if len(attempts) == 1:
+            raise RuntimeError("database unavailable")
+        return {key: str(key) for key in keys}
+
+    loader = DataLoader(batch_load)
+    with pytest.raises(RuntimeError):
+        await loader.load_many([1, 2])
+
+    assert await loader.load_many([1, 2]) == ["1", "2"]
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_loaders_use_one_query_per_kind(test_user):
+    """Users and badges for many ids cost one IN (...) query each"""
+    engine = get_db_engine()
+    async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with async_session() as session:
+        user_id = test_user.id
+        missing_ids = [2_000_000_000 + i for i in range(20)]
+
+        loaders = Loaders(session, use_cache=False)
+        with QueryCounter(engine) as queries:
+            users, badges = await asyncio.gather(
+                loaders.users.load_many([user_id, *missing_ids, user_id]),
+                loaders.badges.load_many([user_id, *missing_ids]),
+            )
+
+        assert queries.count == 2
+        assert users[0]["id"] == user_id
+        assert users[0]["username"] == "testuser"
+        assert users[-1] == users[0]
+        assert all(user is None for user in users[1:-1])
+        assert all(isinstance(user_badges, list) for user_badges in badges)
+
+        # Already loaded in this request: no further queries
+        with QueryCounter(engine) as queries:
+            assert (await loaders.users.load(user_id))["id"] == user_id
+        assert queries.count == 0
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_marketplace_queries_dont_grow_with_page(test_db_session, test_user, cleanup):
+    """Browsing the beta marketplace costs the same queries for 1 profile or 6"""
+    db = test_db_session
+    genre = "loader-query-count"
+    readers = [
+        User(keycloak_id=f"loader-reader-{i}", email=f"loader-reader-{i}@example.com",
+             username=f"loader-reader-{i}", tenant_id=test_user.tenant_id)
+        for i in range(6)
+    ]
+    db.add_all(readers)
+    await db.commit()
+    profiles = [BetaReaderProfile(user_id=reader.id, genres=[genre], is_active=True) for reader in readers]
+    db.add_all(profiles)
+    await db.commit()
+    cleanup(*readers, *profiles)
+
+    async def browse(client, expected):
+        # Cold summaries, so every page has to query for its users and badges
+        for reader in readers:
+            await invalidate_summary(USER, reader.id)
+            await invalidate_summary(BADGES, reader.id)
+        profile, token = start_profile()
+        try:
+            response = await client.get(
+                "/api/v1/beta-profiles/marketplace", params={"genres": genre, "page_size": expected}
+            )
+        finally:
+            stop_profile(token)
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["profiles"]) == expected
+        return profile
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        one = await browse(client, 1)
+        six = await browse(client, 6)
+
+    assert six.count == one.count
+    assert six.repeated(threshold=1) == []
+
+    # Summaries are shared between users: nothing private goes to Redis
+    cache = await get_cache()
+    summary = await cache.get(summary_key(USER, readers[0].id))
+    assert summary is None or "email" not in summary
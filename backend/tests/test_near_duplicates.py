@@ -0,0 +1,113 @@
+"""
+Test the near-duplicate pre-screen
+Lightly edited copies are found through the memory-mapped LSH snapshot and
+through fingerprints written since, unrelated text and the author's own
+work are not
+"""
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import numpy as np
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.models.base import utc_now
+from app.models.content_fingerprint import ContentFingerprint
+from app.models.document import Document, DocumentStatus
+from app.services import near_duplicate_service
+from app.services.near_duplicate_service import (
+    DOCUMENT, NUM_PERM, LshSnapshot, NearDuplicateService, band_keys, current_snapshot, signature,
+)
+
+
+def _texts():
+    rng = random.Random(7)
+    vocabulary = [f"word{i}" for i in range(3000)]
+    original = [rng.choice(vocabulary) for _ in range(2000)]
+    edited = list(original)
+    for i in rng.sample(range(len(edited)), 20):
+        edited[i] = rng.choice(vocabulary)
+    unrelated = [rng.choice(vocabulary) for _ in range(2000)]
+    return " ".join(original), " ".join(edited), " ".join(unrelated)
+
+
+def test_signatures_estimate_similarity():
+    original, edited, unrelated = _texts()
+    sig, words = signature(original)
+
+    assert words == 2000
+    assert (sig == signature(original.upper())[0]).all()
+    assert (sig == signature(edited)[0]).mean() > 0.8
+    assert (sig == signature(unrelated)[0]).mean() < 0.1
+    assert signature("too short to fingerprint")[0] is None
+
+
+def test_snapshot_finds_candidates(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CONTENT_INDEX_DIR", str(tmp_path))
+    original, edited, _ = _texts()
+
+    rng = np.random.default_rng(0)
+    signatures = rng.integers(0, 2**32, size=(1000, NUM_PERM), dtype=np.uint64).astype(np.uint32)
+    signatures[500] = signature(edited)[0]
+    LshSnapshot.write(
+        signatures,
+        np.zeros(1000, dtype=np.uint8),
+        np.arange(1000, dtype=np.int64),
+        np.full(1000, -1, dtype=np.int64),
+        utc_now(),
+    )
+
+    snapshot = current_snapshot()
+    assert len(snapshot) == 1000
+    assert list(snapshot.candidates(band_keys(signature(original)[0][None, :])[0])) == [500]
+
+
+@pytest.mark.asyncio
+async def test_prescreen_matches_other_authors(test_db_session, test_user, cleanup, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CONTENT_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(near_duplicate_service, "_loaded", (None, None))
+    db = test_db_session
+    user = test_user
+    original, edited, unrelated = _texts()
+
+    def published(title, content):
+        return Document(
+            owner_id=user.id, tenant_id=user.tenant_id, title=title,
+            content=content, status=DocumentStatus.PUBLISHED
+        )
+
+    indexed, later, other = docs = [
+        published("near-dup-indexed", original),
+        published("near-dup-later", unrelated),
+        published("near-dup-unpublished", original),
+    ]
+    other.status = DocumentStatus.DRAFT
+    db.add_all(docs)
+    await db.commit()
+    cleanup(*docs, delete(ContentFingerprint).where(
+        ContentFingerprint.kind == DOCUMENT,
+        ContentFingerprint.source_id.in_([d.id for d in docs]),
+    ))
+    someone_else = user.id + 1_000_000
+
+    await NearDuplicateService.index(db, DOCUMENT, indexed.id, someone_else, original)
+    await NearDuplicateService.index(db, DOCUMENT, other.id, someone_else, original)
+    await NearDuplicateService.rebuild(db)
+    # Written after the snapshot: found by the direct comparison
+    await NearDuplicateService.index_document(db, later.id)
+
+    result = await NearDuplicateService.prescreen(db, edited)
+    assert [m["source_id"] for m in result["matches"]] == [indexed.id]
+    assert result["high_confidence"]
+
+    result = await NearDuplicateService.prescreen(db, unrelated)
+    assert [m["source_id"] for m in result["matches"]] == [later.id]
+
+    # The author's own work isn't plagiarism
+    result = await NearDuplicateService.prescreen(db, unrelated, exclude_owner=user.id)
+    assert result["matches"] == []
+
+    assert await NearDuplicateService.prune(db) == 1
@@ -0,0 +1,58 @@
+"""
+Test price analysis job leases
+A job whose worker stopped renewing its lease can be reclaimed, a live one
+can't, and the run that lost it notices on its next renewal
+"""
+from datetime import timedelta
+
+import pytest
+
+from app.models.base import utc_now
+from app.models.store import PriceAnalysisJob, PriceAnalysisJobStatus
+from app.services.price_analysis_service import JobLeaseLost, PriceAnalysisService
+
+
+def test_resumable_statuses():
+    now = utc_now()
+    stale = now - timedelta(seconds=PriceAnalysisService.LEASE_SECONDS + 1)
+
+    def job(status, updated_at=now):
+        return PriceAnalysisJob(status=status, updated_at=updated_at)
+
+    assert PriceAnalysisService.is_resumable(job(PriceAnalysisJobStatus.PENDING), now)
+    assert PriceAnalysisService.is_resumable(job(PriceAnalysisJobStatus.FAILED), now)
+    assert not PriceAnalysisService.is_resumable(job(PriceAnalysisJobStatus.RUNNING), now)
+    assert PriceAnalysisService.is_resumable(job(PriceAnalysisJobStatus.RUNNING, stale), now)
+    assert PriceAnalysisService.is_resumable(job(PriceAnalysisJobStatus.APPLYING, stale), now)
+    assert not PriceAnalysisService.is_resumable(job(PriceAnalysisJobStatus.COMPLETED, stale), now)
+
+
+@pytest.mark.asyncio
+async def test_stale_job_is_reclaimed(test_db_session, test_user, cleanup):
+    db = test_db_session
+    abandoned_at = utc_now() - timedelta(seconds=PriceAnalysisService.LEASE_SECONDS + 60)
+    stale, live = jobs = [
+        PriceAnalysisJob(requested_by=test_user.id, status=PriceAnalysisJobStatus.RUNNING,
+                         total_items=1, updated_at=abandoned_at),
+        PriceAnalysisJob(requested_by=test_user.id, status=PriceAnalysisJobStatus.RUNNING, total_items=1),
+    ]
+    db.add_all(jobs)
+    cleanup(*jobs)
+    await db.commit()
+
+    # The dead worker's view of its job, before the takeover
+    old_run = PriceAnalysisJob(id=stale.id, updated_at=stale.updated_at)
+
+    assert not await PriceAnalysisService.claim_job(db, live.id)
+    assert await PriceAnalysisService.claim_job(db, stale.id)
+    # Reclaimed once: the new lease is fresh
+    assert not await PriceAnalysisService.claim_job(db, stale.id)
+
+    with pytest.raises(JobLeaseLost):
+        await PriceAnalysisService.renew_lease(db, old_run)
+    await db.rollback()
+
+    await db.refresh(stale)
+    assert stale.status == PriceAnalysisJobStatus.RUNNING
+    await PriceAnalysisService.renew_lease(db, stale)
+    await db.commit()
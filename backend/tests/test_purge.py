@@ -0,0 +1,86 @@
+"""
+Test the batched purge engine
+Expired trash is deleted in bounded batches, and storage objects are removed
+with DeleteObjects calls of at most 1000 keys
+"""
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models.base import utc_now
+from app.models.document import Document
+from app.models.project import Project
+from app.services.purge_service import PurgeService
+from app.services.storage_service import StorageService
+from app.services.trash_service import TrashService, TRASH_RETENTION_DAYS
+
+
+class RecordingS3Client:
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = set(failing)
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [o["Key"] for o in Delete["Objects"]]
+        self.calls.append(keys)
+        return {"Errors": [{"Key": k, "Code": "AccessDenied"} for k in keys if k in self.failing]}
+
+
+def test_storage_deletes_in_batches_of_1000():
+    storage = StorageService()
+    storage.s3_client = RecordingS3Client(failing={"key-7"})
+
+    deleted = storage.delete_documents([f"key-{i}" for i in range(2500)])
+
+    assert [len(call) for call in storage.s3_client.calls] == [1000, 1000, 500]
+    assert deleted == 2499
+
+
+@pytest.mark.asyncio
+async def test_purge_expired_trash_in_batches(test_db_session, test_user, cleanup):
+    db = test_db_session
+    user = test_user
+
+    expired = utc_now() - timedelta(days=TRASH_RETENTION_DAYS + 1)
+    project = Project(tenant_id=user.tenant_id, user_id=user.id, title="purge-project", project_type="novel")
+    db.add(project)
+    cleanup(project)
+    await db.commit()
+
+    old = [
+        Document(owner_id=user.id, tenant_id=user.tenant_id, title=f"purge-old-{i}",
+                 is_deleted=True, deleted_at=expired)
+        for i in range(5)
+    ]
+    recent = Document(owner_id=user.id, tenant_id=user.tenant_id, title="purge-recent",
+                      is_deleted=True, deleted_at=utc_now())
+    in_project = [
+        Document(owner_id=user.id, tenant_id=user.tenant_id, title=f"purge-project-{i}", project_id=project.id)
+        for i in range(3)
+    ]
+    docs = [*old, recent, *in_project]
+    db.add_all(docs)
+    cleanup(*docs)
+    await db.commit()
+
+    # Soft delete of the project trashes its documents in one UPDATE
+    await TrashService.move_project_to_trash(db, project.id, user.id, move_documents=True)
+    trashed = (await db.execute(
+        select(Document.is_deleted).where(Document.id.in_([d.id for d in in_project]))
+    )).scalars().all()
+    assert trashed == [True, True, True]
+
+    condition = Document.id.in_([d.id for d in docs]) & (Document.deleted_at <= expired + timedelta(hours=1))
+    stats = await PurgeService.purge_documents(db, condition, batch_size=2)
+    assert stats["rows"] == 5
+    assert stats["batches"] == 3
+    assert stats["rows_per_batch"] == pytest.approx(5 / 3, abs=0.1)
+
+    remaining = (await db.execute(
+        select(Document.id).where(Document.id.in_([d.id for d in docs]))
+    )).scalars().all()
+    assert sorted(remaining) == sorted([recent.id, *[d.id for d in in_project]])
+
+    assert await TrashService.permanently_delete_project(db, project.id, user.id)
+    assert not await TrashService.permanently_delete_project(db, project.id, user.id)
@@ -0,0 +1,35 @@
+"""
+Test per-request query profiling
+Statements must be grouped by shape so N+1 patterns stand out
+"""
+from app.core.query_profiler import QueryProfile, fingerprint
+
+
+def test_fingerprint_ignores_values():
+    """Parameters, literals and IN list lengths don't change the fingerprint"""
+    assert fingerprint("SELECT users.id FROM users WHERE users.id = $1") == \
+        fingerprint("SELECT users.id  FROM users\nWHERE users.id = $7")
+    assert fingerprint("SELECT * FROM t WHERE id IN ($1, $2, $3) AND x = 'it''s' LIMIT 10") == \
+        "SELECT * FROM t WHERE id IN (...) AND x = ? LIMIT ?"
+    assert fingerprint("SELECT * FROM t WHERE id IN ($1, $2)") == fingerprint("SELECT * FROM t WHERE id IN ($1, $2, $3, $4)")
+    # Identifiers keep their digits
+    assert "anon_1" in fingerprint("SELECT anon_1.id FROM (SELECT 1 AS id) AS anon_1")
+
+
+def test_profile_flags_repeated_statements():
+    profile = QueryProfile()
+    for _ in range(12):
+        profile.record("SELECT users.id FROM users WHERE users.id = $1", 0.001)
+    profile.record("SELECT groups.id FROM groups", 0.002)
+
+    assert profile.count == 13
+    assert abs(profile.total_time - 0.014) < 1e-9
+    repeated = profile.repeated(threshold=10)
+    assert repeated == [("SELECT users.id FROM users WHERE users.id = ?", 12)]
+    assert profile.repeated(threshold=12) == []
+    assert profile.server_timing_header() == 'db;dur=14.0;desc="13 queries"'
+
+    # Nothing counts once the response has been sent
+    profile.finished = True
+    profile.record("SELECT 1", 0.5)
+    assert profile.count == 13
@@ -0,0 +1,55 @@
+"""
+Test the per-user saved-items index
+One lookup answers a whole page, and stays right as items are saved and
+removed (with or without Redis)
+"""
+from functools import partial
+
+import pytest
+
+from app.models.collection import BookmarkFolder, BookmarkFolderItem, BookmarkItemType
+from app.models.document import Document
+from app.services.reading_list_service import BookmarkService
+from app.services.saved_items_service import BOOKMARK, SavedItemsService, item_kind
+
+
+@pytest.mark.asyncio
+async def test_saved_state_for_a_page(test_db_session, test_user, cleanup):
+    db = test_db_session
+    user = test_user
+
+    document = Document(owner_id=user.id, tenant_id=user.tenant_id, title="saved-items")
+    reading, favourites = folders = [
+        BookmarkFolder(user_id=user.id, name="saved-items reading"),
+        BookmarkFolder(user_id=user.id, name="saved-items favourites"),
+    ]
+    db.add_all([document, *folders])
+    cleanup(partial(SavedItemsService.invalidate, user.id), document, *folders)
+    await db.commit()
+    await SavedItemsService.invalidate(user.id)
+
+    post = item_kind(BookmarkItemType.POST)
+    page = [(post, 101), (post, 102), (item_kind(BookmarkItemType.GROUP), 101), (BOOKMARK, document.id)]
+
+    in_reading = BookmarkFolderItem(folder_id=reading.id, item_type=BookmarkItemType.POST, item_id=101)
+    in_favourites = BookmarkFolderItem(folder_id=favourites.id, item_type=BookmarkItemType.POST, item_id=101)
+    db.add_all([in_reading, in_favourites])
+    await db.commit()
+    await SavedItemsService.mark_saved(user.id, post, 101)
+
+    await BookmarkService.create_bookmark(db, user.id, document.id)
+    assert await SavedItemsService.lookup(db, user.id, page) == [True, False, False, True]
+    assert await BookmarkService.bookmarked_ids(db, user.id, [document.id, -1]) == {document.id}
+
+    # Still in the other folder
+    await db.delete(in_reading)
+    await db.commit()
+    await SavedItemsService.mark_unsaved(db, user.id, post, 101)
+    assert (await SavedItemsService.lookup(db, user.id, page))[0] is True
+
+    await db.delete(in_favourites)
+    await db.commit()
+    await SavedItemsService.mark_unsaved(db, user.id, post, 101)
+    await BookmarkService.delete_bookmark(db, user.id, document.id)
+    assert await SavedItemsService.lookup(db, user.id, page) == [False, False, False, False]
+    assert not await BookmarkService.is_bookmarked(db, user.id, document.id)
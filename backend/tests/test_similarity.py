@@ -0,0 +1,107 @@
+"""
+Test the similarity index
+Works on the same subject rank above unrelated ones, through the
+memory-mapped matrix and through vectors written since; other editions of
+the same work and unpublished documents are left out
+"""
+import random
+import string
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import numpy as np
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.models.content_vector import ContentVector
+from app.models.document import Document, DocumentStatus
+from app.services import similarity_service
+from app.services.similarity_service import DOCUMENT, DIM, SimilarityService, features, project
+
+
+def _texts(subjects=3, per_subject=3):
+    """Texts drawing half their words from a subject's vocabulary"""
+    rng = random.Random(11)
+    vocabulary = ["".join(rng.choice(string.ascii_lowercase) for _ in range(8)) for _ in range(5000)]
+    texts = []
+    for subject in range(subjects):
+        words = rng.sample(vocabulary, 200)
+        for _ in range(per_subject):
+            texts.append(" ".join(
+                rng.choice(words) if rng.random() < 0.5 else rng.choice(vocabulary) for _ in range(1500)
+            ))
+    return texts
+
+
+def test_projection_ranks_same_subject_first():
+    texts = _texts()
+    rows = [features(text, ["Fantasy"] if i < 3 else []) for i, text in enumerate(texts)]
+    vectors = project(rows, np.ones(1 << similarity_service.FEATURE_BITS, dtype=np.float32))
+
+    assert vectors.shape == (9, DIM)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    scores = vectors @ vectors[0]
+    assert set(np.argsort(-scores)[:3]) == {0, 1, 2}
+    assert scores[1] > 0.5 > scores[5]
+    assert len(features("a an to")[0]) == 0
+
+
+@pytest.mark.asyncio
+async def test_similar_and_recommend(test_db_session, test_user, cleanup, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CONTENT_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(similarity_service, "_loaded", (None, None))
+    db = test_db_session
+    user = test_user
+    texts = _texts(subjects=2, per_subject=3)
+
+    docs = [
+        Document(
+            owner_id=user.id, tenant_id=user.tenant_id, title=f"similar-{i}",
+            content=text, status=DocumentStatus.PUBLISHED
+        )
+        for i, text in enumerate(texts)
+    ]
+    edition = Document(
+        owner_id=user.id, tenant_id=user.tenant_id, title="similar-edition",
+        content=texts[0], status=DocumentStatus.PUBLISHED
+    )
+    draft = Document(
+        owner_id=user.id, tenant_id=user.tenant_id, title="similar-draft",
+        content=texts[1], status=DocumentStatus.DRAFT
+    )
+    everything = docs + [edition, draft]
+    db.add_all(everything)
+    await db.commit()
+    cleanup(*everything, delete(ContentVector).where(
+        ContentVector.kind == DOCUMENT,
+        ContentVector.source_id.in_([d.id for d in everything]),
+    ))
+    someone_else = user.id + 1_000_000
+
+    for document in docs[:4]:
+        await SimilarityService.index_document(db, document.id)
+    await SimilarityService.index(db, DOCUMENT, draft.id, someone_else, texts[1])
+    await SimilarityService.rebuild(db)
+    # Written after the snapshot: found by the direct comparison
+    for document in docs[4:] + [edition]:
+        await SimilarityService.index_document(db, document.id)
+
+    results = await SimilarityService.similar(db, DOCUMENT, docs[0].id)
+    ids = [r["id"] for r in results]
+    assert ids[:2] and set(ids[:2]) == {docs[1].id, docs[2].id}
+    assert edition.id not in ids and draft.id not in ids
+    assert all(r["similarity"] >= similarity_service.MIN_SIMILARITY for r in results)
+
+    results = await SimilarityService.recommend(
+        db, [(DOCUMENT, docs[3].id, 1.0)], exclude={(DOCUMENT, docs[4].id)}
+    )
+    assert results[0]["id"] == docs[5].id
+    assert results[0]["because"] == {"kind": DOCUMENT, "id": docs[3].id}
+
+    assert await SimilarityService.recommend(
+        db, [(DOCUMENT, docs[3].id, 1.0)], exclude_owner=user.id
+    ) == []
+
+    assert await SimilarityService.prune(db) == 1
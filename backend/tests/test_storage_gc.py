@@ -0,0 +1,98 @@
+"""
+Test the storage garbage collector
+Unreferenced objects are deleted in batches; referenced, recent and
+unmanaged objects are kept, and an interrupted run resumes from its checkpoint
+"""
+from datetime import timedelta
+
+import pytest
+
+from app.models.base import utc_now
+from app.models.document import Document, DocumentMode, DocumentVersion
+from app.services.storage_gc_service import GcCheckpoint, StorageGarbageCollector
+from app.services.storage_service import storage_service
+
+
+class FakeS3:
+    """Bucket listing (in key order) and DeleteObjects over a dict"""
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.delete_calls = []
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, Bucket, Prefix, Delimiter=None, StartAfter=None):
+        keys = sorted(k for k in self.objects if k.startswith(Prefix) and (StartAfter is None or k > StartAfter))
+        if Delimiter:
+            yield {"CommonPrefixes": [{"Prefix": p} for p in sorted({k.split("/")[0] + "/" for k in keys})]}
+            return
+        for start in range(0, len(keys), 1000):
+            yield {"Contents": [
+                {"Key": k, "Size": 1, "LastModified": self.objects[k]} for k in keys[start:start + 1000]
+            ]}
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [o["Key"] for o in Delete["Objects"]]
+        self.delete_calls.append(keys)
+        for key in keys:
+            del self.objects[key]
+        return {}
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / "gc.json")
+    checkpoint = GcCheckpoint(path)
+    checkpoint.advance("1/documents/", "1/documents/5/content.txt")
+    checkpoint.finish("2/documents/", {"scanned": 3})
+
+    resumed = GcCheckpoint(path)
+    assert resumed.cursor("1/documents/") == "1/documents/5/content.txt"
+    assert resumed.is_done("2/documents/")
+    assert not resumed.is_done("1/documents/")
+
+    resumed.clear()
+    assert GcCheckpoint(path).cursor("1/documents/") is None
+
+
+@pytest.mark.asyncio
+async def test_collects_unreferenced_objects(test_db_session, test_user, cleanup, monkeypatch, tmp_path):
+    db = test_db_session
+    user = test_user
+
+    prefix = f"{user.tenant_id}/documents/"
+    old = utc_now() - timedelta(days=3)
+    document = Document(owner_id=user.id, tenant_id=user.tenant_id, title="gc", file_path=f"{prefix}gc/current.txt")
+    db.add(document)
+    cleanup(document)
+    await db.commit()
+    version = DocumentVersion(
+        document_id=document.id, version=1, title="gc", content="", mode=DocumentMode.ALPHA,
+        file_path=f"{prefix}gc/v1.txt"
+    )
+    db.add(version)
+    await db.commit()
+
+    orphans = [f"{prefix}gc/orphan-{i:04d}.txt" for i in range(1500)]
+    s3 = FakeS3({
+        document.file_path: old,
+        version.file_path: old,
+        f"{prefix}gc/uploading.txt": utc_now(),
+        "epub-submissions/not-a-submission.epub": old,
+        "published-books/kept.epub": old,
+        **{key: old for key in orphans},
+    })
+    monkeypatch.setattr(storage_service, "s3_client", s3)
+
+    collector = StorageGarbageCollector(
+        dry_run=False, workers=2, checkpoint=GcCheckpoint(str(tmp_path / "gc.json"))
+    )
+    result = await collector.run(prefixes=[prefix, "epub-submissions/"])
+
+    assert result["orphaned"] == 1501
+    assert result["deleted"] == 1501
+    assert all(len(call) <= 1000 for call in s3.delete_calls)
+    assert sorted(s3.objects) == sorted([
+        document.file_path, version.file_path, f"{prefix}gc/uploading.txt", "published-books/kept.epub"
+    ])
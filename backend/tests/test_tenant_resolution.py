@@ -0,0 +1,78 @@
+"""
+Test tenant resolution and compiled theme assets
+Hosts and themes must be served from memory, with versioned, immutable URLs
+"""
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.services.tenant_resolution_service import (
+    GROUP,
+    compile_theme,
+    normalize_host,
+    tenant_resolution,
+)
+
+THEME = {
+    "colors": {"primary_color": "#B34B0C", "text_color": "red;} body{display:none"},
+    "fonts": {"heading_font": 'Inter"; color: red', "body_font": "Inter"},
+    "assets": {"logo_url": None},
+    "layout": {"sidebar": "left"},
+    "custom_css": ".hero { margin: 0 }",
+}
+
+
+def test_compiled_theme_is_versioned_by_content():
+    """Same theme, same version; any edit, a new version"""
+    first = compile_theme(GROUP, 1, THEME)
+    again = compile_theme(GROUP, 1, THEME)
+    edited = compile_theme(GROUP, 1, {**THEME, "custom_css": ".hero { margin: 1rem }"})
+
+    assert first["version"] == again["version"]
+    assert first["version"] != edited["version"]
+
+    css = first["css"].decode()
+    assert "--theme-primary-color: #B34B0C;" in css
+    assert "display:none" not in css  # invalid colors are dropped
+    assert '--theme-heading-font: "Inter\\"; color: red";' in css
+    assert css.rstrip().endswith(".hero { margin: 0 }")
+
+
+def test_normalize_host():
+    assert normalize_host("Writers.WorkShelf.dev:443") == "writers.workshelf.dev"
+    assert normalize_host("example.com.") == "example.com"
+
+
+@pytest.mark.asyncio
+async def test_resolve_and_theme_assets(monkeypatch):
+    """Resolution and theme assets come from the in-memory map"""
+    theme = compile_theme(GROUP, 7, THEME)
+    tenant = {"kind": GROUP, "id": 7, "name": "Writers", "slug": "writers"}
+    monkeypatch.setattr(tenant_resolution, "_hosts", {"writers.workshelf.dev": tenant})
+    monkeypatch.setattr(tenant_resolution, "_themes", {(GROUP, 7): theme})
+    monkeypatch.setattr(tenant_resolution, "_loaded", True)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/api/v1/tenants/resolve", params={"host": "Writers.workshelf.dev"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == 7
+        assert data["theme"]["version"] == theme["version"]
+
+        response = await client.get(data["theme"]["css_url"])
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/css")
+        assert "immutable" in response.headers["cache-control"]
+        assert response.content == theme["css"]
+
+        etag = response.headers["etag"]
+        response = await client.get(data["theme"]["css_url"], headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        # Pages cached before an edit are sent to the current version
+        response = await client.get("/api/v1/tenants/themes/group/7/0000000000000000.json")
+        assert response.status_code == 307
+        assert response.headers["location"].endswith(f"/{theme['version']}.json")
+
+        response = await client.get("/api/v1/tenants/resolve", params={"host": "unknown.example.com"})
+        assert response.status_code == 404
@@ -0,0 +1,77 @@
+"""
+Test trending and popular discovery
+Scores are replayed from the event tables, so the ranking is the same with
+or without Redis
+"""
+from datetime import timedelta
+
+import pytest
+
+from app.models.base import utc_now
+from app.models.collaboration import Comment
+from app.models.document import Document, DocumentStatus, DocumentTag, Tag
+from app.models.studio_customization import DocumentView
+from app.schemas.discovery import SortBy, TimeRange
+from app.services.discovery_service import DiscoveryService
+from app.services.trending_service import TrendingService
+
+
+@pytest.mark.asyncio
+async def test_trending_decays_and_popular_does_not(test_db_session, test_user, cleanup):
+    db = test_db_session
+    user = test_user
+
+    def published(title):
+        return Document(
+            owner_id=user.id, tenant_id=user.tenant_id, title=title, status=DocumentStatus.PUBLISHED
+        )
+
+    viewed, discussed, classic, draft = docs = [
+        published("trending-viewed"),
+        published("trending-discussed"),
+        published("trending-classic"),
+        Document(owner_id=user.id, tenant_id=user.tenant_id, title="trending-draft"),
+    ]
+    tag = Tag(user_id=user.id, name="Trending-Test")
+    db.add_all([*docs, tag])
+    cleanup(tag, *docs)
+    await db.commit()
+
+    now = utc_now()
+    month_ago = now - timedelta(days=30)
+    db.add_all([
+        # 3 fresh views vs one fresh comment (weight 4) vs 10 old views
+        *[DocumentView(document_id=viewed.id, session_id=f"v{i}", is_unique=True) for i in range(3)],
+        DocumentView(document_id=viewed.id, session_id="v0", is_unique=False),
+        Comment(document_id=discussed.id, user_id=user.id, content="..."),
+        *[
+            DocumentView(document_id=classic.id, session_id=f"c{i}", is_unique=True,
+                         created_at=month_ago, updated_at=month_ago)
+            for i in range(10)
+        ],
+        *[DocumentView(document_id=draft.id, session_id=f"d{i}", is_unique=True) for i in range(20)],
+        DocumentTag(document_id=viewed.id, tag_id=tag.id),
+        DocumentTag(document_id=classic.id, tag_id=tag.id),
+    ])
+    await db.commit()
+    await TrendingService.replay(db)
+    ours = {viewed.id, discussed.id, classic.id, draft.id}
+
+    async def ranked(**filters):
+        documents, total = await DiscoveryService.discover_documents(db, limit=100, **filters)
+        return [d.id for d in documents if d.id in ours], total
+
+    ids, _ = await ranked(sort_by=SortBy.TRENDING, time_range=TimeRange.TODAY)
+    assert ids == [discussed.id, viewed.id]
+
+    ids, _ = await ranked(sort_by=SortBy.POPULAR)
+    assert ids == [classic.id, discussed.id, viewed.id]
+
+    ids, total = await ranked(sort_by=SortBy.POPULAR, tags=["trending-test"])
+    assert ids == [classic.id, viewed.id]
+    assert total == 2
+
+    # The total follows the filters on the recent sort too
+    ids, total = await ranked(sort_by=SortBy.RECENT, tags=["TRENDING-TEST"])
+    assert sorted(ids) == sorted([viewed.id, classic.id])
+    assert total == 2